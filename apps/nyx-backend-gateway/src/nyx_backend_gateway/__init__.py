@@ -6,22 +6,29 @@ from .gateway import (
     execute_wallet_transfer,
     fetch_wallet_balance,
 )
-from .migrations import apply_migrations
+from .migrations import MIGRATIONS, SCHEMA_VERSION, MigrationError, apply_migrations, read_schema_version
+from .pagination import MAX_PAGE_SIZE, Page, PaginationError, decode_cursor, encode_cursor
+from .pool import ConnectionPool, PoolStats, configure_pool, get_pool, pooled_connection
 from .storage import (
+    TUNED_PRAGMAS,
     EvidenceRun,
     FeeLedger,
     EntertainmentEvent,
     EntertainmentItem,
+    GatewayConnection,
     Listing,
     MessageEvent,
     Order,
     Purchase,
     Receipt,
+    StoragePragmas,
     Trade,
     WalletAccount,
     WalletTransfer,
+    apply_pragmas,
     apply_wallet_faucet,
     apply_wallet_transfer,
+    configure_pragmas,
     create_connection,
     delete_order,
     insert_entertainment_event,
@@ -35,6 +42,14 @@ from .storage import (
     insert_receipt,
     insert_trade,
     get_wallet_balance,
+    iter_entertainment_events,
+    iter_entertainment_items,
+    iter_listings,
+    iter_messages,
+    iter_orders,
+    iter_purchases,
+    iter_receipts,
+    iter_trades,
     list_entertainment_events,
     list_entertainment_items,
     list_listings,
@@ -43,33 +58,53 @@ from .storage import (
     list_purchases,
     list_trades,
     load_by_id,
+    on_unit_of_work_end,
+    open_connection,
+    unit_of_work,
     update_order_amount,
 )
 
 __all__ = [
+    "ConnectionPool",
     "EvidenceRun",
     "EntertainmentEvent",
     "EntertainmentItem",
     "FeeLedger",
+    "GatewayConnection",
     "GatewayError",
     "GatewayResult",
     "Listing",
+    "MAX_PAGE_SIZE",
+    "MIGRATIONS",
     "MessageEvent",
+    "MigrationError",
     "Order",
+    "Page",
+    "PaginationError",
+    "PoolStats",
     "Purchase",
     "Receipt",
+    "SCHEMA_VERSION",
+    "StoragePragmas",
+    "TUNED_PRAGMAS",
     "Trade",
     "WalletAccount",
     "WalletTransfer",
     "apply_migrations",
+    "apply_pragmas",
     "apply_wallet_faucet",
     "apply_wallet_transfer",
+    "configure_pool",
+    "configure_pragmas",
     "create_connection",
+    "decode_cursor",
     "delete_order",
+    "encode_cursor",
     "execute_run",
     "execute_wallet_faucet",
     "execute_wallet_transfer",
     "fetch_wallet_balance",
+    "get_pool",
     "insert_entertainment_event",
     "insert_entertainment_item",
     "insert_evidence_run",
@@ -81,6 +116,14 @@ __all__ = [
     "insert_receipt",
     "insert_trade",
     "get_wallet_balance",
+    "iter_entertainment_events",
+    "iter_entertainment_items",
+    "iter_listings",
+    "iter_messages",
+    "iter_orders",
+    "iter_purchases",
+    "iter_receipts",
+    "iter_trades",
     "list_entertainment_events",
     "list_entertainment_items",
     "list_listings",
@@ -89,5 +132,10 @@ __all__ = [
     "list_purchases",
     "list_trades",
     "load_by_id",
+    "on_unit_of_work_end",
+    "open_connection",
+    "pooled_connection",
+    "read_schema_version",
+    "unit_of_work",
     "update_order_amount",
 ]
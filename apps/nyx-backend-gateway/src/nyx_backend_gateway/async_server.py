@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+import io
+import socket
+import sys
+import threading
+import traceback
+
+
+class AsyncServerError(ValueError):
+    pass
+
+
+_DEFAULT_WORKERS = 32
+_DEFAULT_STREAM_WORKERS = 64
+_DEFAULT_MAX_CONNECTIONS = 1024
+_DEFAULT_KEEPALIVE_SECONDS = 15.0
+_MAX_HEADER_BYTES = 64 * 1024
+_MAX_REQUEST_BYTES = 1024 * 1024
+_WRITE_TIMEOUT_SECONDS = 30.0
+_WRITE_BUFFER_BYTES = 64 * 1024
+
+
+def _simple_response(status: HTTPStatus, text: str) -> bytes:
+    body = text.encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: text/plain; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def _request_framing(head: bytes) -> tuple[str, str, int, bool]:
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        raise AsyncServerError("bad request line")
+    length = 0
+    expect_continue = False
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise AsyncServerError("bad header")
+        name = name.strip().lower()
+        value = value.strip()
+        if name == "content-length":
+            if not value.isdigit():
+                raise AsyncServerError("bad content-length")
+            length = int(value)
+        elif name == "transfer-encoding":
+            raise AsyncServerError("transfer-encoding not supported")
+        elif name == "expect" and value.lower() == "100-continue":
+            expect_continue = True
+    return parts[0], parts[1].split("?", 1)[0], length, expect_continue
+
+
+def _is_stream_request(method: str, path: str) -> bool:
+    return method == "GET" and path.startswith("/chat/v1/rooms/") and path.endswith("/events")
+
+
+class _LoopWriter:
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter) -> None:
+        self._loop = loop
+        self._writer = writer
+        self._chunks: list[bytes] = []
+        self._buffered = 0
+
+    async def _send(self, data: bytes) -> None:
+        if self._writer.is_closing():
+            raise ConnectionResetError("connection closed")
+        self._writer.write(data)
+        await self._writer.drain()
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._buffered += len(data)
+        if self._buffered >= _WRITE_BUFFER_BYTES:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if not self._chunks:
+            return
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._buffered = 0
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._send(data), self._loop)
+        except RuntimeError as exc:
+            raise ConnectionResetError("server stopped") from exc
+        try:
+            future.result(timeout=_WRITE_TIMEOUT_SECONDS)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            raise ConnectionResetError("write timed out") from exc
+
+
+class _BufferedRequestMixin:
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, request: bytes, client_address: tuple, server: AsyncGatewayServer, wfile: _LoopWriter) -> None:
+        self.request = None
+        self.client_address = client_address
+        self.server = server
+        self.rfile = io.BytesIO(request)
+        self.wfile = wfile
+        self.close_connection = True
+        self.handle_one_request()
+        self.wfile.flush()
+
+    def handle_expect_100(self) -> bool:
+        return True
+
+
+class AsyncGatewayServer:
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handler_class: type[BaseHTTPRequestHandler],
+        workers: int = _DEFAULT_WORKERS,
+        stream_workers: int = _DEFAULT_STREAM_WORKERS,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        keepalive_seconds: float = _DEFAULT_KEEPALIVE_SECONDS,
+    ) -> None:
+        for name, value in (("workers", workers), ("stream_workers", stream_workers), ("max_connections", max_connections)):
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise AsyncServerError(f"{name} out of bounds")
+        if keepalive_seconds <= 0:
+            raise AsyncServerError("keepalive_seconds out of bounds")
+        self._handler_class = type(f"Buffered{handler_class.__name__}", (_BufferedRequestMixin, handler_class), {})
+        self._workers = workers
+        self._stream_workers = stream_workers
+        self._max_connections = max_connections
+        self._keepalive = float(keepalive_seconds)
+        self.socket = socket.create_server(server_address, backlog=max(128, max_connections // 4))
+        self.server_address = self.socket.getsockname()[:2]
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._started = threading.Event()
+        self._stopped = threading.Event()
+        self._stopped.set()
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._requests = 0
+        self._rejected = 0
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter, request: bytes, peer: tuple) -> bool:
+        wfile = _LoopWriter(loop, writer)
+        try:
+            handler = self._handler_class(request, peer, self, wfile)
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+            return False
+        return not handler.close_connection
+
+    async def _reject(self, writer: asyncio.StreamWriter, status: HTTPStatus, text: str) -> None:
+        with self._lock:
+            self._rejected += 1
+        writer.write(_simple_response(status, text))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            return
+
+    async def _serve_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        pools: tuple[ThreadPoolExecutor, ThreadPoolExecutor],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info("peername") or ("unknown", 0)
+        with self._lock:
+            admitted = self._connections < self._max_connections
+            if admitted:
+                self._connections += 1
+        try:
+            if not admitted:
+                await self._reject(writer, HTTPStatus.SERVICE_UNAVAILABLE, "server busy")
+                return
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self._keepalive)
+                except asyncio.LimitOverrunError:
+                    await self._reject(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "headers too large")
+                    return
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                try:
+                    method, path, length, expect_continue = _request_framing(head)
+                except AsyncServerError as exc:
+                    await self._reject(writer, HTTPStatus.BAD_REQUEST, str(exc))
+                    return
+                if length > _MAX_REQUEST_BYTES:
+                    await self._reject(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "payload too large")
+                    return
+                if expect_continue and length:
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                with self._lock:
+                    self._requests += 1
+                pool = pools[1] if _is_stream_request(method, path) else pools[0]
+                keep_alive = await loop.run_in_executor(pool, self._dispatch, loop, writer, head + body, peer)
+                if not keep_alive:
+                    return
+        finally:
+            if admitted:
+                with self._lock:
+                    self._connections -= 1
+            writer.close()
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        pools = (
+            ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="nyx-gateway-worker"),
+            ThreadPoolExecutor(max_workers=self._stream_workers, thread_name_prefix="nyx-gateway-stream"),
+        )
+        tasks: set[asyncio.Task] = set()
+
+        async def accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            task = asyncio.current_task()
+            tasks.add(task)
+            try:
+                await self._serve_connection(reader, writer, pools)
+            except asyncio.CancelledError:
+                return
+            finally:
+                tasks.discard(task)
+
+        server = await asyncio.start_server(accept, sock=self.socket, limit=_MAX_HEADER_BYTES)
+        self._started.set()
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for pool in pools:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def serve_forever(self) -> None:
+        self._stopped.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._loop = None
+            self._started.clear()
+            self._stopped.set()
+
+    def shutdown(self) -> None:
+        if self._started.wait(timeout=5.0):
+            loop, stop = self._loop, self._stop
+            if loop is not None and stop is not None:
+                try:
+                    loop.call_soon_threadsafe(stop.set)
+                except RuntimeError:
+                    pass
+        self._stopped.wait()
+
+    def server_close(self) -> None:
+        self.socket.close()
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            return {"connections": self._connections, "requests": self._requests, "rejected": self._rejected}
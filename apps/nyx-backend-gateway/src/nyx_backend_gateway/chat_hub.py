@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+import threading
+import time
+from typing import Iterator
+
+
+class ChatHubError(ValueError):
+    pass
+
+
+_DEFAULT_MAX_SUBSCRIBERS_PER_ROOM = 64
+
+
+class _Room:
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.seq = 0
+        self.subscribers = 0
+
+
+class Subscription:
+    def __init__(self, hub: ChatHub, room_id: str, room: _Room) -> None:
+        self.room_id = room_id
+        self._hub = hub
+        self._room = room
+
+    def wait(self, after: int, timeout: float) -> bool:
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._room.condition:
+            while self._room.seq <= after and not self._hub.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._room.condition.wait(remaining)
+            return self._room.seq > after
+
+
+@dataclass(frozen=True)
+class ChatHubStats:
+    rooms: int
+    subscribers: int
+    published: int
+
+
+class ChatHub:
+    def __init__(self, max_subscribers_per_room: int = _DEFAULT_MAX_SUBSCRIBERS_PER_ROOM) -> None:
+        if not isinstance(max_subscribers_per_room, int) or max_subscribers_per_room < 1:
+            raise ChatHubError("max_subscribers_per_room out of bounds")
+        self._max_subscribers = max_subscribers_per_room
+        self._lock = threading.Lock()
+        self._rooms: dict[str, _Room] = {}
+        self._published = 0
+        self.closed = False
+
+    @contextmanager
+    def subscribe(self, room_id: str) -> Iterator[Subscription]:
+        with self._lock:
+            if self.closed:
+                raise ChatHubError("chat hub closed")
+            room = self._rooms.get(room_id)
+            if room is None:
+                room = _Room()
+                self._rooms[room_id] = room
+            if room.subscribers >= self._max_subscribers:
+                raise ChatHubError("too many subscribers")
+            room.subscribers += 1
+        try:
+            yield Subscription(self, room_id, room)
+        finally:
+            with self._lock:
+                room.subscribers -= 1
+                if room.subscribers == 0 and self._rooms.get(room_id) is room:
+                    del self._rooms[room_id]
+
+    def publish(self, room_id: str, seq: int) -> None:
+        with self._lock:
+            self._published += 1
+            room = self._rooms.get(room_id)
+        if room is None:
+            return
+        with room.condition:
+            if seq > room.seq:
+                room.seq = seq
+            room.condition.notify_all()
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            rooms = list(self._rooms.values())
+        for room in rooms:
+            with room.condition:
+                room.condition.notify_all()
+
+    def stats(self) -> ChatHubStats:
+        with self._lock:
+            return ChatHubStats(
+                rooms=len(self._rooms),
+                subscribers=sum(room.subscribers for room in self._rooms.values()),
+                published=self._published,
+            )
+
+
+_HUB = ChatHub()
+
+
+def get_chat_hub() -> ChatHub:
+    return _HUB
+
+
+def configure_chat_hub(max_subscribers_per_room: int = _DEFAULT_MAX_SUBSCRIBERS_PER_ROOM) -> ChatHub:
+    global _HUB
+    previous = _HUB
+    _HUB = ChatHub(max_subscribers_per_room=max_subscribers_per_room)
+    previous.close()
+    return _HUB
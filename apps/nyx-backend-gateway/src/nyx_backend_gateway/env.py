@@ -1,14 +1,36 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 import os
 from pathlib import Path
+import signal
+import threading
+import time
+from typing import Mapping
 
+from nyx_backend_gateway.metrics import get_registry
 from nyx_backend_gateway.storage import StorageError
 
 
-def load_env_file(path: Path) -> None:
+_DEFAULT_CHECK_INTERVAL_SECONDS = 1.0
+_CONFIG_KEYS = (
+    "NYX_TESTNET_TREASURY_ADDRESS",
+    "NYX_TESTNET_FEE_ADDRESS",
+    "NYX_PLATFORM_FEE_BPS",
+    "NYX_PROTOCOL_FEE_MIN",
+    "NYX_PORTAL_SESSION_SECRET",
+    "NYX_PORTAL_CHALLENGE_TTL",
+)
+
+_CONFIG_RELOADS = get_registry().counter(
+    "nyx_gateway_config_reloads_total", "Configuration reloads, by outcome", ("outcome",)
+)
+
+
+def _read_env_file(path: Path) -> dict[str, str]:
     if not path.exists():
         raise StorageError("env file not found")
+    values: dict[str, str] = {}
     for line in path.read_text(encoding="utf-8").splitlines():
         stripped = line.strip()
         if not stripped or stripped.startswith("#"):
@@ -19,13 +41,28 @@ def load_env_file(path: Path) -> None:
         key = key.strip()
         value = value.strip()
         if key:
-            os.environ.setdefault(key, value)
+            values[key] = value
+    return values
 
 
-def get_treasury_address() -> str:
-    address = os.environ.get("NYX_TESTNET_TREASURY_ADDRESS", "").strip()
+def load_env_file(path: Path) -> None:
+    for key, value in _read_env_file(path).items():
+        os.environ.setdefault(key, value)
+
+
+@dataclass(frozen=True)
+class GatewayConfig:
+    treasury_address: str
+    platform_fee_bps: int | None
+    protocol_fee_min: int | None
+    portal_session_secret: str
+    portal_challenge_ttl_seconds: int
+
+
+def _parse_treasury_address(environ: Mapping[str, str]) -> str:
+    address = environ.get("NYX_TESTNET_TREASURY_ADDRESS", "").strip()
     if not address:
-        address = os.environ.get("NYX_TESTNET_FEE_ADDRESS", "").strip()
+        address = environ.get("NYX_TESTNET_FEE_ADDRESS", "").strip()
     if not address:
         return "testnet-treasury-unconfigured"
     if len(address) < 8:
@@ -33,12 +70,8 @@ def get_treasury_address() -> str:
     return address
 
 
-def get_fee_address() -> str:
-    return get_treasury_address()
-
-
-def get_platform_fee_bps() -> int | None:
-    raw = os.environ.get("NYX_PLATFORM_FEE_BPS", "").strip()
+def _parse_platform_fee_bps(environ: Mapping[str, str]) -> int | None:
+    raw = environ.get("NYX_PLATFORM_FEE_BPS", "").strip()
     if not raw:
         return None
     try:
@@ -50,8 +83,8 @@ def get_platform_fee_bps() -> int | None:
     return value
 
 
-def get_protocol_fee_min() -> int | None:
-    raw = os.environ.get("NYX_PROTOCOL_FEE_MIN", "").strip()
+def _parse_protocol_fee_min(environ: Mapping[str, str]) -> int | None:
+    raw = environ.get("NYX_PROTOCOL_FEE_MIN", "").strip()
     if not raw:
         return None
     try:
@@ -63,8 +96,8 @@ def get_protocol_fee_min() -> int | None:
     return value
 
 
-def get_portal_session_secret() -> str:
-    secret = os.environ.get("NYX_PORTAL_SESSION_SECRET", "").strip()
+def _parse_portal_session_secret(environ: Mapping[str, str]) -> str:
+    secret = environ.get("NYX_PORTAL_SESSION_SECRET", "").strip()
     if not secret:
         return "testnet-session-secret"
     if len(secret) < 12:
@@ -72,8 +105,8 @@ def get_portal_session_secret() -> str:
     return secret
 
 
-def get_portal_challenge_ttl_seconds() -> int:
-    raw = os.environ.get("NYX_PORTAL_CHALLENGE_TTL", "").strip()
+def _parse_portal_challenge_ttl_seconds(environ: Mapping[str, str]) -> int:
+    raw = environ.get("NYX_PORTAL_CHALLENGE_TTL", "").strip()
     if not raw:
         return 300
     try:
@@ -83,3 +116,165 @@ def get_portal_challenge_ttl_seconds() -> int:
     if value < 60 or value > 3600:
         raise StorageError("NYX_PORTAL_CHALLENGE_TTL out of bounds")
     return value
+
+
+def parse_config(environ: Mapping[str, str]) -> GatewayConfig:
+    return GatewayConfig(
+        treasury_address=_parse_treasury_address(environ),
+        platform_fee_bps=_parse_platform_fee_bps(environ),
+        protocol_fee_min=_parse_protocol_fee_min(environ),
+        portal_session_secret=_parse_portal_session_secret(environ),
+        portal_challenge_ttl_seconds=_parse_portal_challenge_ttl_seconds(environ),
+    )
+
+
+def _file_mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class ConfigStore:
+    def __init__(
+        self,
+        env_file: Path | None = None,
+        check_interval_seconds: float = _DEFAULT_CHECK_INTERVAL_SECONDS,
+        environ: Mapping[str, str] | None = None,
+    ) -> None:
+        if isinstance(check_interval_seconds, bool) or not isinstance(check_interval_seconds, (int, float)):
+            raise StorageError("check_interval_seconds must be number")
+        if check_interval_seconds < 0:
+            raise StorageError("check_interval_seconds must be non-negative")
+        self._env_file = env_file
+        self._check_interval = float(check_interval_seconds)
+        self._environ = os.environ if environ is None else environ
+        self._lock = threading.Lock()
+        self._config: GatewayConfig | None = None
+        self._environ_values: tuple[str | None, ...] | None = None
+        self._mtime: int | None = None
+        self._next_check = 0.0
+        self._reload_requested = False
+        self._last_error: str | None = None
+
+    @property
+    def env_file(self) -> Path | None:
+        return self._env_file
+
+    @property
+    def last_error(self) -> str | None:
+        return self._last_error
+
+    def _environ_snapshot(self) -> tuple[str | None, ...]:
+        return tuple(self._environ.get(key) for key in _CONFIG_KEYS)
+
+    def get(self) -> GatewayConfig:
+        config = self._config
+        if config is not None and not self._reload_requested and self._environ_snapshot() == self._environ_values:
+            if self._env_file is None or time.monotonic() < self._next_check:
+                return config
+        return self._refresh()
+
+    def reload(self) -> GatewayConfig:
+        with self._lock:
+            self._reload_requested = False
+            return self._load()
+
+    def request_reload(self) -> None:
+        self._reload_requested = True
+
+    def _refresh(self) -> GatewayConfig:
+        with self._lock:
+            config = self._config
+            if config is None:
+                return self._load()
+            self._next_check = time.monotonic() + self._check_interval
+            requested = self._reload_requested
+            self._reload_requested = False
+            environ_values = self._environ_snapshot()
+            environ_changed = environ_values != self._environ_values
+            self._environ_values = environ_values
+            if not requested and not environ_changed:
+                if self._env_file is None or _file_mtime(self._env_file) == self._mtime:
+                    return config
+            try:
+                return self._load()
+            except StorageError as exc:
+                self._last_error = str(exc)
+                return config
+
+    def _load(self) -> GatewayConfig:
+        try:
+            values: dict[str, str] = {}
+            mtime = None
+            environ_values = self._environ_snapshot()
+            self._environ_values = environ_values
+            if self._env_file is not None:
+                mtime = _file_mtime(self._env_file)
+                values = _read_env_file(self._env_file)
+            for key, value in zip(_CONFIG_KEYS, environ_values):
+                if value is not None:
+                    values[key] = value
+            config = parse_config(values)
+        except StorageError:
+            _CONFIG_RELOADS.labels("error").inc()
+            raise
+        self._mtime = mtime
+        self._next_check = time.monotonic() + self._check_interval
+        self._last_error = None
+        self._config = config
+        _CONFIG_RELOADS.labels("ok").inc()
+        return config
+
+
+_CONFIG = ConfigStore()
+
+
+def get_config() -> GatewayConfig:
+    return _CONFIG.get()
+
+
+def reload_config() -> GatewayConfig:
+    return _CONFIG.reload()
+
+
+def configure_config(
+    env_file: Path | None = None,
+    check_interval_seconds: float = _DEFAULT_CHECK_INTERVAL_SECONDS,
+) -> ConfigStore:
+    global _CONFIG
+    store = ConfigStore(env_file=env_file, check_interval_seconds=check_interval_seconds)
+    store.reload()
+    _CONFIG = store
+    return store
+
+
+def install_reload_signal() -> bool:
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGHUP, lambda signum, frame: _CONFIG.request_reload())
+    return True
+
+
+def get_treasury_address() -> str:
+    return get_config().treasury_address
+
+
+def get_fee_address() -> str:
+    return get_treasury_address()
+
+
+def get_platform_fee_bps() -> int | None:
+    return get_config().platform_fee_bps
+
+
+def get_protocol_fee_min() -> int | None:
+    return get_config().protocol_fee_min
+
+
+def get_portal_session_secret() -> str:
+    return get_config().portal_session_secret
+
+
+def get_portal_challenge_ttl_seconds() -> int:
+    return get_config().portal_challenge_ttl_seconds
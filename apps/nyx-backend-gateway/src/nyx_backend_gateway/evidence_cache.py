@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import threading
+
+
+class EvidenceCacheError(ValueError):
+    pass
+
+
+_DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class CachedEvidence:
+    version: tuple[object, ...] | None
+    evidence: object
+    status_json: bytes
+    evidence_json: bytes
+    artifacts: dict[str, bytes]
+
+
+@dataclass(frozen=True)
+class EvidenceCacheStats:
+    entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+def _json_bytes(payload: dict[str, object]) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _build(run_id: str, run_root: Path, version: tuple[object, ...] | None) -> CachedEvidence:
+    from nyx_backend.evidence import evidence_artifacts, load_evidence
+
+    evidence = load_evidence(run_id, base_dir=run_root)
+    return CachedEvidence(
+        version=version,
+        evidence=evidence,
+        status_json=_json_bytes({"status": "complete", "replay_ok": evidence.replay_ok}),
+        evidence_json=_json_bytes(
+            {
+                "protocol_anchor": evidence.protocol_anchor,
+                "inputs": evidence.inputs,
+                "outputs": evidence.outputs,
+                "receipt_hashes": evidence.receipt_hashes,
+                "state_hash": evidence.state_hash,
+                "replay_ok": evidence.replay_ok,
+                "stdout": evidence.stdout,
+            }
+        ),
+        artifacts=evidence_artifacts(run_id, evidence),
+    )
+
+
+class EvidenceCache:
+    def __init__(self, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        if not isinstance(max_entries, int) or isinstance(max_entries, bool) or max_entries < 0:
+            raise EvidenceCacheError("max_entries out of bounds")
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], CachedEvidence] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, run_id: str, run_root: Path) -> CachedEvidence:
+        from nyx_backend.evidence import evidence_version
+
+        version = evidence_version(run_id, base_dir=run_root)
+        key = (str(run_root), run_id)
+        if version is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == version:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry
+        entry = _build(run_id, run_root, version)
+        with self._lock:
+            self._misses += 1
+            if version is None or self._max_entries == 0:
+                self._entries.pop(key, None)
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> EvidenceCacheStats:
+        with self._lock:
+            return EvidenceCacheStats(
+                entries=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+_EVIDENCE = EvidenceCache()
+
+
+def get_evidence_cache() -> EvidenceCache:
+    return _EVIDENCE
+
+
+def configure_evidence_cache(max_entries: int = _DEFAULT_MAX_ENTRIES) -> EvidenceCache:
+    global _EVIDENCE
+    _EVIDENCE = EvidenceCache(max_entries=max_entries)
+    return _EVIDENCE
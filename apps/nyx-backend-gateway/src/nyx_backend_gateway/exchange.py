@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 import hashlib
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+import re
+import time
 
+from nyx_backend_gateway.metrics import get_registry
+from nyx_backend_gateway.orderbook import OrderBook, OrderBookError, get_engine
 from nyx_backend_gateway.storage import (
+    GatewayConnection,
     Order,
     Trade,
     delete_order,
     insert_order,
     insert_trade,
-    list_orders,
+    on_unit_of_work_end,
+    unit_of_work,
     update_order_amount,
 )
 
 
+_PLACE_ORDER_SECONDS = get_registry().histogram(
+    "nyx_gateway_place_order_seconds", "place_order time, from engine sync to commit"
+)
+_ORDERS = get_registry().counter("nyx_gateway_orders_total", "Orders placed, by outcome", ("outcome",))
+_TRADES = get_registry().counter("nyx_gateway_trades_total", "Trades produced by matching")
+
+
 class ExchangeError(ValueError):
     pass
 
@@ -29,32 +43,22 @@ def _trade_id(order_id: str, counter_id: str, amount: int) -> str:
     return f"trade-{digest[:16]}"
 
 
-def _fetch_opposites(conn, order: Order) -> list[dict[str, object]]:
-    if order.side == "BUY":
-        return list_orders(
-            conn,
-            side="SELL",
-            asset_in=order.asset_out,
-            asset_out=order.asset_in,
-            order_by="price ASC, order_id ASC",
-        )
-    return list_orders(
-        conn,
-        side="BUY",
-        asset_in=order.asset_out,
-        asset_out=order.asset_in,
-        order_by="price DESC, order_id ASC",
-    )
+def _transaction(conn):
+    if isinstance(conn, GatewayConnection):
+        return unit_of_work(conn)
+    return nullcontext(conn)
 
 
-def place_order(conn, order: Order) -> ExchangeResult:
-    insert_order(conn, order)
+def _match(book: OrderBook, order: Order) -> tuple[list[Trade], list[tuple[str, int]], int]:
     trades: list[Trade] = []
+    fills: list[tuple[str, int]] = []
     remaining = order.amount
-    for row in _fetch_opposites(conn, order):
-        opposite_price = int(row["price"])
-        opposite_amount = int(row["amount"])
-        opposite_id = str(row["order_id"])
+    for resting in book.opposites(order.side):
+        if resting.order_id == order.order_id:
+            continue
+        opposite_price = resting.price
+        opposite_amount = resting.amount
+        opposite_id = resting.order_id
         if order.side == "BUY" and order.price < opposite_price:
             break
         if order.side == "SELL" and order.price > opposite_price:
@@ -69,20 +73,106 @@ def place_order(conn, order: Order) -> ExchangeResult:
                 run_id=order.run_id,
             )
         )
-        insert_trade(conn, trades[-1])
-        if trade_amount == opposite_amount:
-            delete_order(conn, opposite_id)
-        else:
-            update_order_amount(conn, opposite_id, opposite_amount - trade_amount)
+        fills.append((opposite_id, opposite_amount - trade_amount))
         remaining -= trade_amount
         if remaining == 0:
             break
-    if remaining == 0:
-        delete_order(conn, order.order_id)
-    elif remaining != order.amount:
-        update_order_amount(conn, order.order_id, remaining)
+    return trades, fills, remaining
+
+
+def place_order(conn, order: Order) -> ExchangeResult:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = _place_order(conn, order)
+        outcome = "matched" if result.trades else "resting"
+        _TRADES.inc(len(result.trades))
+        return result
+    finally:
+        _PLACE_ORDER_SECONDS.observe(time.perf_counter() - started)
+        _ORDERS.labels(outcome).inc()
+
+
+def _place_order(conn, order: Order) -> ExchangeResult:
+    engine = get_engine(conn)
+    engine.acquire()
+    try:
+        engine.sync(conn)
+        trades, fills, remaining = _match(engine.book_for(order), order)
+        with _transaction(conn):
+            insert_order(conn, order)
+            for trade, (opposite_id, opposite_left) in zip(trades, fills):
+                insert_trade(conn, trade)
+                if opposite_left == 0:
+                    delete_order(conn, opposite_id)
+                else:
+                    update_order_amount(conn, opposite_id, opposite_left)
+            if remaining == 0:
+                delete_order(conn, order.order_id)
+            elif remaining != order.amount:
+                update_order_amount(conn, order.order_id, remaining)
+            engine.remove(order.order_id)
+            for opposite_id, opposite_left in fills:
+                if opposite_left == 0:
+                    engine.remove(opposite_id)
+                else:
+                    engine.set_amount(opposite_id, opposite_left)
+            if remaining:
+                engine.add(replace(order, amount=remaining))
+            engine.mark_synced(conn)
+    except BaseException:
+        engine.finish(False)
+        raise
+    on_unit_of_work_end(conn, engine.finish)
     return ExchangeResult(order=order, trades=trades)
 
 
 def cancel_order(conn, order_id: str) -> None:
-    delete_order(conn, order_id)
+    engine = get_engine(conn)
+    engine.acquire()
+    try:
+        engine.sync(conn)
+        with _transaction(conn):
+            delete_order(conn, order_id)
+            engine.remove(order_id)
+            engine.mark_synced(conn)
+    except BaseException:
+        engine.finish(False)
+        raise
+    on_unit_of_work_end(conn, engine.finish)
+
+
+def order_book_snapshot(conn) -> dict[str, list[dict[str, object]]]:
+    engine = get_engine(conn)
+    with engine:
+        engine.sync(conn)
+        return engine.snapshot()
+
+
+def _pair(asset_in: object, asset_out: object) -> tuple[str, str]:
+    for name, value in (("asset_in", asset_in), ("asset_out", asset_out)):
+        if not isinstance(value, str) or not re.fullmatch(r"[A-Za-z0-9_./-]{1,128}", value):
+            raise ExchangeError(f"{name} invalid")
+    return asset_in, asset_out
+
+
+def order_book_depth(conn, asset_in: str, asset_out: str, depth: int = 20, tick: int = 1) -> dict[str, object]:
+    pair = _pair(asset_in, asset_out)
+    engine = get_engine(conn)
+    with engine:
+        engine.sync(conn)
+        try:
+            return engine.depth(pair, depth, tick)
+        except OrderBookError as exc:
+            raise ExchangeError(str(exc)) from exc
+
+
+def order_book_deltas(conn, asset_in: str, asset_out: str, since: int) -> dict[str, object]:
+    pair = _pair(asset_in, asset_out)
+    engine = get_engine(conn)
+    with engine:
+        engine.sync(conn)
+        try:
+            return engine.deltas(pair, since)
+        except OrderBookError as exc:
+            raise ExchangeError(str(exc)) from exc
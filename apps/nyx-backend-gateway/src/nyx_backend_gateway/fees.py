@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from dataclasses import dataclass
 import hashlib
+import json
 from pathlib import Path
 import sys
+import threading
 
-from nyx_backend_gateway.env import get_fee_address, get_platform_fee_bps
+from nyx_backend_gateway.env import GatewayConfig, get_config
 from nyx_backend_gateway.storage import FeeLedger
 
 
@@ -12,6 +16,25 @@ class FeeRoutingError(ValueError):
     pass
 
 
+_DEFAULT_QUOTE_CACHE_SIZE = 1024
+_PAYER = "testnet-payer"
+
+
+@dataclass(frozen=True)
+class FeeQuote:
+    protocol_fee_total: int
+    platform_fee_amount: int
+    total_paid: int
+
+
+@dataclass(frozen=True)
+class FeeQuoteCacheStats:
+    capacity: int
+    size: int
+    hits: int
+    misses: int
+
+
 def _repo_root() -> Path:
     path = Path(__file__).resolve()
     for _ in range(5):
@@ -46,8 +69,7 @@ def _payload_amount(payload: dict[str, object]) -> int:
     return 1
 
 
-def _platform_fee_amount(payload: dict[str, object]) -> int:
-    bps = get_platform_fee_bps()
+def _platform_fee_amount(payload: dict[str, object], bps: int | None) -> int:
     if bps is None:
         return 1
     if bps == 0:
@@ -57,7 +79,15 @@ def _platform_fee_amount(payload: dict[str, object]) -> int:
     return amount if amount > 0 else 1
 
 
-def route_fee(module: str, action: str, payload: dict[str, object], run_id: str) -> FeeLedger:
+def _payload_digest(payload: dict[str, object]) -> str:
+    try:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError) as exc:
+        raise FeeRoutingError("payload must be JSON") from exc
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _compute_quote(module: str, action: str, payload: dict[str, object], platform_amount: int) -> FeeQuote:
     _ensure_fee_paths()
     from action import ActionDescriptor, ActionKind
     from engine import FeeEngineV0
@@ -70,9 +100,7 @@ def route_fee(module: str, action: str, payload: dict[str, object], run_id: str)
         payload=payload,
     )
     engine = FeeEngineV0()
-    payer = "testnet-payer"
-    platform_amount = _platform_fee_amount(payload)
-    quote = quote_platform_fee(engine, action_desc, payer, platform_fee_amount=platform_amount)
+    quote = quote_platform_fee(engine, action_desc, _PAYER, platform_fee_amount=platform_amount)
     receipt = enforce_platform_fee(
         engine,
         quote,
@@ -80,14 +108,93 @@ def route_fee(module: str, action: str, payload: dict[str, object], run_id: str)
         paid_platform_amount=quote.platform_fee_amount,
         payer=quote.payer,
     )
-    fee_address = get_fee_address()
+    return FeeQuote(
+        protocol_fee_total=quote.protocol_quote.fee_vector.total(),
+        platform_fee_amount=quote.platform_fee_amount,
+        total_paid=receipt.total_paid,
+    )
+
+
+class FeeQuoteCache:
+    def __init__(self, capacity: int = _DEFAULT_QUOTE_CACHE_SIZE) -> None:
+        if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 1:
+            raise FeeRoutingError("capacity must be positive int")
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, str, int | None], FeeQuote] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(
+        self,
+        module: str,
+        action: str,
+        payload: dict[str, object],
+        config: GatewayConfig | None = None,
+    ) -> FeeQuote:
+        bps = (config or get_config()).platform_fee_bps
+        key = (module, action, _payload_digest(payload), bps)
+        with self._lock:
+            quote = self._entries.get(key)
+            if quote is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return quote
+            self._misses += 1
+        quote = _compute_quote(module, action, payload, _platform_fee_amount(payload, bps))
+        with self._lock:
+            self._entries[key] = quote
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+        return quote
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> FeeQuoteCacheStats:
+        with self._lock:
+            return FeeQuoteCacheStats(
+                capacity=self._capacity,
+                size=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+            )
+
+
+_QUOTES = FeeQuoteCache()
+
+
+def get_fee_quote_cache() -> FeeQuoteCache:
+    return _QUOTES
+
+
+def configure_fee_quote_cache(capacity: int = _DEFAULT_QUOTE_CACHE_SIZE) -> FeeQuoteCache:
+    global _QUOTES
+    _QUOTES = FeeQuoteCache(capacity=capacity)
+    return _QUOTES
+
+
+def quote_fee(
+    module: str,
+    action: str,
+    payload: dict[str, object],
+    config: GatewayConfig | None = None,
+) -> FeeQuote:
+    return _QUOTES.get(module, action, payload, config)
+
+
+def route_fee(module: str, action: str, payload: dict[str, object], run_id: str) -> FeeLedger:
+    config = get_config()
+    quote = quote_fee(module, action, payload, config)
     return FeeLedger(
         fee_id=_fee_id(run_id),
         module=module,
         action=action,
-        protocol_fee_total=quote.protocol_quote.fee_vector.total(),
+        protocol_fee_total=quote.protocol_fee_total,
         platform_fee_amount=quote.platform_fee_amount,
-        total_paid=receipt.total_paid,
-        fee_address=fee_address,
+        total_paid=quote.total_paid,
+        fee_address=config.treasury_address,
         run_id=run_id,
     )
@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import hashlib
+import os
 import re
+import sys
+import time
 from pathlib import Path
 from typing import Any
 
+from nyx_backend_gateway.env import get_config
 from nyx_backend_gateway.exchange import ExchangeError, cancel_order, place_order
 from nyx_backend_gateway.fees import route_fee
+from nyx_backend_gateway.metrics import get_registry
+from nyx_backend_gateway.pool import pooled_connection
 from nyx_backend_gateway.storage import (
     EvidenceRun,
     EntertainmentEvent,
@@ -21,7 +27,6 @@ from nyx_backend_gateway.storage import (
     apply_wallet_faucet,
     apply_wallet_faucet_with_fee,
     apply_wallet_transfer,
-    create_connection,
     insert_entertainment_event,
     insert_entertainment_item,
     insert_evidence_run,
@@ -32,6 +37,8 @@ from nyx_backend_gateway.storage import (
     insert_receipt,
     get_wallet_balance,
     load_by_id,
+    set_span_factory,
+    unit_of_work,
 )
 
 
@@ -45,12 +52,56 @@ class GatewayResult:
     state_hash: str
     receipt_hashes: list[str]
     replay_ok: bool
+    fee: FeeLedger | None = None
 
 
 _MAX_AMOUNT = 1_000_000
 _MAX_PRICE = 1_000_000
 _ENTERTAINMENT_MODES = {"pulse", "drift", "scan"}
 _ADDRESS_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_FEE_ACTIONS = frozenset(
+    {
+        ("exchange", "route_swap"),
+        ("exchange", "place_order"),
+        ("exchange", "cancel_order"),
+        ("marketplace", "order_intent"),
+        ("marketplace", "listing_publish"),
+        ("marketplace", "purchase_listing"),
+    }
+)
+_METRIC_MODULES = frozenset({"exchange", "chat", "marketplace", "entertainment", "wallet"})
+_RUN_SECONDS = get_registry().histogram(
+    "nyx_gateway_run_duration_seconds", "execute_run time, by module and outcome", ("module", "outcome")
+)
+_EVIDENCE_SECONDS = get_registry().histogram(
+    "nyx_gateway_evidence_duration_seconds", "run_evidence time, by module", ("module",)
+)
+
+
+def _module_label(module: object) -> str:
+    return module if isinstance(module, str) and module in _METRIC_MODULES else "other"
+
+
+def _run_evidence(**kwargs: Any):
+    _tracing()
+    from nyx_backend.evidence import FeeSettings, run_evidence
+
+    config = get_config()
+    kwargs.setdefault(
+        "fee_settings",
+        FeeSettings(treasury_address=config.treasury_address, platform_fee_bps=config.platform_fee_bps),
+    )
+    with _EVIDENCE_SECONDS.labels(_module_label(kwargs.get("module"))).time():
+        return run_evidence(**kwargs)
+
+
+def _evidence_fee(record: FeeLedger) -> dict[str, object]:
+    return {
+        "protocol_fee_total": record.protocol_fee_total,
+        "platform_fee_amount": record.platform_fee_amount,
+        "total_paid": record.total_paid,
+        "treasury_address": record.fee_address,
+    }
 
 
 def _entertainment_items() -> list[EntertainmentItem]:
@@ -92,6 +143,26 @@ def _backend_src() -> Path:
     return _repo_root() / "apps" / "nyx-backend" / "src"
 
 
+def _ensure_backend_path() -> None:
+    backend_src = str(_backend_src())
+    if backend_src not in sys.path:
+        sys.path.insert(0, backend_src)
+
+
+_TRACING = None
+
+
+def _tracing():
+    global _TRACING
+    if _TRACING is None:
+        _ensure_backend_path()
+        from nyx_backend import tracing
+
+        set_span_factory(tracing.span)
+        _TRACING = tracing
+    return _TRACING
+
+
 def _run_root() -> Path:
     root = _repo_root() / "apps" / "nyx-backend-gateway" / "runs"
     root.mkdir(parents=True, exist_ok=True)
@@ -104,6 +175,11 @@ def _db_path() -> Path:
     return data_dir / "nyx_gateway.db"
 
 
+def _trace_cache_dir() -> Path:
+    raw = os.environ.get("NYX_TRACE_CACHE_DIR", "").strip()
+    return Path(raw) if raw else _run_root() / ".traces"
+
+
 def _deterministic_id(prefix: str, run_id: str) -> str:
     digest = hashlib.sha256(f"{prefix}:{run_id}".encode("utf-8")).hexdigest()
     return f"{prefix}-{digest[:16]}"
@@ -262,175 +338,204 @@ def execute_run(
     db_path: Path | None = None,
     run_root: Path | None = None,
 ) -> GatewayResult:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with _tracing().span("gateway.execute_run", module=_module_label(module)):
+            result = _execute_run(
+                seed=seed,
+                run_id=run_id,
+                module=module,
+                action=action,
+                payload=payload,
+                db_path=db_path,
+                run_root=run_root,
+            )
+        outcome = "ok"
+        return result
+    finally:
+        _RUN_SECONDS.labels(_module_label(module), outcome).observe(time.perf_counter() - started)
+
+
+def _execute_run(
+    *,
+    seed: int,
+    run_id: str,
+    module: str,
+    action: str,
+    payload: dict[str, Any] | None,
+    db_path: Path | None,
+    run_root: Path | None,
+) -> GatewayResult:
+    span = _tracing().span
     if payload is None:
         payload = {}
-    if module == "exchange" and action in {"route_swap"}:
-        payload = _validate_exchange_payload(payload)
-    if module == "exchange" and action == "place_order":
-        payload = _validate_place_order(payload)
-    if module == "exchange" and action == "cancel_order":
-        payload = _validate_cancel(payload)
-    if module == "chat" and action == "message_event":
-        payload = _validate_chat_payload(payload)
-    if module == "marketplace" and action == "order_intent":
-        payload = _validate_market_payload(payload)
-    if module == "marketplace" and action == "listing_publish":
-        payload = _validate_listing_payload(payload)
-    if module == "marketplace" and action == "purchase_listing":
-        payload = _validate_purchase_payload(payload)
-    if module == "entertainment" and action == "state_step":
-        payload = _validate_entertainment_payload(payload)
-
-    backend_src = _backend_src()
-    if str(backend_src) not in __import__("sys").path:
-        __import__("sys").path.insert(0, str(backend_src))
-
-    from nyx_backend.evidence import EvidenceError, run_evidence
+    with span("gateway.validate"):
+        if module == "exchange" and action in {"route_swap"}:
+            payload = _validate_exchange_payload(payload)
+        if module == "exchange" and action == "place_order":
+            payload = _validate_place_order(payload)
+        if module == "exchange" and action == "cancel_order":
+            payload = _validate_cancel(payload)
+        if module == "chat" and action == "message_event":
+            payload = _validate_chat_payload(payload)
+        if module == "marketplace" and action == "order_intent":
+            payload = _validate_market_payload(payload)
+        if module == "marketplace" and action == "listing_publish":
+            payload = _validate_listing_payload(payload)
+        if module == "marketplace" and action == "purchase_listing":
+            payload = _validate_purchase_payload(payload)
+        if module == "entertainment" and action == "state_step":
+            payload = _validate_entertainment_payload(payload)
+
+    _ensure_backend_path()
+
+    from nyx_backend.evidence import EvidenceError
 
     run_root = run_root or _run_root()
+    fee_record: FeeLedger | None = None
+    if (module, action) in _FEE_ACTIONS:
+        with span("gateway.route_fee"):
+            fee_record = route_fee(module, action, payload, run_id)
     try:
-        evidence = run_evidence(
+        evidence = _run_evidence(
             seed=seed,
             run_id=run_id,
             module=module,
             action=action,
             payload=payload,
             base_dir=run_root,
+            fee_quote=_evidence_fee(fee_record) if fee_record is not None else None,
         )
     except EvidenceError as exc:
         raise GatewayError(str(exc)) from exc
 
-    conn = create_connection(db_path or _db_path())
-    insert_evidence_run(
-        conn,
-        EvidenceRun(
-            run_id=run_id,
-            module=module,
-            action=action,
-            seed=seed,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-        ),
-    )
-    insert_receipt(
-        conn,
-        Receipt(
-            receipt_id=_receipt_id(run_id),
-            module=module,
-            action=action,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-            run_id=run_id,
-        ),
-    )
-
-    fee_record: FeeLedger | None = None
-    if module == "exchange" and action in {"route_swap", "place_order", "cancel_order"}:
-        fee_record = route_fee(module, action, payload, run_id)
-        insert_fee_ledger(conn, fee_record)
-    if module == "marketplace" and action in {"order_intent", "listing_publish", "purchase_listing"}:
-        fee_record = route_fee(module, action, payload, run_id)
-        insert_fee_ledger(conn, fee_record)
-
-    if module == "exchange" and action == "place_order":
-        order = Order(
-            order_id=_order_id(run_id),
-            side=payload["side"],
-            amount=payload["amount"],
-            price=payload["price"],
-            asset_in=payload["asset_in"],
-            asset_out=payload["asset_out"],
-            run_id=run_id,
-        )
-        try:
-            place_order(conn, order)
-        except ExchangeError as exc:
-            raise GatewayError(str(exc)) from exc
-    if module == "exchange" and action == "cancel_order":
-        try:
-            cancel_order(conn, payload["order_id"])
-        except ExchangeError as exc:
-            raise GatewayError(str(exc)) from exc
-
-    if module == "chat" and action == "message_event":
-        insert_message_event(
-            conn,
-            MessageEvent(
-                message_id=_deterministic_id("message", run_id),
-                channel=payload["channel"],
-                body=payload["message"],
-                run_id=run_id,
-            ),
-        )
-    if module == "marketplace" and action == "order_intent":
-        insert_listing(
+    with span("gateway.persist"), pooled_connection(db_path or _db_path()) as conn, unit_of_work(conn):
+        insert_evidence_run(
             conn,
-            Listing(
-                listing_id=_deterministic_id("listing", run_id),
-                sku=payload["sku"],
-                title=payload["title"],
-                price=payload["price"],
+            EvidenceRun(
                 run_id=run_id,
+                module=module,
+                action=action,
+                seed=seed,
+                state_hash=evidence.state_hash,
+                receipt_hashes=evidence.receipt_hashes,
+                replay_ok=evidence.replay_ok,
             ),
         )
-        insert_purchase(
+        insert_receipt(
             conn,
-            Purchase(
-                purchase_id=_deterministic_id("purchase", run_id),
-                listing_id=_deterministic_id("listing", run_id),
-                qty=payload["qty"],
+            Receipt(
+                receipt_id=_receipt_id(run_id),
+                module=module,
+                action=action,
+                state_hash=evidence.state_hash,
+                receipt_hashes=evidence.receipt_hashes,
+                replay_ok=evidence.replay_ok,
                 run_id=run_id,
             ),
         )
-    if module == "marketplace" and action == "listing_publish":
-        insert_listing(
-            conn,
-            Listing(
-                listing_id=_deterministic_id("listing", run_id),
-                sku=payload["sku"],
-                title=payload["title"],
+
+        if fee_record is not None:
+            insert_fee_ledger(conn, fee_record)
+
+        if module == "exchange" and action == "place_order":
+            order = Order(
+                order_id=_order_id(run_id),
+                side=payload["side"],
+                amount=payload["amount"],
                 price=payload["price"],
+                asset_in=payload["asset_in"],
+                asset_out=payload["asset_out"],
                 run_id=run_id,
-            ),
-        )
-    if module == "marketplace" and action == "purchase_listing":
-        listing_record = load_by_id(conn, "listings", "listing_id", payload["listing_id"])
-        if listing_record is None:
-            raise GatewayError("listing_id not found")
-        insert_purchase(
-            conn,
-            Purchase(
-                purchase_id=_deterministic_id("purchase", run_id),
-                listing_id=payload["listing_id"],
-                qty=payload["qty"],
-                run_id=run_id,
-            ),
-        )
-    if module == "entertainment" and action == "state_step":
-        _ensure_entertainment_items(conn)
-        item_record = load_by_id(conn, "entertainment_items", "item_id", payload["item_id"])
-        if item_record is None:
-            raise GatewayError("item_id not found")
-        insert_entertainment_event(
-            conn,
-            EntertainmentEvent(
-                event_id=_deterministic_id("ent-event", run_id),
-                item_id=payload["item_id"],
-                mode=payload["mode"],
-                step=payload["step"],
-                run_id=run_id,
-            ),
-        )
-
-    conn.close()
+            )
+            try:
+                with span("exchange.place_order"):
+                    place_order(conn, order)
+            except ExchangeError as exc:
+                raise GatewayError(str(exc)) from exc
+        if module == "exchange" and action == "cancel_order":
+            try:
+                cancel_order(conn, payload["order_id"])
+            except ExchangeError as exc:
+                raise GatewayError(str(exc)) from exc
+
+        if module == "chat" and action == "message_event":
+            insert_message_event(
+                conn,
+                MessageEvent(
+                    message_id=_deterministic_id("message", run_id),
+                    channel=payload["channel"],
+                    body=payload["message"],
+                    run_id=run_id,
+                ),
+            )
+        if module == "marketplace" and action == "order_intent":
+            insert_listing(
+                conn,
+                Listing(
+                    listing_id=_deterministic_id("listing", run_id),
+                    sku=payload["sku"],
+                    title=payload["title"],
+                    price=payload["price"],
+                    run_id=run_id,
+                ),
+            )
+            insert_purchase(
+                conn,
+                Purchase(
+                    purchase_id=_deterministic_id("purchase", run_id),
+                    listing_id=_deterministic_id("listing", run_id),
+                    qty=payload["qty"],
+                    run_id=run_id,
+                ),
+            )
+        if module == "marketplace" and action == "listing_publish":
+            insert_listing(
+                conn,
+                Listing(
+                    listing_id=_deterministic_id("listing", run_id),
+                    sku=payload["sku"],
+                    title=payload["title"],
+                    price=payload["price"],
+                    run_id=run_id,
+                ),
+            )
+        if module == "marketplace" and action == "purchase_listing":
+            listing_record = load_by_id(conn, "listings", "listing_id", payload["listing_id"])
+            if listing_record is None:
+                raise GatewayError("listing_id not found")
+            insert_purchase(
+                conn,
+                Purchase(
+                    purchase_id=_deterministic_id("purchase", run_id),
+                    listing_id=payload["listing_id"],
+                    qty=payload["qty"],
+                    run_id=run_id,
+                ),
+            )
+        if module == "entertainment" and action == "state_step":
+            _ensure_entertainment_items(conn)
+            item_record = load_by_id(conn, "entertainment_items", "item_id", payload["item_id"])
+            if item_record is None:
+                raise GatewayError("item_id not found")
+            insert_entertainment_event(
+                conn,
+                EntertainmentEvent(
+                    event_id=_deterministic_id("ent-event", run_id),
+                    item_id=payload["item_id"],
+                    mode=payload["mode"],
+                    step=payload["step"],
+                    run_id=run_id,
+                ),
+            )
 
     return GatewayResult(
         run_id=run_id,
         state_hash=evidence.state_hash,
         receipt_hashes=evidence.receipt_hashes,
         replay_ok=evidence.replay_ok,
+        fee=fee_record,
     )
 
 
@@ -444,75 +549,76 @@ def execute_wallet_transfer(
 ) -> tuple[GatewayResult, dict[str, int], FeeLedger]:
     validated = _validate_wallet_transfer(payload)
     fee_record = route_fee("wallet", "transfer", validated, run_id)
-    conn = create_connection(db_path or _db_path())
-    from_balance = get_wallet_balance(conn, validated["from_address"])
-    total_debit = validated["amount"] + fee_record.total_paid
-    if from_balance < total_debit:
-        raise GatewayError("insufficient balance")
+    with pooled_connection(db_path or _db_path()) as conn:
+        from_balance = get_wallet_balance(conn, validated["from_address"])
+        total_debit = validated["amount"] + fee_record.total_paid
+        if from_balance < total_debit:
+            raise GatewayError("insufficient balance")
 
-    backend_src = _backend_src()
-    if str(backend_src) not in __import__("sys").path:
-        __import__("sys").path.insert(0, str(backend_src))
-    from nyx_backend.evidence import EvidenceError, run_evidence
+        _ensure_backend_path()
+        from nyx_backend.evidence import EvidenceError
 
-    run_root = run_root or _run_root()
-    try:
-        evidence = run_evidence(
-            seed=seed,
-            run_id=run_id,
-            module="wallet",
-            action="transfer",
-            payload=validated,
-            base_dir=run_root,
-        )
-    except EvidenceError as exc:
-        raise GatewayError(str(exc)) from exc
+        run_root = run_root or _run_root()
+        try:
+            evidence = _run_evidence(
+                seed=seed,
+                run_id=run_id,
+                module="wallet",
+                action="transfer",
+                payload=validated,
+                base_dir=run_root,
+                fee_quote=_evidence_fee(fee_record),
+            )
+        except EvidenceError as exc:
+            raise GatewayError(str(exc)) from exc
 
-    insert_evidence_run(
-        conn,
-        EvidenceRun(
-            run_id=run_id,
-            module="wallet",
-            action="transfer",
-            seed=seed,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-        ),
-    )
-    insert_receipt(
-        conn,
-        Receipt(
-            receipt_id=_receipt_id(run_id),
-            module="wallet",
-            action="transfer",
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-            run_id=run_id,
-        ),
-    )
-    balances = apply_wallet_transfer(
-        conn,
-        transfer_id=_deterministic_id("wallet", run_id),
-        from_address=validated["from_address"],
-        to_address=validated["to_address"],
-        amount=validated["amount"],
-        fee_total=fee_record.total_paid,
-        treasury_address=fee_record.fee_address,
-        run_id=run_id,
-    )
-    insert_fee_ledger(conn, fee_record)
-    return (
-        GatewayResult(
-            run_id=run_id,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-        ),
-        balances,
-        fee_record,
-    )
+        with unit_of_work(conn):
+            insert_evidence_run(
+                conn,
+                EvidenceRun(
+                    run_id=run_id,
+                    module="wallet",
+                    action="transfer",
+                    seed=seed,
+                    state_hash=evidence.state_hash,
+                    receipt_hashes=evidence.receipt_hashes,
+                    replay_ok=evidence.replay_ok,
+                ),
+            )
+            insert_receipt(
+                conn,
+                Receipt(
+                    receipt_id=_receipt_id(run_id),
+                    module="wallet",
+                    action="transfer",
+                    state_hash=evidence.state_hash,
+                    receipt_hashes=evidence.receipt_hashes,
+                    replay_ok=evidence.replay_ok,
+                    run_id=run_id,
+                ),
+            )
+            balances = apply_wallet_transfer(
+                conn,
+                transfer_id=_deterministic_id("wallet", run_id),
+                from_address=validated["from_address"],
+                to_address=validated["to_address"],
+                amount=validated["amount"],
+                fee_total=fee_record.total_paid,
+                treasury_address=fee_record.fee_address,
+                run_id=run_id,
+            )
+            insert_fee_ledger(conn, fee_record)
+        return (
+            GatewayResult(
+                run_id=run_id,
+                state_hash=evidence.state_hash,
+                receipt_hashes=evidence.receipt_hashes,
+                replay_ok=evidence.replay_ok,
+                fee=fee_record,
+            ),
+            balances,
+            fee_record,
+        )
 
 
 def execute_wallet_faucet(
@@ -524,67 +630,66 @@ def execute_wallet_faucet(
     run_root: Path | None = None,
 ) -> tuple[GatewayResult, int]:
     validated = _validate_wallet_faucet(payload)
-    conn = create_connection(db_path or _db_path())
-    existing = load_by_id(conn, "evidence_runs", "run_id", run_id)
-    if existing is not None:
-        raise GatewayError("run_id already exists")
+    with pooled_connection(db_path or _db_path()) as conn:
+        existing = load_by_id(conn, "evidence_runs", "run_id", run_id)
+        if existing is not None:
+            raise GatewayError("run_id already exists")
 
-    backend_src = _backend_src()
-    if str(backend_src) not in __import__("sys").path:
-        __import__("sys").path.insert(0, str(backend_src))
-    from nyx_backend.evidence import EvidenceError, run_evidence
+        _ensure_backend_path()
+        from nyx_backend.evidence import EvidenceError
 
-    run_root = run_root or _run_root()
-    try:
-        evidence = run_evidence(
-            seed=seed,
-            run_id=run_id,
-            module="wallet",
-            action="faucet",
-            payload=validated,
-            base_dir=run_root,
-        )
-    except EvidenceError as exc:
-        raise GatewayError(str(exc)) from exc
+        run_root = run_root or _run_root()
+        try:
+            evidence = _run_evidence(
+                seed=seed,
+                run_id=run_id,
+                module="wallet",
+                action="faucet",
+                payload=validated,
+                base_dir=run_root,
+            )
+        except EvidenceError as exc:
+            raise GatewayError(str(exc)) from exc
 
-    insert_evidence_run(
-        conn,
-        EvidenceRun(
-            run_id=run_id,
-            module="wallet",
-            action="faucet",
-            seed=seed,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-        ),
-    )
-    insert_receipt(
-        conn,
-        Receipt(
-            receipt_id=_receipt_id(run_id),
-            module="wallet",
-            action="faucet",
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-            run_id=run_id,
-        ),
-    )
-    balance = apply_wallet_faucet(
-        conn,
-        validated["address"],
-        validated["amount"],
-    )
-    return (
-        GatewayResult(
-            run_id=run_id,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-        ),
-        balance,
-    )
+        with unit_of_work(conn):
+            insert_evidence_run(
+                conn,
+                EvidenceRun(
+                    run_id=run_id,
+                    module="wallet",
+                    action="faucet",
+                    seed=seed,
+                    state_hash=evidence.state_hash,
+                    receipt_hashes=evidence.receipt_hashes,
+                    replay_ok=evidence.replay_ok,
+                ),
+            )
+            insert_receipt(
+                conn,
+                Receipt(
+                    receipt_id=_receipt_id(run_id),
+                    module="wallet",
+                    action="faucet",
+                    state_hash=evidence.state_hash,
+                    receipt_hashes=evidence.receipt_hashes,
+                    replay_ok=evidence.replay_ok,
+                    run_id=run_id,
+                ),
+            )
+            balance = apply_wallet_faucet(
+                conn,
+                validated["address"],
+                validated["amount"],
+            )
+        return (
+            GatewayResult(
+                run_id=run_id,
+                state_hash=evidence.state_hash,
+                receipt_hashes=evidence.receipt_hashes,
+                replay_ok=evidence.replay_ok,
+            ),
+            balance,
+        )
 
 
 def execute_wallet_faucet_v1(
@@ -598,77 +703,76 @@ def execute_wallet_faucet_v1(
 ) -> tuple[GatewayResult, int, FeeLedger]:
     validated = _validate_wallet_faucet(payload)
     _require_token(payload)
-    conn = create_connection(db_path or _db_path())
-    existing = load_by_id(conn, "evidence_runs", "run_id", run_id)
-    if existing is not None:
-        raise GatewayError("run_id already exists")
+    with pooled_connection(db_path or _db_path()) as conn:
+        existing = load_by_id(conn, "evidence_runs", "run_id", run_id)
+        if existing is not None:
+            raise GatewayError("run_id already exists")
 
-    backend_src = _backend_src()
-    if str(backend_src) not in __import__("sys").path:
-        __import__("sys").path.insert(0, str(backend_src))
-    from nyx_backend.evidence import EvidenceError, run_evidence
+        _ensure_backend_path()
+        from nyx_backend.evidence import EvidenceError
 
-    run_root = run_root or _run_root()
-    try:
-        evidence = run_evidence(
-            seed=seed,
-            run_id=run_id,
-            module="wallet",
-            action="faucet",
-            payload=validated,
-            base_dir=run_root,
-        )
-    except EvidenceError as exc:
-        raise GatewayError(str(exc)) from exc
+        run_root = run_root or _run_root()
+        try:
+            evidence = _run_evidence(
+                seed=seed,
+                run_id=run_id,
+                module="wallet",
+                action="faucet",
+                payload=validated,
+                base_dir=run_root,
+            )
+        except EvidenceError as exc:
+            raise GatewayError(str(exc)) from exc
 
-    insert_evidence_run(
-        conn,
-        EvidenceRun(
-            run_id=run_id,
-            module="wallet",
-            action="faucet",
-            seed=seed,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-        ),
-    )
-    insert_receipt(
-        conn,
-        Receipt(
-            receipt_id=_receipt_id(run_id),
-            module="wallet",
-            action="faucet",
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-            run_id=run_id,
-        ),
-    )
-    fee_record = route_fee("wallet", "faucet_v1", {"amount": validated["amount"]}, run_id)
-    if fee_record.total_paid <= 0:
-        raise GatewayError("fee_total must be nonzero")
-    balances = apply_wallet_faucet_with_fee(
-        conn,
-        address=validated["address"],
-        amount=validated["amount"],
-        fee_total=fee_record.total_paid,
-        treasury_address=fee_record.fee_address,
-        run_id=run_id,
-    )
-    insert_fee_ledger(conn, fee_record)
-    return (
-        GatewayResult(
-            run_id=run_id,
-            state_hash=evidence.state_hash,
-            receipt_hashes=evidence.receipt_hashes,
-            replay_ok=evidence.replay_ok,
-        ),
-        balances["balance"],
-        fee_record,
-    )
+        with unit_of_work(conn):
+            insert_evidence_run(
+                conn,
+                EvidenceRun(
+                    run_id=run_id,
+                    module="wallet",
+                    action="faucet",
+                    seed=seed,
+                    state_hash=evidence.state_hash,
+                    receipt_hashes=evidence.receipt_hashes,
+                    replay_ok=evidence.replay_ok,
+                ),
+            )
+            insert_receipt(
+                conn,
+                Receipt(
+                    receipt_id=_receipt_id(run_id),
+                    module="wallet",
+                    action="faucet",
+                    state_hash=evidence.state_hash,
+                    receipt_hashes=evidence.receipt_hashes,
+                    replay_ok=evidence.replay_ok,
+                    run_id=run_id,
+                ),
+            )
+            fee_record = route_fee("wallet", "faucet_v1", {"amount": validated["amount"]}, run_id)
+            if fee_record.total_paid <= 0:
+                raise GatewayError("fee_total must be nonzero")
+            balances = apply_wallet_faucet_with_fee(
+                conn,
+                address=validated["address"],
+                amount=validated["amount"],
+                fee_total=fee_record.total_paid,
+                treasury_address=fee_record.fee_address,
+                run_id=run_id,
+            )
+            insert_fee_ledger(conn, fee_record)
+        return (
+            GatewayResult(
+                run_id=run_id,
+                state_hash=evidence.state_hash,
+                receipt_hashes=evidence.receipt_hashes,
+                replay_ok=evidence.replay_ok,
+            ),
+            balances["balance"],
+            fee_record,
+        )
 
 
 def fetch_wallet_balance(*, address: str, db_path: Path | None = None) -> int:
-    conn = create_connection(db_path or _db_path())
-    return get_wallet_balance(conn, address)
+    with pooled_connection(db_path or _db_path()) as conn:
+        return get_wallet_balance(conn, address)
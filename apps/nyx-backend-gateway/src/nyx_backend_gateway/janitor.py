@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import re
+import shutil
+import threading
+import time
+from typing import Callable
+
+from nyx_backend_gateway.pool import pooled_connection
+from nyx_backend_gateway.storage import purge_expired_portal_challenges, purge_expired_portal_sessions
+
+
+class JanitorError(ValueError):
+    pass
+
+
+_RUN_DIR_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+@dataclass(frozen=True)
+class JanitorConfig:
+    interval_seconds: float = 300.0
+    batch_size: int = 500
+    max_batches: int = 20
+    run_retention_seconds: int | None = 7 * 24 * 3600
+    run_keep_latest: int | None = 1000
+    run_prune_limit: int = 200
+    incremental_vacuum_pages: int = 1000
+
+
+def _validate_config(config: JanitorConfig) -> JanitorConfig:
+    if config.interval_seconds <= 0:
+        raise JanitorError("interval_seconds out of bounds")
+    for name in ("batch_size", "max_batches", "run_prune_limit", "incremental_vacuum_pages"):
+        value = getattr(config, name)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise JanitorError(f"{name} out of bounds")
+    for name in ("run_retention_seconds", "run_keep_latest"):
+        value = getattr(config, name)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise JanitorError(f"{name} out of bounds")
+    return config
+
+
+@dataclass(frozen=True)
+class SweepReport:
+    challenges_purged: int
+    sessions_purged: int
+    runs_pruned: int
+    vacuumed_pages: int
+    duration_ms: float
+
+
+class Janitor:
+    def __init__(
+        self,
+        db_path: Callable[[], Path],
+        run_root: Callable[[], Path],
+        config: JanitorConfig | None = None,
+    ) -> None:
+        self._db_path = db_path
+        self._run_root = run_root
+        self._config = _validate_config(config or JanitorConfig())
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._totals = {
+            "sweeps": 0,
+            "errors": 0,
+            "challenges_purged": 0,
+            "sessions_purged": 0,
+            "runs_pruned": 0,
+            "vacuumed_pages": 0,
+        }
+        self._last_report: SweepReport | None = None
+        self._last_sweep_at: int | None = None
+        self._last_error: str | None = None
+
+    def _purge(self, purge, now: int) -> int:
+        removed = 0
+        with pooled_connection(self._db_path()) as conn:
+            for _ in range(self._config.max_batches):
+                count = purge(conn, now, self._config.batch_size)
+                removed += count
+                if count < self._config.batch_size:
+                    break
+        return removed
+
+    def _maintain_database(self) -> int:
+        with pooled_connection(self._db_path()) as conn:
+            vacuumed = 0
+            if int(conn.execute("PRAGMA auto_vacuum").fetchone()[0]) == 2:
+                before = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+                conn.execute(f"PRAGMA incremental_vacuum({self._config.incremental_vacuum_pages})").fetchall()
+                vacuumed = before - int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+            conn.execute("PRAGMA optimize").fetchall()
+        return vacuumed
+
+    def _prune_store(self, root: Path, now: float) -> tuple[int, set[str]]:
+        from nyx_backend_gateway.gateway import _ensure_backend_path
+
+        _ensure_backend_path()
+        from nyx_backend.evidence import discard_exports
+        from nyx_backend.evidence_store import open_store, store_exists
+
+        if not store_exists(root):
+            return 0, set()
+        store = open_store(root)
+        removed = store.prune(
+            self._config.run_keep_latest,
+            self._config.run_retention_seconds,
+            self._config.run_prune_limit,
+            now,
+        )
+        for key in removed:
+            shutil.rmtree(root / key, ignore_errors=True)
+            discard_exports(root, key)
+        self._forget_runs(root, removed)
+        store.compact()
+        return len(removed), {key for key, _, _ in store.entries()}
+
+    def _forget_runs(self, root: Path, keys: list[str]) -> None:
+        from nyx_backend.run_catalog import catalog_exists, open_catalog
+
+        if keys and catalog_exists(root):
+            open_catalog(root).remove(keys)
+
+    def _prune_runs(self, now: float) -> int:
+        root = self._run_root()
+        if not root.is_dir():
+            return 0
+        pruned, stored = self._prune_store(root, now)
+        entries: list[tuple[float, Path]] = []
+        for entry in root.iterdir():
+            if entry.is_symlink() or not entry.is_dir() or not _RUN_DIR_NAME.fullmatch(entry.name):
+                continue
+            if entry.name in stored:
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except FileNotFoundError:
+                continue
+        entries.sort(key=lambda item: (-item[0], item[1].name))
+        keep = self._config.run_keep_latest
+        retention = self._config.run_retention_seconds
+        doomed = []
+        for index, (mtime, entry) in enumerate(entries):
+            if keep is not None and index >= keep:
+                doomed.append(entry)
+            elif retention is not None and now - mtime > retention:
+                doomed.append(entry)
+        removed = []
+        for entry in doomed[: self._config.run_prune_limit]:
+            shutil.rmtree(entry, ignore_errors=True)
+            if not entry.exists():
+                removed.append(entry.name)
+        self._forget_runs(root, removed)
+        return pruned + len(removed)
+
+    def run_once(self, now: float | None = None) -> SweepReport:
+        with self._sweep_lock:
+            started = time.perf_counter()
+            wall = time.time() if now is None else now
+            try:
+                challenges = self._purge(purge_expired_portal_challenges, int(wall))
+                sessions = self._purge(purge_expired_portal_sessions, int(wall))
+                runs = self._prune_runs(wall)
+                vacuumed = self._maintain_database()
+            except Exception as exc:
+                with self._lock:
+                    self._totals["errors"] += 1
+                    self._last_error = str(exc)
+                raise
+            report = SweepReport(
+                challenges_purged=challenges,
+                sessions_purged=sessions,
+                runs_pruned=runs,
+                vacuumed_pages=vacuumed,
+                duration_ms=round((time.perf_counter() - started) * 1000.0, 3),
+            )
+        with self._lock:
+            self._totals["sweeps"] += 1
+            self._totals["challenges_purged"] += challenges
+            self._totals["sessions_purged"] += sessions
+            self._totals["runs_pruned"] += runs
+            self._totals["vacuumed_pages"] += vacuumed
+            self._last_report = report
+            self._last_sweep_at = int(wall)
+            self._last_error = None
+            return report
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._config.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                continue
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="nyx-gateway-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def metrics(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "interval_seconds": self._config.interval_seconds,
+                "running": self._thread is not None,
+                "totals": dict(self._totals),
+                "last_sweep_at": self._last_sweep_at,
+                "last_sweep": asdict(self._last_report) if self._last_report is not None else None,
+                "last_error": self._last_error,
+            }
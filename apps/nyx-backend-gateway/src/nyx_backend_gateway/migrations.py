@@ -1,25 +1,29 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import Callable
 
-SCHEMA_VERSION = 1
 
+class MigrationError(ValueError):
+    pass
 
-def apply_migrations(conn: sqlite3.Connection) -> None:
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA foreign_keys = ON")
-    cursor.execute(
-        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
-    )
-    cursor.execute(
-        "SELECT value FROM meta WHERE key = 'schema_version'"
-    )
-    row = cursor.fetchone()
+
+def read_schema_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'meta'"
+    ).fetchone()
     if row is None:
-        cursor.execute(
-            "INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
-            (str(SCHEMA_VERSION),),
-        )
+        return 0
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is None:
+        return 0
+    try:
+        return int(row[0])
+    except (TypeError, ValueError):
+        return 0
+
+
+def _migrate_baseline_tables(cursor: sqlite3.Cursor) -> None:
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS evidence_runs (
@@ -213,4 +217,133 @@ def apply_migrations(conn: sqlite3.Connection) -> None:
         )
         """
     )
-    conn.commit()
+
+
+def _migrate_listing_indexes(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_orders_book_asc "
+        "ON orders (side, asset_in, asset_out, price, order_id, amount, run_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_orders_book_desc "
+        "ON orders (side, asset_in, asset_out, price DESC, order_id, amount, run_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_chat_messages_room_seq ON chat_messages (room_id, seq, message_id)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_rooms_created ON chat_rooms (created_at, room_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_purchases_listing ON purchases (listing_id, purchase_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_receipts_run ON receipts (run_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_channel ON messages (channel, message_id)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_entertainment_events_item ON entertainment_events (item_id, event_id)"
+    )
+
+
+def _migrate_orders_version(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('orders_epoch', lower(hex(randomblob(16))))"
+    )
+    cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('orders_version', '0')")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_orders_version_{event.lower()} AFTER {event} ON orders
+            BEGIN
+                UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'orders_version';
+            END
+            """
+        )
+
+
+def _migrate_chat_room_heads(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chat_room_heads (
+            room_id TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            chain_head TEXT NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO chat_room_heads (room_id, seq, chain_head)
+        SELECT m.room_id, m.seq, m.chain_head FROM chat_messages m
+        WHERE m.message_id = (
+            SELECT message_id FROM chat_messages
+            WHERE room_id = m.room_id
+            ORDER BY seq DESC, message_id DESC
+            LIMIT 1
+        )
+        """
+    )
+
+
+def _migrate_expiry_indexes(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_portal_challenges_expires ON portal_challenges (expires_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_portal_sessions_expires ON portal_sessions (expires_at)")
+
+
+def _migrate_run_jobs(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_jobs (
+            run_id TEXT PRIMARY KEY,
+            request TEXT NOT NULL,
+            request_digest TEXT NOT NULL,
+            status TEXT NOT NULL,
+            error TEXT,
+            result TEXT,
+            enqueued_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_run_jobs_status ON run_jobs (status, enqueued_at)")
+
+
+MIGRATIONS: tuple[tuple[int, Callable[[sqlite3.Cursor], None]], ...] = (
+    (1, _migrate_baseline_tables),
+    (2, _migrate_listing_indexes),
+    (3, _migrate_orders_version),
+    (4, _migrate_chat_room_heads),
+    (5, _migrate_expiry_indexes),
+    (6, _migrate_run_jobs),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def apply_migrations(conn: sqlite3.Connection, target: int = SCHEMA_VERSION) -> int:
+    if target < 0 or target > SCHEMA_VERSION:
+        raise MigrationError("target schema version out of bounds")
+    if conn.in_transaction:
+        conn.commit()
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+    )
+    for version, migrate in MIGRATIONS:
+        if version > target:
+            break
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            current = read_schema_version(conn)
+            if current > SCHEMA_VERSION:
+                raise MigrationError("database schema is newer than gateway")
+            if current >= version:
+                conn.rollback()
+                continue
+            migrate(cursor)
+            cursor.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(version),),
+            )
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return read_schema_version(conn)
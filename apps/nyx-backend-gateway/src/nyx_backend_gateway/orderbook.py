@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import asdict, replace
+from heapq import heapify, heappop, heappush
+import sqlite3
+import threading
+from typing import Generic, Iterable, Iterator, TypeVar
+
+from nyx_backend_gateway.storage import Order, list_orders
+
+
+class OrderBookError(ValueError):
+    pass
+
+
+_DELTA_HISTORY = 1024
+_MAX_DEPTH = 200
+_HEAP_SLACK = 64
+
+_K = TypeVar("_K", int, str)
+
+
+def book_key(order: Order) -> tuple[str, str]:
+    if order.side == "BUY":
+        return (order.asset_in, order.asset_out)
+    return (order.asset_out, order.asset_in)
+
+
+class _LazyHeap(Generic[_K]):
+    def __init__(self) -> None:
+        self._heap: list[_K] = []
+        self._queued: set[_K] = set()
+        self._live: set[_K] = set()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._live
+
+    def add(self, key: _K) -> None:
+        self._live.add(key)
+        if key not in self._queued:
+            heappush(self._heap, key)
+            self._queued.add(key)
+
+    def discard(self, key: _K) -> None:
+        self._live.discard(key)
+        heap = self._heap
+        while heap and heap[0] not in self._live:
+            self._queued.discard(heappop(heap))
+        if len(heap) > _HEAP_SLACK + 2 * len(self._live):
+            self._heap = list(self._live)
+            heapify(self._heap)
+            self._queued = set(self._heap)
+
+    def first(self) -> _K | None:
+        return self._heap[0] if self._heap else None
+
+    def __iter__(self) -> Iterator[_K]:
+        heap = self._heap
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            key, index = heappop(frontier)
+            if key in self._live:
+                yield key
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heappush(frontier, (heap[child], child))
+
+
+class _BookSide:
+    def __init__(self, descending: bool) -> None:
+        self._descending = descending
+        self._prices: _LazyHeap[int] = _LazyHeap()
+        self._levels: dict[int, _LazyHeap[str]] = {}
+        self._totals: dict[int, int] = {}
+
+    def _key(self, price: int) -> int:
+        return -price if self._descending else price
+
+    def add(self, order: Order) -> None:
+        level = self._levels.get(order.price)
+        if level is None:
+            level = _LazyHeap()
+            self._levels[order.price] = level
+            self._totals[order.price] = 0
+            self._prices.add(self._key(order.price))
+        level.add(order.order_id)
+        self._totals[order.price] += order.amount
+
+    def remove(self, order: Order) -> None:
+        level = self._levels.get(order.price)
+        if level is None or order.order_id not in level:
+            raise OrderBookError("order not in book")
+        level.discard(order.order_id)
+        self._totals[order.price] -= order.amount
+        if not level:
+            del self._levels[order.price]
+            del self._totals[order.price]
+            self._prices.discard(self._key(order.price))
+
+    def adjust(self, price: int, delta: int) -> None:
+        self._totals[price] += delta
+
+    def best(self) -> int | None:
+        key = self._prices.first()
+        return None if key is None else self._key(key)
+
+    def level(self, price: int) -> tuple[int, int]:
+        level = self._levels.get(price)
+        if level is None:
+            return 0, 0
+        return self._totals[price], len(level)
+
+    def prices(self) -> Iterator[int]:
+        for key in self._prices:
+            yield self._key(key)
+
+    def levels(self) -> Iterator[tuple[int, Iterable[str]]]:
+        for price in self.prices():
+            yield price, self._levels[price]
+
+    def totals(self) -> Iterator[tuple[int, int, int]]:
+        for price in self.prices():
+            yield price, self._totals[price], len(self._levels[price])
+
+
+class OrderBook:
+    def __init__(self, pair: tuple[str, str], floor: int = 0) -> None:
+        self.pair = pair
+        self._bids = _BookSide(descending=True)
+        self._asks = _BookSide(descending=False)
+        self._orders: dict[str, Order] = {}
+        self._deltas: deque[tuple[int, tuple[tuple[str, int, int, int], ...]]] = deque()
+        self._floor = floor
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def _side(self, side: str) -> _BookSide:
+        return self._bids if side == "BUY" else self._asks
+
+    def get(self, order_id: str) -> Order | None:
+        return self._orders.get(order_id)
+
+    def add(self, order: Order) -> None:
+        if book_key(order) != self.pair:
+            raise OrderBookError("order pair mismatch")
+        if order.order_id in self._orders:
+            raise OrderBookError("order already in book")
+        self._side(order.side).add(order)
+        self._orders[order.order_id] = order
+
+    def remove(self, order_id: str) -> Order | None:
+        order = self._orders.pop(order_id, None)
+        if order is not None:
+            self._side(order.side).remove(order)
+        return order
+
+    def set_amount(self, order_id: str, amount: int) -> None:
+        order = self._orders[order_id]
+        self._side(order.side).adjust(order.price, amount - order.amount)
+        self._orders[order_id] = replace(order, amount=amount)
+
+    def best_bid(self) -> int | None:
+        return self._bids.best()
+
+    def best_ask(self) -> int | None:
+        return self._asks.best()
+
+    def orders(self, side: str) -> Iterator[Order]:
+        for _, order_ids in self._side(side).levels():
+            for order_id in order_ids:
+                yield self._orders[order_id]
+
+    def opposites(self, side: str) -> Iterator[Order]:
+        return self.orders("SELL" if side == "BUY" else "BUY")
+
+    def levels(self, side: str) -> Iterator[tuple[int, int, int]]:
+        return self._side(side).totals()
+
+    def level(self, side: str, price: int) -> tuple[int, int]:
+        return self._side(side).level(price)
+
+    def depth(self, side: str, depth: int, tick: int) -> list[dict[str, int]]:
+        buckets: list[dict[str, int]] = []
+        for price, total, count in self.levels(side):
+            bucket = price // tick * tick if side == "BUY" else -(-price // tick) * tick
+            if buckets and buckets[-1]["price"] == bucket:
+                buckets[-1]["amount"] += total
+                buckets[-1]["orders"] += count
+                continue
+            if len(buckets) == depth:
+                break
+            buckets.append({"price": bucket, "amount": total, "orders": count})
+        return buckets
+
+    def record(self, sequence: int, changes: tuple[tuple[str, int, int, int], ...]) -> None:
+        self._deltas.append((sequence, changes))
+        while len(self._deltas) > _DELTA_HISTORY:
+            evicted, _ = self._deltas.popleft()
+            self._floor = evicted
+
+    def deltas_since(self, since: int, current: int) -> tuple[bool, dict[str, list[dict[str, int]]]]:
+        if since < self._floor or since > current:
+            return True, {"BUY": [], "SELL": []}
+        latest: dict[tuple[str, int], tuple[int, int]] = {}
+        for sequence, changes in self._deltas:
+            if sequence <= since:
+                continue
+            for side, price, total, count in changes:
+                latest[(side, price)] = (total, count)
+        levels: dict[str, list[dict[str, int]]] = {"BUY": [], "SELL": []}
+        for (side, price), (total, count) in latest.items():
+            levels[side].append({"price": price, "amount": total, "orders": count})
+        levels["BUY"].sort(key=lambda level: -level["price"])
+        levels["SELL"].sort(key=lambda level: level["price"])
+        return False, levels
+
+
+class OrderBookEngine:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._books: dict[tuple[str, str], OrderBook] = {}
+        self._index: dict[str, tuple[str, str]] = {}
+        self._state: tuple[str, int] | None = None
+        self._floor = 0
+        self._touched: set[tuple[tuple[str, str], str, int]] = set()
+        self.rebuilds = 0
+
+    def acquire(self) -> None:
+        self._lock.acquire()
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def __enter__(self) -> OrderBookEngine:
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._lock.release()
+
+    @staticmethod
+    def _read_state(conn: sqlite3.Connection) -> tuple[str, int] | None:
+        rows = conn.execute(
+            "SELECT key, value FROM meta WHERE key IN ('orders_epoch', 'orders_version')"
+        ).fetchall()
+        values = {str(row[0]): row[1] for row in rows}
+        if "orders_epoch" not in values or "orders_version" not in values:
+            return None
+        return str(values["orders_epoch"]), int(values["orders_version"])
+
+    def sync(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            state = self._read_state(conn)
+            if state is None or state != self._state:
+                self._rebuild(conn, state)
+
+    def _rebuild(self, conn: sqlite3.Connection, state: tuple[str, int] | None) -> None:
+        self._floor = state[1] if state is not None else 0
+        self._books = {}
+        self._index = {}
+        for row in list_orders(conn):
+            self.add(Order(**row))
+        self._touched.clear()
+        self._state = state
+        self.rebuilds += 1
+
+    def mark_synced(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._state = self._read_state(conn)
+            sequence = self._state[1] if self._state is not None else self._floor
+            changes: dict[tuple[str, str], list[tuple[str, int, int, int]]] = {}
+            for pair, side, price in sorted(self._touched):
+                total, count = self.book(pair).level(side, price)
+                changes.setdefault(pair, []).append((side, price, total, count))
+            self._touched.clear()
+            for pair, pair_changes in changes.items():
+                self.book(pair).record(sequence, tuple(pair_changes))
+
+    @property
+    def sequence(self) -> int:
+        return self._state[1] if self._state is not None else self._floor
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._state = None
+
+    def book(self, pair: tuple[str, str]) -> OrderBook:
+        book = self._books.get(pair)
+        if book is None:
+            book = OrderBook(pair, floor=self._floor)
+            self._books[pair] = book
+        return book
+
+    def book_for(self, order: Order) -> OrderBook:
+        return self.book(book_key(order))
+
+    def books(self) -> list[OrderBook]:
+        return [self._books[pair] for pair in sorted(self._books)]
+
+    def get(self, order_id: str) -> Order | None:
+        pair = self._index.get(order_id)
+        if pair is None:
+            return None
+        return self._books[pair].get(order_id)
+
+    def add(self, order: Order) -> None:
+        self.remove(order.order_id)
+        pair = book_key(order)
+        self.book(pair).add(order)
+        self._index[order.order_id] = pair
+        self._touched.add((pair, order.side, order.price))
+
+    def remove(self, order_id: str) -> Order | None:
+        pair = self._index.pop(order_id, None)
+        if pair is None:
+            return None
+        order = self._books[pair].remove(order_id)
+        if order is not None:
+            self._touched.add((pair, order.side, order.price))
+        return order
+
+    def set_amount(self, order_id: str, amount: int) -> None:
+        pair = self._index.get(order_id)
+        if pair is None:
+            raise OrderBookError("order not in book")
+        order = self._books[pair].get(order_id)
+        self._books[pair].set_amount(order_id, amount)
+        if order is not None:
+            self._touched.add((pair, order.side, order.price))
+
+    def finish(self, committed: bool) -> None:
+        if not committed:
+            self._state = None
+        self._lock.release()
+
+    def depth(self, pair: tuple[str, str], depth: int, tick: int) -> dict[str, object]:
+        if not isinstance(depth, int) or isinstance(depth, bool) or depth < 1 or depth > _MAX_DEPTH:
+            raise OrderBookError("depth out of bounds")
+        if not isinstance(tick, int) or isinstance(tick, bool) or tick < 1:
+            raise OrderBookError("tick out of bounds")
+        with self._lock:
+            book = self._books.get(pair)
+            return {
+                "asset_in": pair[0],
+                "asset_out": pair[1],
+                "sequence": self.sequence,
+                "tick": tick,
+                "bids": book.depth("BUY", depth, tick) if book is not None else [],
+                "asks": book.depth("SELL", depth, tick) if book is not None else [],
+            }
+
+    def deltas(self, pair: tuple[str, str], since: int) -> dict[str, object]:
+        if not isinstance(since, int) or isinstance(since, bool) or since < 0:
+            raise OrderBookError("since out of bounds")
+        with self._lock:
+            book = self._books.get(pair)
+            if book is None:
+                reset = since < self._floor or since > self.sequence
+                levels: dict[str, list[dict[str, int]]] = {"BUY": [], "SELL": []}
+            else:
+                reset, levels = book.deltas_since(since, self.sequence)
+            return {
+                "asset_in": pair[0],
+                "asset_out": pair[1],
+                "since": since,
+                "sequence": self.sequence,
+                "reset": reset,
+                "bids": levels["BUY"],
+                "asks": levels["SELL"],
+            }
+
+    def snapshot(self) -> dict[str, list[dict[str, object]]]:
+        with self._lock:
+            buys = [order for book in self._books.values() for order in book.orders("BUY")]
+            sells = [order for book in self._books.values() for order in book.orders("SELL")]
+        buys.sort(key=lambda order: (-order.price, order.order_id))
+        sells.sort(key=lambda order: (order.price, order.order_id))
+        return {
+            "buy": [asdict(order) for order in buys],
+            "sell": [asdict(order) for order in sells],
+        }
+
+
+_ENGINES: dict[str, OrderBookEngine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def _database_file(conn: sqlite3.Connection) -> str:
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            return str(row[2] or "")
+    return ""
+
+
+def get_engine(conn: sqlite3.Connection) -> OrderBookEngine:
+    path = _database_file(conn)
+    if not path:
+        return OrderBookEngine()
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(path)
+        if engine is None:
+            engine = OrderBookEngine()
+            _ENGINES[path] = engine
+        return engine
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+import hashlib
+import json
+from itertools import islice
+from typing import Callable, Iterable
+
+
+class PaginationError(ValueError):
+    pass
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+_MAX_CURSOR_LENGTH = 512
+
+
+@dataclass(frozen=True)
+class Page:
+    items: list[dict[str, object]]
+    next_cursor: str | None
+
+
+def _scope_tag(scope: str) -> str:
+    return hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16]
+
+
+def page_size(raw: str | None, default: int = DEFAULT_PAGE_SIZE) -> int:
+    if raw is None or raw == "":
+        return default
+    try:
+        size = int(raw)
+    except ValueError as exc:
+        raise PaginationError("limit invalid") from exc
+    if size < 1 or size > MAX_PAGE_SIZE:
+        raise PaginationError("limit out of bounds")
+    return size
+
+
+def encode_cursor(scope: str, key: tuple[object, ...]) -> str:
+    raw = json.dumps([_scope_tag(scope), list(key)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(scope: str, cursor: str | None, arity: int) -> tuple[object, ...] | None:
+    if cursor is None or cursor == "":
+        return None
+    if len(cursor) > _MAX_CURSOR_LENGTH:
+        raise PaginationError("cursor invalid")
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        tag, key = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise PaginationError("cursor invalid") from exc
+    if tag != _scope_tag(scope) or not isinstance(key, list) or len(key) != arity:
+        raise PaginationError("cursor invalid")
+    for value in key:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise PaginationError("cursor invalid")
+    return tuple(key)
+
+
+def take_page(
+    rows: Iterable[dict[str, object]],
+    size: int,
+    scope: str,
+    key: Callable[[dict[str, object]], tuple[object, ...]],
+) -> Page:
+    items = list(islice(rows, size + 1))
+    if len(items) <= size:
+        return Page(items=items, next_cursor=None)
+    items = items[:size]
+    return Page(items=items, next_cursor=encode_cursor(scope, key(items[-1])))
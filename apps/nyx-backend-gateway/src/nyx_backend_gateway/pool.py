@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Iterator
+
+from nyx_backend_gateway.metrics import get_registry
+from nyx_backend_gateway.migrations import SCHEMA_VERSION, apply_migrations, read_schema_version
+from nyx_backend_gateway.storage import StorageError, open_connection
+
+
+_DEFAULT_MAX_IDLE = 16
+_DEFAULT_MAX_LIFETIME_SECONDS = 300.0
+
+
+@dataclass
+class _Entry:
+    conn: sqlite3.Connection
+    created_at: float
+
+
+@dataclass
+class _Lease:
+    entry: _Entry
+    depth: int
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    opened: int
+    closed: int
+    recycled: int
+    health_failures: int
+    idle: int
+    leased: int
+    migrations: int
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        max_idle: int = _DEFAULT_MAX_IDLE,
+        max_lifetime_seconds: float = _DEFAULT_MAX_LIFETIME_SECONDS,
+    ) -> None:
+        if max_idle < 0:
+            raise StorageError("max_idle out of bounds")
+        if max_lifetime_seconds <= 0:
+            raise StorageError("max_lifetime_seconds out of bounds")
+        self._max_idle = max_idle
+        self._max_lifetime = max_lifetime_seconds
+        self._lock = threading.Lock()
+        self._idle: dict[str, deque[_Entry]] = {}
+        self._migrated: set[str] = set()
+        self._local = threading.local()
+        self._opened = 0
+        self._closed = 0
+        self._recycled = 0
+        self._health_failures = 0
+        self._leased = 0
+        self._migrations = 0
+
+    def _leases(self) -> dict[str, _Lease]:
+        leases = getattr(self._local, "leases", None)
+        if leases is None:
+            leases = {}
+            self._local.leases = leases
+        return leases
+
+    def ensure_schema(self, db_path: Path) -> None:
+        key = str(db_path)
+        with self._lock:
+            if key in self._migrated:
+                return
+            conn = open_connection(db_path)
+            try:
+                if read_schema_version(conn) != SCHEMA_VERSION:
+                    apply_migrations(conn)
+                    self._migrations += 1
+            finally:
+                conn.close()
+            self._migrated.add(key)
+
+    def _healthy(self, entry: _Entry, now: float) -> bool:
+        if now - entry.created_at >= self._max_lifetime:
+            with self._lock:
+                self._recycled += 1
+            return False
+        try:
+            entry.conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            with self._lock:
+                self._health_failures += 1
+            return False
+        return True
+
+    def _close(self, entry: _Entry) -> None:
+        try:
+            entry.conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._closed += 1
+
+    def _checkout(self, db_path: Path) -> _Entry:
+        key = str(db_path)
+        self.ensure_schema(db_path)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+            if self._healthy(entry, time.monotonic()):
+                return entry
+            self._close(entry)
+        conn = open_connection(db_path)
+        with self._lock:
+            self._opened += 1
+        return _Entry(conn=conn, created_at=time.monotonic())
+
+    def _checkin(self, db_path: Path, entry: _Entry) -> None:
+        try:
+            if entry.conn.in_transaction:
+                entry.conn.rollback()
+        except sqlite3.Error:
+            self._close(entry)
+            return
+        expired = time.monotonic() - entry.created_at >= self._max_lifetime
+        with self._lock:
+            idle = self._idle.setdefault(str(db_path), deque())
+            if not expired and len(idle) < self._max_idle:
+                idle.append(entry)
+                return
+            if expired:
+                self._recycled += 1
+        self._close(entry)
+
+    @contextmanager
+    def connection(self, db_path: Path) -> Iterator[sqlite3.Connection]:
+        if not isinstance(db_path, Path):
+            raise StorageError("db_path must be Path")
+        leases = self._leases()
+        key = str(db_path)
+        lease = leases.get(key)
+        if lease is None:
+            lease = _Lease(entry=self._checkout(db_path), depth=0)
+            leases[key] = lease
+            with self._lock:
+                self._leased += 1
+        lease.depth += 1
+        try:
+            yield lease.entry.conn
+        finally:
+            lease.depth -= 1
+            if lease.depth == 0:
+                del leases[key]
+                with self._lock:
+                    self._leased -= 1
+                self._checkin(db_path, lease.entry)
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+        for entry in entries:
+            self._close(entry)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                opened=self._opened,
+                closed=self._closed,
+                recycled=self._recycled,
+                health_failures=self._health_failures,
+                idle=sum(len(idle) for idle in self._idle.values()),
+                leased=self._leased,
+                migrations=self._migrations,
+            )
+
+
+_POOL = ConnectionPool()
+
+
+_POOL_CONNECTIONS = get_registry().gauge(
+    "nyx_gateway_pool_connections", "Pooled SQLite connections, by state", ("state",)
+)
+_POOL_CONNECTIONS.labels("idle").set_function(lambda: _POOL.stats().idle)
+_POOL_CONNECTIONS.labels("leased").set_function(lambda: _POOL.stats().leased)
+
+
+def get_pool() -> ConnectionPool:
+    return _POOL
+
+
+def configure_pool(
+    max_idle: int = _DEFAULT_MAX_IDLE,
+    max_lifetime_seconds: float = _DEFAULT_MAX_LIFETIME_SECONDS,
+) -> ConnectionPool:
+    global _POOL
+    previous = _POOL
+    _POOL = ConnectionPool(max_idle=max_idle, max_lifetime_seconds=max_lifetime_seconds)
+    previous.close_all()
+    return _POOL
+
+
+def pooled_connection(db_path: Path):
+    return _POOL.connection(db_path)
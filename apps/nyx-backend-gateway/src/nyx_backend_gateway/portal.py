@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import base64
+from contextlib import nullcontext
 import hashlib
 import hmac
 import json
@@ -8,10 +9,13 @@ import time
 from dataclasses import dataclass
 from typing import Any
 
-from nyx_backend_gateway.env import get_portal_challenge_ttl_seconds, get_portal_session_secret
+from nyx_backend_gateway.chat_hub import get_chat_hub
+from nyx_backend_gateway.env import get_config
+from nyx_backend_gateway.session_cache import get_session_cache
 from nyx_backend_gateway.storage import (
     ChatMessage,
     ChatRoom,
+    GatewayConnection,
     PortalAccount,
     PortalChallenge,
     PortalSession,
@@ -24,9 +28,12 @@ from nyx_backend_gateway.storage import (
     insert_portal_session,
     list_chat_messages,
     list_chat_rooms,
+    load_chat_room_head,
     load_portal_account,
     load_portal_account_by_handle,
     load_portal_session,
+    on_unit_of_work_end,
+    unit_of_work,
 )
 
 
@@ -98,14 +105,13 @@ def issue_challenge(conn, account_id: str) -> PortalChallenge:
     account = load_portal_account(conn, account_id)
     if account is None:
         raise PortalError("account not found")
-    secret = get_portal_session_secret()
+    config = get_config()
     issued_at = int(time.time())
-    nonce = _sha256_hex(f"nonce:{account_id}:{issued_at}:{secret}".encode("utf-8"))
-    ttl = get_portal_challenge_ttl_seconds()
+    nonce = _sha256_hex(f"nonce:{account_id}:{issued_at}:{config.portal_session_secret}".encode("utf-8"))
     challenge = PortalChallenge(
         account_id=account.account_id,
         nonce=nonce,
-        expires_at=issued_at + ttl,
+        expires_at=issued_at + config.portal_challenge_ttl_seconds,
         used=0,
     )
     insert_portal_challenge(conn, challenge)
@@ -138,7 +144,7 @@ def verify_challenge(conn, account_id: str, nonce: str, signature: str) -> Porta
         raise PortalError("account not found")
     if not _verify_signature(account.public_key, nonce, signature):
         raise PortalError("signature invalid")
-    secret = get_portal_session_secret()
+    secret = get_config().portal_session_secret
     token = _sha256_hex(f"session:{account_id}:{nonce}:{secret}".encode("utf-8"))
     expires_at = int(time.time()) + 3600
     session = PortalSession(token=token, account_id=account_id, expires_at=expires_at)
@@ -146,19 +152,31 @@ def verify_challenge(conn, account_id: str, nonce: str, signature: str) -> Porta
     return session
 
 
+def cached_session(token: str) -> PortalSession | None:
+    return get_session_cache().get(token)
+
+
 def require_session(conn, token: str) -> PortalSession:
+    cache = get_session_cache()
+    session = cache.get(token)
+    if session is not None:
+        return session
     session = load_portal_session(conn, token)
     if session is None:
         raise PortalError("session not found")
     if int(time.time()) > session.expires_at:
         raise PortalError("session expired")
+    cache.put(session)
     return session
 
 
 def logout_session(conn, token: str) -> None:
     from nyx_backend_gateway.storage import delete_portal_session
 
+    cache = get_session_cache()
+    cache.invalidate(token)
     delete_portal_session(conn, token)
+    on_unit_of_work_end(conn, lambda committed: cache.invalidate(token))
 
 
 def create_room(conn, name: str, is_public: bool = True) -> ChatRoom:
@@ -171,18 +189,40 @@ def create_room(conn, name: str, is_public: bool = True) -> ChatRoom:
     return room
 
 
-def list_rooms(conn) -> list[dict[str, object]]:
-    return list_chat_rooms(conn)
+def list_rooms(conn, after: tuple[int, str] | None = None, limit: int | None = None) -> list[dict[str, object]]:
+    return list_chat_rooms(conn, after=after, limit=limit)
 
 
 def post_message(conn, room_id: str, sender_account_id: str, body: str) -> tuple[dict[str, object], dict[str, object]]:
     if not isinstance(body, str) or not body or len(body) > 512:
         raise PortalError("message invalid")
-    messages = list_chat_messages(conn, room_id=room_id, after=None, limit=1_000_000)
-    if messages:
-        last = messages[-1]
-        prev_digest = str(last["chain_head"])
-        seq = int(last["seq"]) + 1
+    with _append_transaction(conn):
+        message_fields, receipt = _append_message(conn, room_id, sender_account_id, body)
+        _publish_on_commit(conn, room_id, int(message_fields["seq"]))
+    return message_fields, receipt
+
+
+def _publish_on_commit(conn, room_id: str, seq: int) -> None:
+    def publish(committed: bool) -> None:
+        if committed:
+            get_chat_hub().publish(room_id, seq)
+
+    on_unit_of_work_end(conn, publish)
+
+
+def _append_transaction(conn):
+    if isinstance(conn, GatewayConnection):
+        return unit_of_work(conn, immediate=True)
+    return nullcontext(conn)
+
+
+def _append_message(
+    conn, room_id: str, sender_account_id: str, body: str
+) -> tuple[dict[str, object], dict[str, object]]:
+    head = load_chat_room_head(conn, room_id)
+    if head is not None:
+        prev_digest = head.chain_head
+        seq = head.seq + 1
     else:
         prev_digest = "0" * 64
         seq = 1
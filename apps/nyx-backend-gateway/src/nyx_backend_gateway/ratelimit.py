@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+
+class RateLimitError(ValueError):
+    pass
+
+
+_DEFAULT_SHARDS = 16
+_DEFAULT_MAX_KEYS = 100_000
+_SWEEP_EVERY = 1024
+_SQLITE_SWEEP_EVERY = 4096
+_SQLITE_SWEEP_BATCH = 1000
+
+
+@dataclass(frozen=True)
+class RateLimiterStats:
+    keys: int
+    allowed: int
+    denied: int
+    evicted: int
+
+
+def _validate_limits(limit: object, window_seconds: object) -> tuple[int, float]:
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        raise RateLimitError("limit out of bounds")
+    if isinstance(window_seconds, bool) or not isinstance(window_seconds, (int, float)) or window_seconds <= 0:
+        raise RateLimitError("window_seconds out of bounds")
+    return limit, float(window_seconds)
+
+
+def _validate_cost(cost: object) -> int:
+    if not isinstance(cost, int) or isinstance(cost, bool) or cost < 0:
+        raise RateLimitError("cost out of bounds")
+    return cost
+
+
+class _Shard:
+    __slots__ = ("lock", "tats", "ops", "allowed", "evicted")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tats: dict[str, float] = {}
+        self.ops = 0
+        self.allowed = 0
+        self.evicted = 0
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: float,
+        shards: int = _DEFAULT_SHARDS,
+        max_keys: int = _DEFAULT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limit, self._window = _validate_limits(limit, window_seconds)
+        if not isinstance(shards, int) or isinstance(shards, bool) or shards < 1:
+            raise RateLimitError("shards out of bounds")
+        if not isinstance(max_keys, int) or isinstance(max_keys, bool) or max_keys < shards:
+            raise RateLimitError("max_keys out of bounds")
+        self._interval = self._window / self._limit
+        self._shards = tuple(_Shard() for _ in range(shards))
+        self._max_keys_per_shard = max_keys // shards
+        self._clock = clock
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _sweep(self, shard: _Shard, now: float) -> int:
+        idle = [key for key, tat in shard.tats.items() if tat <= now]
+        for key in idle:
+            del shard.tats[key]
+        evicted = len(idle)
+        while len(shard.tats) >= self._max_keys_per_shard:
+            del shard.tats[next(iter(shard.tats))]
+            evicted += 1
+        return evicted
+
+    def allow(self, key: str, cost: int = 1) -> bool:
+        if _validate_cost(cost) == 0:
+            return True
+        shard = self._shard(key)
+        with shard.lock:
+            now = self._clock()
+            shard.ops += 1
+            tat = shard.tats.pop(key, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + self._interval * cost
+            allowed = new_tat - now <= self._window
+            if shard.ops % _SWEEP_EVERY == 0 or len(shard.tats) >= self._max_keys_per_shard:
+                shard.evicted += self._sweep(shard, now)
+            if allowed:
+                shard.allowed += 1
+                shard.tats[key] = new_tat
+            elif tat > now:
+                shard.tats[key] = tat
+        return allowed
+
+    def retry_after(self, key: str, cost: int = 1) -> float:
+        shard = self._shard(key)
+        with shard.lock:
+            now = self._clock()
+            tat = max(shard.tats.get(key, now), now)
+        return max(0.0, tat + self._interval * _validate_cost(cost) - self._window - now)
+
+    def stats(self) -> RateLimiterStats:
+        keys = ops = allowed = evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                keys += len(shard.tats)
+                ops += shard.ops
+                allowed += shard.allowed
+                evicted += shard.evicted
+        return RateLimiterStats(keys=keys, allowed=allowed, denied=ops - allowed, evicted=evicted)
+
+
+class SqliteRateLimiter:
+    def __init__(
+        self,
+        db_path: Path,
+        limit: int,
+        window_seconds: float,
+        scope: str = "default",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._limit, self._window = _validate_limits(limit, window_seconds)
+        self._interval = self._window / self._limit
+        self._db_path = Path(db_path)
+        self._scope = scope
+        self._clock = clock
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._ops = 0
+        self._allowed = 0
+        self._denied = 0
+        self._evicted = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "scope TEXT NOT NULL, key TEXT NOT NULL, tat REAL NOT NULL, PRIMARY KEY (scope, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits (scope, tat)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self._db_path), timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def allow(self, key: str, cost: int = 1) -> bool:
+        if _validate_cost(cost) == 0:
+            return True
+        conn = self._connection()
+        now = self._clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tat FROM rate_limits WHERE scope = ? AND key = ?", (self._scope, key)
+            ).fetchone()
+            tat = max(float(row[0]), now) if row is not None else now
+            new_tat = tat + self._interval * cost
+            allowed = new_tat - now <= self._window
+            if allowed:
+                conn.execute(
+                    "INSERT INTO rate_limits (scope, key, tat) VALUES (?, ?, ?) "
+                    "ON CONFLICT(scope, key) DO UPDATE SET tat = excluded.tat",
+                    (self._scope, key, new_tat),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._stats_lock:
+            self._ops += 1
+            sweep = self._ops % _SQLITE_SWEEP_EVERY == 0
+            if allowed:
+                self._allowed += 1
+            else:
+                self._denied += 1
+        if sweep:
+            self.evict_idle()
+        return allowed
+
+    def evict_idle(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM rate_limits WHERE rowid IN "
+            "(SELECT rowid FROM rate_limits WHERE scope = ? AND tat <= ? LIMIT ?)",
+            (self._scope, self._clock(), _SQLITE_SWEEP_BATCH),
+        )
+        with self._stats_lock:
+            self._evicted += cursor.rowcount
+        return cursor.rowcount
+
+    def stats(self) -> RateLimiterStats:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM rate_limits WHERE scope = ?", (self._scope,)
+        ).fetchone()
+        with self._stats_lock:
+            return RateLimiterStats(keys=int(row[0]), allowed=self._allowed, denied=self._denied, evicted=self._evicted)
+
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from nyx_backend_gateway.metrics import Counter, Histogram
+
+
+class RouterError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Route:
+    method: str
+    pattern: str
+    handler: Callable
+    auth: bool = False
+    cost: int = 1
+    body: bool = False
+    max_body: int = 0
+    catch_all: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.pattern}"
+
+
+@dataclass(frozen=True)
+class RouteMatch:
+    route: Route
+    params: dict[str, str]
+
+
+def _segments(pattern: str) -> tuple[str, ...]:
+    if not pattern.startswith("/"):
+        raise RouterError("pattern must start with /")
+    return tuple(pattern.split("/")[1:])
+
+
+class Router:
+    def __init__(
+        self,
+        default_max_body: int = 4096,
+        latency: Histogram | None = None,
+        errors: Counter | None = None,
+    ) -> None:
+        if not isinstance(default_max_body, int) or isinstance(default_max_body, bool) or default_max_body < 0:
+            raise RouterError("default_max_body out of bounds")
+        self._default_max_body = default_max_body
+        self._latency = latency or Histogram("route_duration_seconds", "Route handling time", ("route",))
+        self._errors = errors or Counter("route_errors_total", "Route responses with status >= 400", ("route",))
+        if self._latency.labelnames != ("route",) or self._errors.labelnames != ("route",):
+            raise RouterError("route metrics must be labelled by route only")
+        self._routes: list[Route] = []
+        self._exact: dict[tuple[str, str], Route] = {}
+        self._templated: dict[tuple[str, int], list[tuple[tuple[str, ...], Route]]] = {}
+        self._timers: dict[str, tuple[object, object]] = {}
+
+    def add(
+        self,
+        method: str,
+        pattern: str,
+        handler: Callable,
+        auth: bool = False,
+        cost: int = 1,
+        body: bool = False,
+        max_body: int | None = None,
+        catch_all: bool = False,
+    ) -> Route:
+        if not isinstance(cost, int) or isinstance(cost, bool) or cost < 0:
+            raise RouterError("cost out of bounds")
+        if max_body is None:
+            max_body = self._default_max_body
+        if not isinstance(max_body, int) or isinstance(max_body, bool) or max_body < 0:
+            raise RouterError("max_body out of bounds")
+        route = Route(method.upper(), pattern, handler, auth, cost, body, max_body, catch_all)
+        if route.name in self._timers:
+            raise RouterError("duplicate route")
+        segments = _segments(pattern)
+        if any(segment.startswith("{") for segment in segments):
+            for segment in segments:
+                if segment.startswith("{") and (not segment.endswith("}") or len(segment) < 3):
+                    raise RouterError("invalid path parameter")
+            self._templated.setdefault((route.method, len(segments)), []).append((segments, route))
+        else:
+            self._exact[(route.method, pattern)] = route
+        self._routes.append(route)
+        self._timers[route.name] = (self._latency.labels(route.name), self._errors.labels(route.name))
+        return route
+
+    def route(self, method: str, pattern: str, **options) -> Callable[[Callable], Callable]:
+        def register(handler: Callable) -> Callable:
+            self.add(method, pattern, handler, **options)
+            return handler
+
+        return register
+
+    def match(self, method: str, path: str) -> RouteMatch | None:
+        route = self._exact.get((method, path))
+        if route is not None:
+            return RouteMatch(route, {})
+        parts = path.split("/")[1:]
+        for segments, candidate in self._templated.get((method, len(parts)), ()):
+            params = {}
+            for segment, part in zip(segments, parts):
+                if segment.startswith("{"):
+                    if not part:
+                        break
+                    params[segment[1:-1]] = part
+                elif segment != part:
+                    break
+            else:
+                return RouteMatch(candidate, params)
+        return None
+
+    def routes(self) -> tuple[Route, ...]:
+        return tuple(self._routes)
+
+    def observe(self, route: Route, elapsed_seconds: float, error: bool = False) -> None:
+        latency, errors = self._timers[route.name]
+        latency.observe(elapsed_seconds)
+        if error:
+            errors.inc()
+
+    def latency(self) -> dict[str, dict[str, object]]:
+        return {
+            name: {**latency.snapshot(), "errors": int(errors.value)}
+            for name, (latency, errors) in self._timers.items()
+        }
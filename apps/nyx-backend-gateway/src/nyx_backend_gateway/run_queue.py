@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+import queue
+import threading
+import time
+from typing import Callable
+
+from nyx_backend_gateway.metrics import get_registry
+from nyx_backend_gateway.pool import pooled_connection
+from nyx_backend_gateway.storage import (
+    RunJob,
+    claim_run_job,
+    finish_run_job,
+    insert_run_job,
+    list_queued_run_job_ids,
+    load_run_job,
+    requeue_running_jobs,
+)
+
+
+class RunQueueError(ValueError):
+    pass
+
+
+class RunQueueFullError(RunQueueError):
+    pass
+
+
+_DEFAULT_WORKERS = 4
+_DEFAULT_MAX_QUEUED = 1000
+
+_QUEUE_JOBS = get_registry().gauge("nyx_gateway_run_queue_jobs", "Async /run jobs, by state", ("state",))
+_QUEUE_WAIT_SECONDS = get_registry().histogram(
+    "nyx_gateway_run_queue_wait_seconds", "Async /run time from submission to worker start"
+)
+_QUEUE_FINISHED = get_registry().counter(
+    "nyx_gateway_run_jobs_total", "Async /run jobs finished, by outcome", ("outcome",)
+)
+
+
+def _canonical(request: dict[str, object]) -> str:
+    return json.dumps(request, sort_keys=True, separators=(",", ":"))
+
+
+class RunQueue:
+    def __init__(
+        self,
+        db_path: Callable[[], Path],
+        execute: Callable[[str, dict[str, object]], dict[str, object]],
+        workers: int = _DEFAULT_WORKERS,
+        max_queued: int = _DEFAULT_MAX_QUEUED,
+    ) -> None:
+        for name, value in (("workers", workers), ("max_queued", max_queued)):
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise RunQueueError(f"{name} out of bounds")
+        self._db_path = db_path
+        self._execute = execute
+        self._workers = workers
+        self._max_queued = max_queued
+        self._lock = threading.Lock()
+        self._pending: queue.Queue[str | None] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._queued = 0
+        self._running = 0
+
+    def _set_gauges(self) -> None:
+        _QUEUE_JOBS.labels("queued").set(self._queued)
+        _QUEUE_JOBS.labels("running").set(self._running)
+
+    def submit(self, run_id: str, request: dict[str, object]) -> RunJob:
+        body = _canonical(request)
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        with self._lock:
+            with pooled_connection(self._db_path()) as conn:
+                existing = load_run_job(conn, run_id)
+                if existing is not None and existing.request_digest == digest and existing.status != "failed":
+                    return existing
+                if existing is not None and existing.status in {"queued", "running"}:
+                    raise RunQueueError("run_id already queued with a different request")
+                if self._queued >= self._max_queued:
+                    raise RunQueueFullError("run queue full")
+                job = RunJob(
+                    run_id=run_id,
+                    request=body,
+                    request_digest=digest,
+                    status="queued",
+                    error=None,
+                    result=None,
+                    enqueued_at=time.time(),
+                    started_at=None,
+                    finished_at=None,
+                    attempts=0,
+                )
+                insert_run_job(conn, job)
+            self._queued += 1
+            self._set_gauges()
+        self._pending.put(run_id)
+        return job
+
+    def job(self, run_id: str) -> RunJob | None:
+        with pooled_connection(self._db_path()) as conn:
+            return load_run_job(conn, run_id)
+
+    def _work(self, run_id: str) -> None:
+        started = time.time()
+        with pooled_connection(self._db_path()) as conn:
+            claimed = claim_run_job(conn, run_id, started)
+            job = load_run_job(conn, run_id) if claimed else None
+        if job is None:
+            return
+        _QUEUE_WAIT_SECONDS.observe(max(0.0, started - job.enqueued_at))
+        with self._lock:
+            self._running += 1
+            self._set_gauges()
+        result = None
+        error = None
+        try:
+            result = _canonical(self._execute(run_id, json.loads(job.request)))
+        except Exception as exc:
+            error = str(exc) or exc.__class__.__name__
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._set_gauges()
+        status = "complete" if error is None else "failed"
+        with pooled_connection(self._db_path()) as conn:
+            finish_run_job(conn, run_id, status, result, error, time.time())
+        _QUEUE_FINISHED.labels(status).inc()
+
+    def _loop(self) -> None:
+        while True:
+            run_id = self._pending.get()
+            if run_id is None or self._stopping.is_set():
+                return
+            with self._lock:
+                self._queued -= 1
+                self._set_gauges()
+            try:
+                self._work(run_id)
+            except Exception:
+                _QUEUE_FINISHED.labels("error").inc()
+
+    def start(self) -> int:
+        if self._threads:
+            return 0
+        self._stopping.clear()
+        with pooled_connection(self._db_path()) as conn:
+            requeue_running_jobs(conn)
+            recovered = list_queued_run_job_ids(conn)
+        with self._lock:
+            self._queued += len(recovered)
+            self._set_gauges()
+        for run_id in recovered:
+            self._pending.put(run_id)
+        for index in range(self._workers):
+            thread = threading.Thread(target=self._loop, name=f"nyx-gateway-run-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return len(recovered)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"workers": self._workers, "queued": self._queued, "running": self._running}
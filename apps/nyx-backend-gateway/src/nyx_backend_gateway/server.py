@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import dataclass
 import json
+import os
 from pathlib import Path
-import subprocess
+import shutil
 import time
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qs, urlencode, urlparse
 
-from nyx_backend_gateway.env import load_env_file
+from nyx_backend_gateway.chat_hub import ChatHubError, configure_chat_hub, get_chat_hub
+from nyx_backend_gateway.env import configure_config, install_reload_signal
 import nyx_backend_gateway.gateway as gateway
 import nyx_backend_gateway.portal as portal
 from nyx_backend_gateway.gateway import (
@@ -21,16 +24,29 @@ from nyx_backend_gateway.gateway import (
     _run_root,
     _db_path,
 )
+from nyx_backend_gateway.exchange import order_book_deltas, order_book_depth, order_book_snapshot
+from nyx_backend_gateway.janitor import Janitor, JanitorConfig
+from nyx_backend_gateway.orderbook import get_engine
+from nyx_backend_gateway.pagination import PaginationError, decode_cursor, page_size, take_page
+from nyx_backend_gateway.pool import configure_pool, pooled_connection
+from nyx_backend_gateway.ratelimit import RateLimiter, SqliteRateLimiter
+from nyx_backend_gateway.metrics import CONTENT_TYPE as _METRICS_CONTENT_TYPE, get_registry
+from nyx_backend_gateway.router import RouteMatch, Router
+from nyx_backend_gateway.run_queue import RunQueue, RunQueueFullError
+from nyx_backend_gateway.evidence_cache import configure_evidence_cache, get_evidence_cache
+from nyx_backend_gateway.session_cache import configure_session_cache
 from nyx_backend_gateway.storage import (
-    create_connection,
-    list_entertainment_events,
-    list_entertainment_items,
-    list_listings,
-    list_messages,
-    list_orders,
-    list_purchases,
-    list_receipts,
-    list_trades,
+    TUNED_PRAGMAS,
+    FeeLedger,
+    configure_pragmas,
+    iter_entertainment_events,
+    iter_entertainment_items,
+    iter_listings,
+    iter_messages,
+    iter_orders,
+    iter_purchases,
+    iter_receipts,
+    iter_trades,
     load_by_id,
     StorageError,
 )
@@ -40,18 +56,42 @@ _MAX_BODY = 4096
 _RATE_LIMIT = 120
 _RATE_WINDOW_SECONDS = 60
 _ACCOUNT_RATE_LIMIT = 60
+_RATE_LIMIT_MAX_KEYS = 100_000
+_TRACE_CACHE_SIZE = 256
+_POOL_MAX_IDLE = 32
+_POOL_MAX_LIFETIME_SECONDS = 300.0
+_STORAGE_MODES = {"wal", "rollback"}
+_SERVER_MODES = {"threading", "asyncio"}
+_EVIDENCE_SYNC_MODES = {"none", "always", "group"}
+_RUN_MODES = {"sync", "async"}
+_RUN_QUEUE_WORKERS = 4
+_RUN_QUEUE_MAX_QUEUED = 1000
+_ASYNC_WORKERS = 32
+_ASYNC_STREAM_WORKERS = 64
+_ASYNC_MAX_CONNECTIONS = 1024
+_ASYNC_KEEPALIVE_SECONDS = 15.0
+_SESSION_CACHE_MAX_ENTRIES = 4096
+_SESSION_CACHE_TTL_SECONDS = 30.0
+_EVIDENCE_CACHE_MAX_ENTRIES = 256
+_JANITOR_INTERVAL_SECONDS = 300.0
+_CHAT_MAX_SUBSCRIBERS_PER_ROOM = 64
+_CHAT_LONG_POLL_MAX_SECONDS = 30
+_CHAT_STREAM_MAX_SECONDS = 300.0
+_CHAT_STREAM_HEARTBEAT_SECONDS = 15.0
+_CHAT_STREAM_BATCH = 100
+_TRACE_HEADER = "X-Nyx-Trace"
+_EXPORT_BULK_MAX_RUNS = 100
 
 
 def _version_info() -> dict[str, str]:
+    gateway._ensure_backend_path()
+    from nyx_backend.anchor import AnchorError, protocol_anchor
+
     try:
-        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
-    except Exception:
-        commit = "unknown"
-    try:
-        describe = subprocess.check_output(["git", "describe", "--tags", "--always"], text=True).strip()
-    except Exception:
-        describe = "unknown"
-    return {"commit": commit, "describe": describe, "build": "testnet"}
+        anchor = protocol_anchor()
+    except AnchorError:
+        return {"commit": "unknown", "describe": "unknown", "build": "testnet"}
+    return {"commit": anchor["commit"], "describe": anchor["describe"], "build": "testnet"}
 
 
 def _capabilities() -> dict[str, object]:
@@ -65,54 +105,12 @@ def _capabilities() -> dict[str, object]:
             "entertainment",
             "evidence",
         ],
-        "endpoints": [
-            "GET /healthz",
-            "GET /version",
-            "GET /capabilities",
-            "POST /run",
-            "GET /status",
-            "GET /evidence",
-            "GET /artifact",
-            "GET /export.zip",
-            "GET /list",
-            "POST /portal/v1/accounts",
-            "POST /portal/v1/auth/challenge",
-            "POST /portal/v1/auth/verify",
-            "POST /portal/v1/auth/logout",
-            "GET /portal/v1/me",
-            "GET /portal/v1/activity",
-            "POST /chat/v1/rooms",
-            "GET /chat/v1/rooms",
-            "POST /chat/v1/rooms/{room_id}/messages",
-            "GET /chat/v1/rooms/{room_id}/messages",
-            "POST /wallet/v1/faucet",
-            "POST /wallet/v1/transfer",
-            "GET /wallet/balance",
-            "POST /wallet/faucet",
-            "POST /wallet/transfer",
-            "GET /exchange/orderbook",
-            "GET /exchange/orders",
-            "GET /exchange/trades",
-            "POST /exchange/place_order",
-            "POST /exchange/cancel_order",
-            "GET /chat/messages",
-            "POST /chat/send",
-            "GET /marketplace/listings",
-            "GET /marketplace/purchases",
-            "POST /marketplace/listing",
-            "POST /marketplace/purchase",
-            "GET /entertainment/items",
-            "GET /entertainment/events",
-            "POST /entertainment/step",
-        ],
+        "endpoints": [route.name for route in _ROUTER.routes()],
         "notes": "Testnet Beta. No live mainnet data.",
     }
 
 
-def _fee_summary(module: str, action: str, payload: dict, run_id: str) -> dict[str, object]:
-    from nyx_backend_gateway.fees import route_fee
-
-    record = route_fee(module, action, payload, run_id)
+def _fee_summary(record: FeeLedger) -> dict[str, object]:
     return {
         "fee_total": record.total_paid,
         "fee_breakdown": {
@@ -124,26 +122,59 @@ def _fee_summary(module: str, action: str, payload: dict, run_id: str) -> dict[s
     }
 
 
-class RequestLimiter:
-    def __init__(self, limit: int, window_seconds: int) -> None:
-        self._limit = limit
-        self._window = window_seconds
-        self._state: dict[str, tuple[int, float]] = {}
+def _run_response(seed: int, run_id: str, module: str, action: str, payload: object) -> dict[str, object]:
+    result = execute_run(
+        seed=seed,
+        run_id=run_id,
+        module=module,
+        action=action,
+        payload=payload,
+    )
+    response = {
+        "run_id": result.run_id,
+        "status": "complete",
+        "state_hash": result.state_hash,
+        "receipt_hashes": result.receipt_hashes,
+        "replay_ok": result.replay_ok,
+    }
+    if result.fee is not None:
+        response.update(_fee_summary(result.fee))
+    return response
+
 
-    def allow(self, key: str) -> bool:
-        now = time.monotonic()
-        count, start = self._state.get(key, (0, now))
-        if now - start >= self._window:
-            count, start = 0, now
-        if count >= self._limit:
-            self._state[key] = (count, start)
-            return False
-        self._state[key] = (count + 1, start)
-        return True
+def _execute_job(run_id: str, request: dict[str, object]) -> dict[str, object]:
+    return _run_response(request["seed"], run_id, request["module"], request["action"], request["payload"])
+
+
+RequestLimiter = RateLimiter
+
+
+@dataclass(frozen=True)
+class _Request:
+    params: dict[str, str]
+    query: dict[str, list[str]]
+    body: dict
+    session: portal.PortalSession | None
+
+
+_METRICS = get_registry()
+_HTTP_REQUESTS = _METRICS.counter(
+    "nyx_gateway_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+_HTTP_IN_FLIGHT = _METRICS.gauge("nyx_gateway_http_requests_in_flight", "HTTP requests being handled")
+_RATE_LIMITED = _METRICS.counter("nyx_gateway_rate_limited_total", "Requests rejected by a rate limiter", ("scope",))
+_ROUTER = Router(
+    default_max_body=_MAX_BODY,
+    latency=_METRICS.histogram(
+        "nyx_gateway_http_request_duration_seconds", "Time spent handling a request, by route", ("route",)
+    ),
+    errors=_METRICS.counter("nyx_gateway_http_request_errors_total", "Responses with status >= 400, by route", ("route",)),
+)
 
 
 class GatewayHandler(BaseHTTPRequestHandler):
     server_version = "NYXGateway/2.0"
+    _response_status = 0
 
     def _send_json(self, payload: dict, status: HTTPStatus = HTTPStatus.OK) -> None:
         data = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
@@ -168,11 +199,42 @@ class GatewayHandler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(data)
 
-    def _parse_body(self) -> dict:
+    def _etag_matches(self, etag: str) -> bool:
+        header = self.headers.get("If-None-Match", "")
+        tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+        return "*" in tags or etag in tags
+
+    def _send_file(self, path: Path, content_type: str, etag: str, chunk_size: int) -> None:
+        if self._etag_matches(etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        with path.open("rb") as handle:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(os.fstat(handle.fileno()).st_size))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            shutil.copyfileobj(handle, self.wfile, chunk_size)
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        self._response_status = int(code)
+        super().send_response(code, message)
+
+    def end_headers(self) -> None:
+        if self._response_status:
+            trace_id = gateway._tracing().current_trace_id()
+            if trace_id is not None:
+                self.send_header(_TRACE_HEADER, trace_id)
+        super().end_headers()
+
+    def _parse_body(self, max_body: int = _MAX_BODY) -> dict:
         length = int(self.headers.get("Content-Length", "0"))
         if length <= 0:
             return {}
-        if length > _MAX_BODY:
+        if length > max_body:
             raise GatewayError("payload too large")
         body = self.rfile.read(length)
         try:
@@ -183,12 +245,12 @@ class GatewayHandler(BaseHTTPRequestHandler):
             raise GatewayError("payload must be object")
         return payload
 
-    def _rate_limit_ok(self) -> bool:
+    def _rate_limit_ok(self, cost: int) -> bool:
         limiter = getattr(self.server, "rate_limiter", None)
         if limiter is None:
             return True
         client = self.client_address[0] if self.client_address else "unknown"
-        return limiter.allow(client)
+        return limiter.allow(client, cost)
 
     def _account_rate_limit_ok(self, account_id: str) -> bool:
         limiter = getattr(self.server, "account_limiter", None)
@@ -214,6 +276,59 @@ class GatewayHandler(BaseHTTPRequestHandler):
             raise GatewayError("run_id required")
         return run_id
 
+    def _page_request(
+        self, query: dict[str, list[str]], scope: str, arity: int = 1
+    ) -> tuple[int, tuple[object, ...] | None]:
+        size = page_size((query.get("limit") or [""])[0] or None)
+        after = decode_cursor(scope, (query.get("cursor") or [""])[0] or None, arity)
+        return size, after
+
+    def _wait_for_messages(
+        self, room_id: str, after: int | None, limit: int, wait_seconds: int
+    ) -> list[dict[str, object]]:
+        with pooled_connection(_db_path()) as conn:
+            messages = portal.list_messages(conn, room_id=room_id, after=after, limit=limit)
+        if messages or wait_seconds <= 0:
+            return messages
+        with get_chat_hub().subscribe(room_id) as subscription:
+            with pooled_connection(_db_path()) as conn:
+                messages = portal.list_messages(conn, room_id=room_id, after=after, limit=limit)
+            if messages or not subscription.wait(after or 0, wait_seconds):
+                return messages
+        with pooled_connection(_db_path()) as conn:
+            return portal.list_messages(conn, room_id=room_id, after=after, limit=limit)
+
+    def _stream_room_events(self, room_id: str, after: int, session: portal.PortalSession) -> None:
+        hub = get_chat_hub()
+        with hub.subscribe(room_id) as subscription:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            deadline = time.monotonic() + min(_CHAT_STREAM_MAX_SECONDS, max(0.0, session.expires_at - time.time()))
+            try:
+                self.wfile.write(b"retry: 1000\n\n")
+                while not hub.closed:
+                    with pooled_connection(_db_path()) as conn:
+                        messages = portal.list_messages(conn, room_id=room_id, after=after, limit=_CHAT_STREAM_BATCH)
+                    for message in messages:
+                        data = json.dumps(message, sort_keys=True, separators=(",", ":"))
+                        self.wfile.write(f"id: {message['seq']}\nevent: message\ndata: {data}\n\n".encode("utf-8"))
+                        after = int(message["seq"])
+                    self.wfile.flush()
+                    if len(messages) == _CHAT_STREAM_BATCH:
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    if not subscription.wait(after, min(remaining, _CHAT_STREAM_HEARTBEAT_SECONDS)):
+                        self.wfile.write(b": keepalive\n\n")
+                        self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
     def _require_auth(self) -> portal.PortalSession:
         auth = self.headers.get("Authorization", "")
         if not auth.startswith("Bearer "):
@@ -221,666 +336,715 @@ class GatewayHandler(BaseHTTPRequestHandler):
         token = auth.split(" ", 1)[1].strip()
         if not token:
             raise GatewayError("auth required")
-        conn = create_connection(_db_path())
-        try:
-            session = portal.require_session(conn, token)
-        except portal.PortalError as exc:
-            raise GatewayError(str(exc)) from exc
-        finally:
-            conn.close()
+        session = portal.cached_session(token)
+        if session is None:
+            with pooled_connection(_db_path()) as conn:
+                try:
+                    session = portal.require_session(conn, token)
+                except portal.PortalError as exc:
+                    raise GatewayError(str(exc)) from exc
         if not self._account_rate_limit_ok(session.account_id):
+            _RATE_LIMITED.labels("account").inc()
             raise GatewayError("rate limit exceeded")
         return session
 
-    def do_POST(self) -> None:  # noqa: N802
-        if not self._rate_limit_ok():
+    def _dispatch(self, method: str) -> None:
+        parsed = urlparse(self.path)
+        match = _ROUTER.match(method, parsed.path)
+        if not self._rate_limit_ok(match.route.cost if match is not None else 1):
+            _RATE_LIMITED.labels("client").inc()
+            _HTTP_REQUESTS.labels(method, match.route.pattern if match else "unmatched", "429").inc()
             self._send_text("rate limit exceeded", HTTPStatus.TOO_MANY_REQUESTS)
             return
-        try:
-            if self.path == "/run":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                module = payload.get("module")
-                action = payload.get("action")
-                extra = payload.get("payload")
-                result = execute_run(
-                    seed=seed,
-                    run_id=run_id,
-                    module=module,
-                    action=action,
-                    payload=extra,
-                )
-                response = {
-                    "run_id": result.run_id,
-                    "status": "complete",
-                    "state_hash": result.state_hash,
-                    "receipt_hashes": result.receipt_hashes,
-                    "replay_ok": result.replay_ok,
-                }
-                if isinstance(module, str) and isinstance(action, str) and isinstance(extra, dict):
-                    if (module, action) in {
-                        ("exchange", "route_swap"),
-                        ("exchange", "place_order"),
-                        ("exchange", "cancel_order"),
-                        ("marketplace", "order_intent"),
-                        ("marketplace", "listing_publish"),
-                        ("marketplace", "purchase_listing"),
-                    }:
-                        response.update(_fee_summary(module, action, extra, result.run_id))
-                self._send_json(response)
-                return
-            if self.path == "/portal/v1/accounts":
-                payload = self._parse_body()
-                conn = create_connection(_db_path())
-                try:
-                    account = portal.create_account(conn, payload.get("handle"), payload.get("pubkey"))
-                finally:
-                    conn.close()
-                self._send_json(
-                    {
-                        "account_id": account.account_id,
-                        "handle": account.handle,
-                        "pubkey": account.public_key,
-                        "created_at": account.created_at,
-                        "status": account.status,
-                    }
-                )
-                return
-            if self.path == "/portal/v1/auth/challenge":
-                payload = self._parse_body()
-                account_id = payload.get("account_id")
-                if not isinstance(account_id, str) or not account_id:
-                    raise GatewayError("account_id required")
-                conn = create_connection(_db_path())
-                try:
-                    challenge = portal.issue_challenge(conn, account_id)
-                finally:
-                    conn.close()
-                self._send_json({"nonce": challenge.nonce, "expires_at": challenge.expires_at})
-                return
-            if self.path == "/portal/v1/auth/verify":
-                payload = self._parse_body()
-                account_id = payload.get("account_id")
-                nonce = payload.get("nonce")
-                signature = payload.get("signature")
-                if not isinstance(account_id, str) or not account_id:
-                    raise GatewayError("account_id required")
-                if not isinstance(nonce, str) or not nonce:
-                    raise GatewayError("nonce required")
-                if not isinstance(signature, str) or not signature:
-                    raise GatewayError("signature required")
-                conn = create_connection(_db_path())
-                try:
-                    session = portal.verify_challenge(conn, account_id, nonce, signature)
-                finally:
-                    conn.close()
-                self._send_json({"access_token": session.token, "expires_at": session.expires_at})
-                return
-            if self.path == "/portal/v1/auth/logout":
-                session = self._require_auth()
-                conn = create_connection(_db_path())
-                try:
-                    portal.logout_session(conn, session.token)
-                finally:
-                    conn.close()
-                self._send_json({"ok": True})
-                return
-            if self.path == "/chat/v1/rooms":
-                _ = self._require_auth()
-                payload = self._parse_body()
-                name = payload.get("name")
-                is_public = payload.get("is_public", True)
-                conn = create_connection(_db_path())
-                try:
-                    room = portal.create_room(conn, name=name, is_public=bool(is_public))
-                finally:
-                    conn.close()
-                self._send_json(
-                    {
-                        "room_id": room.room_id,
-                        "name": room.name,
-                        "created_at": room.created_at,
-                        "is_public": bool(room.is_public),
-                    }
-                )
-                return
-            if self.path.startswith("/chat/v1/rooms/") and self.path.endswith("/messages"):
-                parts = self.path.split("/")
-                if len(parts) != 6:
-                    raise GatewayError("room_id required")
-                room_id = parts[4]
-                session = self._require_auth()
-                payload = self._parse_body()
-                body = payload.get("body")
-                if not isinstance(body, str) or not body:
-                    raise GatewayError("body required")
-                conn = create_connection(_db_path())
-                try:
-                    message_fields, receipt = portal.post_message(
-                        conn, room_id=room_id, sender_account_id=session.account_id, body=body
-                    )
-                finally:
-                    conn.close()
-                self._send_json({"message": message_fields, "receipt": receipt})
-                return
-            if self.path == "/wallet/v1/faucet":
-                session = self._require_auth()
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                faucet_payload = payload.get("payload")
-                if faucet_payload is None:
-                    faucet_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result, balance, fee_record = gateway.execute_wallet_faucet_v1(
-                    seed=seed,
-                    run_id=run_id,
-                    payload=faucet_payload,
-                    account_id=session.account_id,
-                )
-                self._send_json(
-                    {
-                        "run_id": result.run_id,
-                        "status": "complete",
-                        "state_hash": result.state_hash,
-                        "receipt_hashes": result.receipt_hashes,
-                        "replay_ok": result.replay_ok,
-                        "address": faucet_payload.get("address"),
-                        "balance": balance,
-                        "fee_total": fee_record.total_paid,
-                        "fee_breakdown": {
-                            "protocol_fee_total": fee_record.protocol_fee_total,
-                            "platform_fee_amount": fee_record.platform_fee_amount,
-                        },
-                        "payer": session.account_id,
-                        "treasury_address": fee_record.fee_address,
-                    }
-                )
-                return
-            if self.path == "/wallet/v1/transfer":
-                session = self._require_auth()
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                transfer_payload = payload.get("payload")
-                if transfer_payload is None:
-                    transfer_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result, balances, fee_record = execute_wallet_transfer(
-                    seed=seed,
-                    run_id=run_id,
-                    payload=transfer_payload,
-                )
-                self._send_json(
-                    {
-                        "run_id": result.run_id,
-                        "status": "complete",
-                        "state_hash": result.state_hash,
-                        "receipt_hashes": result.receipt_hashes,
-                        "replay_ok": result.replay_ok,
-                        "from_address": transfer_payload.get("from_address"),
-                        "to_address": transfer_payload.get("to_address"),
-                        "amount": transfer_payload.get("amount"),
-                        "fee_total": fee_record.total_paid,
-                        "fee_breakdown": {
-                            "protocol_fee_total": fee_record.protocol_fee_total,
-                            "platform_fee_amount": fee_record.platform_fee_amount,
-                        },
-                        "payer": session.account_id,
-                        "treasury_address": fee_record.fee_address,
-                        "from_balance": balances["from_balance"],
-                        "to_balance": balances["to_balance"],
-                        "treasury_balance": balances["treasury_balance"],
-                    }
-                )
-                return
-            if self.path == "/exchange/place_order":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                order_payload = payload.get("payload")
-                if order_payload is None:
-                    order_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result = execute_run(
-                    seed=seed,
-                    run_id=run_id,
-                    module="exchange",
-                    action="place_order",
-                    payload=order_payload,
-                )
-                response = {
-                    "run_id": result.run_id,
-                    "status": "complete",
-                    "state_hash": result.state_hash,
-                    "receipt_hashes": result.receipt_hashes,
-                    "replay_ok": result.replay_ok,
-                }
-                if isinstance(order_payload, dict):
-                    response.update(_fee_summary("exchange", "place_order", order_payload, result.run_id))
-                self._send_json(response)
-                return
-            if self.path == "/exchange/cancel_order":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                cancel_payload = payload.get("payload")
-                if cancel_payload is None:
-                    cancel_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result = execute_run(
-                    seed=seed,
-                    run_id=run_id,
-                    module="exchange",
-                    action="cancel_order",
-                    payload=cancel_payload,
-                )
-                response = {
-                    "run_id": result.run_id,
-                    "status": "complete",
-                    "state_hash": result.state_hash,
-                    "receipt_hashes": result.receipt_hashes,
-                    "replay_ok": result.replay_ok,
-                }
-                if isinstance(cancel_payload, dict):
-                    response.update(_fee_summary("exchange", "cancel_order", cancel_payload, result.run_id))
-                self._send_json(response)
-                return
-            if self.path == "/chat/send":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                message_payload = payload.get("payload")
-                if message_payload is None:
-                    message_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result = execute_run(
-                    seed=seed,
-                    run_id=run_id,
-                    module="chat",
-                    action="message_event",
-                    payload=message_payload,
-                )
-                self._send_json(
-                    {
-                        "run_id": result.run_id,
-                        "status": "complete",
-                        "state_hash": result.state_hash,
-                        "receipt_hashes": result.receipt_hashes,
-                        "replay_ok": result.replay_ok,
-                    }
-                )
-                return
-            if self.path == "/wallet/faucet":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                faucet_payload = payload.get("payload")
-                if faucet_payload is None:
-                    faucet_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result, balance = execute_wallet_faucet(
-                    seed=seed,
-                    run_id=run_id,
-                    payload=faucet_payload,
-                )
-                self._send_json(
-                    {
-                        "run_id": result.run_id,
-                        "status": "complete",
-                        "state_hash": result.state_hash,
-                        "receipt_hashes": result.receipt_hashes,
-                        "replay_ok": result.replay_ok,
-                        "address": faucet_payload.get("address"),
-                        "balance": balance,
-                    }
-                )
-                return
-            if self.path == "/wallet/transfer":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                transfer_payload = payload.get("payload")
-                if transfer_payload is None:
-                    transfer_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result, balances, fee_record = execute_wallet_transfer(
-                    seed=seed,
-                    run_id=run_id,
-                    payload=transfer_payload,
-                )
-                self._send_json(
-                    {
-                        "run_id": result.run_id,
-                        "status": "complete",
-                        "state_hash": result.state_hash,
-                        "receipt_hashes": result.receipt_hashes,
-                        "replay_ok": result.replay_ok,
-                        "from_address": transfer_payload.get("from_address"),
-                        "to_address": transfer_payload.get("to_address"),
-                        "amount": transfer_payload.get("amount"),
-                        "fee_total": fee_record.total_paid,
-                        "fee_breakdown": {
-                            "protocol_fee_total": fee_record.protocol_fee_total,
-                            "platform_fee_amount": fee_record.platform_fee_amount,
-                        },
-                        "payer": transfer_payload.get("from_address"),
-                        "treasury_address": fee_record.fee_address,
-                        "from_balance": balances["from_balance"],
-                        "to_balance": balances["to_balance"],
-                        "treasury_balance": balances["treasury_balance"],
-                    }
-                )
-                return
-            if self.path == "/marketplace/listing":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                listing_payload = payload.get("payload")
-                if listing_payload is None:
-                    listing_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result = execute_run(
-                    seed=seed,
-                    run_id=run_id,
-                    module="marketplace",
-                    action="listing_publish",
-                    payload=listing_payload,
-                )
-                response = {
-                    "run_id": result.run_id,
-                    "status": "complete",
-                    "state_hash": result.state_hash,
-                    "receipt_hashes": result.receipt_hashes,
-                    "replay_ok": result.replay_ok,
-                }
-                if isinstance(listing_payload, dict):
-                    response.update(_fee_summary("marketplace", "listing_publish", listing_payload, result.run_id))
-                self._send_json(response)
-                return
-            if self.path == "/marketplace/purchase":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                purchase_payload = payload.get("payload")
-                if purchase_payload is None:
-                    purchase_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result = execute_run(
-                    seed=seed,
-                    run_id=run_id,
-                    module="marketplace",
-                    action="purchase_listing",
-                    payload=purchase_payload,
-                )
-                response = {
-                    "run_id": result.run_id,
-                    "status": "complete",
-                    "state_hash": result.state_hash,
-                    "receipt_hashes": result.receipt_hashes,
-                    "replay_ok": result.replay_ok,
-                }
-                if isinstance(purchase_payload, dict):
-                    response.update(_fee_summary("marketplace", "purchase_listing", purchase_payload, result.run_id))
-                self._send_json(response)
-                return
-            if self.path == "/entertainment/step":
-                payload = self._parse_body()
-                seed = self._require_seed(payload)
-                run_id = self._require_run_id(payload)
-                step_payload = payload.get("payload")
-                if step_payload is None:
-                    step_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
-                result = execute_run(
-                    seed=seed,
-                    run_id=run_id,
-                    module="entertainment",
-                    action="state_step",
-                    payload=step_payload,
-                )
-                self._send_json(
-                    {
-                        "run_id": result.run_id,
-                        "status": "complete",
-                        "state_hash": result.state_hash,
-                        "receipt_hashes": result.receipt_hashes,
-                        "replay_ok": result.replay_ok,
-                    }
-                )
-                return
+        if match is None:
+            _HTTP_REQUESTS.labels(method, "unmatched", "404").inc()
             self._send_text("not found", HTTPStatus.NOT_FOUND)
-        except (GatewayError, portal.PortalError, StorageError) as exc:
-            self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+            return
+        route = match.route
+        self._response_status = 0
+        started = time.perf_counter()
+        _HTTP_IN_FLIGHT.inc()
+        try:
+            with gateway._tracing().get_tracer().trace(route.name) as root:
+                self._invoke(match, parsed.query)
+                if root is not None:
+                    root.set("status", self._response_status)
+        finally:
+            _HTTP_IN_FLIGHT.dec()
+            status = self._response_status or HTTPStatus.INTERNAL_SERVER_ERROR
+            _HTTP_REQUESTS.labels(method, route.pattern, str(int(status))).inc()
+            _ROUTER.observe(route, time.perf_counter() - started, error=not 200 <= status < 400)
+
+    def _invoke(self, match: RouteMatch, query: str) -> None:
+        route = match.route
+        try:
+            session = self._require_auth() if route.auth else None
+            body = self._parse_body(route.max_body) if route.body else {}
+            route.handler(self, _Request(match.params, parse_qs(query), body, session))
+        except Exception as exc:
+            if self._response_status or not (route.catch_all or isinstance(exc, ValueError)):
+                raise
+            status = HTTPStatus.BAD_REQUEST
+            if isinstance(exc, ChatHubError):
+                status = HTTPStatus.TOO_MANY_REQUESTS
+            elif isinstance(exc, RunQueueFullError):
+                status = HTTPStatus.SERVICE_UNAVAILABLE
+            self._send_json({"error": str(exc)}, status)
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch("POST")
 
     def do_GET(self) -> None:  # noqa: N802
-        if not self._rate_limit_ok():
-            self._send_text("rate limit exceeded", HTTPStatus.TOO_MANY_REQUESTS)
-            return
-        parsed = urlparse(self.path)
-        path = parsed.path
-        query = parse_qs(parsed.query)
-        if path == "/healthz":
-            self._send_json({"ok": True})
-            return
-        if path == "/version":
-            self._send_json(_version_info())
-            return
-        if path == "/capabilities":
-            self._send_json(_capabilities())
-            return
-        if path == "/portal/v1/me":
-            try:
-                session = self._require_auth()
-                conn = create_connection(_db_path())
-                account = portal.load_account(conn, session.account_id)
-                conn.close()
-                if account is None:
-                    raise GatewayError("account not found")
-                self._send_json(
-                    {
-                        "account_id": account.account_id,
-                        "handle": account.handle,
-                        "pubkey": account.public_key,
-                        "created_at": account.created_at,
-                        "status": account.status,
-                    }
-                )
-            except GatewayError as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/portal/v1/activity":
-            try:
-                session = self._require_auth()
-                limit_raw = (query.get("limit") or ["50"])[0]
-                try:
-                    limit = int(limit_raw)
-                except ValueError:
-                    raise GatewayError("limit invalid")
-                conn = create_connection(_db_path())
-                receipts = list_receipts(conn, limit=limit)
-                conn.close()
-                self._send_json({"account_id": session.account_id, "receipts": receipts})
-            except (GatewayError, portal.PortalError, StorageError) as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/status":
-            try:
-                run_id = self._require_query_run_id(query)
-                from nyx_backend.evidence import EvidenceError, load_evidence
+        self._dispatch("GET")
 
-                evidence = load_evidence(run_id, base_dir=_run_root())
-                self._send_json({"status": "complete", "replay_ok": evidence.replay_ok})
-            except EvidenceError as exc:
-                self._send_json({"status": "error", "error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/evidence":
-            try:
-                run_id = self._require_query_run_id(query)
-                from nyx_backend.evidence import EvidenceError, load_evidence
+    @_ROUTER.route("GET", "/healthz")
+    def _get_healthz(self, request: _Request) -> None:
+        self._send_json({"ok": True})
 
-                evidence = load_evidence(run_id, base_dir=_run_root())
-            except EvidenceError as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-                return
-            payload = {
-                "protocol_anchor": evidence.protocol_anchor,
-                "inputs": evidence.inputs,
-                "outputs": evidence.outputs,
-                "receipt_hashes": evidence.receipt_hashes,
-                "state_hash": evidence.state_hash,
-                "replay_ok": evidence.replay_ok,
-                "stdout": evidence.stdout,
-            }
-            self._send_json(payload)
-            return
-        if path == "/artifact":
-            try:
-                run_id = self._require_query_run_id(query)
-                name = (query.get("name") or [""])[0]
-                from nyx_backend.evidence import EvidenceError, _safe_artifact_path
-
-                artifact_path = _safe_artifact_path(_run_root(), run_id, name)
-                data = artifact_path.read_bytes()
-            except EvidenceError as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-                return
-            self._send_bytes(data, "application/octet-stream")
-            return
-        if path == "/export.zip":
-            try:
-                run_id = self._require_query_run_id(query)
-                from nyx_backend.evidence import EvidenceError, build_export_zip
+    @_ROUTER.route("GET", "/version")
+    def _get_version(self, request: _Request) -> None:
+        self._send_json(_version_info())
 
-                data = build_export_zip(run_id, base_dir=_run_root())
-            except EvidenceError as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-                return
-            self._send_bytes(data, "application/zip")
-            return
-        if path == "/list":
-            from nyx_backend.evidence import list_runs
+    @_ROUTER.route("GET", "/capabilities")
+    def _get_capabilities(self, request: _Request) -> None:
+        self._send_json(_capabilities())
 
-            records = list_runs(base_dir=_run_root())
-            payload = [{"run_id": record.run_id, "status": record.status} for record in records]
-            self._send_json({"runs": payload})
+    @_ROUTER.route("POST", "/run", cost=5, body=True)
+    def _post_run(self, request: _Request) -> None:
+        payload = request.body
+        seed = self._require_seed(payload)
+        run_id = self._require_run_id(payload)
+        module = payload.get("module")
+        action = payload.get("action")
+        extra = payload.get("payload")
+        run_queue = getattr(self.server, "run_queue", None)
+        if run_queue is None:
+            self._send_json(_run_response(seed, run_id, module, action, extra))
             return
-        if path == "/wallet/balance":
-            try:
-                address = (query.get("address") or [""])[0]
-                balance = fetch_wallet_balance(address=address)
-                self._send_json({"address": address, "balance": balance})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/exchange/orders":
-            try:
-                conn = create_connection(_db_path())
-                side = (query.get("side") or [""])[0] or None
-                asset_in = (query.get("asset_in") or [""])[0] or None
-                asset_out = (query.get("asset_out") or [""])[0] or None
-                orders = list_orders(conn, side=side, asset_in=asset_in, asset_out=asset_out)
-                conn.close()
-                self._send_json({"orders": orders})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+        job = run_queue.submit(run_id, {"seed": seed, "module": module, "action": action, "payload": extra})
+        if job.status == "complete" and job.result is not None:
+            self._send_bytes(job.result.encode("utf-8"), "application/json")
             return
-        if path == "/exchange/trades":
-            try:
-                conn = create_connection(_db_path())
-                trades = list_trades(conn)
-                conn.close()
-                self._send_json({"trades": trades})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/exchange/orderbook":
-            try:
-                conn = create_connection(_db_path())
-                buys = list_orders(conn, side="BUY", order_by="price DESC, order_id ASC")
-                sells = list_orders(conn, side="SELL", order_by="price ASC, order_id ASC")
-                conn.close()
-                self._send_json({"buy": buys, "sell": sells})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+        status_url = "/status?" + urlencode({"run_id": run_id})
+        data = json.dumps(
+            {"run_id": run_id, "status": job.status, "status_url": status_url}, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+        self.send_response(HTTPStatus.ACCEPTED)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Location", status_url)
+        self.end_headers()
+        self.wfile.write(data)
+
+    @_ROUTER.route("GET", "/status")
+    def _get_status(self, request: _Request) -> None:
+        run_id = self._require_query_run_id(request.query)
+        from nyx_backend.evidence import EvidenceError
+
+        run_queue = getattr(self.server, "run_queue", None)
+        job = run_queue.job(run_id) if run_queue is not None else None
+        if job is not None and job.status != "complete":
+            response = {"run_id": run_id, "status": job.status}
+            if job.error is not None:
+                response["error"] = job.error
+            self._send_json(response)
             return
-        if path == "/chat/messages":
-            try:
-                conn = create_connection(_db_path())
-                channel = (query.get("channel") or [""])[0] or None
-                messages = list_messages(conn, channel=channel)
-                conn.close()
-                self._send_json({"messages": messages})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+        try:
+            cached = get_evidence_cache().get(run_id, _run_root())
+        except EvidenceError as exc:
+            self._send_json({"status": "error", "error": str(exc)}, HTTPStatus.BAD_REQUEST)
             return
-        if path == "/chat/v1/rooms":
+        self._send_bytes(cached.status_json, "application/json")
+
+    @_ROUTER.route("GET", "/evidence")
+    def _get_evidence(self, request: _Request) -> None:
+        run_id = self._require_query_run_id(request.query)
+        self._send_bytes(get_evidence_cache().get(run_id, _run_root()).evidence_json, "application/json")
+
+    @_ROUTER.route("GET", "/artifact")
+    def _get_artifact(self, request: _Request) -> None:
+        run_id = self._require_query_run_id(request.query)
+        name = (request.query.get("name") or [""])[0]
+        from nyx_backend.evidence import materialize_artifact
+
+        data = get_evidence_cache().get(run_id, _run_root()).artifacts.get(name)
+        if data is None:
             try:
-                _ = self._require_auth()
-                conn = create_connection(_db_path())
-                rooms = portal.list_rooms(conn)
-                conn.close()
-                self._send_json({"rooms": rooms})
-            except GatewayError as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path.startswith("/chat/v1/rooms/") and path.endswith("/messages"):
-            parts = path.split("/")
-            if len(parts) != 6:
-                self._send_text("not found", HTTPStatus.NOT_FOUND)
+                data = materialize_artifact(run_id, name, base_dir=_run_root()).read_bytes()
+            except OSError:
+                self._send_json({"error": "artifact not found"}, HTTPStatus.NOT_FOUND)
                 return
-            room_id = parts[4]
-            try:
-                _ = self._require_auth()
-                after_raw = (query.get("after") or [""])[0] or None
-                limit_raw = (query.get("limit") or [""])[0] or None
-                after = int(after_raw) if after_raw else None
-                limit = int(limit_raw) if limit_raw else 50
-                conn = create_connection(_db_path())
-                messages = portal.list_messages(conn, room_id=room_id, after=after, limit=limit)
-                conn.close()
-                self._send_json({"messages": messages})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/marketplace/listings":
-            try:
-                conn = create_connection(_db_path())
-                listings = list_listings(conn)
-                conn.close()
-                self._send_json({"listings": listings})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/marketplace/purchases":
-            try:
-                conn = create_connection(_db_path())
-                listing_id = (query.get("listing_id") or [""])[0] or None
-                purchases = list_purchases(conn, listing_id=listing_id)
-                conn.close()
-                self._send_json({"purchases": purchases})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
-            return
-        if path == "/entertainment/items":
-            try:
-                conn = create_connection(_db_path())
-                gateway._ensure_entertainment_items(conn)
-                items = list_entertainment_items(conn)
-                conn.close()
-                self._send_json({"items": items})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+        self._send_bytes(data, "application/octet-stream")
+
+    @_ROUTER.route("GET", "/export.zip", cost=3)
+    def _get_export_zip(self, request: _Request) -> None:
+        run_id = self._require_query_run_id(request.query)
+        from nyx_backend.evidence import EXPORT_CHUNK_BYTES, export_bundle
+
+        bundle = export_bundle(run_id, base_dir=_run_root())
+        self._send_file(bundle.path, "application/zip", bundle.etag, EXPORT_CHUNK_BYTES)
+
+    @_ROUTER.route("GET", "/export/bulk.zip", cost=10)
+    def _get_export_bulk(self, request: _Request) -> None:
+        run_ids = request.query.get("run_id") or []
+        if not run_ids:
+            raise GatewayError("run_id required")
+        if len(run_ids) > _EXPORT_BULK_MAX_RUNS:
+            raise GatewayError("too many run_ids")
+        from nyx_backend.evidence import export_bundle, write_bulk_export
+
+        bundles = [export_bundle(run_id, base_dir=_run_root()) for run_id in run_ids]
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            write_bulk_export(bundles, self.wfile)
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
             return
-        if path == "/entertainment/events":
-            try:
-                conn = create_connection(_db_path())
-                item_id = (query.get("item_id") or [""])[0] or None
-                events = list_entertainment_events(conn, item_id=item_id)
-                conn.close()
-                self._send_json({"events": events})
-            except Exception as exc:
-                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+
+    @_ROUTER.route("GET", "/list")
+    def _get_list(self, request: _Request) -> None:
+        from nyx_backend.evidence import list_runs
+        from nyx_backend.run_catalog import list_scope, parse_run_filters
+
+        filters = parse_run_filters(request.query)
+        scope = list_scope(filters)
+        by_run_id = filters["sort"] == "run_id"
+        size, after = self._page_request(request.query, scope, arity=1 if by_run_id else 2)
+        records = list_runs(base_dir=_run_root(), after=after, limit=size + 1, **filters)
+        rows = (
+            {
+                "run_id": record.run_id,
+                "status": record.status,
+                "module": record.module,
+                "action": record.action,
+                "seed": record.seed,
+                "state_hash": record.state_hash,
+                "replay_ok": record.replay_ok,
+                "created_at": record.created_at,
+            }
+            for record in records
+        )
+        page = take_page(
+            rows,
+            size,
+            scope,
+            lambda row: (row["run_id"],) if by_run_id else (row["created_at"], row["run_id"]),
+        )
+        self._send_json({"runs": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("GET", "/maintenance/metrics")
+    def _get_maintenance_metrics(self, request: _Request) -> None:
+        janitor = getattr(self.server, "janitor", None)
+        if janitor is None:
+            self._send_json({"enabled": False})
             return
-        self._send_text("not found", HTTPStatus.NOT_FOUND)
+        self._send_json({"enabled": True, **janitor.metrics()})
+
+    @_ROUTER.route("GET", "/metrics")
+    def _get_metrics(self, request: _Request) -> None:
+        self._send_bytes(_METRICS.render().encode("utf-8"), _METRICS_CONTENT_TYPE)
+
+    @_ROUTER.route("GET", "/maintenance/routes")
+    def _get_maintenance_routes(self, request: _Request) -> None:
+        self._send_json({"routes": _ROUTER.latency()})
+
+    @_ROUTER.route("POST", "/portal/v1/accounts", body=True)
+    def _post_portal_accounts(self, request: _Request) -> None:
+        payload = request.body
+        with pooled_connection(_db_path()) as conn:
+            account = portal.create_account(conn, payload.get("handle"), payload.get("pubkey"))
+        self._send_json(
+            {
+                "account_id": account.account_id,
+                "handle": account.handle,
+                "pubkey": account.public_key,
+                "created_at": account.created_at,
+                "status": account.status,
+            }
+        )
+
+    @_ROUTER.route("POST", "/portal/v1/auth/challenge", body=True)
+    def _post_portal_challenge(self, request: _Request) -> None:
+        account_id = request.body.get("account_id")
+        if not isinstance(account_id, str) or not account_id:
+            raise GatewayError("account_id required")
+        with pooled_connection(_db_path()) as conn:
+            challenge = portal.issue_challenge(conn, account_id)
+        self._send_json({"nonce": challenge.nonce, "expires_at": challenge.expires_at})
+
+    @_ROUTER.route("POST", "/portal/v1/auth/verify", body=True)
+    def _post_portal_verify(self, request: _Request) -> None:
+        payload = request.body
+        account_id = payload.get("account_id")
+        nonce = payload.get("nonce")
+        signature = payload.get("signature")
+        if not isinstance(account_id, str) or not account_id:
+            raise GatewayError("account_id required")
+        if not isinstance(nonce, str) or not nonce:
+            raise GatewayError("nonce required")
+        if not isinstance(signature, str) or not signature:
+            raise GatewayError("signature required")
+        with pooled_connection(_db_path()) as conn:
+            session = portal.verify_challenge(conn, account_id, nonce, signature)
+        self._send_json({"access_token": session.token, "expires_at": session.expires_at})
+
+    @_ROUTER.route("POST", "/portal/v1/auth/logout", auth=True)
+    def _post_portal_logout(self, request: _Request) -> None:
+        with pooled_connection(_db_path()) as conn:
+            portal.logout_session(conn, request.session.token)
+        self._send_json({"ok": True})
+
+    @_ROUTER.route("GET", "/portal/v1/me", auth=True)
+    def _get_portal_me(self, request: _Request) -> None:
+        with pooled_connection(_db_path()) as conn:
+            account = portal.load_account(conn, request.session.account_id)
+        if account is None:
+            raise GatewayError("account not found")
+        self._send_json(
+            {
+                "account_id": account.account_id,
+                "handle": account.handle,
+                "pubkey": account.public_key,
+                "created_at": account.created_at,
+                "status": account.status,
+            }
+        )
+
+    @_ROUTER.route("GET", "/portal/v1/activity", auth=True)
+    def _get_portal_activity(self, request: _Request) -> None:
+        scope = "portal/activity"
+        size, after = self._page_request(request.query, scope)
+        with pooled_connection(_db_path()) as conn:
+            rows = iter_receipts(conn, after=after[0] if after else None, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["receipt_id"],))
+        self._send_json(
+            {"account_id": request.session.account_id, "receipts": page.items, "next_cursor": page.next_cursor}
+        )
+
+    @_ROUTER.route("POST", "/chat/v1/rooms", auth=True, body=True)
+    def _post_chat_rooms(self, request: _Request) -> None:
+        name = request.body.get("name")
+        is_public = request.body.get("is_public", True)
+        with pooled_connection(_db_path()) as conn:
+            room = portal.create_room(conn, name=name, is_public=bool(is_public))
+        self._send_json(
+            {
+                "room_id": room.room_id,
+                "name": room.name,
+                "created_at": room.created_at,
+                "is_public": bool(room.is_public),
+            }
+        )
+
+    @_ROUTER.route("GET", "/chat/v1/rooms", auth=True)
+    def _get_chat_rooms(self, request: _Request) -> None:
+        scope = "chat/v1/rooms"
+        size, after = self._page_request(request.query, scope, arity=2)
+        with pooled_connection(_db_path()) as conn:
+            rooms = portal.list_rooms(conn, after=after, limit=size + 1)
+        page = take_page(rooms, size, scope, lambda row: (row["created_at"], row["room_id"]))
+        self._send_json({"rooms": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("POST", "/chat/v1/rooms/{room_id}/messages", auth=True, body=True)
+    def _post_chat_room_message(self, request: _Request) -> None:
+        body = request.body.get("body")
+        if not isinstance(body, str) or not body:
+            raise GatewayError("body required")
+        with pooled_connection(_db_path()) as conn:
+            message_fields, receipt = portal.post_message(
+                conn, room_id=request.params["room_id"], sender_account_id=request.session.account_id, body=body
+            )
+        self._send_json({"message": message_fields, "receipt": receipt})
+
+    @_ROUTER.route("GET", "/chat/v1/rooms/{room_id}/messages", auth=True, catch_all=True)
+    def _get_chat_room_messages(self, request: _Request) -> None:
+        room_id = request.params["room_id"]
+        scope = f"chat/v1/rooms/{room_id}/messages"
+        size, cursor = self._page_request(request.query, scope)
+        after_raw = (request.query.get("after") or [""])[0] or None
+        after = int(after_raw) if after_raw else None
+        if cursor is not None:
+            after = int(cursor[0])
+        wait_raw = (request.query.get("wait") or [""])[0] or None
+        wait_seconds = int(wait_raw) if wait_raw else 0
+        if wait_seconds < 0 or wait_seconds > _CHAT_LONG_POLL_MAX_SECONDS:
+            raise GatewayError("wait out of bounds")
+        messages = self._wait_for_messages(room_id, after, size + 1, wait_seconds)
+        page = take_page(messages, size, scope, lambda row: (row["seq"],))
+        self._send_json({"messages": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("GET", "/chat/v1/rooms/{room_id}/events", auth=True, cost=2, catch_all=True)
+    def _get_chat_room_events(self, request: _Request) -> None:
+        room_id = request.params["room_id"]
+        after_raw = self.headers.get("Last-Event-ID", "").strip() or (request.query.get("after") or [""])[0]
+        after = int(after_raw) if after_raw else 0
+        if after < 0:
+            raise GatewayError("after invalid")
+        with pooled_connection(_db_path()) as conn:
+            portal.list_messages(conn, room_id=room_id, after=after, limit=1)
+        self._stream_room_events(room_id, after, request.session)
+
+    @_ROUTER.route("POST", "/wallet/v1/faucet", auth=True, body=True)
+    def _post_wallet_v1_faucet(self, request: _Request) -> None:
+        payload = request.body
+        session = request.session
+        seed = self._require_seed(payload)
+        run_id = self._require_run_id(payload)
+        faucet_payload = payload.get("payload")
+        if faucet_payload is None:
+            faucet_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
+        result, balance, fee_record = gateway.execute_wallet_faucet_v1(
+            seed=seed,
+            run_id=run_id,
+            payload=faucet_payload,
+            account_id=session.account_id,
+        )
+        self._send_json(
+            {
+                "run_id": result.run_id,
+                "status": "complete",
+                "state_hash": result.state_hash,
+                "receipt_hashes": result.receipt_hashes,
+                "replay_ok": result.replay_ok,
+                "address": faucet_payload.get("address"),
+                "balance": balance,
+                "fee_total": fee_record.total_paid,
+                "fee_breakdown": {
+                    "protocol_fee_total": fee_record.protocol_fee_total,
+                    "platform_fee_amount": fee_record.platform_fee_amount,
+                },
+                "payer": session.account_id,
+                "treasury_address": fee_record.fee_address,
+            }
+        )
+
+    @_ROUTER.route("POST", "/wallet/v1/transfer", auth=True, body=True)
+    def _post_wallet_v1_transfer(self, request: _Request) -> None:
+        payload = request.body
+        seed = self._require_seed(payload)
+        run_id = self._require_run_id(payload)
+        transfer_payload = payload.get("payload")
+        if transfer_payload is None:
+            transfer_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
+        result, balances, fee_record = execute_wallet_transfer(
+            seed=seed,
+            run_id=run_id,
+            payload=transfer_payload,
+        )
+        self._send_json(
+            {
+                "run_id": result.run_id,
+                "status": "complete",
+                "state_hash": result.state_hash,
+                "receipt_hashes": result.receipt_hashes,
+                "replay_ok": result.replay_ok,
+                "from_address": transfer_payload.get("from_address"),
+                "to_address": transfer_payload.get("to_address"),
+                "amount": transfer_payload.get("amount"),
+                "fee_total": fee_record.total_paid,
+                "fee_breakdown": {
+                    "protocol_fee_total": fee_record.protocol_fee_total,
+                    "platform_fee_amount": fee_record.platform_fee_amount,
+                },
+                "payer": request.session.account_id,
+                "treasury_address": fee_record.fee_address,
+                "from_balance": balances["from_balance"],
+                "to_balance": balances["to_balance"],
+                "treasury_balance": balances["treasury_balance"],
+            }
+        )
+
+    @_ROUTER.route("GET", "/wallet/balance", catch_all=True)
+    def _get_wallet_balance(self, request: _Request) -> None:
+        address = (request.query.get("address") or [""])[0]
+        balance = fetch_wallet_balance(address=address)
+        self._send_json({"address": address, "balance": balance})
+
+    @_ROUTER.route("POST", "/wallet/faucet", body=True)
+    def _post_wallet_faucet(self, request: _Request) -> None:
+        payload = request.body
+        seed = self._require_seed(payload)
+        run_id = self._require_run_id(payload)
+        faucet_payload = payload.get("payload")
+        if faucet_payload is None:
+            faucet_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
+        result, balance = execute_wallet_faucet(
+            seed=seed,
+            run_id=run_id,
+            payload=faucet_payload,
+        )
+        self._send_json(
+            {
+                "run_id": result.run_id,
+                "status": "complete",
+                "state_hash": result.state_hash,
+                "receipt_hashes": result.receipt_hashes,
+                "replay_ok": result.replay_ok,
+                "address": faucet_payload.get("address"),
+                "balance": balance,
+            }
+        )
+
+    @_ROUTER.route("POST", "/wallet/transfer", body=True)
+    def _post_wallet_transfer(self, request: _Request) -> None:
+        payload = request.body
+        seed = self._require_seed(payload)
+        run_id = self._require_run_id(payload)
+        transfer_payload = payload.get("payload")
+        if transfer_payload is None:
+            transfer_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
+        result, balances, fee_record = execute_wallet_transfer(
+            seed=seed,
+            run_id=run_id,
+            payload=transfer_payload,
+        )
+        self._send_json(
+            {
+                "run_id": result.run_id,
+                "status": "complete",
+                "state_hash": result.state_hash,
+                "receipt_hashes": result.receipt_hashes,
+                "replay_ok": result.replay_ok,
+                "from_address": transfer_payload.get("from_address"),
+                "to_address": transfer_payload.get("to_address"),
+                "amount": transfer_payload.get("amount"),
+                "fee_total": fee_record.total_paid,
+                "fee_breakdown": {
+                    "protocol_fee_total": fee_record.protocol_fee_total,
+                    "platform_fee_amount": fee_record.platform_fee_amount,
+                },
+                "payer": transfer_payload.get("from_address"),
+                "treasury_address": fee_record.fee_address,
+                "from_balance": balances["from_balance"],
+                "to_balance": balances["to_balance"],
+                "treasury_balance": balances["treasury_balance"],
+            }
+        )
+
+    def _run_module_action(self, payload: dict, module: str, action: str) -> None:
+        seed = self._require_seed(payload)
+        run_id = self._require_run_id(payload)
+        action_payload = payload.get("payload")
+        if action_payload is None:
+            action_payload = {k: v for k, v in payload.items() if k not in {"seed", "run_id"}}
+        self._send_json(_run_response(seed, run_id, module, action, action_payload))
+
+    @_ROUTER.route("GET", "/exchange/orderbook", catch_all=True)
+    def _get_exchange_orderbook(self, request: _Request) -> None:
+        with pooled_connection(_db_path()) as conn:
+            book = order_book_snapshot(conn)
+        self._send_json(book)
+
+    @_ROUTER.route("GET", "/exchange/depth", catch_all=True)
+    def _get_exchange_depth(self, request: _Request) -> None:
+        query = request.query
+        asset_in = (query.get("asset_in") or [""])[0]
+        asset_out = (query.get("asset_out") or [""])[0]
+        depth = int((query.get("depth") or ["20"])[0])
+        tick = int((query.get("tick") or ["1"])[0])
+        with pooled_connection(_db_path()) as conn:
+            book = order_book_depth(conn, asset_in, asset_out, depth=depth, tick=tick)
+        self._send_json(book)
+
+    @_ROUTER.route("GET", "/exchange/deltas", catch_all=True)
+    def _get_exchange_deltas(self, request: _Request) -> None:
+        query = request.query
+        asset_in = (query.get("asset_in") or [""])[0]
+        asset_out = (query.get("asset_out") or [""])[0]
+        since_raw = (query.get("since") or [""])[0]
+        if not since_raw:
+            raise GatewayError("since required")
+        since = int(since_raw)
+        with pooled_connection(_db_path()) as conn:
+            deltas = order_book_deltas(conn, asset_in, asset_out, since)
+        self._send_json(deltas)
+
+    @_ROUTER.route("GET", "/exchange/orders", catch_all=True)
+    def _get_exchange_orders(self, request: _Request) -> None:
+        query = request.query
+        side = (query.get("side") or [""])[0] or None
+        asset_in = (query.get("asset_in") or [""])[0] or None
+        asset_out = (query.get("asset_out") or [""])[0] or None
+        scope = f"exchange/orders:{side}:{asset_in}:{asset_out}"
+        size, after = self._page_request(query, scope, arity=2)
+        with pooled_connection(_db_path()) as conn:
+            rows = iter_orders(conn, side=side, asset_in=asset_in, asset_out=asset_out, after=after, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["price"], row["order_id"]))
+        self._send_json({"orders": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("GET", "/exchange/trades", catch_all=True)
+    def _get_exchange_trades(self, request: _Request) -> None:
+        scope = "exchange/trades"
+        size, after = self._page_request(request.query, scope)
+        with pooled_connection(_db_path()) as conn:
+            rows = iter_trades(conn, after=after[0] if after else None, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["trade_id"],))
+        self._send_json({"trades": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("POST", "/exchange/place_order", body=True)
+    def _post_exchange_place_order(self, request: _Request) -> None:
+        self._run_module_action(request.body, "exchange", "place_order")
+
+    @_ROUTER.route("POST", "/exchange/cancel_order", body=True)
+    def _post_exchange_cancel_order(self, request: _Request) -> None:
+        self._run_module_action(request.body, "exchange", "cancel_order")
+
+    @_ROUTER.route("GET", "/chat/messages", catch_all=True)
+    def _get_chat_messages(self, request: _Request) -> None:
+        channel = (request.query.get("channel") or [""])[0] or None
+        scope = f"chat/messages:{channel}"
+        size, after = self._page_request(request.query, scope)
+        with pooled_connection(_db_path()) as conn:
+            rows = iter_messages(conn, channel=channel, after=after[0] if after else None, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["message_id"],))
+        self._send_json({"messages": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("POST", "/chat/send", body=True)
+    def _post_chat_send(self, request: _Request) -> None:
+        self._run_module_action(request.body, "chat", "message_event")
 
+    @_ROUTER.route("GET", "/marketplace/listings", catch_all=True)
+    def _get_marketplace_listings(self, request: _Request) -> None:
+        scope = "marketplace/listings"
+        size, after = self._page_request(request.query, scope)
+        with pooled_connection(_db_path()) as conn:
+            rows = iter_listings(conn, after=after[0] if after else None, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["listing_id"],))
+        self._send_json({"listings": page.items, "next_cursor": page.next_cursor})
 
-def run_server(host: str = "0.0.0.0", port: int = 8091) -> None:
-    server = ThreadingHTTPServer((host, port), GatewayHandler)
-    server.rate_limiter = RequestLimiter(_RATE_LIMIT, _RATE_WINDOW_SECONDS)
-    server.account_limiter = RequestLimiter(_ACCOUNT_RATE_LIMIT, _RATE_WINDOW_SECONDS)
-    server.serve_forever()
+    @_ROUTER.route("GET", "/marketplace/purchases", catch_all=True)
+    def _get_marketplace_purchases(self, request: _Request) -> None:
+        listing_id = (request.query.get("listing_id") or [""])[0] or None
+        scope = f"marketplace/purchases:{listing_id}"
+        size, after = self._page_request(request.query, scope)
+        with pooled_connection(_db_path()) as conn:
+            rows = iter_purchases(conn, listing_id=listing_id, after=after[0] if after else None, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["purchase_id"],))
+        self._send_json({"purchases": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("POST", "/marketplace/listing", body=True)
+    def _post_marketplace_listing(self, request: _Request) -> None:
+        self._run_module_action(request.body, "marketplace", "listing_publish")
+
+    @_ROUTER.route("POST", "/marketplace/purchase", body=True)
+    def _post_marketplace_purchase(self, request: _Request) -> None:
+        self._run_module_action(request.body, "marketplace", "purchase_listing")
+
+    @_ROUTER.route("GET", "/entertainment/items", catch_all=True)
+    def _get_entertainment_items(self, request: _Request) -> None:
+        scope = "entertainment/items"
+        size, after = self._page_request(request.query, scope)
+        with pooled_connection(_db_path()) as conn:
+            gateway._ensure_entertainment_items(conn)
+            rows = iter_entertainment_items(conn, after=after[0] if after else None, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["item_id"],))
+        self._send_json({"items": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("GET", "/entertainment/events", catch_all=True)
+    def _get_entertainment_events(self, request: _Request) -> None:
+        item_id = (request.query.get("item_id") or [""])[0] or None
+        scope = f"entertainment/events:{item_id}"
+        size, after = self._page_request(request.query, scope)
+        with pooled_connection(_db_path()) as conn:
+            rows = iter_entertainment_events(conn, item_id=item_id, after=after[0] if after else None, limit=size + 1)
+            page = take_page(rows, size, scope, lambda row: (row["event_id"],))
+        self._send_json({"events": page.items, "next_cursor": page.next_cursor})
+
+    @_ROUTER.route("POST", "/entertainment/step", body=True)
+    def _post_entertainment_step(self, request: _Request) -> None:
+        self._run_module_action(request.body, "entertainment", "state_step")
+
+
+def run_server(
+    host: str = "0.0.0.0",
+    port: int = 8091,
+    storage_mode: str = "wal",
+    rate_limit_db: Path | None = None,
+    server_mode: str = "threading",
+    trace_sample_rate: float | None = None,
+    trace_path: Path | None = None,
+    env_file: Path | None = None,
+    evidence_sync: str = "group",
+    run_mode: str = "sync",
+    run_workers: int = _RUN_QUEUE_WORKERS,
+    trace_cache_dir: Path | None = None,
+) -> None:
+    if storage_mode not in _STORAGE_MODES:
+        raise GatewayError("storage_mode invalid")
+    if server_mode not in _SERVER_MODES:
+        raise GatewayError("server_mode invalid")
+    if evidence_sync not in _EVIDENCE_SYNC_MODES:
+        raise GatewayError("evidence_sync invalid")
+    if run_mode not in _RUN_MODES:
+        raise GatewayError("run_mode invalid")
+    configure_config(env_file=env_file)
+    install_reload_signal()
+    gateway._ensure_backend_path()
+    from nyx_backend.anchor import protocol_anchor
+    from nyx_backend.evidence import recover_runs
+    from nyx_backend.evidence_store import configure_sync
+    from nyx_backend.trace_cache import configure_trace_cache
+    from nyx_backend.tracing import configure_tracer, get_tracer
+
+    protocol_anchor()
+    configure_sync(evidence_sync)
+    recover_runs(base_dir=_run_root())
+    if trace_sample_rate is not None or trace_path is not None:
+        tracer = get_tracer()
+        configure_tracer(
+            sample_rate=tracer.sample_rate if trace_sample_rate is None else trace_sample_rate,
+            sink=trace_path or tracer.sink,
+        )
+    configure_trace_cache(capacity=_TRACE_CACHE_SIZE, cache_dir=trace_cache_dir or gateway._trace_cache_dir())
+    configure_pragmas(TUNED_PRAGMAS if storage_mode == "wal" else None)
+    pool = configure_pool(max_idle=_POOL_MAX_IDLE, max_lifetime_seconds=_POOL_MAX_LIFETIME_SECONDS)
+    pool.ensure_schema(_db_path())
+    with pool.connection(_db_path()) as conn:
+        get_engine(conn).sync(conn)
+    configure_session_cache(max_entries=_SESSION_CACHE_MAX_ENTRIES, ttl_seconds=_SESSION_CACHE_TTL_SECONDS)
+    configure_evidence_cache(max_entries=_EVIDENCE_CACHE_MAX_ENTRIES)
+    hub = configure_chat_hub(max_subscribers_per_room=_CHAT_MAX_SUBSCRIBERS_PER_ROOM)
+    if server_mode == "asyncio":
+        from nyx_backend_gateway.async_server import AsyncGatewayServer
+
+        server = AsyncGatewayServer(
+            (host, port),
+            GatewayHandler,
+            workers=_ASYNC_WORKERS,
+            stream_workers=_ASYNC_STREAM_WORKERS,
+            max_connections=_ASYNC_MAX_CONNECTIONS,
+            keepalive_seconds=_ASYNC_KEEPALIVE_SECONDS,
+        )
+    else:
+        server = ThreadingHTTPServer((host, port), GatewayHandler)
+    if rate_limit_db is not None:
+        server.rate_limiter = SqliteRateLimiter(rate_limit_db, _RATE_LIMIT, _RATE_WINDOW_SECONDS, scope="client")
+        server.account_limiter = SqliteRateLimiter(
+            rate_limit_db, _ACCOUNT_RATE_LIMIT, _RATE_WINDOW_SECONDS, scope="account"
+        )
+    else:
+        server.rate_limiter = RateLimiter(_RATE_LIMIT, _RATE_WINDOW_SECONDS, max_keys=_RATE_LIMIT_MAX_KEYS)
+        server.account_limiter = RateLimiter(_ACCOUNT_RATE_LIMIT, _RATE_WINDOW_SECONDS, max_keys=_RATE_LIMIT_MAX_KEYS)
+    server.janitor = Janitor(
+        lambda: _db_path(), lambda: _run_root(), JanitorConfig(interval_seconds=_JANITOR_INTERVAL_SECONDS)
+    )
+    server.janitor.start()
+    if run_mode == "async":
+        server.run_queue = RunQueue(
+            lambda: _db_path(), _execute_job, workers=run_workers, max_queued=_RUN_QUEUE_MAX_QUEUED
+        )
+        server.run_queue.start()
+    try:
+        server.serve_forever()
+    finally:
+        if getattr(server, "run_queue", None) is not None:
+            server.run_queue.stop()
+        server.janitor.stop()
+        hub.close()
 
 
 if __name__ == "__main__":
@@ -888,7 +1052,27 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=8091)
     parser.add_argument("--env-file", default="")
+    parser.add_argument("--storage-mode", choices=sorted(_STORAGE_MODES), default="wal")
+    parser.add_argument("--rate-limit-db", default="")
+    parser.add_argument("--server-mode", choices=sorted(_SERVER_MODES), default="threading")
+    parser.add_argument("--trace-sample-rate", type=float, default=None)
+    parser.add_argument("--trace-path", default="")
+    parser.add_argument("--trace-cache-dir", default="")
+    parser.add_argument("--evidence-sync", choices=sorted(_EVIDENCE_SYNC_MODES), default="group")
+    parser.add_argument("--run-mode", choices=sorted(_RUN_MODES), default="sync")
+    parser.add_argument("--run-workers", type=int, default=_RUN_QUEUE_WORKERS)
     args = parser.parse_args()
-    if args.env_file:
-        load_env_file(Path(args.env_file))
-    run_server(host=args.host, port=args.port)
+    run_server(
+        host=args.host,
+        port=args.port,
+        storage_mode=args.storage_mode,
+        rate_limit_db=Path(args.rate_limit_db) if args.rate_limit_db else None,
+        server_mode=args.server_mode,
+        trace_sample_rate=args.trace_sample_rate,
+        trace_path=Path(args.trace_path) if args.trace_path else None,
+        env_file=Path(args.env_file) if args.env_file else None,
+        evidence_sync=args.evidence_sync,
+        run_mode=args.run_mode,
+        run_workers=args.run_workers,
+        trace_cache_dir=Path(args.trace_cache_dir) if args.trace_cache_dir else None,
+    )
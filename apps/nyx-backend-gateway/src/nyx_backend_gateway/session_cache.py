@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import threading
+import time
+
+from nyx_backend_gateway.storage import PortalSession
+
+
+class SessionCacheError(ValueError):
+    pass
+
+
+_DEFAULT_MAX_ENTRIES = 4096
+_DEFAULT_TTL_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class SessionCacheStats:
+    entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class SessionCache:
+    def __init__(self, max_entries: int = _DEFAULT_MAX_ENTRIES, ttl_seconds: float = _DEFAULT_TTL_SECONDS) -> None:
+        if not isinstance(max_entries, int) or isinstance(max_entries, bool) or max_entries < 0:
+            raise SessionCacheError("max_entries out of bounds")
+        if ttl_seconds < 0:
+            raise SessionCacheError("ttl_seconds out of bounds")
+        self._max_entries = max_entries
+        self._ttl = float(ttl_seconds)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[PortalSession, float]] = OrderedDict()
+        self._revoked: OrderedDict[str, float] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, token: str) -> PortalSession | None:
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            session, cached_until = entry
+            if time.monotonic() >= cached_until or int(time.time()) > session.expires_at:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return session
+
+    def put(self, session: PortalSession) -> None:
+        if self._max_entries == 0 or self._ttl == 0:
+            return
+        key = _token_key(session.token)
+        now = time.monotonic()
+        with self._lock:
+            while self._revoked and next(iter(self._revoked.values())) <= now:
+                self._revoked.popitem(last=False)
+            if key in self._revoked:
+                return
+            self._entries[key] = (session, now + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, token: str) -> None:
+        key = _token_key(token)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked.pop(key, None)
+            self._revoked[key] = time.monotonic() + self._ttl
+            while len(self._revoked) > max(self._max_entries, 1):
+                self._revoked.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+
+    def stats(self) -> SessionCacheStats:
+        with self._lock:
+            return SessionCacheStats(
+                entries=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+_SESSIONS = SessionCache()
+
+
+def get_session_cache() -> SessionCache:
+    return _SESSIONS
+
+
+def configure_session_cache(
+    max_entries: int = _DEFAULT_MAX_ENTRIES,
+    ttl_seconds: float = _DEFAULT_TTL_SECONDS,
+) -> SessionCache:
+    global _SESSIONS
+    _SESSIONS = SessionCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    return _SESSIONS
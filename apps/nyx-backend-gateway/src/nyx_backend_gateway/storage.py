@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from dataclasses import dataclass
 import json
 import re
 import sqlite3
+import time
 from pathlib import Path
+from typing import Callable, Iterator
 
+from nyx_backend_gateway.metrics import get_registry
 from nyx_backend_gateway.migrations import apply_migrations
 
 
@@ -13,15 +17,170 @@ class StorageError(ValueError):
     pass
 
 
-def create_connection(db_path: Path) -> sqlite3.Connection:
+_FETCH_BATCH = 256
+
+
+_STATEMENT_KINDS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+_STATEMENT_SECONDS = get_registry().histogram(
+    "nyx_gateway_sqlite_statement_seconds", "SQLite statement execution time, by statement kind", ("kind",)
+)
+_STATEMENT_TIMERS = {kind: _STATEMENT_SECONDS.labels(kind) for kind in _STATEMENT_KINDS + ("other",)}
+_COMMIT_SECONDS = get_registry().histogram("nyx_gateway_sqlite_commit_seconds", "SQLite commit time")
+
+
+_SPAN_FACTORY: Callable[[str], AbstractContextManager] | None = None
+
+
+def set_span_factory(factory: Callable[[str], AbstractContextManager] | None) -> None:
+    global _SPAN_FACTORY
+    _SPAN_FACTORY = factory
+
+
+def _span(name: str) -> AbstractContextManager:
+    factory = _SPAN_FACTORY
+    return nullcontext() if factory is None else factory(name)
+
+
+def _statement_timer(sql: str):
+    head = sql.lstrip()[:6].upper()
+    return _STATEMENT_TIMERS.get(head, _STATEMENT_TIMERS["other"])
+
+
+class GatewayConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.unit_of_work_depth = 0
+        self.unit_of_work_hooks: list[Callable[[bool], None]] = []
+
+    def execute(self, sql: str, parameters=(), /) -> sqlite3.Cursor:
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _statement_timer(sql).observe(time.perf_counter() - started)
+
+    def executemany(self, sql: str, parameters, /) -> sqlite3.Cursor:
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            _statement_timer(sql).observe(time.perf_counter() - started)
+
+    def commit(self) -> None:
+        started = time.perf_counter()
+        try:
+            with _span("sqlite.commit"):
+                super().commit()
+        finally:
+            _COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+
+@dataclass(frozen=True)
+class StoragePragmas:
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+
+
+TUNED_PRAGMAS = StoragePragmas()
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL"}
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_PRAGMAS: StoragePragmas | None = None
+
+
+def _validate_pragmas(pragmas: StoragePragmas) -> StoragePragmas:
+    if pragmas.journal_mode not in _JOURNAL_MODES:
+        raise StorageError("journal_mode invalid")
+    if pragmas.synchronous not in _SYNCHRONOUS_MODES:
+        raise StorageError("synchronous invalid")
+    _validate_int(pragmas.busy_timeout_ms, "busy_timeout_ms", 0)
+    _validate_int(pragmas.mmap_size, "mmap_size", 0)
+    _validate_int(pragmas.cache_size_kib, "cache_size_kib", 1)
+    return pragmas
+
+
+def configure_pragmas(pragmas: StoragePragmas | None) -> None:
+    global _PRAGMAS
+    _PRAGMAS = _validate_pragmas(pragmas) if pragmas is not None else None
+
+
+def current_pragmas() -> StoragePragmas | None:
+    return _PRAGMAS
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: StoragePragmas) -> None:
+    pragmas = _validate_pragmas(pragmas)
+    conn.execute(f"PRAGMA busy_timeout = {pragmas.busy_timeout_ms}")
+    conn.execute(f"PRAGMA journal_mode = {pragmas.journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {pragmas.synchronous}")
+    conn.execute(f"PRAGMA mmap_size = {pragmas.mmap_size}")
+    conn.execute(f"PRAGMA cache_size = -{pragmas.cache_size_kib}")
+
+
+def open_connection(db_path: Path) -> sqlite3.Connection:
     if not isinstance(db_path, Path):
         raise StorageError("db_path must be Path")
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), check_same_thread=False, factory=GatewayConnection)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    if _PRAGMAS is not None:
+        apply_pragmas(conn, _PRAGMAS)
+    return conn
+
+
+def create_connection(db_path: Path) -> sqlite3.Connection:
+    conn = open_connection(db_path)
     apply_migrations(conn)
     return conn
 
 
+def _commit(conn: sqlite3.Connection) -> None:
+    if getattr(conn, "unit_of_work_depth", 0) == 0:
+        conn.commit()
+
+
+@contextmanager
+def unit_of_work(conn: sqlite3.Connection, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    if not isinstance(conn, GatewayConnection):
+        raise StorageError("connection does not support unit of work")
+    if conn.unit_of_work_depth == 0 and not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    conn.unit_of_work_depth += 1
+    try:
+        yield conn
+    except BaseException:
+        conn.unit_of_work_depth -= 1
+        if conn.unit_of_work_depth == 0:
+            conn.rollback()
+            _run_unit_of_work_hooks(conn, False)
+        raise
+    conn.unit_of_work_depth -= 1
+    if conn.unit_of_work_depth == 0:
+        try:
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            _run_unit_of_work_hooks(conn, False)
+            raise
+        _run_unit_of_work_hooks(conn, True)
+
+
+def _run_unit_of_work_hooks(conn: GatewayConnection, committed: bool) -> None:
+    hooks = conn.unit_of_work_hooks
+    conn.unit_of_work_hooks = []
+    for hook in hooks:
+        hook(committed)
+
+
+def on_unit_of_work_end(conn: sqlite3.Connection, hook: Callable[[bool], None]) -> None:
+    if getattr(conn, "unit_of_work_depth", 0) == 0:
+        hook(True)
+        return
+    conn.unit_of_work_hooks.append(hook)
+
+
 def _validate_text(value: object, name: str, pattern: str = r"[A-Za-z0-9_./-]{1,128}") -> str:
     if not isinstance(value, str) or not value or isinstance(value, bool):
         raise StorageError(f"{name} required")
@@ -45,6 +204,25 @@ def _validate_int(
     return value
 
 
+def _stream(cursor: sqlite3.Cursor) -> Iterator[dict[str, object]]:
+    try:
+        while True:
+            rows = cursor.fetchmany(_FETCH_BATCH)
+            if not rows:
+                return
+            for row in rows:
+                yield {col: row[col] for col in row.keys()}
+    finally:
+        cursor.close()
+
+
+def _limit_clause(limit: int | None, params: list[object]) -> str:
+    if limit is None:
+        return ""
+    params.append(_validate_int(limit, "limit", 1))
+    return " LIMIT ?"
+
+
 def _validate_wallet_address(value: object, name: str = "address") -> str:
     return _validate_text(value, name, r"[A-Za-z0-9_-]{1,64}")
 
@@ -60,6 +238,23 @@ class EvidenceRun:
     replay_ok: bool
 
 
+@dataclass(frozen=True)
+class RunJob:
+    run_id: str
+    request: str
+    request_digest: str
+    status: str
+    error: str | None
+    result: str | None
+    enqueued_at: float
+    started_at: float | None
+    finished_at: float | None
+    attempts: int
+
+
+RUN_JOB_STATUSES = ("queued", "running", "complete", "failed")
+
+
 @dataclass(frozen=True)
 class Order:
     order_id: str
@@ -133,6 +328,13 @@ class ChatMessage:
     created_at: int
 
 
+@dataclass(frozen=True)
+class ChatRoomHead:
+    room_id: str
+    seq: int
+    chain_head: str
+
+
 @dataclass(frozen=True)
 class Listing:
     listing_id: str
@@ -222,7 +424,91 @@ def insert_evidence_run(conn: sqlite3.Connection, record: EvidenceRun) -> None:
         "VALUES (?, ?, ?, ?, ?, ?, ?)",
         (run_id, module, action, seed, state_hash, receipt_hashes, replay_ok),
     )
-    conn.commit()
+    _commit(conn)
+
+
+def _validate_time(value: object, name: str) -> float:
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+        raise StorageError(f"{name} invalid")
+    return float(value)
+
+
+def insert_run_job(conn: sqlite3.Connection, job: RunJob) -> None:
+    run_id = _validate_text(job.run_id, "run_id", r"[A-Za-z0-9_-]{1,64}")
+    digest = _validate_text(job.request_digest, "request_digest", r"[a-f0-9]{64}")
+    if job.status not in RUN_JOB_STATUSES:
+        raise StorageError("status invalid")
+    if not isinstance(job.request, str) or not job.request:
+        raise StorageError("request required")
+    conn.execute(
+        "INSERT OR REPLACE INTO run_jobs (run_id, request, request_digest, status, error, result, "
+        "enqueued_at, started_at, finished_at, attempts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            run_id,
+            job.request,
+            digest,
+            job.status,
+            job.error,
+            job.result,
+            _validate_time(job.enqueued_at, "enqueued_at"),
+            job.started_at,
+            job.finished_at,
+            _validate_int(job.attempts, "attempts", 0),
+        ),
+    )
+    _commit(conn)
+
+
+def load_run_job(conn: sqlite3.Connection, run_id: str) -> RunJob | None:
+    rid = _validate_text(run_id, "run_id", r"[A-Za-z0-9_-]{1,64}")
+    row = conn.execute(
+        "SELECT run_id, request, request_digest, status, error, result, enqueued_at, started_at, finished_at, "
+        "attempts FROM run_jobs WHERE run_id = ?",
+        (rid,),
+    ).fetchone()
+    if row is None:
+        return None
+    return RunJob(**{col: row[col] for col in row.keys()})
+
+
+def claim_run_job(conn: sqlite3.Connection, run_id: str, started_at: float) -> bool:
+    rid = _validate_text(run_id, "run_id", r"[A-Za-z0-9_-]{1,64}")
+    cursor = conn.execute(
+        "UPDATE run_jobs SET status = 'running', started_at = ?, attempts = attempts + 1 "
+        "WHERE run_id = ? AND status = 'queued'",
+        (_validate_time(started_at, "started_at"), rid),
+    )
+    _commit(conn)
+    return cursor.rowcount == 1
+
+
+def finish_run_job(
+    conn: sqlite3.Connection,
+    run_id: str,
+    status: str,
+    result: str | None,
+    error: str | None,
+    finished_at: float,
+) -> None:
+    rid = _validate_text(run_id, "run_id", r"[A-Za-z0-9_-]{1,64}")
+    if status not in {"complete", "failed"}:
+        raise StorageError("status invalid")
+    conn.execute(
+        "UPDATE run_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE run_id = ? AND status = 'running'",
+        (status, result, error, _validate_time(finished_at, "finished_at"), rid),
+    )
+    _commit(conn)
+
+
+def requeue_running_jobs(conn: sqlite3.Connection) -> int:
+    cursor = conn.execute("UPDATE run_jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+    _commit(conn)
+    return cursor.rowcount
+
+
+def list_queued_run_job_ids(conn: sqlite3.Connection) -> list[str]:
+    rows = conn.execute("SELECT run_id FROM run_jobs WHERE status = 'queued' ORDER BY enqueued_at, run_id")
+    return [row["run_id"] for row in rows]
 
 
 def insert_portal_account(conn: sqlite3.Connection, account: PortalAccount) -> None:
@@ -236,7 +522,7 @@ def insert_portal_account(conn: sqlite3.Connection, account: PortalAccount) -> N
         "VALUES (?, ?, ?, ?, ?)",
         (account_id, handle, public_key, created_at, status),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def load_portal_account(conn: sqlite3.Connection, account_id: str) -> PortalAccount | None:
@@ -271,7 +557,7 @@ def insert_portal_challenge(conn: sqlite3.Connection, challenge: PortalChallenge
         "VALUES (?, ?, ?, ?)",
         (account_id, nonce, expires_at, used),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def consume_portal_challenge(conn: sqlite3.Connection, account_id: str, nonce: str) -> PortalChallenge | None:
@@ -290,7 +576,7 @@ def consume_portal_challenge(conn: sqlite3.Connection, account_id: str, nonce: s
         "UPDATE portal_challenges SET used = 1 WHERE account_id = ? AND nonce = ?",
         (aid, nn),
     )
-    conn.commit()
+    _commit(conn)
     return challenge
 
 
@@ -302,7 +588,7 @@ def insert_portal_session(conn: sqlite3.Connection, session: PortalSession) -> N
         "INSERT INTO portal_sessions (token, account_id, expires_at) VALUES (?, ?, ?)",
         (token, account_id, expires_at),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def load_portal_session(conn: sqlite3.Connection, token: str) -> PortalSession | None:
@@ -319,7 +605,31 @@ def load_portal_session(conn: sqlite3.Connection, token: str) -> PortalSession |
 def delete_portal_session(conn: sqlite3.Connection, token: str) -> None:
     tok = _validate_text(token, "token", r"[A-Fa-f0-9]{32,128}")
     conn.execute("DELETE FROM portal_sessions WHERE token = ?", (tok,))
-    conn.commit()
+    _commit(conn)
+
+
+def purge_expired_portal_challenges(conn: sqlite3.Connection, now: int, limit: int) -> int:
+    cutoff = _validate_int(now, "now", 0)
+    lim = _validate_int(limit, "limit", 1)
+    cursor = conn.execute(
+        "DELETE FROM portal_challenges WHERE rowid IN "
+        "(SELECT rowid FROM portal_challenges WHERE expires_at < ? LIMIT ?)",
+        (cutoff, lim),
+    )
+    _commit(conn)
+    return cursor.rowcount
+
+
+def purge_expired_portal_sessions(conn: sqlite3.Connection, now: int, limit: int) -> int:
+    cutoff = _validate_int(now, "now", 0)
+    lim = _validate_int(limit, "limit", 1)
+    cursor = conn.execute(
+        "DELETE FROM portal_sessions WHERE rowid IN "
+        "(SELECT rowid FROM portal_sessions WHERE expires_at < ? LIMIT ?)",
+        (cutoff, lim),
+    )
+    _commit(conn)
+    return cursor.rowcount
 
 
 def insert_chat_room(conn: sqlite3.Connection, room: ChatRoom) -> None:
@@ -331,14 +641,36 @@ def insert_chat_room(conn: sqlite3.Connection, room: ChatRoom) -> None:
         "INSERT OR REPLACE INTO chat_rooms (room_id, name, created_at, is_public) VALUES (?, ?, ?, ?)",
         (room_id, name, created_at, is_public),
     )
-    conn.commit()
+    _commit(conn)
 
 
-def list_chat_rooms(conn: sqlite3.Connection) -> list[dict[str, object]]:
-    rows = conn.execute(
-        "SELECT room_id, name, created_at, is_public FROM chat_rooms ORDER BY created_at ASC, room_id ASC"
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+def iter_chat_rooms(
+    conn: sqlite3.Connection,
+    after: tuple[int, str] | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
+    params: list[object] = []
+    clause = ""
+    if after is not None:
+        clause = "WHERE (created_at, room_id) > (?, ?) "
+        params.append(_validate_int(after[0], "after", 0))
+        params.append(_validate_text(after[1], "after", r"[A-Za-z0-9_-]{1,64}"))
+    limit_clause = _limit_clause(limit, params)
+    return _stream(
+        conn.execute(
+            "SELECT room_id, name, created_at, is_public FROM chat_rooms "
+            f"{clause}ORDER BY created_at ASC, room_id ASC{limit_clause}",
+            params,
+        )
+    )
+
+
+def list_chat_rooms(
+    conn: sqlite3.Connection,
+    after: tuple[int, str] | None = None,
+    limit: int | None = None,
+) -> list[dict[str, object]]:
+    return list(iter_chat_rooms(conn, after=after, limit=limit))
 
 
 def insert_chat_message(conn: sqlite3.Connection, message: ChatMessage) -> None:
@@ -356,45 +688,86 @@ def insert_chat_message(conn: sqlite3.Connection, message: ChatMessage) -> None:
         "chain_head, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
         (message_id, room_id, sender, body, seq, prev_digest, msg_digest, chain_head, created_at),
     )
-    conn.commit()
+    conn.execute(
+        "INSERT INTO chat_room_heads (room_id, seq, chain_head) VALUES (?, ?, ?) "
+        "ON CONFLICT(room_id) DO UPDATE SET seq = excluded.seq, chain_head = excluded.chain_head "
+        "WHERE excluded.seq >= chat_room_heads.seq",
+        (room_id, seq, chain_head),
+    )
+    _commit(conn)
 
 
-def list_chat_messages(conn: sqlite3.Connection, room_id: str, after: int | None, limit: int) -> list[dict[str, object]]:
+def load_chat_room_head(conn: sqlite3.Connection, room_id: str) -> ChatRoomHead | None:
+    rid = _validate_text(room_id, "room_id", r"[A-Za-z0-9_-]{1,64}")
+    row = conn.execute(
+        "SELECT room_id, seq, chain_head FROM chat_room_heads WHERE room_id = ?",
+        (rid,),
+    ).fetchone()
+    if row is None:
+        return None
+    return ChatRoomHead(**{col: row[col] for col in row.keys()})
+
+
+def iter_chat_messages(
+    conn: sqlite3.Connection,
+    room_id: str,
+    after: int | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
     rid = _validate_text(room_id, "room_id", r"[A-Za-z0-9_-]{1,64}")
-    lim = _validate_int(limit, "limit", 1)
     params: list[object] = [rid]
     clause = ""
     if after is not None:
         clause = "AND seq > ?"
         params.append(_validate_int(after, "after", 0))
-    params.append(lim)
-    rows = conn.execute(
-        "SELECT message_id, room_id, sender_account_id, body, seq, prev_digest, msg_digest, chain_head, created_at "
-        "FROM chat_messages WHERE room_id = ? "
-        f"{clause} ORDER BY seq ASC, message_id ASC LIMIT ?",
-        tuple(params),
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    limit_clause = _limit_clause(limit, params)
+    return _stream(
+        conn.execute(
+            "SELECT message_id, room_id, sender_account_id, body, seq, prev_digest, msg_digest, chain_head, created_at "
+            "FROM chat_messages WHERE room_id = ? "
+            f"{clause} ORDER BY seq ASC, message_id ASC{limit_clause}",
+            params,
+        )
+    )
+
+
+def list_chat_messages(conn: sqlite3.Connection, room_id: str, after: int | None, limit: int) -> list[dict[str, object]]:
+    return list(iter_chat_messages(conn, room_id, after=after, limit=_validate_int(limit, "limit", 1)))
+
+
+def _receipt_record(record: dict[str, object]) -> dict[str, object]:
+    raw_hashes = record.get("receipt_hashes", "[]")
+    try:
+        record["receipt_hashes"] = json.loads(raw_hashes)
+    except json.JSONDecodeError:
+        record["receipt_hashes"] = []
+    record["replay_ok"] = bool(record.get("replay_ok"))
+    return record
+
+
+def iter_receipts(
+    conn: sqlite3.Connection,
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
+    params: list[object] = []
+    clause = ""
+    if after is not None:
+        clause = "WHERE receipt_id > ? "
+        params.append(_validate_text(after, "after"))
+    limit_clause = _limit_clause(limit, params)
+    rows = _stream(
+        conn.execute(
+            "SELECT receipt_id, module, action, state_hash, receipt_hashes, replay_ok, run_id "
+            f"FROM receipts {clause}ORDER BY receipt_id ASC{limit_clause}",
+            params,
+        )
+    )
+    return (_receipt_record(record) for record in rows)
 
 
 def list_receipts(conn: sqlite3.Connection, limit: int = 50) -> list[dict[str, object]]:
-    lim = _validate_int(limit, "limit", 1, 500)
-    rows = conn.execute(
-        "SELECT receipt_id, module, action, state_hash, receipt_hashes, replay_ok, run_id "
-        "FROM receipts ORDER BY receipt_id ASC LIMIT ?",
-        (lim,),
-    ).fetchall()
-    results = []
-    for row in rows:
-        record = {col: row[col] for col in row.keys()}
-        raw_hashes = record.get("receipt_hashes", "[]")
-        try:
-            record["receipt_hashes"] = json.loads(raw_hashes)
-        except json.JSONDecodeError:
-            record["receipt_hashes"] = []
-        record["replay_ok"] = bool(record.get("replay_ok"))
-        results.append(record)
-    return results
+    return list(iter_receipts(conn, limit=_validate_int(limit, "limit", 1, 500)))
 
 
 def insert_order(conn: sqlite3.Connection, order: Order) -> None:
@@ -410,29 +783,31 @@ def insert_order(conn: sqlite3.Connection, order: Order) -> None:
         "VALUES (?, ?, ?, ?, ?, ?, ?)",
         (order_id, side, amount, price, asset_in, asset_out, run_id),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def update_order_amount(conn: sqlite3.Connection, order_id: str, new_amount: int) -> None:
     oid = _validate_text(order_id, "order_id")
     amount = _validate_int(new_amount, "amount", 1)
     conn.execute("UPDATE orders SET amount = ? WHERE order_id = ?", (amount, oid))
-    conn.commit()
+    _commit(conn)
 
 
 def delete_order(conn: sqlite3.Connection, order_id: str) -> None:
     oid = _validate_text(order_id, "order_id")
     conn.execute("DELETE FROM orders WHERE order_id = ?", (oid,))
-    conn.commit()
+    _commit(conn)
 
 
-def list_orders(
+def iter_orders(
     conn: sqlite3.Connection,
     side: str | None = None,
     asset_in: str | None = None,
     asset_out: str | None = None,
     order_by: str = "price ASC, order_id ASC",
-) -> list[dict[str, object]]:
+    after: tuple[int, str] | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
     clauses = []
     params: list[object] = []
     if side:
@@ -444,14 +819,30 @@ def list_orders(
     if asset_out:
         clauses.append("asset_out = ?")
         params.append(_validate_text(asset_out, "asset_out"))
-    where = "WHERE " + " AND ".join(clauses) if clauses else ""
     if order_by not in {"price ASC, order_id ASC", "price DESC, order_id ASC"}:
         raise StorageError("order_by not allowed")
-    rows = conn.execute(
-        f"SELECT * FROM orders {where} ORDER BY {order_by}",
-        params,
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    if after is not None:
+        price = _validate_int(after[0], "after", 1)
+        order_id = _validate_text(after[1], "after")
+        if order_by == "price ASC, order_id ASC":
+            clauses.append("(price, order_id) > (?, ?)")
+            params.extend([price, order_id])
+        else:
+            clauses.append("(price < ? OR (price = ? AND order_id > ?))")
+            params.extend([price, price, order_id])
+    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    limit_clause = _limit_clause(limit, params)
+    return _stream(conn.execute(f"SELECT * FROM orders {where} ORDER BY {order_by}{limit_clause}", params))
+
+
+def list_orders(
+    conn: sqlite3.Connection,
+    side: str | None = None,
+    asset_in: str | None = None,
+    asset_out: str | None = None,
+    order_by: str = "price ASC, order_id ASC",
+) -> list[dict[str, object]]:
+    return list(iter_orders(conn, side=side, asset_in=asset_in, asset_out=asset_out, order_by=order_by))
 
 
 def insert_trade(conn: sqlite3.Connection, trade: Trade) -> None:
@@ -465,12 +856,25 @@ def insert_trade(conn: sqlite3.Connection, trade: Trade) -> None:
         "VALUES (?, ?, ?, ?, ?)",
         (trade_id, order_id, amount, price, run_id),
     )
-    conn.commit()
+    _commit(conn)
+
+
+def iter_trades(
+    conn: sqlite3.Connection,
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
+    params: list[object] = []
+    clause = ""
+    if after is not None:
+        clause = "WHERE trade_id > ? "
+        params.append(_validate_text(after, "after"))
+    limit_clause = _limit_clause(limit, params)
+    return _stream(conn.execute(f"SELECT * FROM trades {clause}ORDER BY trade_id ASC{limit_clause}", params))
 
 
 def list_trades(conn: sqlite3.Connection) -> list[dict[str, object]]:
-    rows = conn.execute("SELECT * FROM trades ORDER BY trade_id ASC").fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    return list(iter_trades(conn))
 
 
 def insert_message_event(conn: sqlite3.Connection, message: MessageEvent) -> None:
@@ -485,23 +889,32 @@ def insert_message_event(conn: sqlite3.Connection, message: MessageEvent) -> Non
         "INSERT OR REPLACE INTO messages (message_id, channel, body, run_id) VALUES (?, ?, ?, ?)",
         (message_id, channel, message.body, run_id),
     )
-    conn.commit()
+    _commit(conn)
 
 
-def list_messages(conn: sqlite3.Connection, channel: str | None = None, limit: int = 50) -> list[dict[str, object]]:
-    if limit < 1 or limit > 200:
-        raise StorageError("limit out of bounds")
+def iter_messages(
+    conn: sqlite3.Connection,
+    channel: str | None = None,
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
     clauses = []
     params: list[object] = []
     if channel:
         clauses.append("channel = ?")
         params.append(_validate_text(channel, "channel"))
+    if after is not None:
+        clauses.append("message_id > ?")
+        params.append(_validate_text(after, "after"))
     where = "WHERE " + " AND ".join(clauses) if clauses else ""
-    rows = conn.execute(
-        f"SELECT * FROM messages {where} ORDER BY message_id ASC LIMIT ?",
-        (*params, limit),
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    limit_clause = _limit_clause(limit, params)
+    return _stream(conn.execute(f"SELECT * FROM messages {where} ORDER BY message_id ASC{limit_clause}", params))
+
+
+def list_messages(conn: sqlite3.Connection, channel: str | None = None, limit: int = 50) -> list[dict[str, object]]:
+    if limit < 1 or limit > 200:
+        raise StorageError("limit out of bounds")
+    return list(iter_messages(conn, channel=channel, limit=limit))
 
 
 def insert_listing(conn: sqlite3.Connection, listing: Listing) -> None:
@@ -517,17 +930,27 @@ def insert_listing(conn: sqlite3.Connection, listing: Listing) -> None:
         "INSERT OR REPLACE INTO listings (listing_id, sku, title, price, run_id) VALUES (?, ?, ?, ?, ?)",
         (listing_id, sku, listing.title, price, run_id),
     )
-    conn.commit()
+    _commit(conn)
+
+
+def iter_listings(
+    conn: sqlite3.Connection,
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
+    params: list[object] = []
+    clause = ""
+    if after is not None:
+        clause = "WHERE listing_id > ? "
+        params.append(_validate_text(after, "after"))
+    limit_clause = _limit_clause(limit, params)
+    return _stream(conn.execute(f"SELECT * FROM listings {clause}ORDER BY listing_id ASC{limit_clause}", params))
 
 
 def list_listings(conn: sqlite3.Connection, limit: int = 100) -> list[dict[str, object]]:
     if limit < 1 or limit > 500:
         raise StorageError("limit out of bounds")
-    rows = conn.execute(
-        "SELECT * FROM listings ORDER BY listing_id ASC LIMIT ?",
-        (limit,),
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    return list(iter_listings(conn, limit=limit))
 
 
 def insert_purchase(conn: sqlite3.Connection, purchase: Purchase) -> None:
@@ -539,23 +962,32 @@ def insert_purchase(conn: sqlite3.Connection, purchase: Purchase) -> None:
         "INSERT OR REPLACE INTO purchases (purchase_id, listing_id, qty, run_id) VALUES (?, ?, ?, ?)",
         (purchase_id, listing_id, qty, run_id),
     )
-    conn.commit()
+    _commit(conn)
 
 
-def list_purchases(conn: sqlite3.Connection, listing_id: str | None = None, limit: int = 100) -> list[dict[str, object]]:
-    if limit < 1 or limit > 500:
-        raise StorageError("limit out of bounds")
+def iter_purchases(
+    conn: sqlite3.Connection,
+    listing_id: str | None = None,
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
     clauses = []
     params: list[object] = []
     if listing_id:
         clauses.append("listing_id = ?")
         params.append(_validate_text(listing_id, "listing_id"))
+    if after is not None:
+        clauses.append("purchase_id > ?")
+        params.append(_validate_text(after, "after"))
     where = "WHERE " + " AND ".join(clauses) if clauses else ""
-    rows = conn.execute(
-        f"SELECT * FROM purchases {where} ORDER BY purchase_id ASC LIMIT ?",
-        (*params, limit),
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    limit_clause = _limit_clause(limit, params)
+    return _stream(conn.execute(f"SELECT * FROM purchases {where} ORDER BY purchase_id ASC{limit_clause}", params))
+
+
+def list_purchases(conn: sqlite3.Connection, listing_id: str | None = None, limit: int = 100) -> list[dict[str, object]]:
+    if limit < 1 or limit > 500:
+        raise StorageError("limit out of bounds")
+    return list(iter_purchases(conn, listing_id=listing_id, limit=limit))
 
 
 def insert_entertainment_item(conn: sqlite3.Connection, item: EntertainmentItem) -> None:
@@ -573,17 +1005,29 @@ def insert_entertainment_item(conn: sqlite3.Connection, item: EntertainmentItem)
         "INSERT OR IGNORE INTO entertainment_items (item_id, title, summary, category) VALUES (?, ?, ?, ?)",
         (item_id, item.title, item.summary, category),
     )
-    conn.commit()
+    _commit(conn)
+
+
+def iter_entertainment_items(
+    conn: sqlite3.Connection,
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
+    params: list[object] = []
+    clause = ""
+    if after is not None:
+        clause = "WHERE item_id > ? "
+        params.append(_validate_text(after, "after"))
+    limit_clause = _limit_clause(limit, params)
+    return _stream(
+        conn.execute(f"SELECT * FROM entertainment_items {clause}ORDER BY item_id ASC{limit_clause}", params)
+    )
 
 
 def list_entertainment_items(conn: sqlite3.Connection, limit: int = 100) -> list[dict[str, object]]:
     if limit < 1 or limit > 200:
         raise StorageError("limit out of bounds")
-    rows = conn.execute(
-        "SELECT * FROM entertainment_items ORDER BY item_id ASC LIMIT ?",
-        (limit,),
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    return list(iter_entertainment_items(conn, limit=limit))
 
 
 def insert_entertainment_event(conn: sqlite3.Connection, event: EntertainmentEvent) -> None:
@@ -596,27 +1040,38 @@ def insert_entertainment_event(conn: sqlite3.Connection, event: EntertainmentEve
         "INSERT OR REPLACE INTO entertainment_events (event_id, item_id, mode, step, run_id) VALUES (?, ?, ?, ?, ?)",
         (event_id, item_id, mode, step, run_id),
     )
-    conn.commit()
+    _commit(conn)
 
 
-def list_entertainment_events(
+def iter_entertainment_events(
     conn: sqlite3.Connection,
     item_id: str | None = None,
-    limit: int = 100,
-) -> list[dict[str, object]]:
-    if limit < 1 or limit > 200:
-        raise StorageError("limit out of bounds")
+    after: str | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, object]]:
     clauses = []
     params: list[object] = []
     if item_id:
         clauses.append("item_id = ?")
         params.append(_validate_text(item_id, "item_id"))
+    if after is not None:
+        clauses.append("event_id > ?")
+        params.append(_validate_text(after, "after"))
     where = "WHERE " + " AND ".join(clauses) if clauses else ""
-    rows = conn.execute(
-        f"SELECT * FROM entertainment_events {where} ORDER BY event_id ASC LIMIT ?",
-        (*params, limit),
-    ).fetchall()
-    return [{col: row[col] for col in row.keys()} for row in rows]
+    limit_clause = _limit_clause(limit, params)
+    return _stream(
+        conn.execute(f"SELECT * FROM entertainment_events {where} ORDER BY event_id ASC{limit_clause}", params)
+    )
+
+
+def list_entertainment_events(
+    conn: sqlite3.Connection,
+    item_id: str | None = None,
+    limit: int = 100,
+) -> list[dict[str, object]]:
+    if limit < 1 or limit > 200:
+        raise StorageError("limit out of bounds")
+    return list(iter_entertainment_events(conn, item_id=item_id, limit=limit))
 
 
 def insert_receipt(conn: sqlite3.Connection, receipt: Receipt) -> None:
@@ -634,7 +1089,7 @@ def insert_receipt(conn: sqlite3.Connection, receipt: Receipt) -> None:
         "VALUES (?, ?, ?, ?, ?, ?, ?)",
         (receipt_id, module, action, state_hash, receipt_hashes, replay_ok, run_id),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def insert_fee_ledger(conn: sqlite3.Connection, record: FeeLedger) -> None:
@@ -651,7 +1106,7 @@ def insert_fee_ledger(conn: sqlite3.Connection, record: FeeLedger) -> None:
         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
         (fee_id, module, action, protocol_fee_total, platform_fee_amount, total_paid, fee_address, run_id),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def _ensure_wallet_account(conn: sqlite3.Connection, address: str) -> None:
@@ -756,7 +1211,7 @@ def apply_wallet_transfer(
             run_id=run_id,
         ),
     )
-    conn.commit()
+    _commit(conn)
     return {
         "from_balance": new_from,
         "to_balance": new_to,
@@ -771,7 +1226,7 @@ def apply_wallet_faucet(conn: sqlite3.Connection, address: str, amount: int) ->
     current = get_wallet_balance(conn, addr)
     new_balance = current + amt
     set_wallet_balance(conn, addr, new_balance)
-    conn.commit()
+    _commit(conn)
     return new_balance
 
 
@@ -809,7 +1264,7 @@ def apply_wallet_faucet_with_fee(
             run_id=run_id,
         ),
     )
-    conn.commit()
+    _commit(conn)
     return {"balance": new_balance, "treasury_balance": new_treasury}
 
 
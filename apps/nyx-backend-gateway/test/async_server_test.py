@@ -0,0 +1,114 @@
+import _bootstrap
+import json
+import os
+import socket
+import tempfile
+import threading
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.async_server import AsyncGatewayServer, AsyncServerError
+
+
+def _read_response(sock_file) -> tuple[int, dict[str, str], bytes]:
+    status_line = sock_file.readline().decode("latin-1")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = sock_file.readline().decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = sock_file.read(int(headers.get("content-length", "0")))
+    return status, headers, body
+
+
+class AsyncGatewayServerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self._orig = (gateway._db_path, gateway._run_root, server._db_path, server._run_root)
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        self.httpd = AsyncGatewayServer(("127.0.0.1", 0), server.GatewayHandler, workers=4, max_connections=8)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.thread.join(timeout=5)
+        self.httpd.server_close()
+        gateway._db_path, gateway._run_root, server._db_path, server._run_root = self._orig
+        self.tmp.cleanup()
+
+    def test_keep_alive_reuses_connection(self) -> None:
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("GET", "/healthz")
+        response = conn.getresponse()
+        self.assertEqual(json.loads(response.read()), {"ok": True})
+        first_sock = conn.sock
+        self.assertIsNotNone(first_sock)
+        conn.request("POST", "/wallet/faucet", body=b"{}", headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        self.assertEqual(response.status, 400)
+        self.assertIs(conn.sock, first_sock)
+        conn.close()
+        self.assertEqual(self.httpd.metrics()["requests"], 2)
+
+    def test_pipelined_requests_answered_in_order(self) -> None:
+        with socket.create_connection(("127.0.0.1", self.port), timeout=10) as sock:
+            sock.sendall(
+                b"GET /healthz HTTP/1.1\r\nHost: x\r\n\r\n"
+                b"GET /missing HTTP/1.1\r\nHost: x\r\n\r\n"
+                b"GET /version HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n"
+            )
+            sock_file = sock.makefile("rb")
+            statuses = [_read_response(sock_file)[0] for _ in range(3)]
+            self.assertEqual(sock_file.read(), b"")
+        self.assertEqual(statuses, [200, 404, 200])
+
+    def test_oversized_and_chunked_requests_rejected(self) -> None:
+        with socket.create_connection(("127.0.0.1", self.port), timeout=10) as sock:
+            sock.sendall(b"POST /run HTTP/1.1\r\nHost: x\r\nContent-Length: 99999999\r\n\r\n")
+            status, headers, _ = _read_response(sock.makefile("rb"))
+        self.assertEqual(status, 413)
+        self.assertEqual(headers["connection"], "close")
+        with socket.create_connection(("127.0.0.1", self.port), timeout=10) as sock:
+            sock.sendall(b"POST /run HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n")
+            status, _, _ = _read_response(sock.makefile("rb"))
+        self.assertEqual(status, 400)
+
+    def test_connection_limit_rejects_excess(self) -> None:
+        held = [socket.create_connection(("127.0.0.1", self.port), timeout=10) for _ in range(8)]
+        try:
+            conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+            for sock in held:
+                sock.sendall(b"GET /healthz HTTP/1.1\r\nHost: x\r\n\r\n")
+                self.assertEqual(_read_response(sock.makefile("rb"))[0], 200)
+            conn.request("GET", "/healthz")
+            response = conn.getresponse()
+            response.read()
+            self.assertEqual(response.status, 503)
+            conn.close()
+        finally:
+            for sock in held:
+                sock.close()
+
+    def test_invalid_configuration_rejected(self) -> None:
+        with self.assertRaises(AsyncServerError):
+            AsyncGatewayServer(("127.0.0.1", 0), server.GatewayHandler, workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import _bootstrap
+import os
+import signal
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+import nyx_backend_gateway.env as env
+import nyx_backend_gateway.gateway as gateway
+from nyx_backend_gateway.env import ConfigStore, GatewayConfig, parse_config
+from nyx_backend_gateway.storage import StorageError
+
+
+def _write(path: Path, text: str, mtime_ns: int) -> None:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class ConfigTests(unittest.TestCase):
+    def test_parse_defaults_and_validation(self) -> None:
+        self.assertEqual(
+            parse_config({}),
+            GatewayConfig(
+                treasury_address="testnet-treasury-unconfigured",
+                platform_fee_bps=None,
+                protocol_fee_min=None,
+                portal_session_secret="testnet-session-secret",
+                portal_challenge_ttl_seconds=300,
+            ),
+        )
+        for key, value in (
+            ("NYX_PLATFORM_FEE_BPS", "x"),
+            ("NYX_PLATFORM_FEE_BPS", "10001"),
+            ("NYX_TESTNET_TREASURY_ADDRESS", "short"),
+            ("NYX_PORTAL_SESSION_SECRET", "short"),
+            ("NYX_PORTAL_CHALLENGE_TTL", "30"),
+            ("NYX_PROTOCOL_FEE_MIN", "-1"),
+        ):
+            with self.assertRaises(StorageError, msg=key):
+                parse_config({key: value})
+
+    def test_env_file_mtime_reload_respects_process_env(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / ".env"
+            _write(path, "NYX_PLATFORM_FEE_BPS=10\nNYX_PORTAL_CHALLENGE_TTL=120\n", 1_000_000_000)
+            environ = {"NYX_PORTAL_CHALLENGE_TTL": "600"}
+            store = ConfigStore(env_file=path, check_interval_seconds=0, environ=environ)
+            first = store.reload()
+            self.assertEqual((first.platform_fee_bps, first.portal_challenge_ttl_seconds), (10, 600))
+            self.assertIs(store.get(), first)
+            _write(path, "NYX_TESTNET_FEE_ADDRESS=treasury-reloaded\n", 2_000_000_000)
+            second = store.get()
+            self.assertEqual((second.platform_fee_bps, second.treasury_address), (None, "treasury-reloaded"))
+            self.assertEqual(environ, {"NYX_PORTAL_CHALLENGE_TTL": "600"})
+
+    def test_invalid_reload_keeps_previous_config(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / ".env"
+            _write(path, "NYX_PLATFORM_FEE_BPS=25\n", 1_000_000_000)
+            store = ConfigStore(env_file=path, check_interval_seconds=0, environ={})
+            good = store.reload()
+            _write(path, "NYX_PLATFORM_FEE_BPS=oops\n", 2_000_000_000)
+            self.assertIs(store.get(), good)
+            self.assertEqual(store.last_error, "NYX_PLATFORM_FEE_BPS must be int")
+            with self.assertRaises(StorageError):
+                store.reload()
+            with self.assertRaises(StorageError):
+                ConfigStore(env_file=Path(tmp) / "missing.env").reload()
+
+    def test_env_file_config_reaches_evidence_without_os_environ(self) -> None:
+        previous_store = env._CONFIG
+        environ = {key: value for key, value in os.environ.items() if key not in env._CONFIG_KEYS}
+        try:
+            with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, environ, clear=True):
+                path = Path(tmp) / ".env"
+                _write(path, "NYX_TESTNET_TREASURY_ADDRESS=treasury-from-file\nNYX_PLATFORM_FEE_BPS=100\n", 1_000_000_000)
+                env.configure_config(env_file=path)
+                evidence = gateway._run_evidence(
+                    seed=11,
+                    run_id="config-evidence",
+                    module="exchange",
+                    action="route_swap",
+                    payload={"asset_in": "asset-a", "asset_out": "asset-b", "amount": 500, "min_out": 1},
+                    base_dir=Path(tmp) / "runs",
+                )
+                self.assertNotIn("NYX_TESTNET_TREASURY_ADDRESS", os.environ)
+                self.assertNotIn("NYX_PLATFORM_FEE_BPS", os.environ)
+        finally:
+            env._CONFIG = previous_store
+        self.assertEqual(evidence.outputs["treasury_address"], "treasury-from-file")
+        self.assertEqual(evidence.outputs["fee_breakdown"]["platform_fee_amount"], 5)
+
+    def test_environment_changes_apply_without_reload(self) -> None:
+        environ = {"NYX_PLATFORM_FEE_BPS": "10"}
+        store = ConfigStore(environ=environ)
+        first = store.get()
+        self.assertIs(store.get(), first)
+        environ["NYX_PLATFORM_FEE_BPS"] = "20"
+        self.assertEqual(store.get().platform_fee_bps, 20)
+        environ["NYX_PLATFORM_FEE_BPS"] = "oops"
+        self.assertEqual(store.get().platform_fee_bps, 20)
+        self.assertEqual(store.last_error, "NYX_PLATFORM_FEE_BPS must be int")
+        del environ["NYX_PLATFORM_FEE_BPS"]
+        self.assertIsNone(store.get().platform_fee_bps)
+        self.assertIsNone(store.last_error)
+
+    @unittest.skipUnless(hasattr(signal, "SIGHUP"), "SIGHUP not available")
+    def test_sighup_triggers_reload(self) -> None:
+        previous_store = env._CONFIG
+        previous_handler = signal.getsignal(signal.SIGHUP)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / ".env"
+                _write(path, "NYX_PORTAL_CHALLENGE_TTL=120\n", 1_000_000_000)
+                env.configure_config(env_file=path, check_interval_seconds=3600)
+                self.assertTrue(env.install_reload_signal())
+                self.assertEqual(env.get_portal_challenge_ttl_seconds(), 120)
+                _write(path, "NYX_PORTAL_CHALLENGE_TTL=240\n", 1_000_000_000)
+                self.assertEqual(env.get_portal_challenge_ttl_seconds(), 120)
+                os.kill(os.getpid(), signal.SIGHUP)
+                self.assertEqual(env.get_portal_challenge_ttl_seconds(), 240)
+                self.assertNotIn("NYX_PORTAL_CHALLENGE_TTL", os.environ)
+        finally:
+            signal.signal(signal.SIGHUP, previous_handler)
+            env._CONFIG = previous_store
+
+
+if __name__ == "__main__":
+    unittest.main()
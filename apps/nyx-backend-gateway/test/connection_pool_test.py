@@ -0,0 +1,106 @@
+import _bootstrap
+import tempfile
+import threading
+from pathlib import Path
+import unittest
+
+from nyx_backend_gateway.gateway import fetch_wallet_balance
+from nyx_backend_gateway.migrations import SCHEMA_VERSION, read_schema_version
+from nyx_backend_gateway.pool import ConnectionPool, get_pool
+from nyx_backend_gateway.storage import apply_wallet_faucet, create_connection, open_connection
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_schema_migrated_once_and_connection_reused(self) -> None:
+        pool = ConnectionPool()
+        with pool.connection(self.db_path) as first:
+            with pool.connection(self.db_path) as nested:
+                self.assertIs(first, nested)
+        with pool.connection(self.db_path) as again:
+            self.assertIs(first, again)
+            self.assertEqual(read_schema_version(again), SCHEMA_VERSION)
+        stats = pool.stats()
+        self.assertEqual(stats.opened, 1)
+        self.assertEqual(stats.migrations, 1)
+        self.assertEqual(stats.leased, 0)
+        self.assertEqual(stats.idle, 1)
+        pool.close_all()
+
+    def test_threads_hold_distinct_connections(self) -> None:
+        pool = ConnectionPool()
+        pool.ensure_schema(self.db_path)
+        barrier = threading.Barrier(4)
+        seen: list[int] = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            with pool.connection(self.db_path) as conn:
+                barrier.wait()
+                conn.execute("SELECT COUNT(*) FROM evidence_runs").fetchone()
+                with lock:
+                    seen.append(id(conn))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(seen)), 4)
+        self.assertEqual(pool.stats().opened, 4)
+        self.assertEqual(pool.stats().migrations, 1)
+        pool.close_all()
+
+    def test_max_lifetime_recycles_and_broken_connection_replaced(self) -> None:
+        pool = ConnectionPool(max_lifetime_seconds=0.000001)
+        with pool.connection(self.db_path) as first:
+            pass
+        with pool.connection(self.db_path) as second:
+            self.assertIsNot(first, second)
+        self.assertGreaterEqual(pool.stats().recycled, 1)
+        pool.close_all()
+
+        pool = ConnectionPool()
+        with pool.connection(self.db_path) as conn:
+            pass
+        conn.close()
+        with pool.connection(self.db_path) as replacement:
+            self.assertEqual(replacement.execute("SELECT 1").fetchone()[0], 1)
+        self.assertEqual(pool.stats().health_failures, 1)
+        pool.close_all()
+
+    def test_release_rolls_back_open_transaction(self) -> None:
+        pool = ConnectionPool()
+        with pool.connection(self.db_path) as conn:
+            conn.execute("INSERT INTO meta (key, value) VALUES ('scratch', '1')")
+            self.assertTrue(conn.in_transaction)
+        with pool.connection(self.db_path) as conn:
+            self.assertFalse(conn.in_transaction)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'scratch'").fetchone()
+            self.assertIsNone(row)
+        pool.close_all()
+
+    def test_fetch_wallet_balance_returns_connection(self) -> None:
+        conn = create_connection(self.db_path)
+        apply_wallet_faucet(conn, "wallet-a", 25)
+        conn.close()
+        before = get_pool().stats()
+        self.assertEqual(fetch_wallet_balance(address="wallet-a", db_path=self.db_path), 25)
+        self.assertEqual(fetch_wallet_balance(address="wallet-b", db_path=self.db_path), 0)
+        after = get_pool().stats()
+        self.assertEqual(after.leased, 0)
+        self.assertLessEqual(after.opened - before.opened, 1)
+        writer = open_connection(self.db_path)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.rollback()
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
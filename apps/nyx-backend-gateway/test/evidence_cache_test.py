@@ -0,0 +1,68 @@
+import _bootstrap
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+from nyx_backend_gateway.evidence_cache import EvidenceCache, EvidenceCacheError
+
+
+_SWAP = {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "min_out": 3}
+
+
+class EvidenceCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        gateway._ensure_backend_path()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.run_root = Path(self.tmp.name) / "runs"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_repeat_reads_hit_until_run_is_rewritten(self) -> None:
+        from nyx_backend.evidence import EvidenceError, load_evidence, run_evidence
+
+        cache = EvidenceCache(max_entries=1)
+        run_evidence(5, "cache-a", "exchange", "route_swap", _SWAP, base_dir=self.run_root)
+        first = cache.get("cache-a", self.run_root)
+        self.assertIs(cache.get("cache-a", self.run_root), first)
+        self.assertEqual(json.loads(first.status_json), {"replay_ok": True, "status": "complete"})
+        self.assertEqual(json.loads(first.evidence_json)["stdout"], load_evidence("cache-a", self.run_root).stdout)
+        self.assertEqual(json.loads(first.artifacts["inputs.json"])["seed"], 5)
+        run_evidence(6, "cache-a", "exchange", "route_swap", _SWAP, base_dir=self.run_root)
+        second = cache.get("cache-a", self.run_root)
+        self.assertIsNot(second, first)
+        self.assertEqual(json.loads(second.artifacts["inputs.json"])["seed"], 6)
+        run_evidence(5, "cache-b", "exchange", "route_swap", _SWAP, base_dir=self.run_root)
+        cache.get("cache-b", self.run_root)
+        self.assertEqual((cache.stats().hits, cache.stats().misses, cache.stats().evictions), (1, 3, 1))
+        with self.assertRaises(EvidenceError):
+            cache.get("cache-missing", self.run_root)
+        with self.assertRaises(EvidenceCacheError):
+            EvidenceCache(max_entries=-1)
+
+    def test_legacy_run_is_validated_by_evidence_json_stat(self) -> None:
+        from nyx_backend.evidence import materialize_run, run_evidence
+        from nyx_backend.evidence_store import STORE_DIR_NAME
+
+        run_evidence(5, "cache-legacy", "exchange", "route_swap", _SWAP, base_dir=self.run_root)
+        run_dir = materialize_run("cache-legacy", base_dir=self.run_root)
+        legacy_root = Path(self.tmp.name) / "legacy"
+        legacy_root.mkdir()
+        shutil.copytree(run_dir, legacy_root / run_dir.name)
+        self.assertFalse((legacy_root / STORE_DIR_NAME / "runs.pack").exists())
+        cache = EvidenceCache()
+        first = cache.get("cache-legacy", legacy_root)
+        self.assertIs(cache.get("cache-legacy", legacy_root), first)
+        evidence_json = legacy_root / run_dir.name / "evidence.json"
+        stat = evidence_json.stat()
+        os.utime(evidence_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNot(cache.get("cache-legacy", legacy_root), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,17 +4,11 @@ import tempfile
 from pathlib import Path
 import unittest
 
-from nyx_backend.evidence import run_evidence
+from nyx_backend.evidence import materialize_run, run_evidence
 
 
 def _find_run_dir(run_root: Path, run_id: str) -> Path:
-    for entry in run_root.iterdir():
-        if not entry.is_dir():
-            continue
-        run_id_path = entry / "run_id.txt"
-        if run_id_path.exists() and run_id_path.read_text(encoding="utf-8").strip() == run_id:
-            return entry
-    raise AssertionError("run directory not found")
+    return materialize_run(run_id, base_dir=run_root)
 
 
 class EvidenceDeterminismTests(unittest.TestCase):
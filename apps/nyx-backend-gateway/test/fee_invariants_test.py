@@ -2,7 +2,8 @@ import _bootstrap
 import os
 import unittest
 
-from nyx_backend_gateway.fees import route_fee
+from nyx_backend_gateway.fees import FeeQuoteCache, route_fee
+import nyx_backend_gateway.fees as fees
 
 
 class FeeInvariantTests(unittest.TestCase):
@@ -38,6 +39,35 @@ class FeeInvariantTests(unittest.TestCase):
             ledger.protocol_fee_total + ledger.platform_fee_amount,
         )
 
+    def test_quotes_cached_by_payload_and_bps(self) -> None:
+        cache = FeeQuoteCache(capacity=2)
+        payload = {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 500, "min_out": 1}
+        previous = os.environ.pop("NYX_PLATFORM_FEE_BPS", None)
+        try:
+            first = cache.get("exchange", "route_swap", payload)
+            self.assertIs(cache.get("exchange", "route_swap", dict(reversed(list(payload.items())))), first)
+            os.environ["NYX_PLATFORM_FEE_BPS"] = "100"
+            scaled = cache.get("exchange", "route_swap", payload)
+        finally:
+            os.environ.pop("NYX_PLATFORM_FEE_BPS", None)
+            if previous is not None:
+                os.environ["NYX_PLATFORM_FEE_BPS"] = previous
+        self.assertEqual((first.platform_fee_amount, scaled.platform_fee_amount), (1, 5))
+        self.assertEqual(scaled.protocol_fee_total, first.protocol_fee_total)
+        cache.get("exchange", "route_swap", {**payload, "amount": 7})
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 3, 2))
+
+    def test_route_fee_reuses_cached_quote(self) -> None:
+        payload = {"sku": "sku-9", "title": "Cached", "price": 12}
+        before = fees.get_fee_quote_cache().stats()
+        first = route_fee("marketplace", "listing_publish", payload, "run-fee-3")
+        second = route_fee("marketplace", "listing_publish", payload, "run-fee-4")
+        after = fees.get_fee_quote_cache().stats()
+        self.assertEqual(after.hits - before.hits, 1)
+        self.assertNotEqual(first.fee_id, second.fee_id)
+        self.assertEqual(first.total_paid, second.total_paid)
+
 
 if __name__ == "__main__":
     unittest.main()
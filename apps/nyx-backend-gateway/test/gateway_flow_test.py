@@ -1,5 +1,6 @@
 import _bootstrap
 import hashlib
+import json
 import os
 import tempfile
 from pathlib import Path
@@ -14,14 +15,10 @@ def _receipt_id(run_id: str) -> str:
     return f"receipt-{digest[:16]}"
 
 
-def _find_run_dir(run_root: Path, run_id: str) -> Path | None:
-    for entry in run_root.iterdir():
-        if not entry.is_dir():
-            continue
-        run_id_path = entry / "run_id.txt"
-        if run_id_path.exists() and run_id_path.read_text(encoding="utf-8").strip() == run_id:
-            return entry
-    return None
+def _find_run_dir(run_root: Path, run_id: str) -> Path:
+    from nyx_backend.evidence import materialize_run
+
+    return materialize_run(run_id, base_dir=run_root)
 
 
 class GatewayFlowTests(unittest.TestCase):
@@ -51,11 +48,16 @@ class GatewayFlowTests(unittest.TestCase):
             if module == "exchange":
                 fee = load_by_id(conn, "fee_ledger", "run_id", run_id)
                 self.assertIsNotNone(fee)
+                self.assertEqual(fee["total_paid"], result.fee.total_paid)
             conn.close()
             run_dir = _find_run_dir(run_root, run_id)
             self.assertIsNotNone(run_dir)
             if run_dir is not None:
                 self.assertTrue((run_dir / "evidence.json").exists())
+                if result.fee is not None:
+                    outputs = json.loads((run_dir / "artifacts" / "outputs.json").read_text(encoding="utf-8"))
+                    self.assertEqual(outputs["fee_total"], result.fee.total_paid)
+                    self.assertEqual(outputs["fee_breakdown"]["protocol_fee_total"], result.fee.protocol_fee_total)
 
     def test_exchange_flow(self) -> None:
         self._run_and_check(
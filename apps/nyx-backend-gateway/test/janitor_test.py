@@ -0,0 +1,137 @@
+import _bootstrap
+import json
+import os
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.janitor import Janitor, JanitorConfig, JanitorError
+from nyx_backend_gateway.storage import (
+    PortalChallenge,
+    PortalSession,
+    create_connection,
+    insert_portal_challenge,
+    insert_portal_session,
+)
+
+
+class JanitorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self.run_root.mkdir()
+        self.now = int(time.time())
+        conn = create_connection(self.db_path)
+        for index in range(12):
+            expires_at = self.now - 10 if index < 9 else self.now + 600
+            insert_portal_challenge(conn, PortalChallenge("acct-1", f"{index:032x}", expires_at, index % 2))
+            insert_portal_session(conn, PortalSession(f"{index:064x}", "acct-1", expires_at))
+        conn.close()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _janitor(self, **overrides) -> Janitor:
+        config = JanitorConfig(batch_size=2, max_batches=10, **overrides)
+        return Janitor(lambda: self.db_path, lambda: self.run_root, config)
+
+    def _count(self, table: str) -> int:
+        conn = create_connection(self.db_path)
+        try:
+            return int(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+        finally:
+            conn.close()
+
+    def _make_run(self, name: str, age_seconds: int) -> Path:
+        run_dir = self.run_root / name
+        (run_dir / "artifacts").mkdir(parents=True)
+        (run_dir / "run_id.txt").write_text(name + "\n", encoding="utf-8")
+        stamp = self.now - age_seconds
+        os.utime(run_dir, (stamp, stamp))
+        return run_dir
+
+    def test_purges_expired_rows_in_batches(self) -> None:
+        report = self._janitor().run_once(now=self.now)
+        self.assertEqual(report.challenges_purged, 9)
+        self.assertEqual(report.sessions_purged, 9)
+        self.assertEqual(self._count("portal_challenges"), 3)
+        self.assertEqual(self._count("portal_sessions"), 3)
+        self.assertEqual(self._janitor().run_once(now=self.now).sessions_purged, 0)
+
+    def test_batch_budget_bounds_one_sweep(self) -> None:
+        janitor = Janitor(lambda: self.db_path, lambda: self.run_root, JanitorConfig(batch_size=2, max_batches=3))
+        self.assertEqual(janitor.run_once(now=self.now).sessions_purged, 6)
+        self.assertEqual(janitor.run_once(now=self.now).sessions_purged, 3)
+
+    def test_prunes_runs_by_age_and_count(self) -> None:
+        fresh = [self._make_run(f"run-fresh-{index}", index) for index in range(3)]
+        old = self._make_run("run-old", 3600)
+        (self.run_root / "notes.txt").write_text("keep", encoding="utf-8")
+        report = self._janitor(run_retention_seconds=600, run_keep_latest=2).run_once(now=self.now)
+        self.assertEqual(report.runs_pruned, 2)
+        self.assertTrue(fresh[0].exists())
+        self.assertTrue(fresh[1].exists())
+        self.assertFalse(fresh[2].exists())
+        self.assertFalse(old.exists())
+        self.assertTrue((self.run_root / "notes.txt").exists())
+
+    def test_prunes_store_runs_and_their_materialized_dirs(self) -> None:
+        gateway._ensure_backend_path()
+        from nyx_backend.evidence import list_runs
+        from nyx_backend.evidence_store import open_store
+
+        store = open_store(self.run_root)
+        anchor = store.put_blob(b"{}")
+        keys = [f"{index:032x}" for index in range(3)]
+        for index, key in enumerate(keys):
+            store.append(key, f"store-run-{index}", anchor, {"stdout": ""}, self.now - index * 1000)
+        (self.run_root / keys[2] / "artifacts").mkdir(parents=True)
+        self.assertEqual(len(list_runs(self.run_root)), 3)
+        report = self._janitor(run_retention_seconds=1500, run_keep_latest=None).run_once(now=self.now)
+        self.assertEqual(report.runs_pruned, 1)
+        self.assertEqual(sorted(key for key, _, _ in store.entries()), keys[:2])
+        self.assertIsNone(store.load(keys[2]))
+        self.assertFalse((self.run_root / keys[2]).exists())
+        self.assertEqual([record.run_id for record in list_runs(self.run_root)], ["store-run-0", "store-run-1"])
+
+    def test_invalid_config_rejected(self) -> None:
+        with self.assertRaises(JanitorError):
+            Janitor(lambda: self.db_path, lambda: self.run_root, JanitorConfig(batch_size=0))
+
+    def test_metrics_endpoint_reports_totals(self) -> None:
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        httpd.rate_limiter = server.RequestLimiter(100, 60)
+        httpd.janitor = self._janitor()
+        httpd.janitor.run_once(now=self.now)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            conn = HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=10)
+            conn.request("GET", "/maintenance/metrics")
+            response = conn.getresponse()
+            payload = json.loads(response.read().decode("utf-8"))
+            conn.close()
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=2)
+            httpd.server_close()
+        self.assertEqual(response.status, 200)
+        self.assertTrue(payload["enabled"])
+        self.assertEqual(payload["totals"]["sweeps"], 1)
+        self.assertEqual(payload["totals"]["sessions_purged"], 9)
+        self.assertEqual(payload["last_sweep"]["challenges_purged"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
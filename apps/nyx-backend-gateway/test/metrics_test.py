@@ -0,0 +1,140 @@
+import _bootstrap
+import json
+import math
+import os
+import tempfile
+import threading
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.metrics import CONTENT_TYPE, MetricsError, Registry
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class RegistryTests(unittest.TestCase):
+    def test_render_exposition_format(self) -> None:
+        registry = Registry()
+        requests = registry.counter("app_requests_total", "Requests served", ("route",))
+        requests.labels("/a").inc()
+        requests.labels(route='/b"q').inc(2)
+        registry.gauge("app_depth", "Queue depth").set(3)
+        latency = registry.histogram("app_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            latency.observe(value)
+        text = registry.render()
+        self.assertIn("# TYPE app_requests_total counter\n", text)
+        self.assertIn('app_requests_total{route="/a"} 1\n', text)
+        self.assertIn('app_requests_total{route="/b\\"q"} 2\n', text)
+        self.assertIn("app_depth 3\n", text)
+        self.assertIn('app_seconds_bucket{le="0.1"} 2\n', text)
+        self.assertIn('app_seconds_bucket{le="1"} 3\n', text)
+        self.assertIn('app_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn("app_seconds_count 4\n", text)
+        self.assertLess(text.index("app_depth"), text.index("app_requests_total"))
+
+    def test_shape_and_label_validation(self) -> None:
+        registry = Registry()
+        counter = registry.counter("app_total", "Total", ("kind",))
+        self.assertIs(registry.counter("app_total", "Total", ("kind",)), counter)
+        with self.assertRaises(MetricsError):
+            registry.gauge("app_total", "Total", ("kind",))
+        with self.assertRaises(MetricsError):
+            registry.counter("app_total", "Total", ("other",))
+        with self.assertRaises(MetricsError):
+            counter.labels("a", "b")
+        with self.assertRaises(MetricsError):
+            counter.labels("a").inc(-1)
+        with self.assertRaises(MetricsError):
+            registry.histogram("app_seconds", "Latency", buckets=(1.0, 0.5))
+        with self.assertRaises(MetricsError):
+            registry.counter("app-total", "Total")
+
+    def test_gauge_function_and_concurrent_increments(self) -> None:
+        registry = Registry()
+        gauge = registry.gauge("app_live", "Live value")
+        gauge.set_function(lambda: 7)
+        self.assertEqual(gauge.labels().value, 7.0)
+        gauge.set_function(lambda: 1 / 0)
+        self.assertTrue(math.isnan(gauge.labels().value))
+        counter = registry.counter("app_hits_total", "Hits", ("worker",))
+
+        def work() -> None:
+            for _ in range(2000):
+                counter.labels("shared").inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.labels("shared").value, 16000)
+
+
+class ServerMetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self._orig = (gateway._db_path, gateway._run_root, server._db_path, server._run_root)
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.thread.join(timeout=2)
+        self.httpd.server_close()
+        gateway._db_path, gateway._run_root, server._db_path, server._run_root = self._orig
+        self.tmp.cleanup()
+
+    def _request(self, method: str, path: str, body: bytes | None = None):
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        data = response.read()
+        content_type = response.getheader("Content-Type")
+        conn.close()
+        return response.status, data, content_type
+
+    def test_metrics_endpoint_reflects_traffic(self) -> None:
+        before = self._request("GET", "/metrics")[1].decode("utf-8")
+        order = {
+            "seed": 7,
+            "run_id": "run-metrics-1",
+            "payload": {"side": "BUY", "asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "price": 10},
+        }
+        self.assertEqual(self._request("POST", "/exchange/place_order", json.dumps(order).encode("utf-8"))[0], 200)
+        self.assertEqual(self._request("GET", "/missing")[0], 404)
+        status, data, content_type = self._request("GET", "/metrics")
+        self.assertEqual((status, content_type), (200, CONTENT_TYPE))
+        after = data.decode("utf-8")
+        for prefix, delta in (
+            ('nyx_gateway_http_requests_total{method="POST",route="/exchange/place_order",status="200"}', 1),
+            ('nyx_gateway_http_requests_total{method="GET",route="unmatched",status="404"}', 1),
+            ('nyx_gateway_run_duration_seconds_count{module="exchange",outcome="ok"}', 1),
+            ('nyx_gateway_evidence_duration_seconds_count{module="exchange"}', 1),
+            ('nyx_gateway_orders_total{outcome="resting"}', 1),
+        ):
+            self.assertEqual(_sample(after, prefix) - _sample(before, prefix), delta, prefix)
+        self.assertGreater(_sample(after, 'nyx_gateway_sqlite_statement_seconds_count{kind="INSERT"}'), 0)
+        self.assertIn('nyx_gateway_pool_connections{state="idle"}', after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import _bootstrap
+import tempfile
+from pathlib import Path
+import unittest
+
+from nyx_backend_gateway.exchange import ExchangeError, cancel_order, order_book_deltas, order_book_depth, place_order
+from nyx_backend_gateway.storage import Order, create_connection, insert_order
+
+
+def _order(order_id: str, side: str, price: int, amount: int = 5) -> Order:
+    asset_in, asset_out = ("asset-a", "asset-b") if side == "BUY" else ("asset-b", "asset-a")
+    return Order(order_id, side, amount, price, asset_in, asset_out, f"run-{order_id}")
+
+
+class OrderBookDepthTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = create_connection(Path(self.tmp.name) / "depth.db")
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _depth(self, **kwargs) -> dict[str, object]:
+        return order_book_depth(self.conn, "asset-a", "asset-b", **kwargs)
+
+    def _deltas(self, since: int) -> dict[str, object]:
+        return order_book_deltas(self.conn, "asset-a", "asset-b", since)
+
+    def test_depth_aggregates_and_groups_by_tick(self) -> None:
+        for order_id, side, price, amount in [
+            ("b1", "BUY", 101, 2),
+            ("b2", "BUY", 101, 3),
+            ("b3", "BUY", 97, 4),
+            ("b4", "BUY", 89, 1),
+            ("s1", "SELL", 111, 6),
+            ("s2", "SELL", 119, 1),
+            ("s3", "SELL", 121, 2),
+        ]:
+            place_order(self.conn, _order(order_id, side, price, amount))
+        book = self._depth()
+        self.assertEqual(
+            book["bids"],
+            [
+                {"price": 101, "amount": 5, "orders": 2},
+                {"price": 97, "amount": 4, "orders": 1},
+                {"price": 89, "amount": 1, "orders": 1},
+            ],
+        )
+        self.assertEqual(book["asks"][0], {"price": 111, "amount": 6, "orders": 1})
+        grouped = self._depth(depth=2, tick=10)
+        self.assertEqual(
+            grouped["bids"],
+            [{"price": 100, "amount": 5, "orders": 2}, {"price": 90, "amount": 4, "orders": 1}],
+        )
+        self.assertEqual(
+            grouped["asks"],
+            [{"price": 120, "amount": 7, "orders": 2}, {"price": 130, "amount": 2, "orders": 1}],
+        )
+        self.assertEqual(self._depth(depth=1)["bids"], [{"price": 101, "amount": 5, "orders": 2}])
+
+    def test_sequence_increases_and_deltas_report_changed_levels(self) -> None:
+        place_order(self.conn, _order("s1", "SELL", 110, 5))
+        place_order(self.conn, _order("s2", "SELL", 112, 5))
+        start = self._depth()["sequence"]
+        place_order(self.conn, _order("b1", "BUY", 110, 5))
+        self.assertGreater(self._depth()["sequence"], start)
+        place_order(self.conn, _order("b2", "BUY", 105, 2))
+        middle = self._depth()["sequence"]
+        cancel_order(self.conn, "b2")
+        deltas = self._deltas(start)
+        self.assertFalse(deltas["reset"])
+        self.assertEqual(deltas["asks"], [{"price": 110, "amount": 0, "orders": 0}])
+        self.assertEqual(deltas["bids"], [{"price": 105, "amount": 0, "orders": 0}])
+        self.assertEqual(self._deltas(middle)["asks"], [])
+        current = self._deltas(middle)["sequence"]
+        self.assertEqual(self._deltas(current)["bids"], [])
+
+    def test_uncovered_since_requests_reset(self) -> None:
+        place_order(self.conn, _order("s1", "SELL", 110, 5))
+        sequence = self._depth()["sequence"]
+        self.assertTrue(self._deltas(sequence + 5)["reset"])
+        insert_order(self.conn, _order("s2", "SELL", 111, 5))
+        deltas = self._deltas(sequence)
+        self.assertTrue(deltas["reset"])
+        self.assertFalse(self._deltas(deltas["sequence"])["reset"])
+
+    def test_invalid_parameters_rejected(self) -> None:
+        with self.assertRaises(ExchangeError):
+            self._depth(depth=0)
+        with self.assertRaises(ExchangeError):
+            self._depth(tick=0)
+        with self.assertRaises(ExchangeError):
+            order_book_depth(self.conn, "asset a", "asset-b")
+        with self.assertRaises(ExchangeError):
+            self._deltas(-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
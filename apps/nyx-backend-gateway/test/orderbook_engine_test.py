@@ -0,0 +1,185 @@
+import _bootstrap
+import random
+import tempfile
+from pathlib import Path
+import unittest
+
+from nyx_backend_gateway.exchange import _trade_id, cancel_order, order_book_snapshot, place_order
+from nyx_backend_gateway.orderbook import OrderBookEngine, get_engine
+from nyx_backend_gateway.storage import (
+    Order,
+    Trade,
+    create_connection,
+    delete_order,
+    insert_order,
+    insert_trade,
+    list_orders,
+    list_trades,
+    unit_of_work,
+    update_order_amount,
+)
+
+
+def _reference_place_order(conn, order: Order) -> list[Trade]:
+    insert_order(conn, order)
+    if order.side == "BUY":
+        rows = list_orders(
+            conn, side="SELL", asset_in=order.asset_out, asset_out=order.asset_in, order_by="price ASC, order_id ASC"
+        )
+    else:
+        rows = list_orders(
+            conn, side="BUY", asset_in=order.asset_out, asset_out=order.asset_in, order_by="price DESC, order_id ASC"
+        )
+    trades: list[Trade] = []
+    remaining = order.amount
+    for row in rows:
+        opposite_price = int(row["price"])
+        opposite_amount = int(row["amount"])
+        opposite_id = str(row["order_id"])
+        if order.side == "BUY" and order.price < opposite_price:
+            break
+        if order.side == "SELL" and order.price > opposite_price:
+            break
+        trade_amount = min(remaining, opposite_amount)
+        trades.append(
+            Trade(
+                trade_id=_trade_id(order.order_id, opposite_id, trade_amount),
+                order_id=order.order_id,
+                amount=trade_amount,
+                price=opposite_price,
+                run_id=order.run_id,
+            )
+        )
+        insert_trade(conn, trades[-1])
+        if trade_amount == opposite_amount:
+            delete_order(conn, opposite_id)
+        else:
+            update_order_amount(conn, opposite_id, opposite_amount - trade_amount)
+        remaining -= trade_amount
+        if remaining == 0:
+            break
+    if remaining == 0:
+        delete_order(conn, order.order_id)
+    elif remaining != order.amount:
+        update_order_amount(conn, order.order_id, remaining)
+    return trades
+
+
+def _random_order(rng: random.Random, index: int) -> Order:
+    side = rng.choice(["BUY", "SELL"])
+    pair = rng.choice([("asset-a", "asset-b"), ("asset-c", "asset-a")])
+    asset_in, asset_out = pair if side == "BUY" else (pair[1], pair[0])
+    return Order(
+        order_id=f"order-{rng.randrange(1 << 32):08x}-{index}",
+        side=side,
+        amount=rng.randint(1, 20),
+        price=rng.randint(90, 110),
+        asset_in=asset_in,
+        asset_out=asset_out,
+        run_id=f"run-{index}",
+    )
+
+
+class OrderBookEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "engine.db"
+        self.conn = create_connection(self.db_path)
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_matches_reference_byte_for_byte(self) -> None:
+        reference = create_connection(Path(self.tmp.name) / "reference.db")
+        rng = random.Random(7)
+        resting: list[str] = []
+        for index in range(400):
+            if resting and rng.random() < 0.1:
+                order_id = resting.pop(rng.randrange(len(resting)))
+                cancel_order(self.conn, order_id)
+                delete_order(reference, order_id)
+                continue
+            order = _random_order(rng, index)
+            resting.append(order.order_id)
+            result = place_order(self.conn, order)
+            expected = _reference_place_order(reference, order)
+            self.assertEqual(result.trades, expected)
+        self.assertEqual(list_trades(self.conn), list_trades(reference))
+        self.assertEqual(list_orders(self.conn), list_orders(reference))
+        snapshot = order_book_snapshot(self.conn)
+        self.assertEqual(snapshot["buy"], list_orders(reference, side="BUY", order_by="price DESC, order_id ASC"))
+        self.assertEqual(snapshot["sell"], list_orders(reference, side="SELL", order_by="price ASC, order_id ASC"))
+        reference.close()
+
+    def test_same_price_fills_in_order_id_order(self) -> None:
+        for order_id in ("sell-z", "sell-a", "sell-m"):
+            place_order(self.conn, Order(order_id, "SELL", 5, 10, "asset-b", "asset-a", f"run-{order_id}"))
+        place_order(self.conn, Order("sell-high", "SELL", 5, 11, "asset-b", "asset-a", "run-high"))
+        result = place_order(self.conn, Order("buy-1", "BUY", 7, 11, "asset-a", "asset-b", "run-buy-1"))
+        self.assertEqual(
+            [trade.trade_id for trade in result.trades],
+            [_trade_id("buy-1", "sell-a", 5), _trade_id("buy-1", "sell-m", 2)],
+        )
+        engine = OrderBookEngine()
+        engine.sync(self.conn)
+        book = engine.book(("asset-a", "asset-b"))
+        self.assertEqual([order.order_id for order in book.orders("SELL")], ["sell-m", "sell-z", "sell-high"])
+        result = place_order(self.conn, Order("buy-2", "BUY", 6, 10, "asset-a", "asset-b", "run-buy-2"))
+        self.assertEqual(
+            [trade.trade_id for trade in result.trades],
+            [_trade_id("buy-2", "sell-m", 3), _trade_id("buy-2", "sell-z", 3)],
+        )
+
+    def test_level_churn_keeps_price_order(self) -> None:
+        book = OrderBookEngine().book(("asset-a", "asset-b"))
+        rng = random.Random(3)
+        live: dict[str, Order] = {}
+        for index in range(2000):
+            if live and rng.random() < 0.45:
+                book.remove(live.pop(rng.choice(sorted(live))).order_id)
+                continue
+            order = Order(f"o-{index}", "SELL", 1, rng.randint(1, 40), "asset-b", "asset-a", f"run-{index}")
+            book.add(order)
+            live[order.order_id] = order
+        expected = sorted(live.values(), key=lambda order: (order.price, order.order_id))
+        self.assertEqual(list(book.orders("SELL")), expected)
+        self.assertEqual(book.best_ask(), expected[0].price if expected else None)
+
+    def test_rebuilds_from_orders_table(self) -> None:
+        for index, (side, price) in enumerate([("BUY", 9), ("BUY", 11), ("SELL", 15), ("SELL", 13)]):
+            pair = ("asset-a", "asset-b") if side == "BUY" else ("asset-b", "asset-a")
+            place_order(
+                self.conn,
+                Order(f"o-{index}", side, 5, price, pair[0], pair[1], f"run-{index}"),
+            )
+        engine = OrderBookEngine()
+        engine.sync(self.conn)
+        book = engine.book(("asset-a", "asset-b"))
+        self.assertEqual(book.best_bid(), 11)
+        self.assertEqual(book.best_ask(), 13)
+        self.assertEqual(engine.rebuilds, 1)
+        engine.sync(self.conn)
+        self.assertEqual(engine.rebuilds, 1)
+
+    def test_external_writes_trigger_resync(self) -> None:
+        engine = get_engine(self.conn)
+        place_order(self.conn, Order("sell-1", "SELL", 5, 10, "asset-b", "asset-a", "run-1"))
+        rebuilds = engine.rebuilds
+        insert_order(self.conn, Order("sell-2", "SELL", 5, 8, "asset-b", "asset-a", "run-2"))
+        result = place_order(self.conn, Order("buy-1", "BUY", 5, 12, "asset-a", "asset-b", "run-3"))
+        self.assertEqual(engine.rebuilds, rebuilds + 1)
+        self.assertEqual([trade.price for trade in result.trades], [8])
+
+    def test_rolled_back_operation_leaves_book_unchanged(self) -> None:
+        place_order(self.conn, Order("sell-1", "SELL", 5, 10, "asset-b", "asset-a", "run-1"))
+        with self.assertRaises(RuntimeError):
+            with unit_of_work(self.conn):
+                place_order(self.conn, Order("buy-1", "BUY", 5, 12, "asset-a", "asset-b", "run-2"))
+                raise RuntimeError("abort")
+        self.assertEqual([row["order_id"] for row in order_book_snapshot(self.conn)["sell"]], ["sell-1"])
+        self.assertEqual(list_trades(self.conn), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
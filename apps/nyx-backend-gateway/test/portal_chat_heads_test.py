@@ -0,0 +1,93 @@
+import _bootstrap
+import tempfile
+import threading
+from pathlib import Path
+import unittest
+
+from nyx_backend_gateway import portal
+from nyx_backend_gateway.migrations import apply_migrations
+from nyx_backend_gateway.storage import (
+    create_connection,
+    list_chat_messages,
+    load_chat_room_head,
+    open_connection,
+)
+
+
+class PortalChatHeadsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _assert_chain(self, conn, room_id: str, count: int) -> None:
+        messages = list_chat_messages(conn, room_id=room_id, after=None, limit=count + 1)
+        self.assertEqual([int(row["seq"]) for row in messages], list(range(1, count + 1)))
+        prev = "0" * 64
+        for row in messages:
+            self.assertEqual(row["prev_digest"], prev)
+            prev = str(row["chain_head"])
+        head = load_chat_room_head(conn, room_id)
+        self.assertEqual((head.seq, head.chain_head), (count, prev))
+
+    def test_append_reads_head_not_history(self) -> None:
+        conn = create_connection(self.db_path)
+        for index in range(5):
+            portal.post_message(conn, room_id="room-1", sender_account_id="acct-1", body=f"hello {index}")
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        portal.post_message(conn, room_id="room-1", sender_account_id="acct-1", body="again")
+        conn.set_trace_callback(None)
+        self.assertEqual(statements[0], "BEGIN IMMEDIATE")
+        self.assertFalse(any(sql.startswith("SELECT") and "chat_messages" in sql for sql in statements))
+        self._assert_chain(conn, "room-1", 6)
+        conn.close()
+
+    def test_migration_backfills_heads(self) -> None:
+        conn = create_connection(self.db_path)
+        for index in range(3):
+            portal.post_message(conn, room_id="room-1", sender_account_id="acct-1", body=f"hello {index}")
+        portal.post_message(conn, room_id="room-2", sender_account_id="acct-1", body="hello")
+        expected = {room: load_chat_room_head(conn, room) for room in ("room-1", "room-2")}
+        conn.execute("DROP TABLE chat_room_heads")
+        conn.execute("UPDATE meta SET value = '3' WHERE key = 'schema_version'")
+        conn.commit()
+        apply_migrations(conn)
+        self.assertEqual({room: load_chat_room_head(conn, room) for room in expected}, expected)
+        portal.post_message(conn, room_id="room-1", sender_account_id="acct-1", body="after")
+        self._assert_chain(conn, "room-1", 4)
+        conn.close()
+
+    def test_concurrent_posts_get_unique_sequence(self) -> None:
+        create_connection(self.db_path).close()
+        threads_count = 8
+        posts = 15
+        errors: list[BaseException] = []
+        start = threading.Barrier(threads_count)
+
+        def worker(index: int) -> None:
+            conn = open_connection(self.db_path)
+            try:
+                start.wait()
+                for post in range(posts):
+                    portal.post_message(conn, room_id="room-1", sender_account_id=f"acct-{index}", body=f"m {post}")
+            except BaseException as exc:
+                errors.append(exc)
+            finally:
+                conn.close()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+        self.assertEqual(errors, [])
+        conn = open_connection(self.db_path)
+        self._assert_chain(conn, "room-1", threads_count * posts)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
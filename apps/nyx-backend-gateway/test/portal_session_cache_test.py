@@ -0,0 +1,108 @@
+import _bootstrap
+import tempfile
+import threading
+import time
+from pathlib import Path
+import unittest
+
+from nyx_backend_gateway import portal
+from nyx_backend_gateway.session_cache import SessionCache, configure_session_cache
+from nyx_backend_gateway.storage import PortalSession, create_connection, insert_portal_session
+
+
+def _session(token: str, expires_in: int = 3600) -> PortalSession:
+    return PortalSession(token=token, account_id="acct-1", expires_at=int(time.time()) + expires_in)
+
+
+class SessionCacheTests(unittest.TestCase):
+    def test_entries_expire_after_ttl(self) -> None:
+        cache = SessionCache(ttl_seconds=0.05)
+        cache.put(_session("a" * 64))
+        self.assertIsNotNone(cache.get("a" * 64))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("a" * 64))
+
+    def test_expired_session_not_served(self) -> None:
+        cache = SessionCache()
+        cache.put(_session("b" * 64, expires_in=-1))
+        self.assertIsNone(cache.get("b" * 64))
+
+    def test_bounded_lru(self) -> None:
+        cache = SessionCache(max_entries=2)
+        for token in ("a" * 64, "b" * 64, "c" * 64):
+            cache.put(_session(token))
+        self.assertIsNone(cache.get("a" * 64))
+        self.assertIsNotNone(cache.get("c" * 64))
+        self.assertEqual(cache.stats().evictions, 1)
+
+    def test_invalidate_blocks_stale_refill(self) -> None:
+        cache = SessionCache()
+        session = _session("d" * 64)
+        cache.put(session)
+        cache.invalidate(session.token)
+        cache.put(session)
+        self.assertIsNone(cache.get(session.token))
+
+    def test_shared_across_threads(self) -> None:
+        cache = SessionCache(max_entries=64)
+        errors: list[BaseException] = []
+
+        def worker(index: int) -> None:
+            try:
+                for step in range(200):
+                    token = f"{(index * 7 + step) % 96:064x}"
+                    cache.put(_session(token))
+                    cache.get(token)
+                    if step % 5 == 0:
+                        cache.invalidate(token)
+            except BaseException as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(cache.stats().entries, 64)
+
+
+class PortalSessionCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = create_connection(Path(self.tmp.name) / "gateway.db")
+        self.cache = configure_session_cache()
+
+    def tearDown(self) -> None:
+        configure_session_cache()
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _session_queries(self, call) -> int:
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            self.conn.set_trace_callback(None)
+        return sum(1 for sql in statements if "portal_sessions" in sql)
+
+    def test_require_session_hits_database_once(self) -> None:
+        session = _session("e" * 64)
+        insert_portal_session(self.conn, session)
+        self.assertEqual(self._session_queries(lambda: portal.require_session(self.conn, session.token)), 1)
+        self.assertEqual(self._session_queries(lambda: portal.require_session(self.conn, session.token)), 0)
+        self.assertEqual(portal.cached_session(session.token), session)
+
+    def test_logout_invalidates_immediately(self) -> None:
+        session = _session("f" * 64)
+        insert_portal_session(self.conn, session)
+        portal.require_session(self.conn, session.token)
+        portal.logout_session(self.conn, session.token)
+        self.assertIsNone(portal.cached_session(session.token))
+        with self.assertRaises(portal.PortalError):
+            portal.require_session(self.conn, session.token)
+
+
+if __name__ == "__main__":
+    unittest.main()
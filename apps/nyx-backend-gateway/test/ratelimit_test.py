@@ -0,0 +1,128 @@
+import _bootstrap
+import os
+import tempfile
+import threading
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.ratelimit import RateLimitError, RateLimiter, SqliteRateLimiter
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RateLimiterTests(unittest.TestCase):
+    def test_burst_is_capped_at_limit_across_window_edge(self) -> None:
+        clock = _Clock()
+        limiter = RateLimiter(10, 60, clock=clock)
+        self.assertEqual(sum(limiter.allow("client") for _ in range(20)), 10)
+        clock.now += 1.0
+        self.assertEqual(sum(limiter.allow("client") for _ in range(20)), 0)
+        clock.now += 6.0
+        self.assertEqual(sum(limiter.allow("client") for _ in range(20)), 1)
+
+    def test_cost_consumes_capacity(self) -> None:
+        clock = _Clock()
+        limiter = RateLimiter(10, 60, clock=clock)
+        self.assertTrue(limiter.allow("client", 5))
+        self.assertTrue(limiter.allow("client", 5))
+        self.assertFalse(limiter.allow("client", 1))
+        self.assertTrue(limiter.allow("client", 0))
+        self.assertFalse(RateLimiter(4, 60, clock=clock).allow("other", 5))
+        self.assertAlmostEqual(limiter.retry_after("client", 1), 6.0)
+        with self.assertRaises(RateLimitError):
+            limiter.allow("client", -1)
+
+    def test_idle_keys_are_evicted_and_bounded(self) -> None:
+        clock = _Clock()
+        limiter = RateLimiter(10, 60, shards=4, max_keys=400, clock=clock)
+        for index in range(10_000):
+            self.assertTrue(limiter.allow(f"key-{index}"))
+        self.assertLessEqual(limiter.stats().keys, 400)
+        clock.now += 60.0
+        for index in range(5000):
+            limiter.allow(f"fresh-{index}")
+        stats = limiter.stats()
+        self.assertLessEqual(stats.keys, 400)
+        self.assertGreaterEqual(stats.evicted, 10_000 + 5000 - 400)
+
+    def test_concurrent_allow_never_exceeds_limit(self) -> None:
+        limiter = RateLimiter(50, 3600)
+        allowed = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            count = sum(limiter.allow("shared") for _ in range(40))
+            with lock:
+                allowed.append(count)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(allowed), 50)
+        self.assertEqual(limiter.stats().denied, 8 * 40 - 50)
+
+    def test_sqlite_limiter_shares_state_between_instances(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            clock = _Clock()
+            path = Path(tmp) / "limits.db"
+            first = SqliteRateLimiter(path, 6, 60, clock=clock)
+            second = SqliteRateLimiter(path, 6, 60, clock=clock)
+            other_scope = SqliteRateLimiter(path, 6, 60, scope="account", clock=clock)
+            self.assertTrue(first.allow("client", 3))
+            self.assertTrue(second.allow("client", 3))
+            self.assertFalse(first.allow("client"))
+            self.assertTrue(other_scope.allow("client"))
+            clock.now += 60.0
+            self.assertEqual(second.evict_idle(), 1)
+            self.assertTrue(first.allow("client", 6))
+
+
+class ServerRouteCostTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self._orig_db_path = gateway._db_path
+        self._orig_server_db_path = server._db_path
+        db_path = Path(self.tmp.name) / "gateway.db"
+        gateway._db_path = lambda: db_path
+        server._db_path = lambda: db_path
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(7, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        gateway._db_path = self._orig_db_path
+        server._db_path = self._orig_server_db_path
+        self.tmp.cleanup()
+
+    def _status(self, method: str, path: str) -> int:
+        conn = HTTPConnection("127.0.0.1", self.httpd.server_address[1], timeout=10)
+        conn.request(method, path, body=b"{}" if method == "POST" else None)
+        status = conn.getresponse().status
+        conn.close()
+        return status
+
+    def test_run_costs_more_than_healthz(self) -> None:
+        self.assertEqual(self._status("GET", "/healthz"), 200)
+        self.assertEqual(self._status("POST", "/run"), 400)
+        self.assertEqual(self._status("POST", "/run"), 429)
+        self.assertEqual(self._status("GET", "/healthz"), 200)
+        self.assertEqual(self._status("GET", "/healthz"), 429)
+
+
+if __name__ == "__main__":
+    unittest.main()
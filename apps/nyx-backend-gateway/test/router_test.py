@@ -0,0 +1,109 @@
+import _bootstrap
+import json
+import os
+import tempfile
+import threading
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.router import Router, RouterError
+
+
+class RouterTests(unittest.TestCase):
+    def test_exact_and_param_routes(self) -> None:
+        router = Router(default_max_body=128)
+        router.add("GET", "/healthz", "health")
+        router.add("GET", "/rooms/{room_id}/messages", "messages", auth=True, cost=2)
+        router.add("POST", "/rooms/{room_id}/messages", "post", body=True, max_body=16)
+        match = router.match("GET", "/healthz")
+        self.assertEqual((match.route.handler, match.params), ("health", {}))
+        match = router.match("GET", "/rooms/r-1/messages")
+        self.assertEqual(match.params, {"room_id": "r-1"})
+        self.assertEqual((match.route.auth, match.route.cost, match.route.max_body), (True, 2, 128))
+        self.assertEqual(router.match("POST", "/rooms/r-1/messages").route.max_body, 16)
+        self.assertIsNone(router.match("GET", "/rooms//messages"))
+        self.assertIsNone(router.match("GET", "/rooms/r-1/extra/messages"))
+        self.assertIsNone(router.match("DELETE", "/healthz"))
+        self.assertEqual([route.name for route in router.routes()][0], "GET /healthz")
+
+    def test_invalid_routes_rejected(self) -> None:
+        router = Router()
+        router.add("GET", "/rooms/{room_id}", "room")
+        with self.assertRaises(RouterError):
+            router.add("GET", "/rooms/{room_id}", "again")
+        with self.assertRaises(RouterError):
+            router.add("GET", "/rooms/{}", "empty")
+        with self.assertRaises(RouterError):
+            router.add("GET", "rooms", "relative")
+        with self.assertRaises(RouterError):
+            router.add("GET", "/costly", "costly", cost=-1)
+
+    def test_observe_counts_errors_per_route(self) -> None:
+        router = Router()
+        route = router.add("GET", "/healthz", "health")
+        router.observe(route, 0.002)
+        router.observe(route, 0.2, error=True)
+        snapshot = router.latency()["GET /healthz"]
+        self.assertEqual((snapshot["count"], snapshot["errors"]), (2, 1))
+        self.assertAlmostEqual(snapshot["sum"], 0.202)
+
+
+class ServerRouterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self._orig = (gateway._db_path, gateway._run_root, server._db_path, server._run_root)
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.thread.join(timeout=2)
+        self.httpd.server_close()
+        gateway._db_path, gateway._run_root, server._db_path, server._run_root = self._orig
+        self.tmp.cleanup()
+
+    def _request(self, method: str, path: str, body: bytes | None = None, headers: dict | None = None):
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, data
+
+    def test_route_middleware_and_histograms(self) -> None:
+        before = json.loads(self._request("GET", "/maintenance/routes")[1])["routes"]
+        status, data = self._request("GET", "/chat/v1/rooms/room-1/messages")
+        self.assertEqual((status, json.loads(data)), (400, {"error": "auth required"}))
+        status, data = self._request("POST", "/chat/send", body=b"x" * 5000)
+        self.assertEqual((status, json.loads(data)), (400, {"error": "payload too large"}))
+        self.assertEqual(self._request("GET", "/chat/v1/rooms/a/b/messages")[0], 404)
+        self.assertEqual(self._request("POST", "/healthz", body=b"{}")[0], 404)
+        self.assertEqual(self._request("GET", "/healthz?probe=1")[0], 200)
+        after = json.loads(self._request("GET", "/maintenance/routes")[1])["routes"]
+        for name, requests, errors in (
+            ("GET /chat/v1/rooms/{room_id}/messages", 1, 1),
+            ("POST /chat/send", 1, 1),
+            ("GET /healthz", 1, 0),
+        ):
+            self.assertEqual(after[name]["count"] - before[name]["count"], requests)
+            self.assertEqual(after[name]["errors"] - before[name]["errors"], errors)
+        endpoints = json.loads(self._request("GET", "/capabilities")[1])["endpoints"]
+        self.assertIn("GET /maintenance/routes", endpoints)
+        self.assertIn("POST /chat/v1/rooms/{room_id}/messages", endpoints)
+
+
+if __name__ == "__main__":
+    unittest.main()
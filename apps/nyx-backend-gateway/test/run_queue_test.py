@@ -0,0 +1,116 @@
+import _bootstrap
+import json
+import os
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.pool import pooled_connection
+from nyx_backend_gateway.run_queue import RunQueue, RunQueueError, RunQueueFullError
+from nyx_backend_gateway.storage import claim_run_job
+
+
+_SWAP = {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "min_out": 3}
+
+
+class RunQueueTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self._orig = (gateway._db_path, gateway._run_root, server._db_path, server._run_root)
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+
+    def tearDown(self) -> None:
+        gateway._db_path, gateway._run_root, server._db_path, server._run_root = self._orig
+        self.tmp.cleanup()
+
+    def _queue(self, **kwargs) -> RunQueue:
+        return RunQueue(lambda: self.db_path, server._execute_job, **kwargs)
+
+    def _wait(self, queue: RunQueue, run_id: str, status: str) -> None:
+        deadline = time.monotonic() + 30
+        while queue.job(run_id).status != status:
+            self.assertLess(time.monotonic(), deadline, run_id)
+            time.sleep(0.02)
+
+    def test_jobs_are_idempotent_bounded_and_survive_restart(self) -> None:
+        first = self._queue(max_queued=2)
+        request = {"seed": 5, "module": "exchange", "action": "route_swap", "payload": _SWAP}
+        queued = first.submit("queue-a", request)
+        self.assertEqual(queued.status, "queued")
+        self.assertEqual(first.submit("queue-a", dict(request)).enqueued_at, queued.enqueued_at)
+        with self.assertRaises(RunQueueError):
+            first.submit("queue-a", {**request, "seed": 6})
+        first.submit("queue-b", {**request, "payload": {}})
+        with self.assertRaises(RunQueueFullError):
+            first.submit("queue-c", request)
+        with pooled_connection(self.db_path) as conn:
+            self.assertTrue(claim_run_job(conn, "queue-b", time.time()))
+
+        restarted = self._queue(workers=2)
+        self.assertEqual(restarted.start(), 2)
+        try:
+            self._wait(restarted, "queue-a", "complete")
+            self._wait(restarted, "queue-b", "failed")
+        finally:
+            restarted.stop()
+        done = restarted.job("queue-a")
+        self.assertEqual(json.loads(done.result)["run_id"], "queue-a")
+        self.assertEqual(restarted.submit("queue-a", request).status, "complete")
+        self.assertEqual(restarted.job("queue-b").attempts, 2)
+        self.assertTrue(restarted.job("queue-b").error)
+        self.assertEqual(restarted.stats()["queued"], 0)
+
+    def test_async_run_returns_202_and_status_tracks_job(self) -> None:
+        httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        httpd.rate_limiter = server.RequestLimiter(100, 60)
+        httpd.run_queue = self._queue(workers=1)
+        httpd.run_queue.start()
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        port = httpd.server_address[1]
+
+        def call(method: str, path: str, body: dict | None = None):
+            conn = HTTPConnection("127.0.0.1", port, timeout=10)
+            conn.request(method, path, body=json.dumps(body) if body is not None else None)
+            response = conn.getresponse()
+            data = response.read()
+            conn.close()
+            return response.status, response.getheader("Location"), json.loads(data)
+
+        try:
+            body = {"seed": 9, "run_id": "async-a", "module": "exchange", "action": "route_swap", "payload": _SWAP}
+            status, location, payload = call("POST", "/run", body)
+            self.assertEqual((status, location), (202, "/status?run_id=async-a"))
+            self.assertIn(payload["status"], {"queued", "running", "complete"})
+            self._wait(httpd.run_queue, "async-a", "complete")
+            status, _, payload = call("GET", location)
+            self.assertEqual((status, payload), (200, {"replay_ok": True, "status": "complete"}))
+            status, _, payload = call("POST", "/run", body)
+            self.assertEqual((status, payload["run_id"], payload["status"]), (200, "async-a", "complete"))
+            self.assertEqual(call("POST", "/run", {**body, "run_id": "bad id"})[0], 400)
+            conn = HTTPConnection("127.0.0.1", port, timeout=10)
+            conn.request("GET", "/metrics")
+            metrics = conn.getresponse().read().decode("utf-8")
+            conn.close()
+            self.assertIn("nyx_gateway_run_queue_wait_seconds_count", metrics)
+            self.assertIn('nyx_gateway_run_queue_jobs{state="queued"}', metrics)
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=2)
+            httpd.server_close()
+            httpd.run_queue.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,9 @@ import tempfile
 import threading
 from http.client import HTTPConnection
 from pathlib import Path
+from types import SimpleNamespace
 import unittest
+from unittest import mock
 
 import nyx_backend_gateway.gateway as gateway
 import nyx_backend_gateway.server as server
@@ -61,6 +63,50 @@ class ServerArtifactGuardTests(unittest.TestCase):
         self.assertEqual(response.status, 400)
         conn.close()
 
+    def test_artifact_materialized_from_store(self) -> None:
+        result = self._post(
+            "/run",
+            {
+                "seed": 123,
+                "run_id": "artifact-run-2",
+                "module": "exchange",
+                "action": "route_swap",
+                "payload": {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "min_out": 3},
+            },
+        )
+        self.assertEqual([entry.name for entry in self.run_root.iterdir()], [".evidence"])
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("GET", "/artifact?run_id=artifact-run-2&name=state_hash.txt")
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(data.decode("utf-8"), result["state_hash"] + "\n")
+
+    def test_missing_artifact_returns_404(self) -> None:
+        self._post(
+            "/run",
+            {
+                "seed": 123,
+                "run_id": "artifact-run-3",
+                "module": "exchange",
+                "action": "route_swap",
+                "payload": {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "min_out": 3},
+            },
+        )
+        uncached = SimpleNamespace(get=lambda *_args: SimpleNamespace(artifacts={}))
+        with (
+            mock.patch.object(server, "get_evidence_cache", return_value=uncached),
+            mock.patch("nyx_backend.evidence.materialize_artifact", return_value=self.run_root / "missing.txt"),
+        ):
+            conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+            conn.request("GET", "/artifact?run_id=artifact-run-3&name=state_hash.txt")
+            response = conn.getresponse()
+            data = response.read()
+            conn.close()
+        self.assertEqual(response.status, 404)
+        self.assertEqual(json.loads(data.decode("utf-8")), {"error": "artifact not found"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,163 @@
+import _bootstrap
+import base64
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.chat_hub import configure_chat_hub
+
+
+class ServerChatStreamTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        self.stream_max = server._CHAT_STREAM_MAX_SECONDS
+        server._CHAT_STREAM_MAX_SECONDS = 3.0
+        self.hub = configure_chat_hub(max_subscribers_per_room=2)
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.httpd.account_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+        self.token = self._auth_token()
+        status, room = self._post("/chat/v1/rooms", {"name": "General"}, token=self.token)
+        self.assertEqual(status, 200)
+        self.room_id = room["room_id"]
+
+    def tearDown(self) -> None:
+        self.hub.close()
+        configure_chat_hub()
+        server._CHAT_STREAM_MAX_SECONDS = self.stream_max
+        self.httpd.shutdown()
+        self.thread.join(timeout=2)
+        self.httpd.server_close()
+        self.tmp.cleanup()
+
+    def _post(self, path: str, payload: dict, token: str | None = None) -> tuple[int, dict]:
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        body = json.dumps(payload, separators=(",", ":"))
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        conn.request("POST", path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, json.loads(data.decode("utf-8"))
+
+    def _get(self, path: str, token: str | None = None) -> tuple[int, dict]:
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        headers = {}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, json.loads(data.decode("utf-8"))
+
+    def _auth_token(self) -> str:
+        key = b"portal-key-0003-0003-0003-0003"
+        pubkey = base64.b64encode(key).decode("utf-8")
+        status, created = self._post("/portal/v1/accounts", {"handle": "carol", "pubkey": pubkey})
+        self.assertEqual(status, 200)
+        account_id = created.get("account_id")
+        status, challenge = self._post("/portal/v1/auth/challenge", {"account_id": account_id})
+        self.assertEqual(status, 200)
+        nonce = challenge.get("nonce")
+        signature = base64.b64encode(hmac.new(key, nonce.encode("utf-8"), "sha256").digest()).decode("utf-8")
+        status, verified = self._post(
+            "/portal/v1/auth/verify",
+            {"account_id": account_id, "nonce": nonce, "signature": signature},
+        )
+        self.assertEqual(status, 200)
+        return verified.get("access_token")
+
+    def _say(self, body: str) -> None:
+        status, _ = self._post(f"/chat/v1/rooms/{self.room_id}/messages", {"body": body}, token=self.token)
+        self.assertEqual(status, 200)
+
+    def _open_stream(self, headers: dict[str, str] | None = None):
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request(
+            "GET",
+            f"/chat/v1/rooms/{self.room_id}/events",
+            headers={"Authorization": f"Bearer {self.token}", **(headers or {})},
+        )
+        return conn, conn.getresponse()
+
+    def _next_event(self, response) -> dict[str, str]:
+        event: dict[str, str] = {}
+        while True:
+            line = response.fp.readline().decode("utf-8")
+            if not line:
+                return event
+            line = line.rstrip("\n")
+            if not line:
+                if "data" in event:
+                    return event
+                continue
+            if line.startswith(":"):
+                continue
+            field, _, value = line.partition(": ")
+            event[field] = value
+
+    def test_stream_resumes_from_last_event_id_and_pushes_new_messages(self) -> None:
+        self._say("one")
+        self._say("two")
+        conn, response = self._open_stream({"Last-Event-ID": "1"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "text/event-stream")
+        event = self._next_event(response)
+        self.assertEqual(event["id"], "2")
+        self.assertEqual(json.loads(event["data"])["body"], "two")
+        started = time.monotonic()
+        threading.Timer(0.2, self._say, args=("three",)).start()
+        event = self._next_event(response)
+        self.assertEqual(event["id"], "3")
+        self.assertEqual(json.loads(event["data"])["body"], "three")
+        self.assertLess(time.monotonic() - started, 2.0)
+        conn.close()
+
+    def test_long_poll_wakes_on_post(self) -> None:
+        self._say("one")
+        started = time.monotonic()
+        threading.Timer(0.2, self._say, args=("two",)).start()
+        status, payload = self._get(f"/chat/v1/rooms/{self.room_id}/messages?after=1&wait=10", token=self.token)
+        self.assertEqual(status, 200)
+        self.assertEqual([message["seq"] for message in payload["messages"]], [2])
+        self.assertLess(time.monotonic() - started, 5.0)
+        status, payload = self._get(f"/chat/v1/rooms/{self.room_id}/messages?after=2&wait=1", token=self.token)
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["messages"], [])
+
+    def test_stream_requires_auth_and_caps_subscribers(self) -> None:
+        status, _ = self._get(f"/chat/v1/rooms/{self.room_id}/events")
+        self.assertEqual(status, 400)
+        streams = [self._open_stream() for _ in range(2)]
+        for _, response in streams:
+            self.assertEqual(response.status, 200)
+        status, payload = self._get(f"/chat/v1/rooms/{self.room_id}/events", token=self.token)
+        self.assertEqual(status, 429)
+        self.assertEqual(payload["error"], "too many subscribers")
+        for conn, _ in streams:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
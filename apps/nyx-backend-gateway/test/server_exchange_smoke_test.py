@@ -65,6 +65,33 @@ class ServerExchangeSmokeTests(unittest.TestCase):
         self.assertIn("sell", parsed)
         conn.close()
 
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("GET", "/exchange/depth?asset_in=asset-a&asset_out=asset-b&depth=5")
+        response = conn.getresponse()
+        data = response.read()
+        self.assertEqual(response.status, 200)
+        parsed = json.loads(data.decode("utf-8"))
+        self.assertEqual(parsed["bids"], [{"price": 10, "amount": 5, "orders": 1}])
+        sequence = parsed["sequence"]
+        conn.close()
+
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("GET", f"/exchange/deltas?asset_in=asset-a&asset_out=asset-b&since={sequence}")
+        response = conn.getresponse()
+        data = response.read()
+        self.assertEqual(response.status, 200)
+        parsed = json.loads(data.decode("utf-8"))
+        self.assertEqual(parsed["sequence"], sequence)
+        self.assertFalse(parsed["reset"])
+        conn.close()
+
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("GET", "/exchange/deltas?asset_in=asset-a&asset_out=asset-b")
+        response = conn.getresponse()
+        response.read()
+        self.assertEqual(response.status, 400)
+        conn.close()
+
 
 if __name__ == "__main__":
     unittest.main()
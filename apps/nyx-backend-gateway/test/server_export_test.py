@@ -0,0 +1,87 @@
+import _bootstrap
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+
+
+class ServerExportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self._orig = (gateway._db_path, gateway._run_root, server._db_path, server._run_root)
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+        for run_id in ("export-a", "export-b"):
+            body = {
+                "seed": 123,
+                "run_id": run_id,
+                "module": "exchange",
+                "action": "route_swap",
+                "payload": {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "min_out": 3},
+            }
+            self.assertEqual(self._get("/run", "POST", json.dumps(body))[0], 200)
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.thread.join(timeout=2)
+        self.httpd.server_close()
+        gateway._db_path, gateway._run_root, server._db_path, server._run_root = self._orig
+        self.tmp.cleanup()
+
+    def _get(self, path: str, method: str = "GET", body: str | None = None, headers: dict | None = None):
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, dict(response.getheaders()), data
+
+    def test_export_is_cached_and_revalidated(self) -> None:
+        status, headers, data = self._get("/export.zip?run_id=export-a")
+        self.assertEqual(status, 200)
+        self.assertEqual(int(headers["Content-Length"]), len(data))
+        etag = headers["ETag"]
+        self.assertRegex(etag, r'^"[0-9a-f]{64}"$')
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertIn("manifest.json", archive.namelist())
+        cached = list((self.run_root / ".exports").glob("*.zip"))
+        self.assertEqual(len(cached), 1)
+        self.assertEqual(cached[0].read_bytes(), data)
+        self.assertEqual(self._get("/export.zip?run_id=export-a")[2], data)
+        status, headers, data = self._get("/export.zip?run_id=export-a", headers={"If-None-Match": f'W/"x", {etag}'})
+        self.assertEqual((status, data, headers["ETag"]), (304, b"", etag))
+
+    def test_bulk_export_streams_run_archives(self) -> None:
+        single = self._get("/export.zip?run_id=export-b")[2]
+        status, headers, data = self._get("/export/bulk.zip?run_id=export-b&run_id=export-a&run_id=export-b")
+        self.assertEqual(status, 200)
+        self.assertNotIn("Content-Length", headers)
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), ["export-a.zip", "export-b.zip", "manifest.json"])
+            self.assertEqual(archive.read("export-b.zip"), single)
+            manifest = json.loads(archive.read("manifest.json"))
+        self.assertEqual([entry["run_id"] for entry in manifest["runs"]], ["export-a", "export-b"])
+        self.assertEqual(self._get("/export/bulk.zip?run_id=export-a&run_id=missing-run")[0], 400)
+        self.assertEqual(self._get("/export/bulk.zip")[0], 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import _bootstrap
+import json
+import os
+import tempfile
+import threading
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+
+
+class ServerListTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self._orig = (gateway._db_path, gateway._run_root, server._db_path, server._run_root)
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+        swap = {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "min_out": 3}
+        chat = {"channel": "lobby", "message": "hi"}
+        for seed, run_id, module, action, payload in (
+            (11, "list-c", "exchange", "route_swap", swap),
+            (12, "list-a", "chat", "message_event", chat),
+            (13, "list-b", "exchange", "route_swap", swap),
+        ):
+            body = {"seed": seed, "run_id": run_id, "module": module, "action": action, "payload": payload}
+            self.assertEqual(self._get("/run", "POST", json.dumps(body))[0], 200)
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.thread.join(timeout=2)
+        self.httpd.server_close()
+        gateway._db_path, gateway._run_root, server._db_path, server._run_root = self._orig
+        self.tmp.cleanup()
+
+    def _get(self, path: str, method: str = "GET", body: str | None = None, headers: dict | None = None):
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, dict(response.getheaders()), data
+
+    def test_list_filters_and_pages_from_catalog(self) -> None:
+        status, _, data = self._get("/list?module=exchange&order=desc&limit=1")
+        self.assertEqual(status, 200)
+        first = json.loads(data)
+        self.assertEqual([(row["run_id"], row["seed"], row["replay_ok"]) for row in first["runs"]], [("list-c", 11, True)])
+        second = json.loads(self._get(f"/list?module=exchange&order=desc&limit=1&cursor={first['next_cursor']}")[2])
+        self.assertEqual([row["run_id"] for row in second["runs"]], ["list-b"])
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual(self._get(f"/list?module=chat&cursor={first['next_cursor']}")[0], 400)
+        by_time = json.loads(self._get("/list?sort=created_at&replay_ok=true")[2])
+        self.assertEqual(sorted(row["run_id"] for row in by_time["runs"]), ["list-a", "list-b", "list-c"])
+        self.assertEqual(self._get("/list?sort=seed")[0], 400)
+
+    def test_cursor_matches_nyx_backend_list(self) -> None:
+        from nyx_backend.pagination import encode_cursor as backend_encode_cursor
+        from nyx_backend.run_catalog import list_scope, parse_run_filters
+
+        first = json.loads(self._get("/list?module=exchange&order=desc&limit=1")[2])
+        scope = list_scope(parse_run_filters({"module": ["exchange"], "order": ["desc"]}))
+        self.assertEqual(first["next_cursor"], backend_encode_cursor(scope, ("list-c",)))
+        self.assertEqual(server.decode_cursor(scope, first["next_cursor"], 1), ("list-c",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import _bootstrap
+import json
+import os
+import tempfile
+import threading
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+from urllib.parse import quote
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+from nyx_backend_gateway.pagination import MAX_PAGE_SIZE
+from nyx_backend_gateway.storage import Order, Trade, create_connection, insert_order, insert_trade
+
+
+class ServerPaginationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        conn = create_connection(self.db_path)
+        for index in range(7):
+            insert_trade(conn, Trade(f"trade-{index:02d}", "order-1", 1, 10, "run-1"))
+        for index, price in enumerate([12, 10, 10, 11, 9]):
+            insert_order(conn, Order(f"order-{index}", "SELL", 1, price, "asset-b", "asset-a", f"run-{index}"))
+        conn.close()
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.thread.join(timeout=2)
+        self.httpd.server_close()
+        self.tmp.cleanup()
+
+    def _get(self, path: str) -> tuple[int, dict[str, object]]:
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("GET", path)
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, json.loads(data.decode("utf-8"))
+
+    def _walk(self, path: str, key: str) -> list[dict[str, object]]:
+        items: list[dict[str, object]] = []
+        cursor = None
+        while True:
+            suffix = f"&cursor={quote(cursor)}" if cursor else ""
+            status, payload = self._get(f"{path}{suffix}")
+            self.assertEqual(status, 200, payload)
+            self.assertLessEqual(len(payload[key]), 3)
+            items.extend(payload[key])
+            cursor = payload["next_cursor"]
+            if cursor is None:
+                return items
+
+    def test_trades_paginate_in_stable_order(self) -> None:
+        trades = self._walk("/exchange/trades?limit=3", "trades")
+        self.assertEqual([row["trade_id"] for row in trades], [f"trade-{index:02d}" for index in range(7)])
+
+    def test_orders_paginate_on_price_then_order_id(self) -> None:
+        orders = self._walk("/exchange/orders?side=SELL&limit=3", "orders")
+        self.assertEqual(
+            [(row["price"], row["order_id"]) for row in orders],
+            [(9, "order-4"), (10, "order-1"), (10, "order-2"), (11, "order-3"), (12, "order-0")],
+        )
+
+    def test_page_cap_and_cursor_scope_enforced(self) -> None:
+        status, _ = self._get(f"/exchange/trades?limit={MAX_PAGE_SIZE + 1}")
+        self.assertEqual(status, 400)
+        status, payload = self._get("/exchange/trades?limit=2")
+        self.assertEqual(status, 200)
+        cursor = quote(payload["next_cursor"])
+        status, _ = self._get(f"/chat/messages?cursor={cursor}")
+        self.assertEqual(status, 400)
+        status, _ = self._get("/exchange/trades?cursor=not-a-cursor")
+        self.assertEqual(status, 400)
+        status, payload = self._get("/exchange/trades")
+        self.assertEqual(len(payload["trades"]), 7)
+        self.assertIsNone(payload["next_cursor"])
+
+
+if __name__ == "__main__":
+    unittest.main()
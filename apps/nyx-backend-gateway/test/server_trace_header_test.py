@@ -0,0 +1,94 @@
+import _bootstrap
+import json
+import os
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+import unittest
+
+import nyx_backend_gateway.gateway as gateway
+import nyx_backend_gateway.server as server
+
+
+def _names(record: dict) -> list[str]:
+    names = [record["name"]]
+    for child in record.get("spans", []):
+        names.extend(_names(child))
+    return names
+
+
+class ServerTraceHeaderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.run_root = Path(self.tmp.name) / "runs"
+        self._orig = (gateway._db_path, gateway._run_root, server._db_path, server._run_root)
+        gateway._db_path = lambda: self.db_path
+        gateway._run_root = lambda: self.run_root
+        server._db_path = lambda: self.db_path
+        server._run_root = lambda: self.run_root
+        self.tracing = gateway._tracing()
+        self._tracer = self.tracing.get_tracer()
+        self.httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+        self.httpd.rate_limiter = server.RequestLimiter(100, 60)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.httpd.server_address[1]
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.thread.join(timeout=2)
+        self.httpd.server_close()
+        self.tracing._TRACER = self._tracer
+        gateway._db_path, gateway._run_root, server._db_path, server._run_root = self._orig
+        self.tmp.cleanup()
+
+    def _run(self, run_id: str):
+        payload = {
+            "seed": 123,
+            "run_id": run_id,
+            "module": "exchange",
+            "action": "route_swap",
+            "payload": {"asset_in": "asset-a", "asset_out": "asset-b", "amount": 5, "min_out": 3},
+        }
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("POST", "/run", body=json.dumps(payload), headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        return response.status, response.getheader("X-Nyx-Trace")
+
+    def test_sampled_run_carries_trace_header(self) -> None:
+        sink = Path(self.tmp.name) / "trace.jsonl"
+        tracer = self.tracing.configure_tracer(sample_rate=1.0, sink=sink)
+        status, trace_id = self._run("trace-header-1")
+        self.assertEqual(status, 200)
+        self.assertRegex(trace_id, r"^[0-9a-f]{16}$")
+        deadline = time.monotonic() + 5
+        while not tracer.emitted and time.monotonic() < deadline:
+            time.sleep(0.01)
+        record = json.loads(sink.read_text(encoding="utf-8").splitlines()[-1])
+        self.assertEqual((record["trace_id"], record["name"]), (trace_id, "POST /run"))
+        self.assertEqual(record["attrs"], {"status": 200})
+        names = _names(record)
+        for name in (
+            "gateway.execute_run",
+            "gateway.validate",
+            "evidence.run_evidence",
+            "evidence.protocol_anchor",
+            "gateway.persist",
+            "gateway.route_fee",
+            "sqlite.commit",
+        ):
+            self.assertIn(name, names)
+
+    def test_unsampled_run_has_no_header(self) -> None:
+        self.tracing.configure_tracer(sample_rate=0.0)
+        self.assertEqual(self._run("trace-header-2"), (200, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,13 @@ import tempfile
 from pathlib import Path
 import unittest
 
-from nyx_backend_gateway.migrations import apply_migrations
+from nyx_backend_gateway.migrations import (
+    MIGRATIONS,
+    SCHEMA_VERSION,
+    MigrationError,
+    apply_migrations,
+    read_schema_version,
+)
 
 
 class StorageMigrationTests(unittest.TestCase):
@@ -35,6 +41,37 @@ class StorageMigrationTests(unittest.TestCase):
             self.assertTrue(expected.issubset(tables))
             conn.close()
 
+    def test_versions_step_forward_in_order(self) -> None:
+        versions = [version for version, _ in MIGRATIONS]
+        self.assertEqual(versions, list(range(1, SCHEMA_VERSION + 1)))
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = sqlite3.connect(str(Path(tmp) / "gateway.db"))
+            self.assertEqual(apply_migrations(conn, target=1), 1)
+            indexes = conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'").fetchall()
+            self.assertEqual(indexes, [])
+            self.assertEqual(apply_migrations(conn), SCHEMA_VERSION)
+            self.assertEqual(read_schema_version(conn), SCHEMA_VERSION)
+            indexes = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'")
+            }
+            self.assertIn("idx_orders_book_asc", indexes)
+            self.assertIn("idx_chat_messages_room_seq", indexes)
+            self.assertIn("idx_purchases_listing", indexes)
+            self.assertIn("idx_receipts_run", indexes)
+            self.assertEqual(apply_migrations(conn), SCHEMA_VERSION)
+            conn.close()
+
+    def test_newer_database_rejected(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = sqlite3.connect(str(Path(tmp) / "gateway.db"))
+            apply_migrations(conn, target=1)
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'", (str(SCHEMA_VERSION + 1),))
+            conn.commit()
+            with self.assertRaises(MigrationError):
+                apply_migrations(conn)
+            conn.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+import _bootstrap
+import tempfile
+from pathlib import Path
+import unittest
+
+from nyx_backend_gateway import storage
+
+
+class StorageQueryPlanTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = storage.create_connection(Path(self.tmp.name) / "gateway.db")
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _plan(self, call) -> list[str]:
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            call(self.conn)
+        finally:
+            self.conn.set_trace_callback(None)
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+        self.assertEqual(len(selects), 1)
+        return [str(row[3]) for row in self.conn.execute("EXPLAIN QUERY PLAN " + selects[0]).fetchall()]
+
+    def _assert_plan(self, call, expected: str) -> None:
+        plan = self._plan(call)
+        self.assertIn(expected, plan, plan)
+        self.assertFalse(any("TEMP B-TREE" in step for step in plan), plan)
+
+    def test_list_orders_by_pair_ascending(self) -> None:
+        self._assert_plan(
+            lambda conn: storage.list_orders(conn, side="SELL", asset_in="ECHO", asset_out="NYXT"),
+            "SEARCH orders USING COVERING INDEX idx_orders_book_asc (side=? AND asset_in=? AND asset_out=?)",
+        )
+
+    def test_list_orders_by_pair_descending(self) -> None:
+        self._assert_plan(
+            lambda conn: storage.list_orders(
+                conn, side="BUY", asset_in="NYXT", asset_out="ECHO", order_by="price DESC, order_id ASC"
+            ),
+            "SEARCH orders USING COVERING INDEX idx_orders_book_desc (side=? AND asset_in=? AND asset_out=?)",
+        )
+
+    def test_list_chat_messages_after_seq(self) -> None:
+        self._assert_plan(
+            lambda conn: storage.list_chat_messages(conn, room_id="room-1", after=3, limit=10),
+            "SEARCH chat_messages USING INDEX idx_chat_messages_room_seq (room_id=? AND seq>?)",
+        )
+
+    def test_list_chat_messages_from_start(self) -> None:
+        self._assert_plan(
+            lambda conn: storage.list_chat_messages(conn, room_id="room-1", after=None, limit=10),
+            "SEARCH chat_messages USING INDEX idx_chat_messages_room_seq (room_id=?)",
+        )
+
+    def test_list_chat_rooms(self) -> None:
+        self._assert_plan(storage.list_chat_rooms, "SCAN chat_rooms USING INDEX idx_chat_rooms_created")
+
+    def test_list_purchases_by_listing(self) -> None:
+        self._assert_plan(
+            lambda conn: storage.list_purchases(conn, listing_id="listing-1"),
+            "SEARCH purchases USING INDEX idx_purchases_listing (listing_id=?)",
+        )
+
+    def test_list_messages_by_channel(self) -> None:
+        self._assert_plan(
+            lambda conn: storage.list_messages(conn, channel="general"),
+            "SEARCH messages USING INDEX idx_messages_channel (channel=?)",
+        )
+
+    def test_list_entertainment_events_by_item(self) -> None:
+        self._assert_plan(
+            lambda conn: storage.list_entertainment_events(conn, item_id="ent-001"),
+            "SEARCH entertainment_events USING INDEX idx_entertainment_events_item (item_id=?)",
+        )
+
+    def test_primary_key_listings(self) -> None:
+        self._assert_plan(storage.list_receipts, "SCAN receipts USING INDEX sqlite_autoindex_receipts_1")
+        self._assert_plan(storage.list_trades, "SCAN trades USING INDEX sqlite_autoindex_trades_1")
+        self._assert_plan(storage.list_listings, "SCAN listings USING INDEX sqlite_autoindex_listings_1")
+        self._assert_plan(storage.list_purchases, "SCAN purchases USING INDEX sqlite_autoindex_purchases_1")
+        self._assert_plan(
+            storage.list_entertainment_items,
+            "SCAN entertainment_items USING INDEX sqlite_autoindex_entertainment_items_1",
+        )
+
+    def test_keyset_pages_seek_on_index(self) -> None:
+        self._assert_plan(
+            lambda conn: list(
+                storage.iter_orders(conn, side="SELL", asset_in="ECHO", asset_out="NYXT", after=(10, "o-1"), limit=3)
+            ),
+            "SEARCH orders USING COVERING INDEX idx_orders_book_asc "
+            "(side=? AND asset_in=? AND asset_out=? AND (price,order_id)>(?,?))",
+        )
+        self._assert_plan(
+            lambda conn: list(storage.iter_trades(conn, after="trade-1", limit=3)),
+            "SEARCH trades USING INDEX sqlite_autoindex_trades_1 (trade_id>?)",
+        )
+        self._assert_plan(
+            lambda conn: list(storage.iter_purchases(conn, listing_id="listing-1", after="purchase-1", limit=3)),
+            "SEARCH purchases USING INDEX idx_purchases_listing (listing_id=? AND purchase_id>?)",
+        )
+        self._assert_plan(
+            lambda conn: list(storage.iter_chat_rooms(conn, after=(1, "room-1"), limit=3)),
+            "SEARCH chat_rooms USING INDEX idx_chat_rooms_created ((created_at,room_id)>(?,?))",
+        )
+
+    def test_receipts_run_index_exists(self) -> None:
+        plan = self._plan(lambda conn: storage.load_by_id(conn, "receipts", "run_id", "run-1"))
+        self.assertIn("SEARCH receipts USING INDEX idx_receipts_run (run_id=?)", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
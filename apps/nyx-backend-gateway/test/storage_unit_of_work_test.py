@@ -0,0 +1,99 @@
+import _bootstrap
+import sqlite3
+import tempfile
+from pathlib import Path
+import unittest
+
+from nyx_backend_gateway.exchange import place_order
+from nyx_backend_gateway.storage import (
+    Order,
+    StorageError,
+    StoragePragmas,
+    TUNED_PRAGMAS,
+    apply_pragmas,
+    configure_pragmas,
+    create_connection,
+    insert_order,
+    list_orders,
+    list_trades,
+    open_connection,
+    unit_of_work,
+)
+
+
+def _order(order_id: str, side: str, price: int, amount: int = 5) -> Order:
+    asset_in, asset_out = ("NYXT", "ECHO") if side == "BUY" else ("ECHO", "NYXT")
+    return Order(
+        order_id=order_id,
+        side=side,
+        amount=amount,
+        price=price,
+        asset_in=asset_in,
+        asset_out=asset_out,
+        run_id=f"run-{order_id}",
+    )
+
+
+class StorageUnitOfWorkTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "gateway.db"
+        self.conn = create_connection(self.db_path)
+        self.commits = 0
+        self.conn.set_trace_callback(self._trace)
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _trace(self, statement: str) -> None:
+        if statement.strip().upper() == "COMMIT":
+            self.commits += 1
+
+    def test_operation_commits_once(self) -> None:
+        insert_order(self.conn, _order("sell-1", "SELL", 10))
+        self.commits = 0
+        with unit_of_work(self.conn):
+            place_order(self.conn, _order("buy-1", "BUY", 10, amount=3))
+        self.assertEqual(self.commits, 1)
+        reader = open_connection(self.db_path)
+        self.assertEqual(len(list_trades(reader)), 1)
+        self.assertEqual(int(list_orders(reader, side="SELL")[0]["amount"]), 2)
+        reader.close()
+
+    def test_failure_rolls_back_whole_operation(self) -> None:
+        with self.assertRaises(StorageError):
+            with unit_of_work(self.conn):
+                insert_order(self.conn, _order("buy-1", "BUY", 10))
+                with unit_of_work(self.conn):
+                    insert_order(self.conn, _order("buy-2", "BUY", 11))
+                insert_order(self.conn, _order("bad id", "BUY", 12))
+        self.assertEqual(self.commits, 0)
+        self.assertEqual(list_orders(self.conn), [])
+
+    def test_plain_connection_rejected(self) -> None:
+        conn = sqlite3.connect(str(self.db_path))
+        with self.assertRaises(StorageError):
+            with unit_of_work(conn):
+                pass
+        conn.close()
+
+    def test_tuned_pragmas_applied_on_open(self) -> None:
+        configure_pragmas(TUNED_PRAGMAS)
+        try:
+            conn = open_connection(self.db_path)
+        finally:
+            configure_pragmas(None)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], TUNED_PRAGMAS.busy_timeout_ms)
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -TUNED_PRAGMAS.cache_size_kib)
+        conn.close()
+
+    def test_invalid_pragmas_rejected(self) -> None:
+        with self.assertRaises(StorageError):
+            apply_pragmas(self.conn, StoragePragmas(journal_mode="WAL; DROP TABLE orders"))
+
+
+if __name__ == "__main__":
+    unittest.main()
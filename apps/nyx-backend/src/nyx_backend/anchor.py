@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import re
+import subprocess
+import threading
+import zlib
+
+
+class AnchorError(ValueError):
+    pass
+
+
+_SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+_ABBREV_LEN = 7
+
+
+def _repo_root() -> Path:
+    path = Path(__file__).resolve()
+    for _ in range(5):
+        path = path.parent
+    return path
+
+
+def _default_anchor_file() -> Path:
+    override = os.environ.get("NYX_ANCHOR_FILE", "").strip()
+    if override:
+        return Path(override)
+    return _repo_root() / "anchor.json"
+
+
+def _git_dir(root: Path) -> Path | None:
+    candidate = root / ".git"
+    if candidate.is_dir():
+        return candidate
+    if candidate.is_file():
+        text = candidate.read_text(encoding="utf-8").strip()
+        if text.startswith("gitdir:"):
+            target = Path(text.split(":", 1)[1].strip())
+            if not target.is_absolute():
+                target = (root / target).resolve()
+            if target.is_dir():
+                return target
+    return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    commondir = git_dir / "commondir"
+    if commondir.is_file():
+        target = Path(commondir.read_text(encoding="utf-8").strip())
+        if not target.is_absolute():
+            target = (git_dir / target).resolve()
+        return target
+    return git_dir
+
+
+def _read_packed_refs(common_dir: Path) -> tuple[dict[str, str], dict[str, str]]:
+    refs: dict[str, str] = {}
+    peeled: dict[str, str] = {}
+    path = common_dir / "packed-refs"
+    if not path.is_file():
+        return refs, peeled
+    last_ref = ""
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("^"):
+            if last_ref:
+                peeled[last_ref] = line[1:].strip()
+            continue
+        parts = line.split(" ", 1)
+        if len(parts) != 2:
+            continue
+        sha, name = parts[0].strip(), parts[1].strip()
+        refs[name] = sha
+        last_ref = name
+    return refs, peeled
+
+
+def _loose_ref(git_dir: Path, common_dir: Path, name: str) -> str | None:
+    for base in (git_dir, common_dir):
+        path = base / name
+        if path.is_file():
+            return path.read_text(encoding="utf-8").strip()
+    return None
+
+
+def _resolve_ref(git_dir: Path, common_dir: Path, packed: dict[str, str], name: str) -> str:
+    seen: set[str] = set()
+    current = name
+    while current not in seen:
+        seen.add(current)
+        value = _loose_ref(git_dir, common_dir, current)
+        if value is None:
+            value = packed.get(current)
+        if value is None:
+            raise AnchorError(f"git ref not found: {current}")
+        if value.startswith("ref:"):
+            current = value.split(":", 1)[1].strip()
+            continue
+        if not _SHA_PATTERN.fullmatch(value):
+            raise AnchorError(f"git ref invalid: {current}")
+        return value
+    raise AnchorError("git ref cycle")
+
+
+def _peel_loose_tag(common_dir: Path, sha: str) -> str | None:
+    path = common_dir / "objects" / sha[:2] / sha[2:]
+    if not path.is_file():
+        return None
+    try:
+        raw = zlib.decompress(path.read_bytes())
+    except zlib.error:
+        return None
+    header, _, body = raw.partition(b"\x00")
+    if not header.startswith(b"tag "):
+        return sha
+    for line in body.split(b"\n"):
+        if line.startswith(b"object "):
+            return line[len(b"object "):].decode("ascii").strip()
+        if not line:
+            break
+    return None
+
+
+def _tag_targets(common_dir: Path, packed: dict[str, str], peeled: dict[str, str]) -> dict[str, str | None]:
+    targets: dict[str, str | None] = {}
+    for name, sha in packed.items():
+        if name.startswith("refs/tags/"):
+            targets[name[len("refs/tags/"):]] = peeled.get(name, sha)
+    tags_dir = common_dir / "refs" / "tags"
+    if tags_dir.is_dir():
+        for path in tags_dir.rglob("*"):
+            if not path.is_file():
+                continue
+            sha = path.read_text(encoding="utf-8").strip()
+            if not _SHA_PATTERN.fullmatch(sha):
+                continue
+            targets[path.relative_to(tags_dir).as_posix()] = _peel_loose_tag(common_dir, sha)
+    return targets
+
+
+def _git_describe(root: Path) -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--tags", "--always"],
+            cwd=str(root),
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    value = result.stdout.strip()
+    return value or None
+
+
+def _anchor_from_git(root: Path) -> dict[str, str] | None:
+    git_dir = _git_dir(root)
+    if git_dir is None:
+        return None
+    common_dir = _common_dir(git_dir)
+    packed, peeled = _read_packed_refs(common_dir)
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    if head.startswith("ref:"):
+        commit = _resolve_ref(git_dir, common_dir, packed, head.split(":", 1)[1].strip())
+    elif _SHA_PATTERN.fullmatch(head):
+        commit = head
+    else:
+        raise AnchorError("git HEAD invalid")
+    targets = _tag_targets(common_dir, packed, peeled)
+    tags = sorted(tag for tag, target in targets.items() if target == commit)
+    tag = tags[0] if tags else ""
+    if tag:
+        describe = tag
+    elif not targets:
+        describe = commit[:_ABBREV_LEN]
+    else:
+        describe = _git_describe(root) or commit[:_ABBREV_LEN]
+        if targets.get(describe, "") is None:
+            tag = describe
+    return {"tag": tag, "commit": commit, "describe": describe}
+
+
+def _anchor_from_file(path: Path) -> dict[str, str] | None:
+    if not path.is_file():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise AnchorError("anchor file invalid json") from exc
+    if not isinstance(payload, dict):
+        raise AnchorError("anchor file must be object")
+    anchor: dict[str, str] = {}
+    for key in ("tag", "commit", "describe"):
+        value = payload.get(key, "")
+        if not isinstance(value, str):
+            raise AnchorError(f"anchor file {key} must be text")
+        anchor[key] = value
+    if not _SHA_PATTERN.fullmatch(anchor["commit"]):
+        raise AnchorError("anchor file commit invalid")
+    return anchor
+
+
+class ProtocolAnchorProvider:
+    def __init__(self, root: Path | None = None, anchor_file: Path | None = None) -> None:
+        self._root = root
+        self._anchor_file = anchor_file
+        self._lock = threading.Lock()
+        self._anchor: dict[str, str] | None = None
+        self._source = ""
+        self._resolutions = 0
+
+    @property
+    def resolutions(self) -> int:
+        return self._resolutions
+
+    @property
+    def source(self) -> str:
+        return self._source
+
+    def _resolve(self) -> tuple[dict[str, str], str]:
+        root = self._root or _repo_root()
+        anchor = _anchor_from_git(root)
+        if anchor is not None:
+            return anchor, "git"
+        anchor = _anchor_from_file(self._anchor_file or _default_anchor_file())
+        if anchor is not None:
+            return anchor, "file"
+        raise AnchorError("protocol anchor unavailable")
+
+    def get(self) -> dict[str, str]:
+        anchor = self._anchor
+        if anchor is None:
+            with self._lock:
+                if self._anchor is None:
+                    self._anchor, self._source = self._resolve()
+                    self._resolutions += 1
+                anchor = self._anchor
+        return dict(anchor)
+
+    def reload(self) -> dict[str, str]:
+        with self._lock:
+            self._anchor, self._source = self._resolve()
+            self._resolutions += 1
+            anchor = self._anchor
+        return dict(anchor)
+
+
+_PROVIDER = ProtocolAnchorProvider()
+
+
+def get_anchor_provider() -> ProtocolAnchorProvider:
+    return _PROVIDER
+
+
+def protocol_anchor() -> dict[str, str]:
+    return _PROVIDER.get()
+
+
+def reload_protocol_anchor() -> dict[str, str]:
+    return _PROVIDER.reload()
+
+
+def anchor_resolution_count() -> int:
+    return _PROVIDER.resolutions
+
+
+def write_anchor_file(path: Path, root: Path | None = None) -> dict[str, str]:
+    anchor = _anchor_from_git(root or _repo_root())
+    if anchor is None:
+        raise AnchorError("git checkout required to write anchor file")
+    path.write_text(json.dumps(anchor, sort_keys=True, separators=(",", ":")) + "\n", encoding="utf-8")
+    return anchor
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NYX protocol anchor")
+    parser.add_argument("--write", default="", help="write anchor.json for builds without .git")
+    args = parser.parse_args()
+    if args.write:
+        anchor = write_anchor_file(Path(args.write))
+    else:
+        anchor = protocol_anchor()
+    print(json.dumps(anchor, sort_keys=True, separators=(",", ":")))
+    return 0
+
+
+__all__ = [
+    "AnchorError",
+    "ProtocolAnchorProvider",
+    "anchor_resolution_count",
+    "get_anchor_provider",
+    "protocol_anchor",
+    "reload_protocol_anchor",
+    "write_anchor_file",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
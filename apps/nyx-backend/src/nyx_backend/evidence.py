@@ -2,15 +2,24 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import hashlib
-import io
 import json
 import os
 from pathlib import Path
 import re
-import subprocess
+import shutil
+import sqlite3
 import sys
+import threading
+import time
+from typing import BinaryIO
 import zipfile
 
+from nyx_backend.anchor import AnchorError, protocol_anchor
+from nyx_backend.evidence_store import STORE_DIR_NAME, EvidenceStoreError, open_store
+from nyx_backend.run_catalog import CatalogEntry, CatalogError, RunCatalog, open_catalog
+from nyx_backend.trace_cache import TraceCacheError, get_trace_cache
+from nyx_backend.tracing import span
+
 
 class EvidenceError(ValueError):
     pass
@@ -20,6 +29,11 @@ _MAX_PAYLOAD_DEPTH = 6
 _MAX_PAYLOAD_ITEMS = 64
 _MAX_TEXT_LEN = 256
 
+EXPORT_DIR_NAME = ".exports"
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+_CATALOG_REBUILD_LOCK = threading.Lock()
+
 ALLOWED_ARTIFACT_NAMES = {
     "protocol_anchor.json",
     "inputs.json",
@@ -50,6 +64,18 @@ class RunRecord:
     run_id: str
     status: str
     error: str | None
+    module: str | None = None
+    action: str | None = None
+    seed: int | None = None
+    state_hash: str | None = None
+    replay_ok: bool | None = None
+    created_at: int | None = None
+
+
+@dataclass(frozen=True)
+class FeeSettings:
+    treasury_address: str
+    platform_fee_bps: int | None
 
 
 def _repo_root() -> Path:
@@ -135,23 +161,11 @@ def _run_root(base_dir: Path | None = None) -> Path:
     return root
 
 
-def _run_git(args: list[str]) -> str:
-    result = subprocess.run(
-        ["git", *args],
-        check=True,
-        capture_output=True,
-        text=True,
-    )
-    return result.stdout.strip()
-
-
 def _protocol_anchor() -> dict[str, str]:
-    commit = _run_git(["rev-parse", "HEAD"])
-    describe = _run_git(["describe", "--tags", "--always"])
-    tags_raw = _run_git(["tag", "--points-at", "HEAD"])
-    tags = sorted([t for t in tags_raw.splitlines() if t.strip()])
-    tag = tags[0] if tags else ""
-    return {"tag": tag, "commit": commit, "describe": describe}
+    try:
+        return protocol_anchor()
+    except AnchorError as exc:
+        raise EvidenceError(str(exc)) from exc
 
 
 def _validate_text(value: object, name: str) -> str:
@@ -203,40 +217,14 @@ def _summary_stdout(state_hash: str, receipt_hashes: list[str], replay_ok: bool)
     )
 
 
-def _platform_fee_for_marketplace(payload: object) -> dict[str, object]:
-    from action import ActionDescriptor, ActionKind
-    from engine import FeeEngineV0
-    from l2_platform_fee.fee_hook import enforce_platform_fee, quote_platform_fee
-
-    action = ActionDescriptor(
-        kind=ActionKind.STATE_MUTATION,
-        module="marketplace",
-        action="order_intent",
-        payload=payload,
-    )
-    engine = FeeEngineV0()
-    payer = "platform-payer"
-    platform_amount = _platform_fee_amount(payload)
-    quote = quote_platform_fee(
-        engine,
-        action,
-        payer=payer,
-        platform_fee_amount=platform_amount,
-    )
-    receipt = enforce_platform_fee(
-        engine,
-        quote,
-        paid_protocol_vector=quote.protocol_quote.fee_vector,
-        paid_platform_amount=quote.platform_fee_amount,
-        payer=quote.payer,
-    )
+def _platform_fee_for_marketplace(fee_quote: dict[str, object], settings: FeeSettings) -> dict[str, object]:
     return {
-        "platform_fee_amount": quote.platform_fee_amount,
-        "protocol_fee_total": quote.protocol_quote.fee_vector.total(),
-        "total_due": quote.total_due,
-        "total_paid": receipt.total_paid,
-        "payer": quote.payer,
-        "treasury_address": _treasury_address(),
+        "platform_fee_amount": fee_quote["platform_fee_amount"],
+        "protocol_fee_total": fee_quote["protocol_fee_total"],
+        "total_due": fee_quote["protocol_fee_total"] + fee_quote["platform_fee_amount"],
+        "total_paid": fee_quote["total_paid"],
+        "payer": "platform-payer",
+        "treasury_address": fee_quote.get("treasury_address") or settings.treasury_address,
     }
 
 
@@ -249,16 +237,26 @@ def _treasury_address() -> str:
     return address
 
 
-def _platform_fee_amount(payload: object) -> int:
+def _platform_fee_bps() -> int | None:
     raw = os.environ.get("NYX_PLATFORM_FEE_BPS", "").strip()
     if not raw:
-        return 1
+        return None
     try:
         bps = int(raw)
     except ValueError as exc:
         raise EvidenceError("NYX_PLATFORM_FEE_BPS must be int") from exc
     if bps < 0 or bps > 10_000:
         raise EvidenceError("NYX_PLATFORM_FEE_BPS out of bounds")
+    return bps
+
+
+def _env_fee_settings() -> FeeSettings:
+    return FeeSettings(treasury_address=_treasury_address(), platform_fee_bps=_platform_fee_bps())
+
+
+def _platform_fee_amount(payload: object, bps: int | None) -> int:
+    if bps is None:
+        return 1
     if bps == 0:
         return 0
     base = 1
@@ -272,17 +270,12 @@ def _platform_fee_amount(payload: object) -> int:
     return amount if amount > 0 else 1
 
 
-def _fee_summary(module: str, action: str, payload: object) -> dict[str, object]:
+def _quote_fee(module: str, action: str, payload: object, settings: FeeSettings) -> dict[str, int]:
     from action import ActionDescriptor, ActionKind
     from engine import FeeEngineV0
     from l2_platform_fee.fee_hook import enforce_platform_fee, quote_platform_fee
 
-    platform_amount = _platform_fee_amount(payload)
-    payer = "testnet-payer"
-    if isinstance(payload, dict):
-        candidate = payload.get("from_address")
-        if isinstance(candidate, str) and candidate:
-            payer = candidate
+    platform_amount = _platform_fee_amount(payload, settings.platform_fee_bps)
     descriptor = ActionDescriptor(
         kind=ActionKind.STATE_MUTATION,
         module=module,
@@ -290,7 +283,7 @@ def _fee_summary(module: str, action: str, payload: object) -> dict[str, object]
         payload=payload,
     )
     engine = FeeEngineV0()
-    quote = quote_platform_fee(engine, descriptor, payer=payer, platform_fee_amount=platform_amount)
+    quote = quote_platform_fee(engine, descriptor, payer="testnet-payer", platform_fee_amount=platform_amount)
     receipt = enforce_platform_fee(
         engine,
         quote,
@@ -299,13 +292,47 @@ def _fee_summary(module: str, action: str, payload: object) -> dict[str, object]
         payer=quote.payer,
     )
     return {
-        "fee_total": receipt.total_paid,
+        "protocol_fee_total": quote.protocol_quote.fee_vector.total(),
+        "platform_fee_amount": quote.platform_fee_amount,
+        "total_paid": receipt.total_paid,
+    }
+
+
+def _validate_fee_quote(fee_quote: object) -> dict[str, object] | None:
+    if fee_quote is None:
+        return None
+    if not isinstance(fee_quote, dict):
+        raise EvidenceError("fee_quote must be dict")
+    out: dict[str, object] = {}
+    for key in ("protocol_fee_total", "platform_fee_amount", "total_paid"):
+        value = fee_quote.get(key)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise EvidenceError(f"fee_quote {key} must be non-negative int")
+        out[key] = value
+    if out["total_paid"] != out["protocol_fee_total"] + out["platform_fee_amount"]:
+        raise EvidenceError("fee_quote total mismatch")
+    treasury = fee_quote.get("treasury_address")
+    if treasury is not None:
+        if not isinstance(treasury, str) or not treasury or len(treasury) > _MAX_TEXT_LEN:
+            raise EvidenceError("fee_quote treasury_address must be text")
+        out["treasury_address"] = treasury
+    return out
+
+
+def _fee_summary(payload: object, fee_quote: dict[str, object], settings: FeeSettings) -> dict[str, object]:
+    payer = "testnet-payer"
+    if isinstance(payload, dict):
+        candidate = payload.get("from_address")
+        if isinstance(candidate, str) and candidate:
+            payer = candidate
+    return {
+        "fee_total": fee_quote["total_paid"],
         "fee_breakdown": {
-            "protocol_fee_total": quote.protocol_quote.fee_vector.total(),
-            "platform_fee_amount": quote.platform_fee_amount,
+            "protocol_fee_total": fee_quote["protocol_fee_total"],
+            "platform_fee_amount": fee_quote["platform_fee_amount"],
         },
-        "payer": quote.payer,
-        "treasury_address": _treasury_address(),
+        "payer": payer,
+        "treasury_address": fee_quote.get("treasury_address") or settings.treasury_address,
     }
 
 
@@ -335,6 +362,22 @@ def run_evidence(
     action: str,
     payload: object | None = None,
     base_dir: Path | None = None,
+    fee_quote: dict[str, object] | None = None,
+    fee_settings: FeeSettings | None = None,
+) -> EvidencePayload:
+    with span("evidence.run_evidence"):
+        return _run_evidence(seed, run_id, module, action, payload, base_dir, fee_quote, fee_settings)
+
+
+def _run_evidence(
+    seed: int,
+    run_id: str,
+    module: str,
+    action: str,
+    payload: object | None,
+    base_dir: Path | None,
+    fee_quote: dict[str, object] | None,
+    fee_settings: FeeSettings | None,
 ) -> EvidencePayload:
     if not isinstance(seed, int) or isinstance(seed, bool):
         raise EvidenceError("seed must be int")
@@ -343,24 +386,23 @@ def run_evidence(
     mod = _validate_text(module, "module")
     act = _validate_text(action, "action")
     payload = _validate_payload(payload)
+    fee_quote = _validate_fee_quote(fee_quote)
 
     _ensure_paths()
-    from e2e_private_transfer.pipeline import run_private_transfer
-    from e2e_private_transfer.replay import replay_and_verify
 
     rid = _sanitize_run_id(run_id)
     run_root = _run_root(base_dir)
     run_dir = _safe_run_dir(run_root, rid)
-    artifacts_dir = run_dir / "artifacts"
-    artifacts_dir.mkdir(parents=True, exist_ok=True)
-    (run_dir / "run_id.txt").write_text(rid + "\n", encoding="utf-8")
 
-    trace, _ = run_private_transfer(seed=seed)
-    replay_ok = replay_and_verify(trace)
-    if not replay_ok:
-        raise EvidenceError("replay verification failed")
+    with span("evidence.trace_cache"):
+        try:
+            trace = get_trace_cache().get(seed)
+        except TraceCacheError as exc:
+            raise EvidenceError(str(exc)) from exc
+    replay_ok = True
 
-    protocol_anchor = _protocol_anchor()
+    with span("evidence.protocol_anchor"):
+        protocol_anchor = _protocol_anchor()
     inputs = {"seed": seed, "module": mod, "action": act, "payload": payload}
     receipt_hashes = [
         trace.fee.receipt_hash_hex,
@@ -372,57 +414,169 @@ def run_evidence(
         "receipt_hashes": receipt_hashes,
         "replay_ok": replay_ok,
     }
-    if (mod, act) in {
-        ("exchange", "route_swap"),
-        ("exchange", "place_order"),
-        ("exchange", "cancel_order"),
-        ("marketplace", "order_intent"),
-        ("marketplace", "listing_publish"),
-        ("marketplace", "purchase_listing"),
-        ("wallet", "transfer"),
-    }:
-        outputs.update(_fee_summary(mod, act, payload))
-    if mod == "marketplace" and act == "order_intent":
-        outputs["platform_fee"] = _platform_fee_for_marketplace(payload)
-    if mod == "entertainment" and act == "state_step":
-        outputs["entertainment_state"] = _entertainment_state(seed, payload)
-
-    (artifacts_dir / "protocol_anchor.json").write_text(_json_dumps(protocol_anchor), encoding="utf-8")
-    (artifacts_dir / "inputs.json").write_text(_json_dumps(inputs), encoding="utf-8")
-    (artifacts_dir / "outputs.json").write_text(_json_dumps(outputs), encoding="utf-8")
-    (artifacts_dir / "receipt_hashes.json").write_text(_json_dumps(receipt_hashes), encoding="utf-8")
-    (artifacts_dir / "state_hash.txt").write_text(outputs["state_hash"] + "\n", encoding="utf-8")
-    (artifacts_dir / "replay_ok.txt").write_text(("true" if replay_ok else "false") + "\n", encoding="utf-8")
-
-    stdout_text = _summary_stdout(outputs["state_hash"], receipt_hashes, replay_ok)
-    (artifacts_dir / "stdout.txt").write_text(stdout_text, encoding="utf-8")
-
-    evidence_payload = {
-        "protocol_anchor": protocol_anchor,
-        "inputs": inputs,
-        "outputs": outputs,
-        "receipt_hashes": receipt_hashes,
-        "state_hash": outputs["state_hash"],
-        "replay_ok": replay_ok,
-        "stdout": stdout_text,
-    }
-    (run_dir / "evidence.json").write_text(_json_dumps(evidence_payload), encoding="utf-8")
-
-    return EvidencePayload(
+    with span("evidence.outputs"):
+        if (mod, act) in {
+            ("exchange", "route_swap"),
+            ("exchange", "place_order"),
+            ("exchange", "cancel_order"),
+            ("marketplace", "order_intent"),
+            ("marketplace", "listing_publish"),
+            ("marketplace", "purchase_listing"),
+            ("wallet", "transfer"),
+        }:
+            fee_settings = fee_settings or _env_fee_settings()
+            if fee_quote is None:
+                fee_quote = _quote_fee(mod, act, payload, fee_settings)
+            outputs.update(_fee_summary(payload, fee_quote, fee_settings))
+        if mod == "marketplace" and act == "order_intent":
+            outputs["platform_fee"] = _platform_fee_for_marketplace(fee_quote, fee_settings)
+        if mod == "entertainment" and act == "state_step":
+            outputs["entertainment_state"] = _entertainment_state(seed, payload)
+
+    evidence = EvidencePayload(
         protocol_anchor=protocol_anchor,
         inputs=inputs,
         outputs=outputs,
         receipt_hashes=receipt_hashes,
         state_hash=outputs["state_hash"],
         replay_ok=replay_ok,
-        stdout=stdout_text,
+        stdout=_summary_stdout(outputs["state_hash"], receipt_hashes, replay_ok),
+    )
+    with span("evidence.write_artifacts"):
+        try:
+            store = open_store(run_root)
+            anchor_digest = store.put_blob(_json_dumps(protocol_anchor).encode("utf-8"))
+            created_at = int(time.time())
+            store.append(run_dir.name, rid, anchor_digest, _evidence_record(evidence), created_at)
+        except (EvidenceStoreError, OSError) as exc:
+            raise EvidenceError(f"evidence store write failed: {exc}") from exc
+        if run_dir.exists():
+            shutil.rmtree(run_dir, ignore_errors=True)
+    with span("evidence.catalog"):
+        try:
+            _catalog(run_root).record(_catalog_entry(run_dir.name, rid, evidence, created_at))
+        except sqlite3.Error as exc:
+            raise EvidenceError(f"run catalog write failed: {exc}") from exc
+    return evidence
+
+
+def _evidence_record(evidence: EvidencePayload) -> dict[str, object]:
+    return {
+        "inputs": evidence.inputs,
+        "outputs": evidence.outputs,
+        "receipt_hashes": evidence.receipt_hashes,
+        "state_hash": evidence.state_hash,
+        "replay_ok": evidence.replay_ok,
+        "stdout": evidence.stdout,
+    }
+
+
+def _legacy_files(run_id: str, evidence: EvidencePayload) -> dict[str, bytes]:
+    evidence_json = {"protocol_anchor": evidence.protocol_anchor, **_evidence_record(evidence)}
+    files = {
+        "run_id.txt": run_id + "\n",
+        "evidence.json": _json_dumps(evidence_json),
+        "artifacts/protocol_anchor.json": _json_dumps(evidence.protocol_anchor),
+        "artifacts/inputs.json": _json_dumps(evidence.inputs),
+        "artifacts/outputs.json": _json_dumps(evidence.outputs),
+        "artifacts/receipt_hashes.json": _json_dumps(evidence.receipt_hashes),
+        "artifacts/state_hash.txt": evidence.state_hash + "\n",
+        "artifacts/replay_ok.txt": ("true" if evidence.replay_ok else "false") + "\n",
+        "artifacts/stdout.txt": evidence.stdout,
+    }
+    return {name: text.encode("utf-8") for name, text in files.items()}
+
+
+def _load_stored(run_root: Path, key: str) -> EvidencePayload | None:
+    try:
+        store = open_store(run_root)
+        stored = store.load(key)
+        if stored is None:
+            return None
+        anchor = store.get_json_blob(stored.anchor)
+    except (EvidenceStoreError, OSError, ValueError) as exc:
+        raise EvidenceError(f"evidence store read failed: {exc}") from exc
+    record = stored.evidence
+    if not isinstance(record, dict) or not isinstance(record.get("receipt_hashes"), list):
+        raise EvidenceError("receipt_hashes must be list")
+    return EvidencePayload(
+        protocol_anchor=anchor,
+        inputs=record.get("inputs"),
+        outputs=record.get("outputs"),
+        receipt_hashes=record["receipt_hashes"],
+        state_hash=record.get("state_hash"),
+        replay_ok=record.get("replay_ok") is True,
+        stdout=record.get("stdout"),
     )
 
 
+def evidence_version(run_id: str, base_dir: Path | None = None) -> tuple[object, ...] | None:
+    rid = _sanitize_run_id(run_id)
+    run_root = _run_root(base_dir)
+    run_dir = _safe_run_dir(run_root, rid)
+    try:
+        located = open_store(run_root).locate(run_dir.name)
+    except (EvidenceStoreError, OSError) as exc:
+        raise EvidenceError(f"evidence store read failed: {exc}") from exc
+    if located is not None:
+        return ("pack", *located)
+    try:
+        stat = (run_dir / "evidence.json").stat()
+    except FileNotFoundError:
+        return None
+    return ("file", stat.st_mtime_ns, stat.st_size)
+
+
+def evidence_artifacts(run_id: str, evidence: EvidencePayload) -> dict[str, bytes]:
+    rid = _sanitize_run_id(run_id)
+    return {
+        name.removeprefix("artifacts/"): content
+        for name, content in _legacy_files(rid, evidence).items()
+        if name.startswith("artifacts/")
+    }
+
+
+def materialize_run(run_id: str, base_dir: Path | None = None) -> Path:
+    rid = _sanitize_run_id(run_id)
+    run_root = _run_root(base_dir)
+    run_dir = _safe_run_dir(run_root, rid)
+    if (run_dir / "evidence.json").exists():
+        return run_dir
+    evidence = _load_stored(run_root, run_dir.name)
+    if evidence is None:
+        raise EvidenceError("run_id not found")
+    stage = run_root / f".stage-{run_dir.name}-{os.urandom(4).hex()}"
+    try:
+        (stage / "artifacts").mkdir(parents=True)
+        for name, content in _legacy_files(rid, evidence).items():
+            (stage / name).write_bytes(content)
+        if run_dir.exists() and not (run_dir / "evidence.json").exists():
+            shutil.rmtree(run_dir, ignore_errors=True)
+        try:
+            os.rename(stage, run_dir)
+        except OSError:
+            if not (run_dir / "evidence.json").exists():
+                raise
+    finally:
+        shutil.rmtree(stage, ignore_errors=True)
+    return run_dir
+
+
+def materialize_artifact(run_id: str, name: str, base_dir: Path | None = None) -> Path:
+    run_root = _run_root(base_dir)
+    path = _safe_artifact_path(run_root, run_id, name)
+    if not path.exists():
+        materialize_run(run_id, base_dir=run_root)
+    return path
+
+
 def load_evidence(run_id: str, base_dir: Path | None = None) -> EvidencePayload:
     rid = _sanitize_run_id(run_id)
     run_root = _run_root(base_dir)
     run_dir = _safe_run_dir(run_root, rid)
+    stored = _load_stored(run_root, run_dir.name)
+    if stored is not None:
+        return stored
     artifacts_dir = run_dir / "artifacts"
     if not artifacts_dir.exists():
         raise EvidenceError("run_id not found")
@@ -464,33 +618,189 @@ def verify_evidence_payload(payload: EvidencePayload) -> None:
         raise EvidenceError("replay_ok mismatch")
 
 
-def list_runs(base_dir: Path | None = None) -> list[RunRecord]:
-    run_root = _run_root(base_dir)
-    if not run_root.exists():
-        return []
-    records: list[RunRecord] = []
+def _catalog_entry(
+    key: str, run_id: str, evidence: EvidencePayload | None, created_at: int, status: str = "complete"
+) -> CatalogEntry:
+    inputs = evidence.inputs if evidence is not None and isinstance(evidence.inputs, dict) else {}
+    seed = inputs.get("seed")
+    return CatalogEntry(
+        key=key,
+        run_id=run_id,
+        status=status,
+        module=inputs.get("module") if isinstance(inputs.get("module"), str) else None,
+        action=inputs.get("action") if isinstance(inputs.get("action"), str) else None,
+        seed=seed if isinstance(seed, int) and not isinstance(seed, bool) else None,
+        state_hash=evidence.state_hash if evidence is not None else None,
+        replay_ok=evidence.replay_ok if evidence is not None else None,
+        created_at=created_at,
+    )
+
+
+def _scan_runs(run_root: Path) -> list[CatalogEntry]:
+    entries: list[CatalogEntry] = []
+    for key, run_id, created_at in open_store(run_root).entries():
+        try:
+            evidence = _load_stored(run_root, key)
+        except EvidenceError:
+            evidence = None
+        status = "complete" if evidence is not None else "unknown"
+        entries.append(_catalog_entry(key, run_id, evidence, created_at, status))
+    stored = {entry.key for entry in entries}
     for entry in sorted(run_root.iterdir()):
-        if not entry.is_dir():
+        if entry.name.startswith(".") or entry.name in stored or not entry.is_dir():
             continue
-        status = "complete" if (entry / "artifacts").exists() else "unknown"
         run_id_path = entry / "run_id.txt"
         run_id = entry.name
         if run_id_path.exists():
             run_id = run_id_path.read_text(encoding="utf-8").strip() or entry.name
-        records.append(RunRecord(run_id=run_id, status=status, error=None))
-    return records
+        created_at = int(entry.stat().st_mtime)
+        evidence = None
+        if (entry / "artifacts").exists():
+            try:
+                evidence = load_evidence(run_id, base_dir=run_root)
+            except (EvidenceError, OSError, ValueError):
+                evidence = None
+        status = "complete" if evidence is not None else "unknown"
+        entries.append(_catalog_entry(entry.name, run_id, evidence, created_at, status))
+    return entries
+
+
+@dataclass(frozen=True)
+class RecoveryReport:
+    stage_dirs: int
+    temp_files: int
+    torn_bytes: int
+    materialized_dirs: int
+    catalog_rebuilt: bool
+
+
+def _materialized_intact(run_dir: Path, files: dict[str, bytes]) -> bool:
+    for name, content in files.items():
+        try:
+            if (run_dir / name).read_bytes() != content:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def recover_runs(base_dir: Path | None = None) -> RecoveryReport:
+    run_root = _run_root(base_dir)
+    stage_dirs = 0
+    for stage in run_root.glob(".stage-*"):
+        shutil.rmtree(stage, ignore_errors=True)
+        stage_dirs += 1
+    temp_files = 0
+    for directory in (run_root / STORE_DIR_NAME, run_root / EXPORT_DIR_NAME):
+        if directory.is_dir():
+            for tmp in directory.rglob(".*.tmp"):
+                tmp.unlink(missing_ok=True)
+                temp_files += 1
+    try:
+        store = open_store(run_root)
+    except (EvidenceStoreError, OSError) as exc:
+        raise EvidenceError(f"evidence store recovery failed: {exc}") from exc
+    materialized_dirs = 0
+    live = set()
+    for key, run_id, _ in store.entries():
+        live.add(key)
+        run_dir = run_root / key
+        if not run_dir.is_dir():
+            continue
+        try:
+            evidence = _load_stored(run_root, key)
+        except EvidenceError:
+            continue
+        if evidence is None or not _materialized_intact(run_dir, _legacy_files(run_id, evidence)):
+            shutil.rmtree(run_dir, ignore_errors=True)
+            materialized_dirs += 1
+    for entry in run_root.iterdir():
+        if not entry.name.startswith(".") and entry.is_dir():
+            live.add(entry.name)
+    catalog = open_catalog(run_root)
+    try:
+        catalog_rebuilt = catalog.needs_rebuild or set(catalog.keys()) != live
+        if catalog_rebuilt:
+            catalog.replace_all(_scan_runs(run_root))
+    except sqlite3.Error as exc:
+        raise EvidenceError(f"run catalog recovery failed: {exc}") from exc
+    return RecoveryReport(
+        stage_dirs=stage_dirs,
+        temp_files=temp_files,
+        torn_bytes=store.stats().recovered_bytes,
+        materialized_dirs=materialized_dirs,
+        catalog_rebuilt=catalog_rebuilt,
+    )
+
+
+def rebuild_catalog(base_dir: Path | None = None) -> int:
+    run_root = _run_root(base_dir)
+    try:
+        return open_catalog(run_root).replace_all(_scan_runs(run_root))
+    except sqlite3.Error as exc:
+        raise EvidenceError(f"run catalog rebuild failed: {exc}") from exc
+
+
+def _catalog(run_root: Path) -> RunCatalog:
+    catalog = open_catalog(run_root)
+    if catalog.needs_rebuild:
+        with _CATALOG_REBUILD_LOCK:
+            if catalog.needs_rebuild:
+                catalog.replace_all(_scan_runs(run_root))
+    return catalog
+
+
+def list_runs(
+    base_dir: Path | None = None,
+    module: str | None = None,
+    action: str | None = None,
+    replay_ok: bool | None = None,
+    sort: str = "run_id",
+    descending: bool = False,
+    after: tuple[object, ...] | None = None,
+    limit: int | None = None,
+) -> list[RunRecord]:
+    run_root = _run_root(base_dir)
+    try:
+        entries = _catalog(run_root).query(
+            module=module,
+            action=action,
+            replay_ok=replay_ok,
+            sort=sort,
+            descending=descending,
+            after=after,
+            limit=limit,
+        )
+    except CatalogError as exc:
+        raise EvidenceError(str(exc)) from exc
+    except sqlite3.Error as exc:
+        raise EvidenceError(f"run catalog read failed: {exc}") from exc
+    return [
+        RunRecord(
+            run_id=entry.run_id,
+            status=entry.status,
+            error=None,
+            module=entry.module,
+            action=entry.action,
+            seed=entry.seed,
+            state_hash=entry.state_hash,
+            replay_ok=entry.replay_ok,
+            created_at=entry.created_at,
+        )
+        for entry in entries
+    ]
 
 
 def _sha256_bytes(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
-def build_export_zip(run_id: str, base_dir: Path | None = None) -> bytes:
-    rid = _sanitize_run_id(run_id)
-    run_root = _run_root(base_dir)
+def _export_payloads(run_root: Path, rid: str) -> list[tuple[str, bytes]]:
     run_dir = _safe_run_dir(run_root, rid)
+    stored = _load_stored(run_root, run_dir.name)
+    legacy = _legacy_files(rid, stored) if stored is not None else None
     artifacts_dir = run_dir / "artifacts"
-    if not artifacts_dir.exists():
+    if legacy is None and not artifacts_dir.exists():
         raise EvidenceError("run_id not found")
 
     files = [
@@ -507,30 +817,123 @@ def build_export_zip(run_id: str, base_dir: Path | None = None) -> bytes:
     manifest_entries = []
     payloads: list[tuple[str, bytes]] = []
     for rel in files:
-        full_path = run_dir / rel
-        content = full_path.read_bytes()
+        content = legacy[rel.as_posix()] if legacy is not None else (run_dir / rel).read_bytes()
         payloads.append((str(rel), content))
         manifest_entries.append({"path": str(rel), "sha256": _sha256_bytes(content)})
 
     manifest = _json_dumps({"files": sorted(manifest_entries, key=lambda x: x["path"])})
     payloads.append(("manifest.json", manifest.encode("utf-8")))
+    return sorted(payloads, key=lambda item: item[0])
+
+
+def _zip_info(name: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name)
+    info.date_time = (1980, 1, 1, 0, 0, 0)
+    return info
+
+
+@dataclass(frozen=True)
+class ExportBundle:
+    run_id: str
+    path: Path
+    manifest_sha256: str
+    size: int
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.manifest_sha256}"'
+
+
+def _cached_export(path: Path, rid: str) -> ExportBundle | None:
+    try:
+        digest = path.with_suffix(".sha256").read_text(encoding="ascii").strip()
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return None
+    return ExportBundle(run_id=rid, path=path, manifest_sha256=digest, size=size)
+
+
+def export_bundle(run_id: str, base_dir: Path | None = None) -> ExportBundle:
+    rid = _sanitize_run_id(run_id)
+    run_root = _run_root(base_dir)
+    version = evidence_version(rid, base_dir=run_root)
+    key = _run_key(rid)
+    export_dir = run_root / EXPORT_DIR_NAME
+    payloads: list[tuple[str, bytes]] | None = None
+    if version is None:
+        payloads = _export_payloads(run_root, rid)
+        token = _sha256_bytes(dict(payloads)["manifest.json"])[:32]
+    else:
+        token = _sha256_bytes(_json_dumps(list(version)).encode("utf-8"))[:32]
+    path = export_dir / f"{key}-{token}.zip"
+    cached = _cached_export(path, rid)
+    if cached is not None:
+        return cached
+    if payloads is None:
+        payloads = _export_payloads(run_root, rid)
+    digest = _sha256_bytes(dict(payloads)["manifest.json"])
+    export_dir.mkdir(parents=True, exist_ok=True)
+    discard_exports(run_root, key)
+    suffix = os.urandom(4).hex()
+    tmp = export_dir / f".{path.name}.{suffix}.tmp"
+    tmp_digest = export_dir / f".{path.stem}.sha256.{suffix}.tmp"
+    try:
+        with tmp.open("wb") as handle:
+            with zipfile.ZipFile(handle, mode="w", compression=zipfile.ZIP_STORED) as zip_file:
+                for name, content in payloads:
+                    zip_file.writestr(_zip_info(name), content)
+        os.replace(tmp, path)
+        tmp_digest.write_text(digest + "\n", encoding="ascii")
+        os.replace(tmp_digest, path.with_suffix(".sha256"))
+    finally:
+        tmp.unlink(missing_ok=True)
+        tmp_digest.unlink(missing_ok=True)
+    return ExportBundle(run_id=rid, path=path, manifest_sha256=digest, size=path.stat().st_size)
+
+
+def build_export_zip(run_id: str, base_dir: Path | None = None) -> bytes:
+    return export_bundle(run_id, base_dir=base_dir).path.read_bytes()
+
+
+def discard_exports(run_root: Path, key: str) -> None:
+    for pattern in (f"{key}-*.sha256", f"{key}-*.zip"):
+        for path in (run_root / EXPORT_DIR_NAME).glob(pattern):
+            path.unlink(missing_ok=True)
+
 
-    payloads_sorted = sorted(payloads, key=lambda item: item[0])
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as zip_file:
-        for name, content in payloads_sorted:
-            info = zipfile.ZipInfo(name)
-            info.date_time = (1980, 1, 1, 0, 0, 0)
-            zip_file.writestr(info, content)
-    return buffer.getvalue()
+def write_bulk_export(bundles: list[ExportBundle], out: BinaryIO) -> None:
+    if not bundles:
+        raise EvidenceError("run_ids required")
+    unique = sorted({bundle.run_id: bundle for bundle in bundles}.values(), key=lambda bundle: bundle.run_id)
+    runs = []
+    with zipfile.ZipFile(out, mode="w", compression=zipfile.ZIP_STORED) as zip_file:
+        for bundle in unique:
+            name = f"{bundle.run_id}.zip"
+            info = _zip_info(name)
+            info.file_size = bundle.size
+            with bundle.path.open("rb") as src, zip_file.open(info, "w") as dst:
+                shutil.copyfileobj(src, dst, EXPORT_CHUNK_BYTES)
+            runs.append({"manifest_sha256": bundle.manifest_sha256, "path": name, "run_id": bundle.run_id})
+        zip_file.writestr(_zip_info("manifest.json"), _json_dumps({"runs": runs}))
 
 
 __all__ = [
     "EvidenceError",
     "EvidencePayload",
+    "ExportBundle",
+    "FeeSettings",
+    "RecoveryReport",
     "RunRecord",
     "build_export_zip",
+    "evidence_artifacts",
+    "evidence_version",
+    "export_bundle",
     "list_runs",
     "load_evidence",
+    "materialize_artifact",
+    "materialize_run",
+    "rebuild_catalog",
+    "recover_runs",
     "run_evidence",
+    "write_bulk_export",
 ]
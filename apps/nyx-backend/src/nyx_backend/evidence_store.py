@@ -0,0 +1,499 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import threading
+import time
+
+
+class EvidenceStoreError(ValueError):
+    pass
+
+
+STORE_DIR_NAME = ".evidence"
+SYNC_MODES = ("none", "always", "group")
+
+_PACK_FORMAT = "nyx-evidence-pack/1"
+_INDEX_FORMAT = "nyx-evidence-idx/1"
+_PACK_NAME = "runs.pack"
+_INDEX_NAME = "runs.idx"
+_OBJECTS_DIR = "objects"
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+_KEY = re.compile(r"[0-9a-f]{32}")
+_DEFAULT_BLOB_MEMO = 64
+_DEFAULT_COMPACT_MIN_DEAD_BYTES = 1 << 20
+_DEFAULT_SYNC_MODE = "group"
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+@dataclass(frozen=True)
+class StoredRun:
+    key: str
+    run_id: str
+    created_at: int
+    anchor: str
+    evidence: dict[str, object]
+
+
+@dataclass(frozen=True)
+class StoreStats:
+    runs: int
+    pack_bytes: int
+    dead_bytes: int
+    blobs_written: int
+    blobs_deduplicated: int
+    appends: int
+    syncs: int
+    recovered_bytes: int
+
+
+@dataclass(frozen=True)
+class _Entry:
+    offset: int
+    length: int
+    created_at: int
+    run_id: str
+
+
+def _json_line(record: dict[str, object]) -> bytes:
+    return (json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp.open("wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+def _validate_sync(mode: str, group_window_seconds: float) -> None:
+    if mode not in SYNC_MODES:
+        raise EvidenceStoreError("sync mode invalid")
+    if not isinstance(group_window_seconds, (int, float)) or group_window_seconds < 0 or group_window_seconds > 1:
+        raise EvidenceStoreError("group_window_seconds out of bounds")
+
+
+class _Fd:
+    __slots__ = ("fd",)
+
+    def __init__(self, path: Path, flags: int) -> None:
+        self.fd = os.open(path, flags)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            fd, self.fd = self.fd, -1
+            os.close(fd)
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except OSError:
+            pass
+
+
+def _parse_record(line: bytes) -> dict[str, object] | None:
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or not isinstance(record.get("key"), str):
+        return None
+    return record
+
+
+class EvidenceStore:
+    def __init__(
+        self,
+        root: Path,
+        compact_min_dead_bytes: int = _DEFAULT_COMPACT_MIN_DEAD_BYTES,
+        sync_mode: str = _DEFAULT_SYNC_MODE,
+        group_window_seconds: float = 0.0,
+    ) -> None:
+        _validate_sync(sync_mode, group_window_seconds)
+        self._root = root
+        self._objects = root / _OBJECTS_DIR
+        self._pack_path = root / _PACK_NAME
+        self._index_path = root / _INDEX_NAME
+        self._compact_min_dead_bytes = compact_min_dead_bytes
+        self._sync_mode = sync_mode
+        self._group_window = float(group_window_seconds)
+        self._lock = threading.Lock()
+        self._sync_cond = threading.Condition(self._lock)
+        self._syncing = False
+        self._appends = 0
+        self._syncs = 0
+        self._recovered_bytes = 0
+        self._index: dict[str, _Entry] = {}
+        self._blob_memo: dict[str, object] = {}
+        self._blobs_written = 0
+        self._blobs_deduplicated = 0
+        self._dead_bytes = 0
+        created = not root.exists()
+        self._objects.mkdir(parents=True, exist_ok=True)
+        if created:
+            _fsync_dir(root.parent)
+        self._open()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _open(self) -> None:
+        if not self._pack_path.exists():
+            self._generation = os.urandom(8).hex()
+            _write_atomic(self._pack_path, _json_line({"format": _PACK_FORMAT, "generation": self._generation}))
+            _write_atomic(self._index_path, f"{_INDEX_FORMAT} {self._generation}\n".encode("utf-8"))
+        self._reader = _Fd(self._pack_path, os.O_RDONLY)
+        head = os.pread(self._reader.fd, 4096, 0)
+        first = head[: head.find(b"\n") + 1]
+        try:
+            header = json.loads(first)
+        except ValueError as exc:
+            raise EvidenceStoreError("evidence pack header invalid") from exc
+        if not isinstance(header, dict) or header.get("format") != _PACK_FORMAT:
+            raise EvidenceStoreError("evidence pack format unsupported")
+        self._generation = str(header.get("generation", ""))
+        self._header_end = len(first)
+        self._writer = _Fd(self._pack_path, os.O_WRONLY | os.O_APPEND)
+        self._end = self._header_end
+        self._index = {}
+        self._dead_bytes = 0
+        if not self._load_index():
+            self._index = {}
+            self._dead_bytes = 0
+            self._end = self._header_end
+            self._scan_tail()
+            self._rewrite_index()
+        else:
+            self._scan_tail()
+        self._dead_bytes = self._end - self._header_end - sum(entry.length for entry in self._index.values())
+        self._synced = self._end
+
+    def _load_index(self) -> bool:
+        try:
+            lines = self._index_path.read_bytes().decode("utf-8").split("\n")
+        except (OSError, UnicodeDecodeError):
+            return False
+        if lines[0] != f"{_INDEX_FORMAT} {self._generation}":
+            return False
+        pack_size = os.fstat(self._reader.fd).st_size
+        for line in lines[1:]:
+            if not line:
+                continue
+            parts = line.split(" ")
+            if len(parts) != 6 or not _KEY.fullmatch(parts[0]):
+                return False
+            try:
+                offset, length, created_at, live = (int(value) for value in parts[1:5])
+            except ValueError:
+                return False
+            if offset < self._header_end or offset + length > pack_size:
+                return False
+            self._apply(parts[0], _Entry(offset, length, created_at, parts[5]), bool(live))
+        return True
+
+    def _apply(self, key: str, entry: _Entry, live: bool) -> None:
+        previous = self._index.pop(key, None)
+        if previous is not None:
+            self._dead_bytes += previous.length
+        if live:
+            self._index[key] = entry
+        else:
+            self._dead_bytes += entry.length
+        self._end = max(self._end, entry.offset + entry.length)
+
+    def _scan_tail(self) -> None:
+        size = os.fstat(self._reader.fd).st_size
+        if size <= self._end:
+            return
+        data = os.pread(self._reader.fd, size - self._end, self._end)
+        offset = self._end
+        lines = []
+        for line in data.splitlines(keepends=True):
+            record = _parse_record(line)
+            if record is None:
+                break
+            entry = _Entry(offset, len(line), int(record.get("created_at", 0)), str(record.get("run_id", "-")))
+            live = not record.get("deleted", False)
+            self._apply(record["key"], entry, live)
+            lines.append(self._index_line(record["key"], entry, live))
+            offset += len(line)
+        if offset < size:
+            os.truncate(self._pack_path, offset)
+            self._recovered_bytes += size - offset
+        self._end = offset
+        if lines:
+            with self._index_path.open("ab") as handle:
+                handle.write(b"".join(lines))
+
+    @staticmethod
+    def _index_line(key: str, entry: _Entry, live: bool) -> bytes:
+        return f"{key} {entry.offset} {entry.length} {entry.created_at} {int(live)} {entry.run_id}\n".encode("utf-8")
+
+    def _rewrite_index(self) -> None:
+        lines = [f"{_INDEX_FORMAT} {self._generation}\n".encode("utf-8")]
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1].offset):
+            lines.append(self._index_line(key, entry, True))
+        _write_atomic(self._index_path, b"".join(lines))
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._objects / digest[:2] / digest[2:]
+
+    def put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if path.exists():
+            with self._lock:
+                self._blobs_deduplicated += 1
+            return digest
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _fsync_dir(self._objects)
+        _write_atomic(path, data)
+        with self._lock:
+            self._blobs_written += 1
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        if not _DIGEST.fullmatch(digest):
+            raise EvidenceStoreError("blob digest invalid")
+        try:
+            data = self._blob_path(digest).read_bytes()
+        except FileNotFoundError as exc:
+            raise EvidenceStoreError("blob not found") from exc
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise EvidenceStoreError("blob digest mismatch")
+        return data
+
+    def get_json_blob(self, digest: str) -> object:
+        with self._lock:
+            if digest in self._blob_memo:
+                return self._blob_memo[digest]
+        value = json.loads(self.get_blob(digest))
+        with self._lock:
+            if len(self._blob_memo) >= _DEFAULT_BLOB_MEMO:
+                self._blob_memo.pop(next(iter(self._blob_memo)))
+            self._blob_memo[digest] = value
+        return value
+
+    def _append(self, key: str, record: dict[str, object], live: bool) -> int:
+        line = _json_line(record)
+        os.write(self._writer.fd, line)
+        end = os.lseek(self._writer.fd, 0, os.SEEK_CUR)
+        entry = _Entry(end - len(line), len(line), int(record["created_at"]), str(record.get("run_id", "-")))
+        self._apply(key, entry, live)
+        self._end = end
+        self._appends += 1
+        with self._index_path.open("ab") as handle:
+            handle.write(self._index_line(key, entry, live))
+        return end
+
+    def _sync_to(self, end: int) -> None:
+        if self._sync_mode == "none":
+            return
+        if self._sync_mode == "always":
+            _fdatasync(self._writer.fd)
+            self._syncs += 1
+            self._synced = max(self._synced, end)
+            return
+        generation = self._generation
+        while self._synced < end and self._generation == generation:
+            if self._syncing:
+                self._sync_cond.wait()
+                continue
+            fd = os.dup(self._writer.fd)
+            self._syncing = True
+            target = None
+            self._lock.release()
+            try:
+                if self._group_window:
+                    time.sleep(self._group_window)
+                target = self._end
+                _fdatasync(fd)
+            finally:
+                os.close(fd)
+                self._lock.acquire()
+                self._syncing = False
+                if target is not None and self._generation == generation:
+                    self._syncs += 1
+                    self._synced = max(self._synced, target)
+                self._sync_cond.notify_all()
+
+    def append(self, key: str, run_id: str, anchor: str, evidence: dict[str, object], created_at: int) -> None:
+        if not _KEY.fullmatch(key):
+            raise EvidenceStoreError("run key invalid")
+        if not _DIGEST.fullmatch(anchor):
+            raise EvidenceStoreError("anchor digest invalid")
+        record = {"anchor": anchor, "created_at": created_at, "evidence": evidence, "key": key, "run_id": run_id}
+        with self._lock:
+            self._sync_to(self._append(key, record, True))
+
+    def load(self, key: str) -> StoredRun | None:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None and os.fstat(self._reader.fd).st_size > self._end:
+                self._scan_tail()
+                entry = self._index.get(key)
+            reader = self._reader
+        if entry is None:
+            return None
+        record = _parse_record(os.pread(reader.fd, entry.length, entry.offset))
+        if record is None or record["key"] != key:
+            raise EvidenceStoreError("evidence record corrupt")
+        return StoredRun(
+            key=key,
+            run_id=str(record["run_id"]),
+            created_at=int(record["created_at"]),
+            anchor=str(record["anchor"]),
+            evidence=record["evidence"],
+        )
+
+    def locate(self, key: str) -> tuple[str, int, int] | None:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None and os.fstat(self._reader.fd).st_size > self._end:
+                self._scan_tail()
+                entry = self._index.get(key)
+            if entry is None:
+                return None
+            return self._generation, entry.offset, entry.length
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def entries(self) -> list[tuple[str, str, int]]:
+        with self._lock:
+            return [(key, entry.run_id, entry.created_at) for key, entry in self._index.items()]
+
+    def delete(self, key: str, now: int) -> bool:
+        with self._lock:
+            if key not in self._index:
+                return False
+            record = {"created_at": now, "deleted": True, "key": key, "run_id": self._index[key].run_id}
+            self._append(key, record, False)
+            return True
+
+    def prune(
+        self,
+        keep_latest: int | None,
+        retention_seconds: int | None,
+        limit: int,
+        now: float,
+    ) -> list[str]:
+        ordered = sorted(self.entries(), key=lambda item: (-item[2], item[0]))
+        doomed = []
+        for index, (key, _, created_at) in enumerate(ordered):
+            if keep_latest is not None and index >= keep_latest:
+                doomed.append(key)
+            elif retention_seconds is not None and now - created_at > retention_seconds:
+                doomed.append(key)
+        removed = []
+        for key in doomed[:limit]:
+            if self.delete(key, int(now)):
+                removed.append(key)
+        return removed
+
+    def compact(self, force: bool = False) -> int:
+        with self._lock:
+            if not force and self._dead_bytes < self._compact_min_dead_bytes:
+                return 0
+            reclaimed = self._dead_bytes
+            generation = os.urandom(8).hex()
+            header = _json_line({"format": _PACK_FORMAT, "generation": generation})
+            chunks = [header]
+            index_lines = [f"{_INDEX_FORMAT} {generation}\n".encode("utf-8")]
+            offset = len(header)
+            for key, entry in sorted(self._index.items(), key=lambda item: item[1].offset):
+                line = os.pread(self._reader.fd, entry.length, entry.offset)
+                chunks.append(line)
+                moved = _Entry(offset, entry.length, entry.created_at, entry.run_id)
+                index_lines.append(self._index_line(key, moved, True))
+                offset += entry.length
+            _write_atomic(self._pack_path, b"".join(chunks))
+            _write_atomic(self._index_path, b"".join(index_lines))
+            self._writer.close()
+            self._open()
+            return reclaimed
+
+    def stats(self) -> StoreStats:
+        with self._lock:
+            return StoreStats(
+                runs=len(self._index),
+                pack_bytes=self._end,
+                dead_bytes=self._dead_bytes,
+                blobs_written=self._blobs_written,
+                blobs_deduplicated=self._blobs_deduplicated,
+                appends=self._appends,
+                syncs=self._syncs,
+                recovered_bytes=self._recovered_bytes,
+            )
+
+    def set_sync(self, mode: str, group_window_seconds: float = 0.0) -> None:
+        _validate_sync(mode, group_window_seconds)
+        with self._lock:
+            self._sync_mode = mode
+            self._group_window = float(group_window_seconds)
+
+    def close(self) -> None:
+        with self._lock:
+            self._writer.close()
+            self._reader.close()
+
+
+_STORES: dict[Path, EvidenceStore] = {}
+_STORES_LOCK = threading.Lock()
+_SYNC = (_DEFAULT_SYNC_MODE, 0.0)
+
+
+def configure_sync(mode: str = _DEFAULT_SYNC_MODE, group_window_seconds: float = 0.0) -> None:
+    global _SYNC
+    _validate_sync(mode, group_window_seconds)
+    with _STORES_LOCK:
+        _SYNC = (mode, float(group_window_seconds))
+        for store in _STORES.values():
+            store.set_sync(mode, group_window_seconds)
+
+
+def open_store(run_root: Path) -> EvidenceStore:
+    root = (run_root / STORE_DIR_NAME).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(root)
+        if store is None or not (root / _PACK_NAME).exists():
+            store = EvidenceStore(root, sync_mode=_SYNC[0], group_window_seconds=_SYNC[1])
+            _STORES[root] = store
+        return store
+
+
+def store_exists(run_root: Path) -> bool:
+    return (run_root / STORE_DIR_NAME / _PACK_NAME).exists()
+
+
+__all__ = [
+    "STORE_DIR_NAME",
+    "SYNC_MODES",
+    "EvidenceStore",
+    "EvidenceStoreError",
+    "StoreStats",
+    "StoredRun",
+    "configure_sync",
+    "open_store",
+    "store_exists",
+]
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Iterable
+
+from nyx_backend.evidence_store import STORE_DIR_NAME
+
+
+class CatalogError(ValueError):
+    pass
+
+
+CATALOG_NAME = "catalog.sqlite3"
+SORT_KEYS = ("run_id", "created_at")
+
+_SCHEMA_VERSION = 1
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS runs ("
+    "key TEXT PRIMARY KEY, "
+    "run_id TEXT NOT NULL UNIQUE, "
+    "status TEXT NOT NULL, "
+    "module TEXT, "
+    "action TEXT, "
+    "seed INTEGER, "
+    "state_hash TEXT, "
+    "replay_ok INTEGER, "
+    "created_at INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at, run_id)",
+    "CREATE INDEX IF NOT EXISTS runs_module_action ON runs (module, action, run_id)",
+)
+_COLUMNS = "key, run_id, status, module, action, seed, state_hash, replay_ok, created_at"
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    key: str
+    run_id: str
+    status: str
+    module: str | None
+    action: str | None
+    seed: int | None
+    state_hash: str | None
+    replay_ok: bool | None
+    created_at: int
+
+
+def _row_entry(row: tuple) -> CatalogEntry:
+    key, run_id, status, module, action, seed, state_hash, replay_ok, created_at = row
+    return CatalogEntry(
+        key=key,
+        run_id=run_id,
+        status=status,
+        module=module,
+        action=action,
+        seed=seed,
+        state_hash=state_hash,
+        replay_ok=None if replay_ok is None else bool(replay_ok),
+        created_at=created_at,
+    )
+
+
+def _entry_row(entry: CatalogEntry) -> tuple:
+    replay_ok = None if entry.replay_ok is None else int(entry.replay_ok)
+    return (
+        entry.key,
+        entry.run_id,
+        entry.status,
+        entry.module,
+        entry.action,
+        entry.seed,
+        entry.state_hash,
+        replay_ok,
+        entry.created_at,
+    )
+
+
+class RunCatalog:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    @property
+    def needs_rebuild(self) -> bool:
+        with self._lock:
+            return self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION
+
+    def record(self, entry: CatalogEntry) -> None:
+        with self._lock:
+            self._conn.execute(f"INSERT OR REPLACE INTO runs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", _entry_row(entry))
+
+    def remove(self, keys: Iterable[str]) -> int:
+        rows = [(key,) for key in keys]
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("DELETE FROM runs WHERE key = ?", rows)
+            return self._conn.total_changes - before
+
+    def replace_all(self, entries: Iterable[CatalogEntry]) -> int:
+        rows = [_entry_row(entry) for entry in entries]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM runs")
+                self._conn.executemany(f"INSERT OR REPLACE INTO runs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT key FROM runs")]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def query(
+        self,
+        module: str | None = None,
+        action: str | None = None,
+        replay_ok: bool | None = None,
+        sort: str = "run_id",
+        descending: bool = False,
+        after: tuple[object, ...] | None = None,
+        limit: int | None = None,
+    ) -> list[CatalogEntry]:
+        if sort not in SORT_KEYS:
+            raise CatalogError("sort not allowed")
+        clauses = []
+        params: list[object] = []
+        if module:
+            clauses.append("module = ?")
+            params.append(module)
+        if action:
+            clauses.append("action = ?")
+            params.append(action)
+        if replay_ok is not None:
+            clauses.append("replay_ok = ?")
+            params.append(int(replay_ok))
+        op = "<" if descending else ">"
+        direction = "DESC" if descending else "ASC"
+        if after is not None:
+            if sort == "run_id":
+                if len(after) != 1 or not isinstance(after[0], str):
+                    raise CatalogError("after invalid")
+                clauses.append(f"run_id {op} ?")
+                params.append(after[0])
+            else:
+                if len(after) != 2 or not isinstance(after[0], int) or not isinstance(after[1], str):
+                    raise CatalogError("after invalid")
+                clauses.append(f"(created_at, run_id) {op} (?, ?)")
+                params.extend(after)
+        order_by = f"run_id {direction}" if sort == "run_id" else f"created_at {direction}, run_id {direction}"
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        limit_clause = ""
+        if limit is not None:
+            if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+                raise CatalogError("limit out of bounds")
+            limit_clause = " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM runs {where} ORDER BY {order_by}{limit_clause}", params
+            ).fetchall()
+        return [_row_entry(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def parse_run_filters(query: dict[str, list[str]]) -> dict[str, object]:
+    module = (query.get("module") or [""])[0] or None
+    action = (query.get("action") or [""])[0] or None
+    replay_raw = (query.get("replay_ok") or [""])[0]
+    if replay_raw not in {"", "true", "false"}:
+        raise CatalogError("replay_ok must be true or false")
+    sort = (query.get("sort") or [""])[0] or "run_id"
+    if sort not in SORT_KEYS:
+        raise CatalogError("sort not allowed")
+    order = (query.get("order") or [""])[0] or "asc"
+    if order not in {"asc", "desc"}:
+        raise CatalogError("order must be asc or desc")
+    return {
+        "module": module,
+        "action": action,
+        "replay_ok": None if replay_raw == "" else replay_raw == "true",
+        "sort": sort,
+        "descending": order == "desc",
+    }
+
+
+def list_scope(filters: dict[str, object]) -> str:
+    return "list:{module}:{action}:{replay_ok}:{sort}:{descending}".format(**filters)
+
+
+_CATALOGS: dict[Path, RunCatalog] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def catalog_path(run_root: Path) -> Path:
+    return run_root / STORE_DIR_NAME / CATALOG_NAME
+
+
+def open_catalog(run_root: Path) -> RunCatalog:
+    path = catalog_path(run_root).resolve()
+    with _CATALOGS_LOCK:
+        catalog = _CATALOGS.get(path)
+        if catalog is None or not path.exists():
+            if catalog is not None:
+                catalog.close()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            catalog = RunCatalog(path)
+            _CATALOGS[path] = catalog
+        return catalog
+
+
+def catalog_exists(run_root: Path) -> bool:
+    return catalog_path(run_root).exists()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NYX run catalog")
+    parser.add_argument("--run-root", default="", help="run directory (defaults to apps/nyx-backend/runs)")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the catalog from the evidence store and run dirs")
+    args = parser.parse_args()
+    from nyx_backend.evidence import _run_root, rebuild_catalog
+
+    run_root = _run_root(Path(args.run_root) if args.run_root else None)
+    if args.rebuild:
+        count = rebuild_catalog(base_dir=run_root)
+    else:
+        count = open_catalog(run_root).count()
+    print(json.dumps({"run_root": str(run_root), "runs": count}, sort_keys=True, separators=(",", ":")))
+    return 0
+
+
+__all__ = [
+    "CATALOG_NAME",
+    "SORT_KEYS",
+    "CatalogEntry",
+    "CatalogError",
+    "RunCatalog",
+    "catalog_exists",
+    "catalog_path",
+    "list_scope",
+    "open_catalog",
+    "parse_run_filters",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,13 +6,18 @@ from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
+from nyx_backend.anchor import protocol_anchor
 from nyx_backend.evidence import (
     EvidenceError,
+    RunRecord,
     build_export_zip,
     list_runs,
     load_evidence,
+    recover_runs,
     run_evidence,
 )
+from nyx_backend.pagination import PaginationError, decode_cursor, encode_cursor, page_size
+from nyx_backend.run_catalog import CatalogError, list_scope, parse_run_filters
 
 
 class GatewayHandler(BaseHTTPRequestHandler):
@@ -121,24 +126,48 @@ class GatewayHandler(BaseHTTPRequestHandler):
             self._send_bytes(data, "application/zip")
             return
         if path == "/list":
-            records = list_runs()
-            payload = [
-                {"run_id": record.run_id, "status": record.status}
-                for record in records
-            ]
-            self._send_json({"runs": payload})
+            try:
+                filters = parse_run_filters(query)
+                scope = list_scope(filters)
+                by_run_id = filters["sort"] == "run_id"
+                limit = page_size((query.get("limit") or [""])[0] or None)
+                after = decode_cursor(scope, (query.get("cursor") or [""])[0] or None, 1 if by_run_id else 2)
+                records = list_runs(**filters, after=after, limit=limit + 1)
+            except (EvidenceError, CatalogError, PaginationError) as exc:
+                self._send_json({"error": str(exc)}, HTTPStatus.BAD_REQUEST)
+                return
+            payload = [_run_row(record) for record in records[:limit]]
+            next_cursor = None
+            if len(records) > limit:
+                last = records[limit - 1]
+                next_cursor = encode_cursor(scope, (last.run_id,) if by_run_id else (last.created_at, last.run_id))
+            self._send_json({"runs": payload, "next_cursor": next_cursor})
             return
         self._send_text("not found", HTTPStatus.NOT_FOUND)
 
 
+def _run_row(record: RunRecord) -> dict[str, object]:
+    return {
+        "run_id": record.run_id,
+        "status": record.status,
+        "module": record.module,
+        "action": record.action,
+        "seed": record.seed,
+        "state_hash": record.state_hash,
+        "replay_ok": record.replay_ok,
+        "created_at": record.created_at,
+    }
+
+
 def _artifact_path(run_id: str, name: str) -> Path:
-    from nyx_backend.evidence import _run_root, _safe_artifact_path
+    from nyx_backend.evidence import materialize_artifact
 
-    root = _run_root()
-    return _safe_artifact_path(root, run_id, name)
+    return materialize_artifact(run_id, name)
 
 
 def run_server(host: str = "0.0.0.0", port: int = 8090) -> None:
+    protocol_anchor()
+    recover_runs()
     server = ThreadingHTTPServer((host, port), GatewayHandler)
     server.serve_forever()
 
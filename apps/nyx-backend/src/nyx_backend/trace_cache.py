@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import re
+import threading
+
+from nyx_backend.tracing import span
+
+
+class TraceCacheError(ValueError):
+    pass
+
+
+_DEFAULT_CAPACITY = 64
+
+
+@dataclass(frozen=True)
+class TraceCacheStats:
+    capacity: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    disk_loads: int
+    disk_writes: int
+    disk_errors: int
+    replays: int
+
+
+def _pipeline_version() -> str:
+    from e2e_private_transfer.pipeline import PIPELINE_VERSION
+
+    return PIPELINE_VERSION
+
+
+def _version_dir_name(version: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", version)
+
+
+class TraceCache:
+    def __init__(self, capacity: int = _DEFAULT_CAPACITY, cache_dir: Path | None = None) -> None:
+        if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 1:
+            raise TraceCacheError("capacity must be positive int")
+        self._capacity = capacity
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[int, str], object] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._disk_loads = 0
+        self._disk_writes = 0
+        self._disk_errors = 0
+        self._replays = 0
+
+    @property
+    def cache_dir(self) -> Path | None:
+        return self._cache_dir
+
+    def _disk_path(self, key: tuple[int, str]) -> Path | None:
+        if self._cache_dir is None:
+            return None
+        seed, version = key
+        return self._cache_dir / _version_dir_name(version) / f"{seed}.json"
+
+    def _load_from_disk(self, key: tuple[int, str]):
+        from e2e_private_transfer.trace import TraceError, TransferTrace
+
+        path = self._disk_path(key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            return TransferTrace.from_json(path.read_text(encoding="utf-8"))
+        except (OSError, TraceError, TypeError):
+            return None
+
+    def _store_to_disk(self, key: tuple[int, str], trace) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(trace.to_json(), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            with self._lock:
+                self._disk_errors += 1
+            return
+        with self._lock:
+            self._disk_writes += 1
+
+    def _fill(self, key: tuple[int, str]):
+        with span("trace_cache.fill", seed=key[0]):
+            return self._fill_traced(key)
+
+    def _fill_traced(self, key: tuple[int, str]):
+        from e2e_private_transfer.pipeline import run_private_transfer
+        from e2e_private_transfer.replay import replay_and_verify
+
+        trace = self._load_from_disk(key)
+        from_disk = trace is not None
+        if trace is not None:
+            with self._lock:
+                self._replays += 1
+            with span("pipeline.replay"):
+                replayed = replay_and_verify(trace)
+            if not replayed:
+                trace = None
+                from_disk = False
+        if trace is None:
+            with span("pipeline.run"):
+                trace, _ = run_private_transfer(seed=key[0])
+            with self._lock:
+                self._replays += 1
+            with span("pipeline.replay"):
+                replayed = replay_and_verify(trace)
+            if not replayed:
+                raise TraceCacheError("replay verification failed")
+        if from_disk:
+            with self._lock:
+                self._disk_loads += 1
+        else:
+            self._store_to_disk(key, trace)
+        return trace
+
+    def get(self, seed: int):
+        if not isinstance(seed, int) or isinstance(seed, bool):
+            raise TraceCacheError("seed must be int")
+        key = (seed, _pipeline_version())
+        with self._lock:
+            trace = self._entries.get(key)
+            if trace is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return trace
+            self._misses += 1
+        trace = self._fill(key)
+        with self._lock:
+            self._entries[key] = trace
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return trace
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> TraceCacheStats:
+        with self._lock:
+            return TraceCacheStats(
+                capacity=self._capacity,
+                size=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                disk_loads=self._disk_loads,
+                disk_writes=self._disk_writes,
+                disk_errors=self._disk_errors,
+                replays=self._replays,
+            )
+
+
+_CACHE = TraceCache()
+
+
+def get_trace_cache() -> TraceCache:
+    return _CACHE
+
+
+def configure_trace_cache(capacity: int = _DEFAULT_CAPACITY, cache_dir: Path | None = None) -> TraceCache:
+    global _CACHE
+    _CACHE = TraceCache(capacity=capacity, cache_dir=cache_dir)
+    return _CACHE
+
+
+def trace_cache_stats() -> TraceCacheStats:
+    return _CACHE.stats()
+
+
+__all__ = [
+    "TraceCache",
+    "TraceCacheError",
+    "TraceCacheStats",
+    "configure_trace_cache",
+    "get_trace_cache",
+    "trace_cache_stats",
+]
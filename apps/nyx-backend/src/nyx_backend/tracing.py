@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import os
+from pathlib import Path
+import random
+import threading
+import time
+from typing import Callable, Iterator
+
+
+class TracingError(ValueError):
+    pass
+
+
+_DEFAULT_MAX_SPANS = 256
+_DEFAULT_RECENT = 64
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans", "dropped", "max_spans")
+
+    def __init__(self, trace_id: str, max_spans: int) -> None:
+        self.trace_id = trace_id
+        self.spans = 0
+        self.dropped = 0
+        self.max_spans = max_spans
+
+
+class Span:
+    __slots__ = ("trace", "name", "attrs", "started", "duration", "error", "children")
+
+    def __init__(self, trace: _Trace, name: str, attrs: dict[str, object]) -> None:
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.error: str | None = None
+        self.children: list[Span] = []
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, key: str, value: object) -> None:
+        self.attrs[key] = value
+
+    def to_dict(self, origin: float) -> dict[str, object]:
+        record: dict[str, object] = {
+            "name": self.name,
+            "offset_ms": round((self.started - origin) * 1000.0, 3),
+            "duration_ms": round(self.duration * 1000.0, 3),
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if self.error is not None:
+            record["error"] = self.error
+        if self.children:
+            record["spans"] = [child.to_dict(origin) for child in self.children]
+        return record
+
+
+_CURRENT: ContextVar[Span | None] = ContextVar("nyx_trace_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _CURRENT.get()
+
+
+def current_trace_id() -> str | None:
+    active = _CURRENT.get()
+    return active.trace.trace_id if active is not None else None
+
+
+@contextmanager
+def _activate(active: Span) -> Iterator[Span]:
+    token = _CURRENT.set(active)
+    try:
+        yield active
+    except BaseException as exc:
+        active.error = type(exc).__name__
+        raise
+    finally:
+        active.duration = time.perf_counter() - active.started
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: object) -> Iterator[Span | None]:
+    parent = _CURRENT.get()
+    if parent is None:
+        yield None
+        return
+    trace = parent.trace
+    if trace.spans >= trace.max_spans:
+        trace.dropped += 1
+        yield None
+        return
+    trace.spans += 1
+    child = Span(trace, name, attrs)
+    parent.children.append(child)
+    with _activate(child) as active:
+        yield active
+
+
+def _validate_sample_rate(value: object) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TracingError("sample_rate must be a number")
+    rate = float(value)
+    if not 0.0 <= rate <= 1.0:
+        raise TracingError("sample_rate out of bounds")
+    return rate
+
+
+class Tracer:
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        sink: Path | None = None,
+        max_spans: int = _DEFAULT_MAX_SPANS,
+        recent: int = _DEFAULT_RECENT,
+        sampler: Callable[[], float] = random.random,
+    ) -> None:
+        self._sample_rate = _validate_sample_rate(sample_rate)
+        if not isinstance(max_spans, int) or isinstance(max_spans, bool) or max_spans < 1:
+            raise TracingError("max_spans must be positive int")
+        if not isinstance(recent, int) or isinstance(recent, bool) or recent < 0:
+            raise TracingError("recent must be non-negative int")
+        self._sink = sink
+        self._max_spans = max_spans
+        self._sampler = sampler
+        self._lock = threading.Lock()
+        self._recent: deque[dict[str, object]] = deque(maxlen=recent)
+        self._emitted = 0
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
+    @property
+    def sink(self) -> Path | None:
+        return self._sink
+
+    @contextmanager
+    def trace(self, name: str, force: bool = False, **attrs: object) -> Iterator[Span | None]:
+        if _CURRENT.get() is not None:
+            with span(name, **attrs) as active:
+                yield active
+            return
+        if not force and (self._sample_rate <= 0.0 or self._sampler() >= self._sample_rate):
+            yield None
+            return
+        root = Span(_Trace(os.urandom(8).hex(), self._max_spans), name, attrs)
+        wall = time.time()
+        try:
+            with _activate(root) as active:
+                yield active
+        finally:
+            self._emit(root, wall)
+
+    def _emit(self, root: Span, wall: float) -> None:
+        record = {"trace_id": root.trace.trace_id, "ts": round(wall, 6), **root.to_dict(root.started)}
+        del record["offset_ms"]
+        if root.trace.dropped:
+            record["dropped_spans"] = root.trace.dropped
+        line = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._recent.append(record)
+            self._emitted += 1
+            if self._sink is not None:
+                self._sink.parent.mkdir(parents=True, exist_ok=True)
+                with self._sink.open("a", encoding="utf-8") as handle:
+                    handle.write(line)
+
+    def recent(self) -> list[dict[str, object]]:
+        with self._lock:
+            return list(self._recent)
+
+    @property
+    def emitted(self) -> int:
+        with self._lock:
+            return self._emitted
+
+
+def _env_sample_rate() -> float:
+    raw = os.environ.get("NYX_TRACE_SAMPLE_RATE", "").strip()
+    if not raw:
+        return 0.0
+    try:
+        return _validate_sample_rate(float(raw))
+    except ValueError as exc:
+        raise TracingError("NYX_TRACE_SAMPLE_RATE must be a number in [0, 1]") from exc
+
+
+def _env_sink() -> Path | None:
+    raw = os.environ.get("NYX_TRACE_PATH", "").strip()
+    return Path(raw) if raw else None
+
+
+_TRACER: Tracer | None = None
+
+
+def get_tracer() -> Tracer:
+    global _TRACER
+    if _TRACER is None:
+        _TRACER = Tracer(sample_rate=_env_sample_rate(), sink=_env_sink())
+    return _TRACER
+
+
+def configure_tracer(
+    sample_rate: float = 0.0,
+    sink: Path | None = None,
+    max_spans: int = _DEFAULT_MAX_SPANS,
+) -> Tracer:
+    global _TRACER
+    _TRACER = Tracer(sample_rate=sample_rate, sink=sink, max_spans=max_spans)
+    return _TRACER
+
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "TracingError",
+    "configure_tracer",
+    "current_span",
+    "current_trace_id",
+    "get_tracer",
+    "span",
+]
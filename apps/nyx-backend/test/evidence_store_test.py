@@ -0,0 +1,137 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+import sys
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parents[1]
+SRC = BACKEND_ROOT / "src"
+PKG_PATHS = [
+    SRC,
+    REPO_ROOT / "packages" / "e2e-private-transfer" / "src",
+    REPO_ROOT / "packages" / "l2-private-ledger" / "src",
+    REPO_ROOT / "packages" / "l0-zk-id" / "src",
+    REPO_ROOT / "packages" / "l2-economics" / "src",
+    REPO_ROOT / "packages" / "l1-chain" / "src",
+    REPO_ROOT / "packages" / "wallet-kernel" / "src",
+]
+for path in PKG_PATHS:
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from nyx_backend.evidence import (  # noqa: E402
+    EvidenceError,
+    list_runs,
+    load_evidence,
+    materialize_artifact,
+    materialize_run,
+    recover_runs,
+    run_evidence,
+)
+from nyx_backend.evidence_store import EvidenceStore, EvidenceStoreError, open_store  # noqa: E402
+from nyx_backend.run_catalog import open_catalog  # noqa: E402
+
+
+_PAYLOAD = {"asset_in": "a", "asset_out": "b", "amount": 5, "min_out": 1}
+
+
+class EvidenceStoreTests(unittest.TestCase):
+    def test_runs_share_anchor_blob_and_leave_no_run_dirs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp)
+            first = run_evidence(7, "store-a", "exchange", "route_swap", _PAYLOAD, base_dir=base_dir)
+            run_evidence(7, "store-b", "exchange", "route_swap", _PAYLOAD, base_dir=base_dir)
+            self.assertEqual([entry.name for entry in base_dir.iterdir()], [".evidence"])
+            store = open_store(base_dir)
+            blobs = [path for path in (store.root / "objects").rglob("*") if path.is_file()]
+            self.assertEqual(len(blobs), 1)
+            self.assertEqual(load_evidence("store-a", base_dir=base_dir), first)
+            self.assertEqual(sorted(record.run_id for record in list_runs(base_dir)), ["store-a", "store-b"])
+
+    def test_materialized_layout_matches_legacy_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp)
+            payload = run_evidence(7, "store-legacy", "exchange", "route_swap", _PAYLOAD, base_dir=base_dir)
+            path = materialize_artifact("store-legacy", "outputs.json", base_dir=base_dir)
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), payload.outputs)
+            run_dir = path.parent.parent
+            self.assertEqual((run_dir / "run_id.txt").read_text(encoding="utf-8"), "store-legacy\n")
+            self.assertEqual(json.loads((run_dir / "evidence.json").read_text(encoding="utf-8"))["stdout"], payload.stdout)
+            self.assertEqual(len(list((run_dir / "artifacts").iterdir())), 7)
+            with self.assertRaises(EvidenceError):
+                materialize_run("missing-run", base_dir=base_dir)
+
+    def test_reopen_recovers_torn_tail_and_stale_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / ".evidence"
+            store = EvidenceStore(root)
+            anchor = store.put_blob(b"{}")
+            store.append("a" * 32, "run-a", anchor, {"stdout": "x"}, 1)
+            store.append("b" * 32, "run-b", anchor, {"stdout": "y"}, 2)
+            store.close()
+            with (root / "runs.pack").open("ab") as handle:
+                handle.write(b'{"key":"cccc')
+            (root / "runs.idx").write_text("nyx-evidence-idx/1 stale\n", encoding="utf-8")
+            reopened = EvidenceStore(root)
+            self.assertEqual(reopened.load("b" * 32).evidence, {"stdout": "y"})
+            self.assertEqual(reopened.stats().recovered_bytes, len(b'{"key":"cccc'))
+            self.assertFalse((root / "runs.pack").read_bytes().endswith(b"cccc"))
+            self.assertTrue(reopened.delete("a" * 32, 3))
+            self.assertGreater(reopened.compact(force=True), 0)
+            self.assertIsNone(reopened.load("a" * 32))
+            self.assertEqual(EvidenceStore(root).load("b" * 32).run_id, "run-b")
+            blob = root / "objects" / anchor[:2] / anchor[2:]
+            blob.write_bytes(b"tampered")
+            with self.assertRaises(EvidenceStoreError):
+                reopened.get_blob(anchor)
+
+    def test_group_commit_shares_fsyncs_across_concurrent_appends(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = EvidenceStore(Path(tmp) / ".evidence", sync_mode="group", group_window_seconds=0.05)
+            anchor = store.put_blob(b"{}")
+            barrier = threading.Barrier(8)
+
+            def append(index: int) -> None:
+                barrier.wait()
+                store.append(f"{index:032x}", f"run-{index}", anchor, {"stdout": ""}, index)
+
+            threads = [threading.Thread(target=append, args=(index,)) for index in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            stats = store.stats()
+            self.assertEqual((stats.runs, stats.appends), (8, 8))
+            self.assertLess(stats.syncs, 8)
+            with self.assertRaises(EvidenceStoreError):
+                store.set_sync("sometimes")
+            store.close()
+
+    def test_recovery_scan_cleans_partial_writes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp)
+            run_evidence(7, "recover-a", "exchange", "route_swap", _PAYLOAD, base_dir=base_dir)
+            run_evidence(7, "recover-b", "exchange", "route_swap", _PAYLOAD, base_dir=base_dir)
+            intact = materialize_run("recover-a", base_dir=base_dir)
+            torn = materialize_run("recover-b", base_dir=base_dir)
+            (torn / "artifacts" / "outputs.json").write_bytes(b"")
+            (base_dir / ".stage-deadbeef-0000").mkdir()
+            (base_dir / ".evidence" / ".runs.idx.1.2.tmp").write_bytes(b"partial")
+            open_catalog(base_dir).remove([intact.name])
+            report = recover_runs(base_dir)
+            self.assertEqual(
+                (report.stage_dirs, report.temp_files, report.materialized_dirs, report.catalog_rebuilt),
+                (1, 1, 1, True),
+            )
+            self.assertTrue(intact.is_dir())
+            self.assertFalse(torn.exists())
+            self.assertEqual(sorted(record.run_id for record in list_runs(base_dir)), ["recover-a", "recover-b"])
+            self.assertFalse(recover_runs(base_dir).catalog_rebuilt)
+
+
+if __name__ == "__main__":
+    unittest.main()
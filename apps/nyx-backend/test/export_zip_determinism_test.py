@@ -1,5 +1,6 @@
 import tempfile
 import unittest
+from unittest import mock
 from pathlib import Path
 import sys
 
@@ -21,7 +22,8 @@ for path in PKG_PATHS:
     if path_str not in sys.path:
         sys.path.insert(0, path_str)
 
-from nyx_backend.evidence import build_export_zip, run_evidence  # noqa: E402
+from nyx_backend import evidence  # noqa: E402
+from nyx_backend.evidence import build_export_zip, export_bundle, run_evidence  # noqa: E402
 
 
 class ExportZipDeterminismTests(unittest.TestCase):
@@ -49,6 +51,23 @@ class ExportZipDeterminismTests(unittest.TestCase):
             zip2 = build_export_zip("deterministic-run", base_dir=base2)
             self.assertEqual(zip1, zip2)
 
+    def test_cached_export_skips_artifact_reads(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            run_evidence(
+                seed=42,
+                run_id="cached-run",
+                module="exchange",
+                action="route_swap",
+                payload={"route": "basic"},
+                base_dir=base,
+            )
+            first = export_bundle("cached-run", base_dir=base)
+            with mock.patch.object(evidence, "_export_payloads", side_effect=AssertionError("rebuilt")):
+                second = export_bundle("cached-run", base_dir=base)
+            self.assertEqual(second, first)
+            self.assertEqual(second.path.read_bytes(), build_export_zip("cached-run", base_dir=base))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -23,7 +23,7 @@ for path in PKG_PATHS:
     if path_str not in sys.path:
         sys.path.insert(0, path_str)
 
-from nyx_backend.evidence import run_evidence  # noqa: E402
+from nyx_backend.evidence import EvidenceError, run_evidence  # noqa: E402
 
 
 class FeeSummaryOutputsTests(unittest.TestCase):
@@ -64,6 +64,54 @@ class FeeSummaryOutputsTests(unittest.TestCase):
             self.assertIn("treasury_address", outputs)
             self.assertGreater(outputs.get("fee_total", 0), 0)
 
+    def test_precomputed_fee_quote_matches_computed_outputs(self) -> None:
+        payload = {"sku": "sku-1", "title": "Item", "price": 10, "qty": 1}
+        with tempfile.TemporaryDirectory() as tmp:
+            computed = run_evidence(
+                seed=123,
+                run_id="fee-market-1",
+                module="marketplace",
+                action="order_intent",
+                payload=payload,
+                base_dir=Path(tmp),
+            ).outputs
+            quote = {
+                "protocol_fee_total": computed["fee_breakdown"]["protocol_fee_total"],
+                "platform_fee_amount": computed["fee_breakdown"]["platform_fee_amount"],
+                "total_paid": computed["fee_total"],
+            }
+            reused = run_evidence(
+                seed=123,
+                run_id="fee-market-2",
+                module="marketplace",
+                action="order_intent",
+                payload=payload,
+                base_dir=Path(tmp),
+                fee_quote=quote,
+            ).outputs
+            self.assertEqual(reused, computed)
+            with self.assertRaises(EvidenceError):
+                run_evidence(
+                    seed=123,
+                    run_id="fee-market-3",
+                    module="marketplace",
+                    action="order_intent",
+                    payload=payload,
+                    base_dir=Path(tmp),
+                    fee_quote={**quote, "total_paid": quote["total_paid"] + 1},
+                )
+            routed = run_evidence(
+                seed=123,
+                run_id="fee-market-4",
+                module="marketplace",
+                action="order_intent",
+                payload=payload,
+                base_dir=Path(tmp),
+                fee_quote={**quote, "treasury_address": "treasury-from-config"},
+            ).outputs
+            self.assertEqual(routed["treasury_address"], "treasury-from-config")
+            self.assertEqual(routed["platform_fee"]["treasury_address"], "treasury-from-config")
+
 
 if __name__ == "__main__":
     unittest.main()
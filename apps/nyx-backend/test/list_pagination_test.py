@@ -0,0 +1,94 @@
+import functools
+import json
+import tempfile
+import unittest
+from http import HTTPStatus
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+import sys
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parents[1]
+SRC = BACKEND_ROOT / "src"
+PKG_PATHS = [
+    SRC,
+    REPO_ROOT / "packages" / "e2e-private-transfer" / "src",
+    REPO_ROOT / "packages" / "l2-private-ledger" / "src",
+    REPO_ROOT / "packages" / "l0-zk-id" / "src",
+    REPO_ROOT / "packages" / "l2-economics" / "src",
+    REPO_ROOT / "packages" / "l1-chain" / "src",
+    REPO_ROOT / "packages" / "wallet-kernel" / "src",
+]
+for path in PKG_PATHS:
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+import nyx_backend.server as server  # noqa: E402
+from nyx_backend.evidence import list_runs, run_evidence  # noqa: E402
+from nyx_backend.pagination import decode_cursor, encode_cursor  # noqa: E402
+from nyx_backend.run_catalog import list_scope, parse_run_filters  # noqa: E402
+
+
+_SWAP = {"asset_in": "a", "asset_out": "b", "amount": 5, "min_out": 1}
+
+
+class _FakeRequest(server.GatewayHandler):
+    def __init__(self, path: str):
+        self.path = path
+        self.rfile = BytesIO()
+        self.wfile = BytesIO()
+        self.headers = {}
+        self.responses = []
+
+    def send_response(self, code, message=None):
+        self.responses.append(code)
+
+    def send_header(self, *_args, **_kwargs):
+        pass
+
+    def end_headers(self):
+        pass
+
+
+class ServerListTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        base_dir = Path(self.tmp.name)
+        for seed, run_id in ((1, "list-c"), (2, "list-a"), (3, "list-b")):
+            run_evidence(seed, run_id, "exchange", "route_swap", _SWAP, base_dir=base_dir)
+        patcher = mock.patch.object(server, "list_runs", functools.partial(list_runs, base_dir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def _get(self, path: str) -> tuple[int, dict]:
+        handler = _FakeRequest(path)
+        handler.do_GET()
+        return handler.responses[-1], json.loads(handler.wfile.getvalue())
+
+    def test_pages_with_opaque_cursor(self) -> None:
+        status, first = self._get("/list?limit=2")
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual([row["run_id"] for row in first["runs"]], ["list-a", "list-b"])
+        scope = list_scope(parse_run_filters({}))
+        self.assertEqual(first["next_cursor"], encode_cursor(scope, ("list-b",)))
+        status, second = self._get(f"/list?limit=2&cursor={first['next_cursor']}")
+        self.assertEqual([row["run_id"] for row in second["runs"]], ["list-c"])
+        self.assertIsNone(second["next_cursor"])
+        by_time = self._get("/list?sort=created_at&limit=1")[1]
+        scope = list_scope(parse_run_filters({"sort": ["created_at"]}))
+        self.assertEqual(len(decode_cursor(scope, by_time["next_cursor"], 2)), 2)
+
+    def test_rejects_bad_limit_and_cursor(self) -> None:
+        ascending = encode_cursor(list_scope(parse_run_filters({})), ("list-b",))
+        for query in ("limit=0", "limit=-1", "limit=201", "limit=x", "cursor=list-b", f"order=desc&cursor={ascending}"):
+            status, payload = self._get(f"/list?{query}")
+            self.assertEqual(status, HTTPStatus.BAD_REQUEST, query)
+            self.assertIn("error", payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+SRC = BACKEND_ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from nyx_backend import anchor as anchor_module  # noqa: E402
+from nyx_backend.anchor import AnchorError, ProtocolAnchorProvider, write_anchor_file  # noqa: E402
+
+
+def _git(root: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-c", "user.name=nyx", "-c", "user.email=nyx@localhost", *args],
+        cwd=str(root),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+def _git_anchor(root: Path) -> dict[str, str]:
+    tags = sorted(t for t in _git(root, "tag", "--points-at", "HEAD").splitlines() if t.strip())
+    return {
+        "tag": tags[0] if tags else "",
+        "commit": _git(root, "rev-parse", "HEAD"),
+        "describe": _git(root, "describe", "--tags", "--always"),
+    }
+
+
+class ProtocolAnchorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "repo"
+        self.root.mkdir()
+        _git(self.root, "init", "-q")
+        (self.root / "a.txt").write_text("a\n", encoding="utf-8")
+        _git(self.root, "add", "a.txt")
+        _git(self.root, "commit", "-q", "-m", "first")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _provider(self) -> ProtocolAnchorProvider:
+        return ProtocolAnchorProvider(root=self.root, anchor_file=Path(self.tmp.name) / "anchor.json")
+
+    def test_untagged_head_matches_git(self) -> None:
+        self.assertEqual(self._provider().get(), _git_anchor(self.root))
+
+    def test_lightweight_and_annotated_tags_match_git(self) -> None:
+        _git(self.root, "tag", "v0.2")
+        _git(self.root, "tag", "-a", "v0.1", "-m", "annotated")
+        self.assertEqual(self._provider().get(), _git_anchor(self.root))
+        _git(self.root, "pack-refs", "--all")
+        self.assertEqual(self._provider().get(), _git_anchor(self.root))
+
+    def test_resolves_once_until_reload(self) -> None:
+        provider = self._provider()
+        first = provider.get()
+        provider.get()
+        self.assertEqual(provider.resolutions, 1)
+        (self.root / "b.txt").write_text("b\n", encoding="utf-8")
+        _git(self.root, "add", "b.txt")
+        _git(self.root, "commit", "-q", "-m", "second")
+        self.assertEqual(provider.get(), first)
+        reloaded = provider.reload()
+        self.assertEqual(provider.resolutions, 2)
+        self.assertEqual(reloaded, _git_anchor(self.root))
+
+    def test_describe_past_tag_spawns_git_once(self) -> None:
+        _git(self.root, "tag", "-a", "v0.1", "-m", "annotated")
+        (self.root / "b.txt").write_text("b\n", encoding="utf-8")
+        _git(self.root, "add", "b.txt")
+        _git(self.root, "commit", "-q", "-m", "second")
+        provider = self._provider()
+        with mock.patch.object(anchor_module.subprocess, "run", wraps=subprocess.run) as run:
+            first = provider.get()
+            provider.get()
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(first, _git_anchor(self.root))
+        self.assertRegex(first["describe"], r"^v0\.1-1-g[0-9a-f]+$")
+
+    def test_anchor_file_fallback_without_git(self) -> None:
+        anchor_file = Path(self.tmp.name) / "anchor.json"
+        expected = write_anchor_file(anchor_file, root=self.root)
+        bare_root = Path(self.tmp.name) / "image"
+        bare_root.mkdir()
+        provider = ProtocolAnchorProvider(root=bare_root, anchor_file=anchor_file)
+        self.assertEqual(provider.get(), expected)
+        self.assertEqual(provider.source, "file")
+        self.assertEqual(json.loads(anchor_file.read_text(encoding="utf-8")), expected)
+
+    def test_missing_anchor_rejected(self) -> None:
+        bare_root = Path(self.tmp.name) / "image"
+        bare_root.mkdir()
+        provider = ProtocolAnchorProvider(root=bare_root, anchor_file=bare_root / "anchor.json")
+        with self.assertRaises(AnchorError):
+            provider.get()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parents[1]
+SRC = BACKEND_ROOT / "src"
+PKG_PATHS = [
+    SRC,
+    REPO_ROOT / "packages" / "e2e-private-transfer" / "src",
+    REPO_ROOT / "packages" / "l2-private-ledger" / "src",
+    REPO_ROOT / "packages" / "l0-zk-id" / "src",
+    REPO_ROOT / "packages" / "l2-economics" / "src",
+    REPO_ROOT / "packages" / "l1-chain" / "src",
+    REPO_ROOT / "packages" / "wallet-kernel" / "src",
+]
+for path in PKG_PATHS:
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from nyx_backend.evidence import (  # noqa: E402
+    EvidenceError,
+    list_runs,
+    materialize_run,
+    rebuild_catalog,
+    run_evidence,
+)
+from nyx_backend.run_catalog import catalog_path, open_catalog  # noqa: E402
+
+
+_SWAP = {"asset_in": "a", "asset_out": "b", "amount": 5, "min_out": 1}
+
+
+class RunCatalogTests(unittest.TestCase):
+    def test_list_filters_sorts_and_pages_from_catalog(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp)
+            run_evidence(3, "cat-c", "exchange", "route_swap", _SWAP, base_dir=base_dir)
+            run_evidence(4, "cat-a", "chat", "message_event", {"channel": "c", "message": "m"}, base_dir=base_dir)
+            run_evidence(5, "cat-b", "exchange", "route_swap", _SWAP, base_dir=base_dir)
+            records = list_runs(base_dir, module="exchange")
+            self.assertEqual([record.run_id for record in records], ["cat-b", "cat-c"])
+            self.assertEqual((records[0].action, records[0].seed, records[0].replay_ok), ("route_swap", 5, True))
+            self.assertEqual(len(records[0].state_hash), 64)
+            page = list_runs(base_dir, descending=True, limit=2)
+            self.assertEqual([record.run_id for record in page], ["cat-c", "cat-b"])
+            rest = list_runs(base_dir, descending=True, after=(page[-1].run_id,), limit=2)
+            self.assertEqual([record.run_id for record in rest], ["cat-a"])
+            by_time = list_runs(base_dir, sort="created_at", after=(0, ""))
+            self.assertEqual(len(by_time), 3)
+            with self.assertRaises(EvidenceError):
+                list_runs(base_dir, sort="seed")
+
+    def test_rebuild_recovers_store_and_legacy_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp)
+            run_evidence(7, "cat-store", "exchange", "route_swap", _SWAP, base_dir=base_dir)
+            run_evidence(8, "cat-legacy", "wallet", "transfer", {"to": "x", "amount": 1}, base_dir=base_dir)
+            legacy_dir = materialize_run("cat-legacy", base_dir=base_dir)
+            open_catalog(base_dir).remove([legacy_dir.name])
+            self.assertEqual([record.run_id for record in list_runs(base_dir)], ["cat-store"])
+            self.assertEqual(rebuild_catalog(base_dir), 2)
+            catalog_path(base_dir).unlink()
+            records = list_runs(base_dir, module="wallet")
+            self.assertEqual([(record.run_id, record.seed) for record in records], [("cat-legacy", 8)])
+
+
+if __name__ == "__main__":
+    unittest.main()
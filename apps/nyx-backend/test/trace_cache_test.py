@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parents[1]
+SRC = BACKEND_ROOT / "src"
+PKG_PATHS = [
+    SRC,
+    REPO_ROOT / "packages" / "e2e-private-transfer" / "src",
+    REPO_ROOT / "packages" / "l2-private-ledger" / "src",
+    REPO_ROOT / "packages" / "l0-zk-id" / "src",
+    REPO_ROOT / "packages" / "l2-economics" / "src",
+    REPO_ROOT / "packages" / "l1-chain" / "src",
+    REPO_ROOT / "packages" / "wallet-kernel" / "src",
+]
+for path in PKG_PATHS:
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from e2e_private_transfer.pipeline import run_private_transfer  # noqa: E402
+from nyx_backend.trace_cache import TraceCache  # noqa: E402
+
+
+class TraceCacheTests(unittest.TestCase):
+    def test_hits_misses_and_evictions(self) -> None:
+        cache = TraceCache(capacity=2)
+        first = cache.get(123)
+        self.assertIs(cache.get(123), first)
+        cache.get(7)
+        cache.get(8)
+        stats = cache.stats()
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.misses, 3)
+        self.assertEqual(stats.evictions, 1)
+        self.assertEqual(stats.size, 2)
+        self.assertEqual(stats.replays, 3)
+        expected, _ = run_private_transfer(seed=123)
+        self.assertEqual(first.to_json(), expected.to_json())
+
+    def test_disk_persistence_is_canonical_and_reloaded(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = Path(tmp)
+            writer = TraceCache(capacity=4, cache_dir=cache_dir)
+            trace = writer.get(123)
+            files = list(cache_dir.rglob("123.json"))
+            self.assertEqual(len(files), 1)
+            self.assertEqual(files[0].read_text(encoding="utf-8"), trace.to_json())
+            reader = TraceCache(capacity=4, cache_dir=cache_dir)
+            self.assertEqual(reader.get(123).to_json(), trace.to_json())
+            stats = reader.stats()
+            self.assertEqual(stats.disk_loads, 1)
+            self.assertEqual(stats.disk_writes, 0)
+
+    def test_corrupt_disk_entry_is_recomputed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = Path(tmp)
+            trace = TraceCache(capacity=4, cache_dir=cache_dir).get(123)
+            path = next(cache_dir.rglob("123.json"))
+            path.write_text("{}", encoding="utf-8")
+            reader = TraceCache(capacity=4, cache_dir=cache_dir)
+            self.assertEqual(reader.get(123).to_json(), trace.to_json())
+            self.assertEqual(reader.stats().disk_loads, 0)
+            self.assertEqual(path.read_text(encoding="utf-8"), trace.to_json())
+
+    def test_disk_write_failure_keeps_serving_from_memory(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = Path(tmp) / "traces"
+            cache = TraceCache(capacity=4, cache_dir=cache_dir)
+            with mock.patch("nyx_backend.trace_cache.os.replace", side_effect=OSError("disk full")):
+                trace = cache.get(123)
+            self.assertIs(cache.get(123), trace)
+            stats = cache.stats()
+            self.assertEqual((stats.disk_writes, stats.disk_errors), (0, 1))
+            self.assertEqual([path for path in cache_dir.rglob("*") if path.is_file()], [])
+            blocked = Path(tmp) / "blocked"
+            blocked.write_text("", encoding="utf-8")
+            readonly = TraceCache(capacity=4, cache_dir=blocked / "traces")
+            self.assertEqual(readonly.get(123).to_json(), trace.to_json())
+            self.assertEqual(readonly.stats().disk_errors, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
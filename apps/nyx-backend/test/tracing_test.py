@@ -0,0 +1,121 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+import sys
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+REPO_ROOT = BACKEND_ROOT.parents[1]
+SRC = BACKEND_ROOT / "src"
+PKG_PATHS = [
+    SRC,
+    REPO_ROOT / "packages" / "e2e-private-transfer" / "src",
+    REPO_ROOT / "packages" / "l2-private-ledger" / "src",
+    REPO_ROOT / "packages" / "l0-zk-id" / "src",
+    REPO_ROOT / "packages" / "l2-economics" / "src",
+    REPO_ROOT / "packages" / "l1-chain" / "src",
+    REPO_ROOT / "packages" / "wallet-kernel" / "src",
+]
+for path in PKG_PATHS:
+    path_str = str(path)
+    if path_str not in sys.path:
+        sys.path.insert(0, path_str)
+
+from nyx_backend.evidence import run_evidence  # noqa: E402
+import nyx_backend.trace_cache as trace_cache  # noqa: E402
+from nyx_backend.tracing import Tracer, TracingError, current_trace_id, span  # noqa: E402
+
+
+def _names(record: dict) -> list[str]:
+    names = [record["name"]]
+    for child in record.get("spans", []):
+        names.extend(_names(child))
+    return names
+
+
+class TracingTests(unittest.TestCase):
+    def test_nested_spans_are_emitted_as_one_json_line(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sink = Path(tmp) / "traces" / "trace.jsonl"
+            tracer = Tracer(sample_rate=1.0, sink=sink)
+            with tracer.trace("root", route="/run") as root:
+                trace_id = current_trace_id()
+                self.assertEqual(root.trace_id, trace_id)
+                with span("child"):
+                    with span("grandchild", n=1):
+                        pass
+                with self.assertRaises(KeyError):
+                    with span("failing"):
+                        raise KeyError("x")
+            self.assertIsNone(current_trace_id())
+            lines = sink.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 1)
+            record = json.loads(lines[0])
+        self.assertEqual(record["trace_id"], trace_id)
+        self.assertEqual(record["attrs"], {"route": "/run"})
+        self.assertEqual(_names(record), ["root", "child", "grandchild", "failing"])
+        child, failing = record["spans"]
+        self.assertEqual(child["spans"][0]["attrs"], {"n": 1})
+        self.assertEqual(failing["error"], "KeyError")
+        self.assertLessEqual(child["duration_ms"], record["duration_ms"])
+
+    def test_sampling_and_span_budget(self) -> None:
+        self.assertIsNone(Tracer(sample_rate=0.0).trace("x").__enter__())
+        draws = iter([0.2, 0.7])
+        tracer = Tracer(sample_rate=0.5, max_spans=2, sampler=lambda: next(draws))
+        with tracer.trace("sampled") as root:
+            self.assertIsNotNone(root)
+            for _ in range(3):
+                with span("leaf"):
+                    pass
+        with tracer.trace("skipped") as root:
+            self.assertIsNone(root)
+            with span("leaf") as leaf:
+                self.assertIsNone(leaf)
+        self.assertEqual(tracer.emitted, 1)
+        self.assertEqual(tracer.recent()[0]["dropped_spans"], 1)
+        with self.assertRaises(TracingError):
+            Tracer(sample_rate=1.5)
+
+    def test_context_does_not_leak_across_threads(self) -> None:
+        tracer = Tracer(sample_rate=1.0)
+        seen = []
+        with tracer.trace("root"):
+            worker = threading.Thread(target=lambda: seen.append(current_trace_id()))
+            worker.start()
+            worker.join()
+        self.assertEqual(seen, [None])
+
+    def test_run_evidence_spans_reach_the_pipeline(self) -> None:
+        previous = trace_cache.get_trace_cache()
+        trace_cache.configure_trace_cache(capacity=4)
+        try:
+            tracer = Tracer(sample_rate=1.0)
+            with tempfile.TemporaryDirectory() as tmp:
+                with tracer.trace("run"):
+                    run_evidence(
+                        seed=4242,
+                        run_id="trace-run",
+                        module="exchange",
+                        action="route_swap",
+                        payload={"asset_in": "a", "asset_out": "b", "amount": 5, "min_out": 1},
+                        base_dir=Path(tmp),
+                    )
+        finally:
+            trace_cache._CACHE = previous
+        names = _names(tracer.recent()[0])
+        for name in (
+            "evidence.run_evidence",
+            "evidence.trace_cache",
+            "trace_cache.fill",
+            "pipeline.run",
+            "pipeline.replay",
+            "evidence.write_artifacts",
+        ):
+            self.assertIn(name, names)
+
+
+if __name__ == "__main__":
+    unittest.main()
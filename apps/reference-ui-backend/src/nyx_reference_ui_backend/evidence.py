@@ -4,7 +4,6 @@ from dataclasses import dataclass
 import json
 from pathlib import Path
 import re
-import subprocess
 import sys
 import hashlib
 import io
@@ -54,6 +53,7 @@ def _repo_root() -> Path:
 def _ensure_paths() -> None:
     repo_root = _repo_root()
     paths = [
+        repo_root / "apps" / "nyx-backend" / "src",
         repo_root / "packages" / "e2e-private-transfer" / "src",
         repo_root / "packages" / "l2-private-ledger" / "src",
         repo_root / "packages" / "l0-zk-id" / "src",
@@ -142,23 +142,14 @@ def _run_root(base_dir: Path | None = None) -> Path:
     return root
 
 
-def _run_git(args: list[str]) -> str:
-    result = subprocess.run(
-        ["git", *args],
-        check=True,
-        capture_output=True,
-        text=True,
-    )
-    return result.stdout.strip()
-
-
 def _protocol_anchor() -> dict[str, str]:
-    commit = _run_git(["rev-parse", "HEAD"])
-    describe = _run_git(["describe", "--tags", "--always"])
-    tags_raw = _run_git(["tag", "--points-at", "HEAD"])
-    tags = sorted([t for t in tags_raw.splitlines() if t.strip()])
-    tag = tags[0] if tags else ""
-    return {"tag": tag, "commit": commit, "describe": describe}
+    _ensure_paths()
+    from nyx_backend.anchor import AnchorError, protocol_anchor
+
+    try:
+        return protocol_anchor()
+    except AnchorError as exc:
+        raise EvidenceError(str(exc)) from exc
 
 
 def _summary_stdout(trace, replay_ok: bool) -> str:
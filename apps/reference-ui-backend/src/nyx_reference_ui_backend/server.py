@@ -12,6 +12,7 @@ from nyx_reference_ui_backend.evidence import (
     list_runs,
     load_evidence,
     run_evidence,
+    _protocol_anchor,
     _safe_artifact_path,
     _sanitize_run_id,
 )
@@ -169,6 +170,7 @@ class ReferenceUIHandler(BaseHTTPRequestHandler):
 
 
 def run_server(host: str = "0.0.0.0", port: int = 8080) -> None:
+    _protocol_anchor()
     server = ThreadingHTTPServer((host, port), ReferenceUIHandler)
     server.serve_forever()
 
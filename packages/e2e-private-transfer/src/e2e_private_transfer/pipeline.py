@@ -50,6 +50,9 @@ except Exception as exc:  # pragma: no cover
     _IMPORT_ERROR = exc
 
 
+PIPELINE_VERSION = "e2e-private-transfer/v1"
+
+
 class E2EError(ValueError):
     pass
 
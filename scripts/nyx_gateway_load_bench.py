@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+from http.client import HTTPConnection
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import time
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GATEWAY_SRC = REPO_ROOT / "apps" / "nyx-backend-gateway" / "src"
+if str(GATEWAY_SRC) not in sys.path:
+    sys.path.insert(0, str(GATEWAY_SRC))
+os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+
+
+def _serve(mode: str, workdir: str, ready) -> None:
+    import io
+    import contextlib
+
+    import nyx_backend_gateway.gateway as gateway
+    import nyx_backend_gateway.server as server
+    from nyx_backend_gateway.async_server import AsyncGatewayServer
+    from nyx_backend_gateway.pool import configure_pool
+
+    db_path = Path(workdir) / "gateway.db"
+    run_root = Path(workdir) / "runs"
+    gateway._db_path = lambda: db_path
+    gateway._run_root = lambda: run_root
+    server._db_path = lambda: db_path
+    server._run_root = lambda: run_root
+    server.GatewayHandler.log_message = lambda self, *args: None
+    configure_pool().ensure_schema(db_path)
+    if mode == "asyncio":
+        httpd = AsyncGatewayServer(("127.0.0.1", 0), server.GatewayHandler)
+    else:
+        httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.GatewayHandler)
+    ready.put(httpd.server_address[1])
+    with contextlib.redirect_stderr(io.StringIO()):
+        httpd.serve_forever()
+
+
+def _client(port: int, paths: list[str], deadline: float, latencies: list[float], errors: list[int], lock) -> None:
+    conn = HTTPConnection("127.0.0.1", port, timeout=30)
+    local: list[float] = []
+    failed = 0
+    index = 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                failed += 1
+        except OSError:
+            failed += 1
+            conn.close()
+            continue
+        local.append(time.perf_counter() - started)
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        errors.append(failed)
+
+
+def _run(mode: str, concurrency: int, duration: float, paths: list[str]) -> dict[str, object]:
+    with tempfile.TemporaryDirectory() as tmp:
+        ready = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_serve, args=(mode, tmp, ready), daemon=True)
+        process.start()
+        port = ready.get(timeout=30)
+        latencies: list[float] = []
+        errors: list[int] = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+        clients = [
+            threading.Thread(target=_client, args=(port, paths, deadline, latencies, errors, lock))
+            for _ in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        process.terminate()
+        process.join(timeout=10)
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000.0, 3)
+
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gateway server mode load test (threading vs asyncio)")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--path", action="append", default=[])
+    args = parser.parse_args()
+    if args.concurrency < 1 or args.duration <= 0:
+        parser.error("--concurrency and --duration must be positive")
+    paths = args.path or ["/healthz", "/exchange/orderbook", "/marketplace/listings"]
+    for mode in ("threading", "asyncio"):
+        print(json.dumps(_run(mode, args.concurrency, args.duration, paths), sort_keys=True, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import threading
+import time
+import tracemalloc
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GATEWAY_SRC = REPO_ROOT / "apps" / "nyx-backend-gateway" / "src"
+if str(GATEWAY_SRC) not in sys.path:
+    sys.path.insert(0, str(GATEWAY_SRC))
+
+from nyx_backend_gateway.ratelimit import RateLimiter  # noqa: E402
+
+
+class _FixedWindowLimiter:
+    # The limiter the gateway shipped before: one unsynchronised dict, never pruned.
+    def __init__(self, limit: int, window_seconds: int) -> None:
+        self._limit = limit
+        self._window = window_seconds
+        self._state: dict[str, tuple[int, float]] = {}
+
+    def allow(self, key: str, cost: int = 1) -> bool:
+        now = time.monotonic()
+        count, start = self._state.get(key, (0, now))
+        if now - start >= self._window:
+            count, start = 0, now
+        if count >= self._limit:
+            self._state[key] = (count, start)
+            return False
+        self._state[key] = (count + 1, start)
+        return True
+
+
+def _retained_keys(limiter) -> int:
+    if isinstance(limiter, _FixedWindowLimiter):
+        return len(limiter._state)
+    return limiter.stats().keys
+
+
+def _limiter(mode: str, keys: int, window: float):
+    if mode == "before":
+        return _FixedWindowLimiter(120, int(window))
+    return RateLimiter(120, window, max_keys=keys * 2)
+
+
+def _resident_bytes(mode: str, names: list[str], window: float) -> int:
+    limiter = _limiter(mode, len(names), window)
+    tracemalloc.start()
+    for name in names:
+        limiter.allow(name)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def _run(mode: str, keys: int, requests: int, threads: int, window: float) -> dict[str, object]:
+    limiter = _limiter(mode, keys, window)
+    names = [f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}" for index in range(keys)]
+    per_thread = requests // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset: int) -> None:
+        barrier.wait()
+        for index in range(per_thread):
+            limiter.allow(names[(offset + index * 7919) % keys])
+
+    workers = [threading.Thread(target=worker, args=(offset * 997,)) for offset in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    retained_active = _retained_keys(limiter)
+    time.sleep(window)
+    for index in range(keys):
+        limiter.allow(f"late-{index}")
+    retained_after_idle = _retained_keys(limiter)
+    return {
+        "mode": mode,
+        "keys": keys,
+        "threads": threads,
+        "requests": per_thread * threads,
+        "ops_per_sec": round(per_thread * threads / elapsed, 1),
+        "retained_keys_active": retained_active,
+        "retained_keys_after_idle": retained_after_idle,
+        "state_mib": round(_resident_bytes(mode, names, window) / (1024 * 1024), 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gateway rate limiter benchmark (distinct client keys)")
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--window", type=float, default=1.0)
+    args = parser.parse_args()
+    if args.keys < 1 or args.requests < 1 or args.threads < 1 or args.window <= 0:
+        parser.error("--keys, --requests, --threads and --window must be positive")
+    for mode in ("before", "after"):
+        print(json.dumps(_run(mode, args.keys, args.requests, args.threads, args.window), sort_keys=True, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GATEWAY_SRC = REPO_ROOT / "apps" / "nyx-backend-gateway" / "src"
+if str(GATEWAY_SRC) not in sys.path:
+    sys.path.insert(0, str(GATEWAY_SRC))
+os.environ.setdefault("NYX_TESTNET_FEE_ADDRESS", "testnet-fee-address")
+
+from nyx_backend_gateway.exchange import place_order  # noqa: E402
+from nyx_backend_gateway.fees import route_fee  # noqa: E402
+from nyx_backend_gateway.storage import (  # noqa: E402
+    EvidenceRun,
+    Order,
+    Receipt,
+    StoragePragmas,
+    TUNED_PRAGMAS,
+    apply_pragmas,
+    create_connection,
+    insert_evidence_run,
+    insert_fee_ledger,
+    insert_receipt,
+    unit_of_work,
+)
+
+
+# Syncs issued per durable commit on Linux: rollback journal with synchronous=FULL
+# syncs the journal twice and the database once; WAL with synchronous=NORMAL
+# defers all syncs to checkpoints (two per checkpoint, every ~1000 pages).
+_SYNCS_PER_COMMIT = {("DELETE", "FULL"): 3, ("WAL", "NORMAL"): 0}
+_DEFAULT_PRAGMAS = StoragePragmas(journal_mode="DELETE", synchronous="FULL", mmap_size=0, cache_size_kib=2000)
+
+
+def _payload(index: int) -> dict[str, object]:
+    if index % 2 == 0:
+        return {"side": "BUY", "asset_in": "NYXT", "asset_out": "ECHO", "amount": 10, "price": 100 + index % 5}
+    return {"side": "SELL", "asset_in": "ECHO", "asset_out": "NYXT", "amount": 7, "price": 100 - index % 3}
+
+
+def _place_order_writes(conn, index: int) -> None:
+    run_id = f"bench-run-{index}"
+    payload = _payload(index)
+    state_hash = f"{index:064x}"
+    insert_evidence_run(
+        conn,
+        EvidenceRun(
+            run_id=run_id,
+            module="exchange",
+            action="place_order",
+            seed=index,
+            state_hash=state_hash,
+            receipt_hashes=[state_hash],
+            replay_ok=True,
+        ),
+    )
+    insert_receipt(
+        conn,
+        Receipt(
+            receipt_id=f"receipt-{index}",
+            module="exchange",
+            action="place_order",
+            state_hash=state_hash,
+            receipt_hashes=[state_hash],
+            replay_ok=True,
+            run_id=run_id,
+        ),
+    )
+    insert_fee_ledger(conn, route_fee("exchange", "place_order", payload, run_id))
+    place_order(
+        conn,
+        Order(
+            order_id=f"order-{index}",
+            side=str(payload["side"]),
+            amount=int(payload["amount"]),
+            price=int(payload["price"]),
+            asset_in=str(payload["asset_in"]),
+            asset_out=str(payload["asset_out"]),
+            run_id=run_id,
+        ),
+    )
+
+
+def _run(mode: str, requests: int) -> dict[str, object]:
+    pragmas = TUNED_PRAGMAS if mode == "after" else _DEFAULT_PRAGMAS
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = create_connection(Path(tmp) / "bench.db")
+        apply_pragmas(conn, pragmas)
+        commits = 0
+
+        def _trace(statement: str) -> None:
+            nonlocal commits
+            if statement.strip().upper() == "COMMIT":
+                commits += 1
+
+        conn.set_trace_callback(_trace)
+        started = time.perf_counter()
+        for index in range(requests):
+            if mode == "after":
+                with unit_of_work(conn):
+                    _place_order_writes(conn, index)
+            else:
+                _place_order_writes(conn, index)
+        elapsed = time.perf_counter() - started
+        conn.set_trace_callback(None)
+        conn.close()
+    syncs_per_commit = _SYNCS_PER_COMMIT[(pragmas.journal_mode, pragmas.synchronous)]
+    return {
+        "mode": mode,
+        "journal_mode": pragmas.journal_mode,
+        "synchronous": pragmas.synchronous,
+        "requests": requests,
+        "commits_per_request": round(commits / requests, 2),
+        "fsyncs_per_request": round(commits * syncs_per_commit / requests, 2),
+        "ms_per_request": round(elapsed * 1000 / requests, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gateway storage fsync benchmark (exchange/place_order writes)")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    if args.requests < 1:
+        parser.error("--requests must be positive")
+    for mode in ("before", "after"):
+        print(json.dumps(_run(mode, args.requests), sort_keys=True, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())